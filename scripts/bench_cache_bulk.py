@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""Per-key loops vs bulk calls (get_many / upsert_many / delete_many) per backend.
+
+Writes, reads and deletes a batch of table rows once through the single-key
+methods and once through the bulk ones, for each cache backend. Redis is
+skipped when no server answers at ``--url``; JSON writes under a temporary
+directory.
+
+    uv run python scripts/bench_cache_bulk.py
+    uv run python scripts/bench_cache_bulk.py --sizes 10 100 1000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+# Allow `python scripts/bench_cache_bulk.py` from a source checkout.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SYSTEM_LOG_LEVEL", "WARNING")
+
+from wappa.domain.interfaces.cache_interfaces import ITableCache  # noqa: E402
+from wappa.persistence.cache_factory import create_cache_factory  # noqa: E402
+from wappa.persistence.json.handlers.utils.file_manager import (  # noqa: E402
+    file_manager,
+)
+from wappa.persistence.redis.redis_client import RedisClient  # noqa: E402
+
+INBOX = "bench-bulk"
+TABLE = "orders"
+
+
+async def loop_round(table: ITableCache, rows: dict[str, dict[str, Any]]) -> None:
+    for pkid, row in rows.items():
+        await table.upsert(TABLE, pkid, row)
+    for pkid in rows:
+        await table.get(TABLE, pkid)
+    for pkid in rows:
+        await table.delete(TABLE, pkid)
+
+
+async def bulk_round(table: ITableCache, rows: dict[str, dict[str, Any]]) -> None:
+    await table.upsert_many(TABLE, rows)
+    await table.get_many(TABLE, rows)
+    await table.delete_many(TABLE, rows)
+
+
+async def best_of(repeat: int, call: Callable[[], Awaitable[None]]) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1e3
+
+
+async def redis_available(url: str) -> bool:
+    RedisClient.setup_single_url(url)
+    try:
+        await (await RedisClient.get("table")).ping()
+        return True
+    except Exception:
+        await RedisClient.close()
+        return False
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", default=os.getenv("REDIS_URL", "redis://localhost:6379")
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = ["memory", "json"]
+    if await redis_available(args.url):
+        backends.append("redis")
+    else:
+        print(f"(no Redis reachable at {args.url}; skipping redis)\n")
+
+    with tempfile.TemporaryDirectory() as cache_root:
+        file_manager._cache_root = Path(cache_root)
+        file_manager.ensure_cache_directories()
+
+        print(f"{'backend':<8} {'rows':>6} {'loop':>11} {'bulk':>11} {'speedup':>8}")
+        try:
+            for backend in backends:
+                table = create_cache_factory(backend)(
+                    inbox_id=INBOX, user_id="bench"
+                ).create_table_cache()
+                for size in args.sizes:
+                    rows = {
+                        f"o-{i}": {"total": i, "status": "paid"} for i in range(size)
+                    }
+                    loop_ms = await best_of(
+                        args.repeat, lambda t=table, r=rows: loop_round(t, r)
+                    )
+                    bulk_ms = await best_of(
+                        args.repeat, lambda t=table, r=rows: bulk_round(t, r)
+                    )
+                    print(
+                        f"{backend:<8} {size:>6} {loop_ms:>8.2f} ms "
+                        f"{bulk_ms:>8.2f} ms {loop_ms / bulk_ms:>7.1f}x"
+                    )
+        finally:
+            await RedisClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
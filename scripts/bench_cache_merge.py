@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Read-merge-write vs atomic merge / append_to_list on large states per backend.
+
+Seeds a handler state with ``--fields`` fields (plus a list of the same
+length), then times small updates two ways: the old read-whole-state,
+change-in-Python, write-it-back route (``IStateCache.merge``'s default and a
+get + upsert append) and the backend's own ``merge`` / ``append_to_list``,
+which touch only the changed fields. Redis is skipped when no server answers
+at ``--url``; JSON writes under a temporary directory.
+
+    uv run python scripts/bench_cache_merge.py
+    uv run python scripts/bench_cache_merge.py --fields 50 500 --updates 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+# Allow `python scripts/bench_cache_merge.py` from a source checkout.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SYSTEM_LOG_LEVEL", "WARNING")
+
+from wappa.domain.interfaces.cache_interfaces import IStateCache  # noqa: E402
+from wappa.persistence.cache_factory import create_cache_factory  # noqa: E402
+from wappa.persistence.json.handlers.utils.file_manager import (  # noqa: E402
+    file_manager,
+)
+from wappa.persistence.redis.redis_client import RedisClient  # noqa: E402
+
+INBOX = "bench-merge"
+HANDLER = "checkout"
+
+
+async def rmw_merges(state: IStateCache, updates: int) -> None:
+    for i in range(updates):
+        await IStateCache.merge(state, HANDLER, {"step": i})
+
+
+async def atomic_merges(state: IStateCache, updates: int) -> None:
+    for i in range(updates):
+        await state.merge(HANDLER, {"step": i})
+
+
+async def rmw_appends(state: IStateCache, updates: int) -> None:
+    for i in range(updates):
+        current = await state.get(HANDLER) or {}
+        current["events"] = [*current.get("events", []), i]
+        await state.upsert(HANDLER, current)
+
+
+async def atomic_appends(state: IStateCache, updates: int) -> None:
+    for i in range(updates):
+        await state.append_to_list(HANDLER, "events", i)
+
+
+async def best_of(
+    repeat: int,
+    seed: Callable[[], Awaitable[None]],
+    call: Callable[[], Awaitable[None]],
+) -> float:
+    samples = []
+    for _ in range(repeat):
+        await seed()
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1e3
+
+
+async def redis_available(url: str) -> bool:
+    RedisClient.setup_single_url(url)
+    try:
+        await (await RedisClient.get("state_handler")).ping()
+        return True
+    except Exception:
+        await RedisClient.close()
+        return False
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", default=os.getenv("REDIS_URL", "redis://localhost:6379")
+    )
+    parser.add_argument("--fields", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = ["memory", "json"]
+    if await redis_available(args.url):
+        backends.append("redis")
+    else:
+        print(f"(no Redis reachable at {args.url}; skipping redis)\n")
+
+    with tempfile.TemporaryDirectory() as cache_root:
+        file_manager._cache_root = Path(cache_root)
+        file_manager.ensure_cache_directories()
+
+        print(
+            f"{'backend':<8} {'op':<7} {'fields':>6} "
+            f"{'read+write':>13} {'atomic':>11} {'speedup':>8}"
+        )
+        try:
+            for backend in backends:
+                state = create_cache_factory(backend)(
+                    inbox_id=INBOX, user_id="bench"
+                ).create_state_cache()
+                for fields in args.fields:
+                    data = {f"field_{i}": f"value-{i}" for i in range(fields)}
+                    data["events"] = list(range(fields))
+
+                    async def seed(s: IStateCache = state, d: dict = data) -> None:
+                        await s.upsert(HANDLER, d)
+
+                    for op, old, new in (
+                        ("merge", rmw_merges, atomic_merges),
+                        ("append", rmw_appends, atomic_appends),
+                    ):
+                        old_ms = await best_of(
+                            args.repeat,
+                            seed,
+                            lambda s=state, f=old: f(s, args.updates),
+                        )
+                        new_ms = await best_of(
+                            args.repeat,
+                            seed,
+                            lambda s=state, f=new: f(s, args.updates),
+                        )
+                        print(
+                            f"{backend:<8} {op:<7} {fields:>6} "
+                            f"{old_ms:>10.2f} ms {new_ms:>8.2f} ms "
+                            f"{old_ms / new_ms:>7.1f}x"
+                        )
+                await state.delete(HANDLER)
+        finally:
+            await RedisClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
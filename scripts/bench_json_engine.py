@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""Single-row write and read cost of the JSON backend's file and log engines.
+
+Fills one inbox with ``--sizes`` rows, then times single-row writes and gets
+against it, in three shapes:
+
+- ``table``: plain table rows.
+- ``indexed``: table rows with a declared ``customer_id`` index (ten rows per
+  customer), so each upsert also moves the row between index entries.
+- ``users``: user upserts that change the user's phone number, so each one
+  also rewrites the inbox's identity index.
+
+The ``file`` engine rewrites the whole tables, indexes or identities file on
+each write, so its cost grows with the rows already stored; the ``log``
+engine appends the entries the write changed, whose size depends on the rows
+sharing the changed index values, not on the table. Runs under a temporary
+directory; fsync is left to the OS (``fsync_interval`` above the run time) so
+both engines are compared on the same footing.
+
+    uv run python scripts/bench_json_engine.py
+    uv run python scripts/bench_json_engine.py --sizes 100 1000 10000 --writes 200
+    uv run python scripts/bench_json_engine.py --shapes indexed users
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Allow `python scripts/bench_json_engine.py` from a source checkout.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SYSTEM_LOG_LEVEL", "WARNING")
+
+from wappa.persistence import field_indexes  # noqa: E402
+from wappa.persistence.json.engines import FileEngine, JSONEngine  # noqa: E402
+from wappa.persistence.json.handlers.utils.file_manager import (  # noqa: E402
+    file_manager,
+)
+from wappa.persistence.json.json_cache_factory import JSONCacheFactory  # noqa: E402
+from wappa.persistence.json.log_engine import LogEngine  # noqa: E402
+from wappa.persistence.json.storage_manager import storage_manager  # noqa: E402
+
+TABLE = "orders"
+INDEXED = "indexed_orders"
+SHAPES = ("table", "indexed", "users")
+
+
+def _order(i: int, total: int) -> dict[str, int | str]:
+    return {"total": total, "status": "paid", "customer_id": f"c-{i // 10}"}
+
+
+async def run(
+    engine: JSONEngine, shape: str, size: int, writes: int
+) -> tuple[float, float]:
+    """Microseconds per single-row write and per get with ``size`` rows stored."""
+    storage_manager.use_engine(engine)
+    inbox = f"bench-{engine.name}-{shape}-{size}"
+    factory = JSONCacheFactory(inbox_id=inbox, user_id="bench")
+
+    if shape == "users":
+        await factory.create_user_cache(user_id="bench").upsert_many(
+            {f"u-{i}": {"phone_number": f"1555{i:07d}"} for i in range(size)}
+        )
+        users = [factory.create_user_cache(user_id=f"u-{i}") for i in range(size)]
+
+        async def write(i: int) -> None:
+            await users[i % size].upsert({"phone_number": f"1666{i:07d}"})
+
+        async def read(i: int) -> None:
+            await users[i % size].get()
+
+    else:
+        table_name = INDEXED if shape == "indexed" else TABLE
+        table = factory.create_table_cache()
+        await table.upsert_many(
+            table_name, {f"o-{i}": _order(i, i) for i in range(size)}
+        )
+
+        async def write(i: int) -> None:
+            # Moves the row to another customer's index entry and back
+            row = _order(i + 10 * (i % 2), -i)
+            await table.upsert(table_name, f"o-{i % size}", row)
+
+        async def read(i: int) -> None:
+            await table.get(table_name, f"o-{i % size}")
+
+    start = time.perf_counter()
+    for i in range(writes):
+        await write(i)
+    write_us = (time.perf_counter() - start) / writes * 1e6
+
+    start = time.perf_counter()
+    for i in range(writes):
+        await read(i)
+    read_us = (time.perf_counter() - start) / writes * 1e6
+
+    await engine.close()
+    return write_us, read_us
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    args = parser.parse_args()
+
+    field_indexes.declare(INDEXED, "customer_id")
+    with tempfile.TemporaryDirectory() as cache_root:
+        file_manager._cache_root = Path(cache_root)
+        file_manager.ensure_cache_directories()
+
+        print(f"{'shape':<8} {'engine':<6} {'rows':>7} {'upsert':>12} {'get':>12}")
+        for shape in args.shapes:
+            for size in args.sizes:
+                for engine in (FileEngine(), LogEngine(fsync_interval=3600)):
+                    write_us, read_us = await run(engine, shape, size, args.writes)
+                    print(
+                        f"{shape:<8} {engine.name:<6} {size:>7} "
+                        f"{write_us:>9.0f} µs {read_us:>9.0f} µs"
+                    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""MemoryStore call latency under concurrent load, sweep vs heap expiry.
+
+Seeds ``--keys`` entries with TTLs spread over the run, so they keep expiring
+while ``--workers`` concurrent tasks read and write random users for
+``--seconds``. Each call is timed from the moment it yields to the event loop
+until it returns, so time spent waiting behind an expiry pass counts. Two
+stores are compared: the previous engine (one lock per namespace and a full
+sweep of every entry, every ``--sweep-interval`` seconds) and the current one
+(lock stripes, bounded batches popped from a deadline heap).
+
+    uv run python scripts/bench_memory_store.py
+    uv run python scripts/bench_memory_store.py --keys 500000 --workers 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Allow `python scripts/bench_memory_store.py` from a source checkout.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SYSTEM_LOG_LEVEL", "WARNING")
+
+from wappa.persistence.memory.handlers.utils.memory_store import (  # noqa: E402
+    MemoryStore,
+)
+
+NAMESPACE = "states"
+
+
+class SweepingStore(MemoryStore):
+    """The previous engine: one lock per namespace, periodic full sweep."""
+
+    def __init__(self, sweep_interval: float) -> None:
+        super().__init__(stripes=1, expiry_interval=sweep_interval)
+
+    def _expire_due(self) -> tuple[int, int]:
+        now = time.monotonic()
+        expired = 0
+        for store in self._store.values():
+            for context_key, context_store in list(store.items()):
+                due = [k for k, (_, d, _) in context_store.items() if d and now > d]
+                for key in due:
+                    del context_store[key]
+                expired += len(due)
+                if not context_store:
+                    del store[context_key]
+        self._deadlines.clear()
+        return 0, expired
+
+
+async def seed(store: MemoryStore, keys: int, seconds: float) -> None:
+    # TTLs from 1s to just past the run, so expiry keeps finding due entries
+    for start in range(0, keys, 1000):
+        ttl = 1 + start * int(seconds) // keys
+        batch = [
+            (f"inbox_u{i}", "flow", {"step": i}) for i in range(start, start + 1000)
+        ]
+        await store.set_many(NAMESPACE, batch[: keys - start], ttl=ttl)
+
+
+async def worker(
+    store: MemoryStore, users: int, until: float, samples: list[float]
+) -> None:
+    rng = random.Random()
+    while time.perf_counter() < until:
+        context_key = f"inbox_u{rng.randrange(users)}"
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        if rng.random() < 0.8:
+            await store.get(NAMESPACE, context_key, "flow")
+        else:
+            await store.set(NAMESPACE, context_key, "flow", {"step": 0}, ttl=60)
+        samples.append(time.perf_counter() - start)
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1e3
+
+
+async def run(store: MemoryStore, args: argparse.Namespace) -> list[float]:
+    await seed(store, args.keys, args.seconds)
+    # Keep full collections over the seeded entries out of both timings
+    gc.collect()
+    gc.freeze()
+    store.start_cleanup_task()
+    samples: list[float] = []
+    until = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        *(worker(store, args.keys, until, samples) for _ in range(args.workers))
+    )
+    store.stop_cleanup_task()
+    gc.unfreeze()
+    return sorted(samples)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=300_000)
+    parser.add_argument("--workers", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--sweep-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.keys} keys, {args.workers} workers, {args.seconds:.0f}s, "
+        f"80% get / 20% set"
+    )
+    print(
+        f"{'engine':<12}{'calls':>10}{'mean ms':>10}{'p50 ms':>10}"
+        f"{'p99 ms':>10}{'p99.9 ms':>10}{'max ms':>10}"
+    )
+    engines = {
+        "sweep": SweepingStore(args.sweep_interval),
+        "heap": MemoryStore(),
+    }
+    for name, store in engines.items():
+        samples = await run(store, args)
+        print(
+            f"{name:<12}{len(samples):>10}{statistics.fmean(samples) * 1e3:>10.3f}"
+            f"{percentile(samples, 0.5):>10.3f}{percentile(samples, 0.99):>10.3f}"
+            f"{percentile(samples, 0.999):>10.3f}{samples[-1] * 1e3:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""Redis round trips and latency per cache handler call, per-call PING vs none.
+
+``RedisClient.get()`` used to PING before handing out a client, so every cache
+operation paid one extra round trip. This runs common handler calls against a
+live Redis twice: once with that PING re-enabled ("ping") and once as shipped
+("lookup"), counting commands sent and timing each call.
+
+    uv run python scripts/bench_redis_round_trips.py
+    uv run python scripts/bench_redis_round_trips.py --url redis://localhost:6379 --rounds 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# Allow `python scripts/bench_redis_round_trips.py` from a source checkout.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SYSTEM_LOG_LEVEL", "WARNING")
+
+from redis.asyncio import Redis  # noqa: E402
+from redis.asyncio.client import Pipeline  # noqa: E402
+
+from wappa.persistence.redis.redis_client import RedisClient  # noqa: E402
+from wappa.persistence.redis.redis_handler import (  # noqa: E402
+    RedisStateHandler,
+    RedisTable,
+    RedisUser,
+)
+
+INBOX = "bench-round-trips"
+
+round_trips = 0
+_execute_command = Redis.execute_command
+_execute_pipeline = Pipeline.execute
+_lookup_get = RedisClient.get.__func__  # type: ignore[attr-defined]
+
+
+async def _counted_command(self: Redis, *args: Any, **kwargs: Any) -> Any:
+    global round_trips
+    round_trips += 1
+    return await _execute_command(self, *args, **kwargs)
+
+
+async def _counted_pipeline(self: Pipeline, *args: Any, **kwargs: Any) -> Any:
+    global round_trips
+    round_trips += 1
+    return await _execute_pipeline(self, *args, **kwargs)
+
+
+async def _ping_get(cls: type[RedisClient], alias: Any = "users") -> Redis:
+    client = await _lookup_get(cls, alias)
+    await client.ping()
+    return client
+
+
+@contextmanager
+def per_call_ping():
+    RedisClient.get = classmethod(_ping_get)  # type: ignore[method-assign]
+    try:
+        yield
+    finally:
+        RedisClient.get = classmethod(_lookup_get)  # type: ignore[method-assign]
+
+
+def operations() -> dict[str, Callable[[], Awaitable[Any]]]:
+    user = RedisUser(inbox=INBOX, user_id="u-1")
+    state = RedisStateHandler(inbox=INBOX, user_id="u-1")
+    table = RedisTable(inbox=INBOX)
+    return {
+        "user.upsert": lambda: user.upsert({"name": "Ana", "score": 1}),
+        "user.get": user.get,
+        "user.get_field": lambda: user.get_field("name"),
+        "state.upsert": lambda: state.upsert("flow", {"step": 1}),
+        "state.get": lambda: state.get("flow"),
+        "table.upsert": lambda: table.upsert("orders", "o-1", {"total": 10}),
+        "table.get": lambda: table.get("orders", "o-1"),
+    }
+
+
+async def measure(
+    call: Callable[[], Awaitable[Any]], rounds: int
+) -> tuple[float, float]:
+    global round_trips
+    await call()
+    round_trips = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await call()
+    elapsed = time.perf_counter() - start
+    return round_trips / rounds, elapsed * 1e6 / rounds
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--url", default=os.getenv("REDIS_URL", "redis://localhost:6379")
+    )
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    RedisClient.setup_single_url(args.url)
+    try:
+        await (await RedisClient.get("users")).ping()
+    except Exception as exc:
+        sys.exit(f"No Redis reachable at {args.url}: {exc}")
+
+    Redis.execute_command = _counted_command  # type: ignore[method-assign]
+    Pipeline.execute = _counted_pipeline  # type: ignore[method-assign]
+    try:
+        print(
+            f"{'operation':<16} {'trips ping':>10} {'trips lookup':>12} "
+            f"{'ping':>10} {'lookup':>10} {'saved':>7}"
+        )
+        for name, call in operations().items():
+            with per_call_ping():
+                ping_trips, ping_us = await measure(call, args.rounds)
+            lookup_trips, lookup_us = await measure(call, args.rounds)
+            print(
+                f"{name:<16} {ping_trips:>10.1f} {lookup_trips:>12.1f} "
+                f"{ping_us:>7.1f} µs {lookup_us:>7.1f} µs "
+                f"{1 - lookup_us / ping_us:>6.0%}"
+            )
+    finally:
+        Redis.execute_command = _execute_command  # type: ignore[method-assign]
+        Pipeline.execute = _execute_pipeline  # type: ignore[method-assign]
+        await RedisTable(inbox=INBOX).delete_table("orders")
+        await RedisUser(inbox=INBOX, user_id="u-1").delete()
+        await RedisStateHandler(inbox=INBOX, user_id="u-1").delete("flow")
+        await RedisClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+"""CPU and stored size per Redis value of each serde codec, and of guessed vs schema reads.
+
+Encodes and decodes an AI-state sized conversation and a wide table row with
+every codec installed (``json`` always; ``orjson`` and ``msgpack`` with their
+extras), then compares model reads the way they used to work - decode, turn
+"1"/"0" into bools, try ISO parsing on every string, validate - against the
+cached ``TypeAdapter`` reads ``loads`` and ``loads_hash`` do now.
+
+Sizes are the bytes Redis holds: the UTF-8 encoding of the stored text. For
+msgpack that is more than the packed bytes (see ``serde.MsgpackCodec``).
+
+    uv run python scripts/bench_serde.py
+    uv run python scripts/bench_serde.py --messages 200 --rounds 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+# Allow `python scripts/bench_serde.py` from a source checkout.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SYSTEM_LOG_LEVEL", "WARNING")
+
+from pydantic import BaseModel  # noqa: E402
+
+from wappa.persistence.redis.redis_handler.utils import serde  # noqa: E402
+
+
+class Message(BaseModel):
+    role: str
+    text: str
+    sent_at: datetime
+    delivered: bool
+    tokens: int
+
+
+class Conversation(BaseModel):
+    conversation_id: str
+    summary: str
+    messages: list[Message]
+    tools: dict[str, bool]
+
+
+class Order(BaseModel):
+    order_id: str
+    customer: str
+    phone: str
+    status: str
+    currency: str
+    total: float
+    items: int
+    paid: bool
+    created_at: datetime
+    notes: str
+    address: dict[str, str]
+    tags: list[str]
+
+
+def conversation(messages: int) -> Conversation:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    return Conversation(
+        conversation_id="c-573001234567",
+        summary="Customer asks about an order placed last week " * 4,
+        messages=[
+            Message(
+                role="user" if i % 2 else "assistant",
+                text=f"Message {i}: " + "lorem ipsum dolor sit amet " * 6,
+                sent_at=start + timedelta(seconds=i),
+                delivered=i % 3 != 0,
+                tokens=40 + i,
+            )
+            for i in range(messages)
+        ],
+        tools={"search": True, "refund": False, "handoff": True},
+    )
+
+
+def order() -> Order:
+    return Order(
+        order_id="o-10293",
+        customer="Ada Lovelace",
+        phone="+573001234567",
+        status="paid",
+        currency="COP",
+        total=125900.0,
+        items=3,
+        paid=True,
+        created_at=datetime(2025, 1, 1, 12, 30, tzinfo=UTC),
+        notes="Leave at the front desk",
+        address={"city": "Bogotá", "street": "Cra 7 # 71-21", "zip": "110231"},
+        tags=["vip", "repeat"],
+    )
+
+
+def readings(count: int) -> dict[str, Any]:
+    """A float-heavy value: sensor-style samples."""
+    return {"sensor": "s-1", "samples": [1000.5 + i for i in range(count)]}
+
+
+def stored_bytes(raw: str) -> int:
+    """Bytes Redis holds for an encoded value (the pools write UTF-8)."""
+    return len(raw.encode())
+
+
+def guessed_model_read(raw: str, model: type[BaseModel]) -> BaseModel:
+    """``loads(raw, model)`` before schema-directed reads."""
+    data = serde._convert_redis_to_bools(json.loads(raw))
+    return model.model_validate(serde._convert_iso_strings_to_datetime(data))
+
+
+def guessed_hash_read(raw: dict[str, str], model: type[BaseModel]) -> BaseModel:
+    """``loads_hash(raw, model)`` before str fields were taken as stored."""
+    data = {}
+    for field, value in raw.items():
+        if value in ("null", "1", "0"):
+            data[field] = serde.loads(value)
+            continue
+        try:
+            data[field] = json.loads(value)
+        except json.JSONDecodeError:
+            data[field] = value
+    return model.model_validate(data)
+
+
+def best_us(fn: Callable[[], Any], rounds: int) -> float:
+    for _ in range(min(rounds, 100)):
+        fn()
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        samples.append((time.perf_counter() - start) / rounds)
+    return min(samples) * 1e6
+
+
+def report(label: str, us: float, baseline: float | None = None) -> None:
+    speedup = f"{baseline / us:>7.1f}x" if baseline else ""
+    print(f"  {label:<36} {us:>10.1f} µs {speedup}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    state = conversation(args.messages)
+    expected = json.loads(serde.dumps(state))
+    codecs = [name for name in ("json", "orjson", "msgpack") if name in serde._codecs]
+    print(f"codecs: {', '.join(codecs)}; {args.messages} messages per state\n")
+
+    print("Stored size (bytes in Redis)")
+    values = {
+        "AI state": state,
+        "table row": order(),
+        f"{args.messages} float samples": readings(args.messages),
+    }
+    for label, value in values.items():
+        sizes = []
+        for name in codecs:
+            serde.use_codec(name)
+            sizes.append(f"{name} {stored_bytes(serde.dumps(value))}")
+        print(f"  {label:<24} {', '.join(sizes)}")
+    if "msgpack" in codecs:
+        serde.use_codec("msgpack")
+        # One character per packed byte, after the one-character marker.
+        packed = len(serde.dumps(state)) - 1
+        print(f"  (AI state as packed by msgpack, before UTF-8: {packed})")
+    print()
+
+    print("AI state, encode / decode (untyped)")
+    baseline: dict[str, float] = {}
+    for name in codecs:
+        serde.use_codec(name)
+        raw = serde.dumps(state)
+        encode = best_us(lambda: serde.dumps(state), args.rounds)
+        decode = best_us(lambda raw=raw: serde.loads(raw), args.rounds)
+        baseline.setdefault("encode", encode)
+        baseline.setdefault("decode", decode)
+        report(f"{name} encode ({stored_bytes(raw)} bytes)", encode, baseline["encode"])
+        report(f"{name} decode", decode, baseline["decode"])
+        assert serde.loads(raw) == expected
+
+    print("\nAI state, read into the model")
+    serde.use_codec("json")
+    raw = serde.dumps(state)
+    guessed = best_us(lambda: guessed_model_read(raw, Conversation), args.rounds)
+    report("guessed (bools + ISO walk)", guessed)
+    for name in codecs:
+        serde.use_codec(name)
+        raw = serde.dumps(state)
+        assert serde.loads(raw, Conversation) == state
+        schema = best_us(lambda raw=raw: serde.loads(raw, Conversation), args.rounds)
+        report(f"{name} + TypeAdapter", schema, guessed)
+
+    print("\nTable row, HGETALL read into the model")
+    serde.use_codec("json")
+    row = serde.dumps_hash(order())
+    guessed = best_us(lambda: guessed_hash_read(row, Order), args.rounds * 5)
+    report("guessed (decode every field)", guessed)
+    for name in codecs:
+        serde.use_codec(name)
+        row = serde.dumps_hash(order())
+        assert serde.loads_hash(row, models=Order) == order()
+        schema = best_us(
+            lambda row=row: serde.loads_hash(row, models=Order), args.rounds * 5
+        )
+        report(f"{name} + str fields as stored", schema, guessed)
+    serde.use_codec("json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Per-status cost of decoding WhatsApp status webhooks, fast vs strict.
+
+Runs every status fixture in ``tests/fixtures/meta/v25.0`` through
+``create_universal_webhooks`` twice: with the fast status decoder (the
+default) and with ``strict_validation=True``, which validates the whole
+container and each status with the pydantic models.
+
+    uv run python scripts/bench_status_decoder.py
+    uv run python scripts/bench_status_decoder.py --rounds 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# Allow `python scripts/bench_status_decoder.py` from a source checkout.
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SYSTEM_LOG_LEVEL", "WARNING")
+
+from wappa.processors.whatsapp_processor import WhatsAppWebhookProcessor  # noqa: E402
+
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "meta" / "v25.0"
+
+
+def status_fixtures() -> dict[str, dict[str, Any]]:
+    fixtures = {}
+    for path in sorted(FIXTURE_DIR.glob("*.json")):
+        payload = json.loads(path.read_text())
+        if '"statuses"' in json.dumps(payload):
+            fixtures[path.name] = payload
+    return fixtures
+
+
+def count_statuses(payload: dict[str, Any]) -> int:
+    return sum(
+        len(change["value"].get("statuses") or ())
+        for entry in payload["entry"]
+        for change in entry["changes"]
+    )
+
+
+async def per_status_us(
+    processor: WhatsAppWebhookProcessor, payload: dict[str, Any], rounds: int
+) -> float:
+    for _ in range(min(rounds, 200)):
+        await processor.create_universal_webhooks(payload)
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await processor.create_universal_webhooks(payload)
+        samples.append((time.perf_counter() - start) / rounds)
+    return min(samples) * 1e6 / count_statuses(payload)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    fast = WhatsAppWebhookProcessor(strict_validation=False)
+    strict = WhatsAppWebhookProcessor(strict_validation=True)
+
+    print(f"{'fixture':<32} {'statuses':>8} {'strict':>12} {'fast':>12} {'speedup':>8}")
+    for name, payload in status_fixtures().items():
+        strict_us = await per_status_us(strict, payload, args.rounds)
+        fast_us = await per_status_us(fast, payload, args.rounds)
+        print(
+            f"{name:<32} {count_statuses(payload):>8} "
+            f"{strict_us:>9.1f} µs {fast_us:>9.1f} µs {strict_us / fast_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""Bytes-to-event latency of WhatsApp webhook intake, before and after.
+
+"before" is the old route: ``request.json()`` (stdlib decode of the body
+text) and no signature check. "after" is the current route: verify
+``X-Hub-Signature-256`` over the raw bytes, decode them with the fast
+decoder (orjson when installed), then build universal webhooks. Junk
+traffic is measured separately — before, every forged delivery was parsed
+and validated; after, it is refused at the HMAC.
+
+    uv run python scripts/bench_webhook_intake.py
+    uv run python scripts/bench_webhook_intake.py --events 50 --rounds 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+
+# Allow `python scripts/bench_webhook_intake.py` from a source checkout.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wappa.core.inbound.payload_codec import JSON_BACKEND, decode_payload  # noqa: E402
+from wappa.processors.whatsapp_processor import WhatsAppWebhookProcessor  # noqa: E402
+
+INBOX_ID = "123456789012345"
+APP_SECRET = "bench-app-secret"
+
+
+def build_body(events: int) -> bytes:
+    statuses = [
+        {
+            "id": f"wamid.bench-{n:06d}",
+            "status": ("sent", "delivered", "read")[n % 3],
+            "timestamp": "1785772800",
+            "recipient_id": f"57300{n:07d}",
+        }
+        for n in range(events)
+    ]
+    return json.dumps(
+        {
+            "object": "whatsapp_business_account",
+            "entry": [
+                {
+                    "id": "535497026314662",
+                    "changes": [
+                        {
+                            "field": "messages",
+                            "value": {
+                                "messaging_product": "whatsapp",
+                                "metadata": {
+                                    "display_phone_number": "15550001111",
+                                    "phone_number_id": INBOX_ID,
+                                },
+                                "statuses": statuses,
+                            },
+                        }
+                    ],
+                }
+            ],
+        }
+    ).encode()
+
+
+def sign(body: bytes) -> str:
+    return "sha256=" + hmac.new(APP_SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+async def measure(
+    label: str, rounds: int, events: int, step: Callable[[], Awaitable[object]]
+) -> None:
+    for _ in range(min(rounds, 50)):
+        await step()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await step()
+        samples.append(time.perf_counter() - start)
+    p50 = statistics.median(samples) * 1e6
+    p99 = sorted(samples)[int(len(samples) * 0.99) - 1] * 1e6
+    print(
+        f"{label:<28} p50 {p50:9.1f} µs  p99 {p99:9.1f} µs  "
+        f"per event {p50 / max(events, 1):7.1f} µs"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20, help="statuses per body")
+    parser.add_argument("--rounds", type=int, default=1000)
+    args = parser.parse_args()
+
+    processor = WhatsAppWebhookProcessor()
+    body = build_body(args.events)
+    signature = sign(body)
+    forged = "sha256=" + "0" * 64
+
+    async def before() -> object:
+        payload = json.loads(body.decode("utf-8"))
+        return await processor.create_universal_webhooks(payload, inbox_id=INBOX_ID)
+
+    async def after() -> object:
+        if not processor.validate_webhook_signature(
+            body, signature, app_secret=APP_SECRET
+        ):
+            raise RuntimeError("benchmark signature rejected")
+        payload = decode_payload(body)
+        return await processor.create_universal_webhooks(payload, inbox_id=INBOX_ID)
+
+    async def junk_after() -> object:
+        return processor.validate_webhook_signature(body, forged, app_secret=APP_SECRET)
+
+    print(
+        f"body {len(body)} bytes, {args.events} events, {args.rounds} rounds, "
+        f"decoder: {JSON_BACKEND}"
+    )
+    await measure("before (json, unsigned)", args.rounds, args.events, before)
+    await measure("after (verify + decode)", args.rounds, args.events, after)
+    await measure("junk before (full parse)", args.rounds, args.events, before)
+    await measure("junk after (HMAC reject)", args.rounds, args.events, junk_after)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+"""merge / append_to_list / increment_field are atomic on every backend.
+
+The Redis variant needs a live server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``) and is skipped when none is reachable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from wappa.domain.interfaces.cache_factory import ICacheFactory
+from wappa.persistence.cache_factory import create_cache_factory
+from wappa.persistence.identity_index import hot_identities
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.redis.redis_client import RedisClient
+from wappa.persistence.redis.redis_handler.utils.inbox_cache import InboxCache
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+
+async def _open_redis_pools() -> bool:
+    """Bind fresh pools to this test's event loop; False when no server answers."""
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="users") as redis:
+            await redis.ping()
+        return True
+    except Exception:
+        await RedisClient.close()
+        return False
+
+
+@pytest.fixture(params=["memory", "json", "redis"])
+async def factory(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncIterator[ICacheFactory]:
+    """Cache factory for one backend, on an inbox isolated per test."""
+    node = request.node.name.replace("[", "-").replace("]", "")
+    inbox = f"rmw-{node}"[:96]
+    hot_identities.clear()
+    cache_type = request.param
+
+    match cache_type:
+        case "memory":
+            pass
+        case "json":
+            file_manager._cache_root = tmp_path / "cache"
+            file_manager.ensure_cache_directories()
+        case _:
+            if not await _open_redis_pools():
+                pytest.skip(f"No Redis reachable at {REDIS_URL}")
+
+    try:
+        yield create_cache_factory(cache_type)(inbox_id=inbox, user_id="u-0")
+    finally:
+        if cache_type == "redis":
+            for alias in ("users", "state_handler", "table"):
+                async with RedisClient.connection(alias=alias) as redis:
+                    keys = [key async for key in redis.scan_iter(f"{inbox}:*")]
+                    if keys:
+                        await redis.delete(*keys)
+            await RedisClient.close()
+
+
+async def test_concurrent_increments_and_appends_are_not_lost(
+    factory: ICacheFactory,
+) -> None:
+    state = factory.create_state_cache()
+    table = factory.create_table_cache()
+
+    await asyncio.gather(
+        *(state.increment_field("flow", "hits") for _ in range(10)),
+        *(state.append_to_list("flow", "log", i) for i in range(10)),
+        *(table.increment_field("orders", "o-1", "qty", 2) for _ in range(10)),
+    )
+
+    flow = await state.get("flow")
+    assert flow is not None
+    assert flow["hits"] == 10
+    assert sorted(flow["log"]) == list(range(10))
+    assert await table.get_field("orders", "o-1", "qty") == 20
+
+
+async def test_append_trims_to_the_newest_items(factory: ICacheFactory) -> None:
+    users = factory.create_user_cache()
+    # Items whose JSON text holds commas, brackets and escaped quotes.
+    items = [{"t": "a, b"}, ["x", "]"], 'say "hi", [ok]', 4, None]
+
+    for item in items:
+        assert await users.append_to_list("recent", item, max_length=3)
+
+    assert await users.get_field("recent") == items[-3:]
+
+    with pytest.raises(ValueError):
+        await users.append_to_list("recent", 5, max_length=0)
+
+
+async def test_append_replaces_a_field_that_is_not_a_list(
+    factory: ICacheFactory,
+) -> None:
+    ai_state = factory.create_ai_state_cache()
+    await ai_state.upsert("agent", {"notes": "[draft]", "empty": []})
+
+    await ai_state.append_to_list("agent", "notes", "first")
+    await ai_state.append_to_list("agent", "empty", "only")
+
+    assert await ai_state.get_field("agent", "notes") == ["first"]
+    assert await ai_state.get_field("agent", "empty") == ["only"]
+
+
+async def test_merge_writes_only_the_given_fields(factory: ICacheFactory) -> None:
+    state = factory.create_state_cache()
+    ai_state = factory.create_ai_state_cache()
+    await state.upsert("flow", {"step": 1, "cart": ["sku-1"]})
+
+    await asyncio.gather(
+        state.merge("flow", {"step": 2}),
+        state.merge("flow", {"coupon": "WELCOME"}),
+    )
+    merged = await state.merge("flow", {"paid": False})
+
+    assert merged is not None
+    assert merged["step"] == 2
+    assert merged["coupon"] == "WELCOME"
+    assert merged["cart"] == ["sku-1"]
+    assert merged["handler_type"] == "flow"
+    assert await state.get("flow") == merged
+
+    created = await ai_state.merge("router", {"turns": 1})
+    assert created is not None and created["agent_type"] == "router"
+
+
+async def test_redis_empty_merge_reads_the_stored_hash(
+    factory: ICacheFactory,
+) -> None:
+    state = factory.create_state_cache()
+    if not isinstance(state, InboxCache):
+        pytest.skip("merge helper of the Redis backend")
+    await state.upsert("flow", {"step": 1, "cart": ["sku-1"]})
+
+    merged = await state._merge_hash(state._key("flow"), {})
+
+    assert merged == await state.get("flow")
+    assert await state._merge_hash(state._key("missing"), {}) == {}
+
+
+async def test_user_field_updates_keep_the_identity_index(
+    factory: ICacheFactory,
+) -> None:
+    users = factory.create_user_cache()
+    index = factory.create_identity_index()
+
+    await users.upsert({"name": "Ana", "phone_number": "573001110001"})
+    await users.update_field("phone_number", "573009990001")
+
+    assert await index.get_user_id("573001110001") is None
+    assert await index.get_user_id("573009990001") == "u-0"
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any
+
+import pytest
+
+from wappa.core.events.event_dispatcher import WappaEventDispatcher
+from wappa.core.events.event_handler import WappaEventHandler
+from wappa.core.inbound import (
+    InboundQueueFullError,
+    InboundRuntime,
+    InboundRuntimeDependencies,
+    InboundScheduler,
+)
+from wappa.core.lifecycle import BackgroundWorkTracker
+from wappa.domain.interfaces.inbox_credential_store import (
+    IInboxCredentialStore,
+    InboxCredentials,
+    InboxNotFoundError,
+)
+from wappa.processors.whatsapp_processor import WhatsAppWebhookProcessor
+from wappa.schemas.core.types import PlatformType
+from wappa.webhooks import InboundMessageWebhook, StatusWebhook
+
+INBOX_ID = "123456789012345"
+WABA_ID = "535497026314662"
+
+
+def _metadata() -> dict[str, str]:
+    return {"display_phone_number": "15550001111", "phone_number_id": INBOX_ID}
+
+
+def _status(message_id: str, status: str, recipient: str) -> dict[str, Any]:
+    return {
+        "id": message_id,
+        "status": status,
+        "timestamp": "1785772800",
+        "recipient_id": recipient,
+    }
+
+
+def _text(message_id: str, sender: str, body: str) -> dict[str, Any]:
+    return {
+        "from": sender,
+        "id": message_id,
+        "timestamp": "1785772800",
+        "type": "text",
+        "text": {"body": body},
+    }
+
+
+def _change(value: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "field": "messages",
+        "value": {"messaging_product": "whatsapp", "metadata": _metadata(), **value},
+    }
+
+
+def _batched_payload() -> dict[str, Any]:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": WABA_ID,
+                "changes": [
+                    _change(
+                        {
+                            "statuses": [
+                                _status("wamid.batch-s1", "sent", "573001110001"),
+                                _status("wamid.batch-s2", "delivered", "573001110002"),
+                            ]
+                        }
+                    ),
+                    _change(
+                        {
+                            "contacts": [
+                                {"wa_id": "573001110003", "profile": {"name": "Ana"}}
+                            ],
+                            "messages": [
+                                _text("wamid.batch-m1", "573001110003", "first"),
+                                _text("wamid.batch-m2", "573001110003", "second"),
+                            ],
+                        }
+                    ),
+                ],
+            },
+            {
+                "id": WABA_ID,
+                "changes": [
+                    _change(
+                        {
+                            "statuses": [
+                                _status("wamid.batch-s3", "read", "573001110001")
+                            ]
+                        }
+                    )
+                ],
+            },
+        ],
+    }
+
+
+class _CountingCredentialStore(IInboxCredentialStore):
+    def __init__(self) -> None:
+        self.credential_lookups = 0
+        self.validations = 0
+
+    async def get_credentials(self, inbox_id: str) -> InboxCredentials:
+        self.credential_lookups += 1
+        if inbox_id != INBOX_ID:
+            raise InboxNotFoundError(inbox_id)
+        return InboxCredentials(
+            inbox_id=INBOX_ID, access_token="token", platform_account_id=WABA_ID
+        )
+
+    async def validate_inbox(self, inbox_id: str) -> bool:
+        self.validations += 1
+        return inbox_id == INBOX_ID
+
+
+class _RecordingHandler(WappaEventHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen: list[tuple[str, str | None]] = []
+
+    async def process_message(self, webhook: InboundMessageWebhook) -> None:
+        self.seen.append((webhook.message.message_id, self.user_id))
+
+    async def process_status(self, webhook: StatusWebhook) -> None:
+        self.seen.append((webhook.message_id, self.user_id))
+
+
+def _dependencies(store: IInboxCredentialStore) -> InboundRuntimeDependencies:
+    return InboundRuntimeDependencies(
+        session_provider=lambda: None,  # type: ignore[arg-type,return-value]
+        inbox_credential_store=store,
+        messenger_middleware=[],
+        cache_type="memory",
+        background_work_tracker=BackgroundWorkTracker(),
+        media_download_client_provider=lambda: None,  # type: ignore[arg-type,return-value]
+    )
+
+
+@pytest.mark.asyncio
+async def test_processor_fans_out_every_message_and_status_in_payload_order() -> None:
+    webhooks = await WhatsAppWebhookProcessor().create_universal_webhooks(
+        _batched_payload(), inbox_id=INBOX_ID
+    )
+
+    assert [type(webhook).__name__ for webhook in webhooks] == [
+        "StatusWebhook",
+        "StatusWebhook",
+        "InboundMessageWebhook",
+        "InboundMessageWebhook",
+        "StatusWebhook",
+    ]
+    assert [
+        webhook.message_id
+        if isinstance(webhook, StatusWebhook)
+        else webhook.message.message_id
+        for webhook in webhooks
+    ] == [
+        "wamid.batch-s1",
+        "wamid.batch-s2",
+        "wamid.batch-m1",
+        "wamid.batch-m2",
+        "wamid.batch-s3",
+    ]
+    assert all(webhook.inbox.inbox_id == INBOX_ID for webhook in webhooks)
+
+
+@pytest.mark.asyncio
+async def test_single_event_api_returns_first_event_of_batch() -> None:
+    webhook = await WhatsAppWebhookProcessor().create_universal_webhook(
+        _batched_payload(), inbox_id=INBOX_ID
+    )
+
+    assert isinstance(webhook, StatusWebhook)
+    assert webhook.message_id == "wamid.batch-s1"
+
+
+@pytest.mark.asyncio
+async def test_runtime_dispatches_every_event_with_one_envelope_per_delivery() -> None:
+    handler = _RecordingHandler()
+    runtime = InboundRuntime(WappaEventDispatcher(handler))
+    store = _CountingCredentialStore()
+
+    contexts = await runtime.build_dispatch_contexts(
+        platform=PlatformType.WHATSAPP,
+        inbox_id=INBOX_ID,
+        payload=_batched_payload(),
+        dependencies=_dependencies(store),
+    )
+    await runtime.dispatch_all(contexts)
+
+    assert handler.seen == [
+        ("wamid.batch-s1", "573001110001"),
+        ("wamid.batch-s2", "573001110002"),
+        ("wamid.batch-m1", "573001110003"),
+        ("wamid.batch-m2", "573001110003"),
+        ("wamid.batch-s3", "573001110001"),
+    ]
+    # Routed-inbox validation once per delivery; the messenger build only
+    # resolves credentials.
+    assert store.validations == 1
+    assert store.credential_lookups == 1
+    assert len({id(context.request_handler.messenger) for context in contexts}) == 1
+
+
+@pytest.mark.asyncio
+async def test_accepted_batch_runs_through_per_user_mailboxes() -> None:
+    handler = _RecordingHandler()
+    runtime = InboundRuntime(WappaEventDispatcher(handler))
+    dependencies = _dependencies(_CountingCredentialStore())
+    tracker = dependencies.background_work_tracker
+    scheduler = InboundScheduler(tracker, max_concurrency=4)
+
+    await runtime.accept_webhook(
+        platform=PlatformType.WHATSAPP,
+        inbox_id=INBOX_ID,
+        payload=_batched_payload(),
+        dependencies=replace(dependencies, inbound_scheduler=scheduler),
+    )
+    await tracker.drain(timeout=5.0)
+
+    per_user: dict[str | None, list[str]] = {}
+    for message_id, user_id in handler.seen:
+        per_user.setdefault(user_id, []).append(message_id)
+    assert per_user == {
+        "573001110001": ["wamid.batch-s1", "wamid.batch-s3"],
+        "573001110002": ["wamid.batch-s2"],
+        "573001110003": ["wamid.batch-m1", "wamid.batch-m2"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_over_queue_bound_is_shed_before_dispatch() -> None:
+    handler = _RecordingHandler()
+    runtime = InboundRuntime(WappaEventDispatcher(handler))
+    dependencies = _dependencies(_CountingCredentialStore())
+    scheduler = InboundScheduler(dependencies.background_work_tracker, max_queued=4)
+
+    with pytest.raises(InboundQueueFullError):
+        await runtime.accept_webhook(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_batched_payload(),
+            dependencies=replace(dependencies, inbound_scheduler=scheduler),
+        )
+
+    assert handler.seen == []
+    assert scheduler.get_stats().shed == 5
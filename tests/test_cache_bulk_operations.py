@@ -0,0 +1,165 @@
+"""Bulk get/upsert/delete on the cache repositories, across backends.
+
+The Redis variant needs a live server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``) and is skipped when none is reachable.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from wappa.domain.interfaces.cache_factory import ICacheFactory
+from wappa.domain.interfaces.cache_interfaces import IStateCache
+from wappa.persistence.cache_factory import create_cache_factory
+from wappa.persistence.identity_index import hot_identities
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.redis.redis_client import RedisClient
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+
+async def _open_redis_pools() -> bool:
+    """Bind fresh pools to this test's event loop; False when no server answers."""
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="users") as redis:
+            await redis.ping()
+        return True
+    except Exception:
+        await RedisClient.close()
+        return False
+
+
+@pytest.fixture(params=["memory", "json", "redis"])
+async def factory(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncIterator[ICacheFactory]:
+    """Cache factory for one backend, on an inbox isolated per test."""
+    node = request.node.name.replace("[", "-").replace("]", "")
+    inbox = f"bulk-{node}"[:96]
+    hot_identities.clear()
+    cache_type = request.param
+
+    match cache_type:
+        case "memory":
+            pass
+        case "json":
+            file_manager._cache_root = tmp_path / "cache"
+            file_manager.ensure_cache_directories()
+        case _:
+            if not await _open_redis_pools():
+                pytest.skip(f"No Redis reachable at {REDIS_URL}")
+
+    try:
+        yield create_cache_factory(cache_type)(inbox_id=inbox, user_id="u-0")
+    finally:
+        if cache_type == "redis":
+            async with RedisClient.connection(alias="users") as redis:
+                keys = [key async for key in redis.scan_iter(f"{inbox}:*")]
+                if keys:
+                    await redis.delete(*keys)
+            await RedisClient.close()
+
+
+class Product(BaseModel):
+    name: str
+    price: int
+
+
+async def test_table_rows_round_trip(factory: ICacheFactory) -> None:
+    table = factory.create_table_cache()
+    rows = {f"sku{i}": {"name": f"item {i}", "price": i} for i in range(5)}
+
+    assert await table.upsert_many("products", rows) is True
+
+    found = await table.get_many("products", ["sku4", "sku0", "nope", "sku0"], Product)
+    assert list(found) == ["sku4", "sku0", "nope"]
+    assert found["sku4"] == Product(name="item 4", price=4)
+    assert found["nope"] is None
+
+    assert await table.delete_many("products", ["sku0", "sku1", "nope"]) == 2
+    remaining = await table.get_many("products", rows)
+    assert [pkid for pkid, row in remaining.items() if row] == ["sku2", "sku3", "sku4"]
+
+
+async def test_state_and_ai_state_entries_round_trip(factory: ICacheFactory) -> None:
+    state = factory.create_state_cache()
+    ai_state = factory.create_ai_state_cache()
+
+    assert await state.upsert_many({"checkout": {"step": 1}, "survey": {"q": 3}})
+    assert await ai_state.upsert_many({"router": {"turns": 2}})
+
+    assert await state.get_many(["survey", "checkout", "absent"]) == {
+        "survey": {"q": 3},
+        "checkout": {"step": 1},
+        "absent": None,
+    }
+    assert (await ai_state.get_many(["router"]))["router"]["turns"] == 2
+
+    assert await state.delete_many(["checkout", "absent"]) == 1
+    assert await state.get("checkout") is None
+    assert await state.get("survey") == {"q": 3}
+
+
+async def test_user_bulk_writes_keep_the_identity_index(
+    factory: ICacheFactory,
+) -> None:
+    users = factory.create_user_cache()
+    index = factory.create_identity_index()
+
+    await users.upsert_many(
+        {
+            "u-1": {"name": "Ana", "phone_number": "573001110001"},
+            "u-2": {"name": "Bo", "phone_number": "573001110002", "bsuid": "CO.2"},
+        }
+    )
+    found = await users.get_many(["u-1", "u-2", "u-3"])
+    assert found["u-1"]["name"] == "Ana"
+    assert found["u-3"] is None
+    assert await index.get_user_ids(["573001110001", "CO.2"]) == {
+        "573001110001": "u-1",
+        "CO.2": "u-2",
+    }
+
+    await users.upsert_many({"u-1": {"name": "Ana", "phone_number": "573009990001"}})
+    assert await index.get_user_id("573001110001") is None
+    assert await index.get_user_id("573009990001") == "u-1"
+
+    assert await users.delete_many(["u-1", "u-2", "u-3"]) == 2
+    assert await index.get_user_ids(["573009990001", "573001110002", "CO.2"]) == {}
+
+
+class _LoopingState(IStateCache):
+    """Only the single-key methods; bulk calls use the interface defaults."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+    async def get(self, handler_name, models=None):
+        return self.data.get(handler_name)
+
+    async def upsert(self, handler_name, state_data, ttl=None):
+        self.data[handler_name] = state_data
+        return True
+
+    async def delete(self, handler_name):
+        return 1 if self.data.pop(handler_name, None) is not None else 0
+
+
+# Only the single-key methods above are exercised.
+_LoopingState.__abstractmethods__ = frozenset()
+
+
+async def test_interface_defaults_loop_over_single_key_calls() -> None:
+    state = _LoopingState()
+
+    assert await state.upsert_many({"a": {"n": 1}, "b": {"n": 2}})
+    assert await state.get_many(["b", "c"]) == {"b": {"n": 2}, "c": None}
+    assert await state.delete_many(["a", "a", "c"]) == 1
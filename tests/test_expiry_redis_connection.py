@@ -1,9 +1,15 @@
+import asyncio
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 import pytest
 
-from wappa.core.expiry.connection import ConnectionConfig, RedisConnectionManager
+from wappa.core.expiry.connection import (
+    ConnectionConfig,
+    RedisConnection,
+    RedisConnectionManager,
+)
 from wappa.persistence.redis.redis_client import RedisClient
 
 
@@ -32,6 +38,10 @@ class FakePubSub:
     async def close(self) -> None:
         self.closed = True
 
+    async def listen(self) -> AsyncIterator[dict[str, Any]]:
+        for channel in self.subscribed_channels:
+            yield {"type": "message", "channel": channel}
+
 
 class FakePubSubWithoutConnection(FakePubSub):
     connection = None
@@ -105,3 +115,26 @@ async def test_expiry_pubsub_connection_warns_when_connection_is_unavailable(
     assert "expiry listener read timeout could not be disabled" in caplog.text
 
     await manager.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_listen_merges_one_subscription_per_cluster_node() -> None:
+    first, second = FakePubSub(), FakePubSub()
+    await first.subscribe("node-1")
+    await second.subscribe("node-2")
+    connection = RedisConnection(
+        redis=FakeRedis(first),  # type: ignore[arg-type]
+        pubsub=first,  # type: ignore[arg-type]
+        channel="__keyevent@0__:expired",
+        db_index=0,
+        pubsubs=[first, second],  # type: ignore[list-item]
+    )
+
+    received: list[str] = []
+    # A subscription that ends means a lost node: the listener must reconnect.
+    with pytest.raises(ConnectionError):
+        async with asyncio.timeout(1):
+            async for msg in connection.listen():
+                received.append(msg["channel"])
+
+    assert received and set(received) <= {"node-1", "node-2"}
@@ -0,0 +1,228 @@
+"""Declared field indexes behind find_by_field, across cache backends.
+
+The Redis variant needs a live server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``) and is skipped when none is reachable.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from wappa.domain.interfaces.cache_factory import ICacheFactory
+from wappa.persistence import field_indexes
+from wappa.persistence.cache_factory import create_cache_factory
+from wappa.persistence.field_index import FieldIndexRegistry
+from wappa.persistence.identity_index import hot_identities
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.redis.redis_client import RedisClient
+from wappa.persistence.redis.redis_handler.table import RedisTable
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+
+async def _open_redis_pools() -> bool:
+    """Bind fresh pools to this test's event loop; False when no server answers."""
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="users") as redis:
+            await redis.ping()
+        return True
+    except Exception:
+        await RedisClient.close()
+        return False
+
+
+@pytest.fixture(params=["memory", "json", "redis"])
+async def factory(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncIterator[ICacheFactory]:
+    """Cache factory for one backend, on an inbox isolated per test."""
+    node = request.node.name.replace("[", "-").replace("]", "")
+    inbox = f"fidx-{node}"[:96]
+    hot_identities.clear()
+    field_indexes.clear()
+    cache_type = request.param
+
+    match cache_type:
+        case "memory":
+            pass
+        case "json":
+            file_manager._cache_root = tmp_path / "cache"
+            file_manager.ensure_cache_directories()
+        case _:
+            if not await _open_redis_pools():
+                pytest.skip(f"No Redis reachable at {REDIS_URL}")
+
+    try:
+        yield create_cache_factory(cache_type)(inbox_id=inbox, user_id="u-0")
+    finally:
+        field_indexes.clear()
+        if cache_type == "redis":
+            for alias in ("users", "table"):
+                async with RedisClient.connection(alias=alias) as redis:
+                    keys = [key async for key in redis.scan_iter(f"{inbox}:*")]
+                    if keys:
+                        await redis.delete(*keys)
+            await RedisClient.close()
+
+
+class Order(BaseModel):
+    status: str
+    total: int
+
+
+async def test_indexed_lookup_follows_writes_and_deletes(
+    factory: ICacheFactory,
+) -> None:
+    field_indexes.declare("orders", "status")
+    table = factory.create_table_cache()
+
+    await table.upsert("orders", "o-1", {"status": "paid", "total": 10})
+    await table.upsert("orders", "o-2", {"status": "pending", "total": 20})
+
+    assert await table.find_by_field("orders", "status", "pending", Order) == Order(
+        status="pending", total=20
+    )
+
+    await table.update_field("orders", "o-2", "status", "paid")
+    assert await table.find_by_field("orders", "status", "pending") is None
+    assert (await table.find_by_field("orders", "status", "paid"))["total"] in (10, 20)
+
+    await table.delete_many("orders", ["o-1", "o-2"])
+    assert await table.find_by_field("orders", "status", "paid") is None
+
+
+async def test_lookup_matches_whole_values_and_follows_increments(
+    factory: ICacheFactory,
+) -> None:
+    field_indexes.declare("orders", "status", "total")
+    table = factory.create_table_cache()
+    await table.upsert("orders", "o-1", {"status": "paid-late", "total": 10})
+
+    assert await table.find_by_field("orders", "status", "paid") is None
+
+    assert await table.increment_field("orders", "o-1", "total", 5) == 15
+    assert await table.find_by_field("orders", "total", 10) is None
+    row = await table.find_by_field("orders", "total", 15)
+    assert row is not None and row["status"] == "paid-late"
+
+
+async def test_redis_prunes_index_entries_of_vanished_rows(
+    factory: ICacheFactory,
+) -> None:
+    table = factory.create_table_cache()
+    if not isinstance(table, RedisTable):
+        pytest.skip("Redis index layout")
+    field_indexes.declare("orders", "status")
+    await table.upsert("orders", "o-1", {"status": "paid", "total": 10})
+    index = table.keys.field_index(table.inbox, "orders", "status")
+    # The row vanishes without a Wappa write (as when it expires).
+    await table.delete_key(table._key("orders", "o-1"))
+
+    assert await table.find_by_field("orders", "status", "paid") is None
+    async with RedisClient.connection(alias="table") as redis:
+        assert await redis.zcard(index) == 0
+
+
+async def test_reindexing_a_row_touches_only_its_own_entries(
+    factory: ICacheFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    table = factory.create_table_cache()
+    if isinstance(table, RedisTable):
+        pytest.skip("Memory and JSON index layout")
+    field_indexes.declare("orders", "status")
+    await table.upsert_many(
+        "orders",
+        {
+            f"o-{i}": {"status": "paid" if i % 2 else "new", "total": i}
+            for i in range(20)
+        },
+    )
+    storage = sys.modules[type(table).__module__].storage_manager
+    update_many = storage.update_many
+    touched: set[str] = set()
+
+    async def spy(cache_type, inbox_id, user_id, keys, mutate, ttl=None):
+        if cache_type == "indexes":
+            touched.update(keys)
+        await update_many(cache_type, inbox_id, user_id, keys, mutate, ttl)
+
+    monkeypatch.setattr(storage, "update_many", spy)
+    await table.update_field("orders", "o-3", "status", "refunded")
+
+    assert touched == {
+        '["orders","status"]@o-3',
+        '["orders","status"]="paid"',
+        '["orders","status"]="refunded"',
+    }
+    assert await table.find_by_field("orders", "status", "refunded") is not None
+    assert (await table.find_by_field("orders", "status", "paid"))["total"] != 3
+
+
+async def test_undeclared_field_falls_back_to_a_scan(factory: ICacheFactory) -> None:
+    table = factory.create_table_cache()
+    await table.upsert_many(
+        "orders",
+        {"o-1": {"status": "paid", "total": 10}, "o-2": {"status": "new", "total": 7}},
+    )
+
+    row = await table.find_by_field("orders", "total", 7)
+    assert row is not None and row["status"] == "new"
+    assert await table.find_by_field("orders", "total", 8) is None
+
+
+async def test_rebuild_indexes_rows_written_before_the_declaration(
+    factory: ICacheFactory,
+) -> None:
+    table = factory.create_table_cache()
+    await table.upsert("orders", "o-1", {"status": "pending", "total": 5})
+    await table.upsert("orders", "o-2", {"status": "paid", "total": 6})
+
+    field_indexes.declare("orders", "status")
+    assert await table.find_by_field("orders", "status", "pending") is None
+
+    assert await table.rebuild_field_indexes("orders") == 2
+    row = await table.find_by_field("orders", "status", "pending")
+    assert row is not None and row["total"] == 5
+
+
+async def test_user_field_index(factory: ICacheFactory) -> None:
+    field_indexes.declare_users("email")
+    users = factory.create_user_cache()
+
+    await users.upsert_many(
+        {
+            "u-1": {"name": "Ana", "email": "ana@example.com"},
+            "u-2": {"name": "Bo", "email": "bo@example.com"},
+        }
+    )
+    found = await users.find_by_field("email", "bo@example.com")
+    assert found is not None and found["name"] == "Bo"
+
+    await users.delete_many(["u-2"])
+    assert await users.find_by_field("email", "bo@example.com") is None
+    # An undeclared field still answers, by checking every user.
+    found = await users.find_by_field("name", "Ana")
+    assert found is not None and found["email"] == "ana@example.com"
+
+
+def test_registry_accumulates_fields_and_rejects_bad_names() -> None:
+    registry = FieldIndexRegistry()
+    registry.declare("orders", "status")
+    registry.declare("orders", "status", "customer_id")
+    registry.declare_users("email")
+
+    assert registry.fields("orders") == ("status", "customer_id")
+    assert registry.is_indexed("@user", "email")
+    assert not registry.is_indexed("orders", "email")
+    with pytest.raises(ValueError):
+        registry.declare("orders", "a:b")
+    with pytest.raises(ValueError):
+        registry.declare("", "status")
@@ -0,0 +1,278 @@
+"""In-process table generations and the feeds that keep them coherent.
+
+The Redis tests need a live server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``) and are skipped when none is reachable; the
+tracking test is also skipped when the server has no ``CLIENT TRACKING``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from wappa.domain.interfaces.cache_interfaces import ITableCache
+from wappa.persistence import GenerationCache, VersionedTableCache
+from wappa.persistence.json.handlers.table_handler import JSONTable
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.memory.handlers.table_handler import MemoryTable
+from wappa.persistence.redis import RedisGenerationSync
+from wappa.persistence.redis.redis_client import RedisClient
+from wappa.persistence.redis.redis_handler.table import RedisTable
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+
+class AgentRow(BaseModel):
+    agent_id: str
+    name: str
+
+
+# ---------------------------------------------------------------------------
+# GenerationCache
+# ---------------------------------------------------------------------------
+
+
+async def test_nothing_is_cached_until_a_feed_attaches() -> None:
+    cache = GenerationCache()
+    loads = 0
+
+    async def load() -> int:
+        nonlocal loads
+        loads += 1
+        return 3
+
+    assert await cache.resolve("k", load) == 3
+    assert await cache.resolve("k", load) == 3
+    assert loads == 2 and cache.get("k") is None
+
+    cache.attach()
+    await cache.resolve("k", load)
+    assert cache.get("k") == 3 and loads == 3
+
+    cache.detach()
+    assert cache.get("k") is None
+
+
+async def test_a_read_overtaken_by_an_invalidation_is_not_cached() -> None:
+    cache = GenerationCache()
+    cache.attach()
+
+    async def load() -> int:
+        cache.invalidate(["k"])  # the bump lands while the read is in flight
+        return 1
+
+    assert await cache.resolve("k", load) == 1
+    assert cache.get("k") is None
+
+    since = cache.snapshot()
+    cache.invalidate(["other"])
+    cache.offer("k", 1, since)
+    assert cache.get("k") is None
+
+
+def test_entries_expire_after_max_age(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(
+        "wappa.persistence.generation_cache.time.monotonic", lambda: now[0]
+    )
+    cache = GenerationCache(max_age=10)
+    cache.attach()
+
+    cache.offer("k", 2, cache.snapshot())
+    now[0] += 10
+    assert cache.get("k") == 2
+    now[0] += 1
+    assert cache.get("k") is None
+
+    with pytest.raises(ValueError):
+        GenerationCache(max_age=0)
+
+
+async def test_a_loader_owns_every_cached_read() -> None:
+    cache = GenerationCache()
+    loaded: list[str] = []
+
+    async def loader(key: str) -> int:
+        loaded.append(key)
+        return 5
+
+    cache.attach(loader)
+    assert cache.loads_reads
+
+    cache.offer("k", 1, cache.snapshot())
+    assert cache.get("k") is None
+
+    async def unused() -> int:
+        raise AssertionError("reads go through the loader")
+
+    assert await cache.resolve("k", unused) == 5
+    assert cache.get("k") == 5 and loaded == ["k"]
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+async def _open_redis_pools() -> bool:
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="table") as redis:
+            await redis.ping()
+        return True
+    except Exception:
+        await RedisClient.close()
+        return False
+
+
+async def _drop_inbox(inbox: str) -> None:
+    async with RedisClient.connection(alias="table") as redis:
+        keys = [key async for key in redis.scan_iter(f"{inbox}:*")]
+        if keys:
+            await redis.delete(*keys)
+
+
+@pytest.fixture(params=["memory", "json", "redis"])
+async def table(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncIterator[ITableCache]:
+    node = request.node.name.replace("[", "-").replace("]", "")
+    inbox = f"generations-{node}"
+
+    match request.param:
+        case "memory":
+            yield MemoryTable(inbox=inbox)
+        case "json":
+            file_manager._cache_root = tmp_path / "cache"
+            file_manager.ensure_cache_directories()
+            yield JSONTable(inbox=inbox)
+        case _:
+            if not await _open_redis_pools():
+                pytest.skip(f"No Redis reachable at {REDIS_URL}")
+            try:
+                yield RedisTable(inbox=inbox)
+            finally:
+                await _drop_inbox(inbox)
+                await RedisClient.close()
+
+
+async def test_get_in_generation_reads_the_row_of_the_current_generation(
+    table: ITableCache,
+) -> None:
+    await table.upsert("agents@v1", "a-1", {"agent_id": "a-1", "name": "old"})
+    await table.upsert("agents@v2", "a-1", {"agent_id": "a-1", "name": "new"})
+
+    assert await table.get_in_generation("versions", "agents", "agents@v", "a-1") == (
+        1,
+        {"agent_id": "a-1", "name": "old"},
+    )
+    assert await table.bump_generation("versions", "agents", 60) == 2
+    assert await table.get_generation("versions", "agents") == 2
+
+    generation, row = await table.get_in_generation(
+        "versions", "agents", "agents@v", "a-1", models=AgentRow
+    )
+    assert generation == 2 and row == AgentRow(agent_id="a-1", name="new")
+    assert await table.get_in_generation("versions", "agents", "agents@v", "a-9") == (
+        2,
+        None,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Redis feeds
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+async def redis_inbox(request: pytest.FixtureRequest) -> AsyncIterator[str]:
+    if not await _open_redis_pools():
+        pytest.skip(f"No Redis reachable at {REDIS_URL}")
+    inbox = f"generations-{request.node.name}"
+    try:
+        yield inbox
+    finally:
+        await _drop_inbox(inbox)
+        await RedisClient.close()
+
+
+def _versions(
+    inbox: str, generations: GenerationCache
+) -> VersionedTableCache[AgentRow]:
+    return VersionedTableCache(
+        RedisTable(inbox=inbox),
+        "agents",
+        AgentRow,
+        default_ttl=60,
+        generations=generations,
+    )
+
+
+async def _until(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "feed never delivered"
+        await asyncio.sleep(0.01)
+
+
+async def test_a_bump_in_one_process_invalidates_the_others(
+    redis_inbox: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ours, theirs = GenerationCache(), GenerationCache()
+    syncs = [RedisGenerationSync(ours), RedisGenerationSync(theirs)]
+    for sync in syncs:
+        await sync.start()
+    try:
+        reader, writer = _versions(redis_inbox, ours), _versions(redis_inbox, theirs)
+        await writer.upsert("a-1", AgentRow(agent_id="a-1", name="Ana"))
+
+        assert (await reader.get("a-1")).name == "Ana"
+        key = reader._generation_key
+        assert key is not None and ours.get(key) == 1
+
+        # Cached: the next read skips the counter altogether
+        async def no_counter_reads(*args: object, **kwargs: object) -> object:
+            raise AssertionError("generation read from Redis")
+
+        monkeypatch.setattr(RedisTable, "get_in_generation", no_counter_reads)
+        monkeypatch.setattr(RedisTable, "get_generation", no_counter_reads)
+        assert (await reader.get("a-1")).name == "Ana"
+        monkeypatch.undo()
+
+        assert await writer.bump_version() == 2
+        await _until(lambda: ours.get(key) is None)
+        assert await reader.get("a-1") is None
+        assert await reader.current_version() == 2
+    finally:
+        for sync in syncs:
+            await sync.stop()
+    assert not ours.live
+
+
+async def test_tracking_invalidates_counters_it_served(redis_inbox: str) -> None:
+    ours = GenerationCache()
+    sync = RedisGenerationSync(ours, mode="tracking")
+    try:
+        await sync.start()
+    except Exception as e:
+        pytest.skip(f"Client-side tracking unavailable: {e}")
+    try:
+        versions = _versions(redis_inbox, ours)
+        assert await versions.current_version() == 1
+        key = versions._generation_key
+        assert key is not None and ours.get(key) == 1
+
+        # A write that bypasses bump_generation is still reported
+        await RedisTable(inbox=redis_inbox).increment_field(
+            "_wappa_table_versions", "agents", "bumps"
+        )
+        await _until(lambda: ours.get(key) is None)
+        assert await versions.current_version() == 2
+    finally:
+        await sync.stop()
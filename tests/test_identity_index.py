@@ -0,0 +1,258 @@
+"""Identity index (phone number / BSUID -> user_id) across cache backends.
+
+The Redis variant needs a live server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``) and is skipped when none is reachable.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncIterator
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from wappa.core.events.event_dispatcher import WappaEventDispatcher
+from wappa.core.events.event_handler import WappaEventHandler
+from wappa.core.inbound import InboundRuntime
+from wappa.core.logging.context import clear_request_context, set_request_context
+from wappa.domain.interfaces.cache_factory import ICacheFactory
+from wappa.persistence.cache_factory import create_cache_factory
+from wappa.persistence.identity_index import (
+    IndexedIdentityResolver,
+    StorageIdentityIndex,
+    hot_identities,
+)
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.memory.handlers.user_handler import MemoryUser
+from wappa.persistence.memory.storage_manager import storage_manager as memory_storage
+from wappa.persistence.redis.redis_client import RedisClient
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+
+async def _open_redis_pools() -> bool:
+    """Bind fresh pools to this test's event loop; False when no server answers."""
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="users") as redis:
+            await redis.ping()
+        return True
+    except Exception:
+        await RedisClient.close()
+        return False
+
+
+@pytest.fixture(params=["memory", "json", "redis"])
+async def backend(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncIterator[tuple[str, str]]:
+    """``(cache_type, inbox)`` for one backend, isolated per test."""
+    node = request.node.name.replace("[", "-").replace("]", "")
+    inbox = f"identity-{node}"[:96]
+    hot_identities.clear()
+
+    match request.param:
+        case "memory":
+            yield "memory", inbox
+        case "json":
+            file_manager._cache_root = tmp_path / "cache"
+            file_manager.ensure_cache_directories()
+            yield "json", inbox
+        case _:
+            if not await _open_redis_pools():
+                pytest.skip(f"No Redis reachable at {REDIS_URL}")
+            try:
+                yield "redis", inbox
+            finally:
+                async with RedisClient.connection(alias="users") as redis:
+                    keys = [key async for key in redis.scan_iter(f"{inbox}:*")]
+                    if keys:
+                        await redis.delete(*keys)
+                await RedisClient.close()
+
+
+def _factory(backend: tuple[str, str], user_id: str = "u-1") -> ICacheFactory:
+    cache_type, inbox = backend
+    return create_cache_factory(cache_type)(inbox_id=inbox, user_id=user_id)
+
+
+async def test_upsert_links_and_delete_unlinks(backend: tuple[str, str]) -> None:
+    factory = _factory(backend)
+    index = factory.create_identity_index()
+
+    await factory.create_user_cache().upsert(
+        {"name": "Ana", "phone_number": "573001112233", "bsuid": "CO.1"}
+    )
+    assert await index.get_user_ids(["573001112233", "CO.1", "5730"]) == {
+        "573001112233": "u-1",
+        "CO.1": "u-1",
+    }
+
+    await factory.create_user_cache().delete()
+    assert await index.get_user_ids(["573001112233", "CO.1"]) == {}
+
+
+async def test_changed_phone_moves_the_index_entry(backend: tuple[str, str]) -> None:
+    factory = _factory(backend)
+    user = factory.create_user_cache()
+    index = factory.create_identity_index()
+
+    await user.upsert({"phone_number": "573001112233"})
+    await user.update_field("phone_number", "573009998877")
+
+    assert await index.get_user_id("573001112233") is None
+    assert await index.get_user_id("573009998877") == "u-1"
+
+
+async def test_unlink_leaves_identities_owned_by_another_user(
+    backend: tuple[str, str],
+) -> None:
+    first = _factory(backend, "u-1")
+    second = _factory(backend, "u-2")
+
+    await first.create_user_cache().upsert({"phone_number": "573001112233"})
+    await second.create_user_cache().upsert({"phone_number": "573001112233"})
+    await first.create_user_cache().delete()
+
+    index = first.create_identity_index()
+    assert await index.get_user_id("573001112233") == "u-2"
+
+
+class _CountingStorage:
+    """The memory storage manager, counting identity reads."""
+
+    def __init__(self) -> None:
+        self.reads = 0
+
+    async def get_many(self, cache_type, inbox_id, refs):
+        if cache_type == "identities":
+            self.reads += 1
+        return await memory_storage.get_many(cache_type, inbox_id, refs)
+
+    def __getattr__(self, name):
+        return getattr(memory_storage, name)
+
+
+async def test_hot_cache_serves_repeat_lookups_and_drops_on_link() -> None:
+    hot_identities.clear()
+    storage = _CountingStorage()
+    index = StorageIdentityIndex(storage, "hot-inbox", lambda user: f"user:{user}")
+    for user in ("u-1", "u-2"):
+        await memory_storage.set(
+            "users", "hot-inbox", user, f"user:{user}", {"phone_number": "573001112233"}
+        )
+
+    await index.link("u-1", {"573001112233"})
+    for _ in range(3):
+        assert await index.get_user_id("573001112233") == "u-1"
+        assert await index.get_user_id("573000000000") is None
+    assert storage.reads == 2
+
+    await index.link("u-2", {"573001112233"})
+    assert await index.get_user_id("573001112233") == "u-2"
+    assert storage.reads == 3
+
+
+async def test_lookups_drop_entries_of_users_that_are_gone(
+    backend: tuple[str, str],
+) -> None:
+    factory = _factory(backend)
+    index = factory.create_identity_index()
+    await factory.create_user_cache().upsert({"phone_number": "573001112233"})
+    # Entries whose user expired, or whose record lost the identity without
+    # the index hearing of it
+    await index.link("ghost", {"573000000099"})
+    await index.link("u-1", {"573000000088"})
+
+    assert await index.get_user_ids(
+        ["573001112233", "573000000099", "573000000088"]
+    ) == {"573001112233": "u-1"}
+
+
+async def test_rebuild_indexes_users_stored_before_the_index(
+    backend: tuple[str, str],
+) -> None:
+    factory = _factory(backend)
+    index = factory.create_identity_index()
+    await factory.create_user_cache().upsert({"phone_number": "573001112233"})
+    # As stored by a release without the index, next to an expired user's entry
+    await index.unlink("u-1", {"573001112233"})
+    await index.link("ghost", {"573000000099"})
+    assert not await index.is_complete()
+
+    assert await index.rebuild() == 1
+
+    hot_identities.clear()
+    assert await index.is_complete()
+    assert await index.get_user_ids(["573001112233", "573000000099"]) == {
+        "573001112233": "u-1"
+    }
+
+
+class _NoopHandler(WappaEventHandler):
+    async def process_message(self, webhook) -> None:
+        return None
+
+
+async def _enrich(statuses: list[SimpleNamespace], inbox: str) -> None:
+    runtime = InboundRuntime(WappaEventDispatcher(_NoopHandler()))
+    await runtime._enrich_status_user_ids(
+        statuses,  # type: ignore[arg-type]
+        inbox,
+        SimpleNamespace(cache_type="memory", redis_manager=None),  # type: ignore[arg-type]
+    )
+
+
+async def test_status_enrichment_reads_the_index_without_scanning(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    hot_identities.clear()
+    factory = create_cache_factory("memory")(inbox_id="enrich-inbox", user_id="u-9")
+    await factory.create_user_cache().upsert({"phone_number": "573001110001"})
+    await factory.create_identity_index().rebuild()
+
+    async def no_scan(*args, **kwargs):
+        raise AssertionError("scanned users after a rebuild")
+
+    monkeypatch.setattr(MemoryUser, "find_by_field", no_scan)
+
+    statuses = [
+        SimpleNamespace(recipient_phone_id="573001110001", user_id="573001110001"),
+        SimpleNamespace(recipient_phone_id="573001110002", user_id="573001110002"),
+    ]
+    await _enrich(statuses, "enrich-inbox")
+
+    assert [status.user_id for status in statuses] == ["u-9", "573001110002"]
+
+
+async def test_status_enrichment_scans_users_until_the_index_is_rebuilt() -> None:
+    hot_identities.clear()
+    factory = create_cache_factory("memory")(inbox_id="legacy-inbox", user_id="u-3")
+    await factory.create_user_cache().upsert(
+        {"user_id": "u-3", "phone_number": "573001110003"}
+    )
+    await factory.create_identity_index().unlink("u-3", {"573001110003"})
+
+    status = SimpleNamespace(recipient_phone_id="573001110003", user_id="573001110003")
+    await _enrich([status], "legacy-inbox")
+
+    assert status.user_id == "u-3"
+
+
+async def test_indexed_resolver_uses_the_current_inbox() -> None:
+    hot_identities.clear()
+    factory = create_cache_factory("memory")(inbox_id="resolve-inbox", user_id="u-7")
+    await factory.create_user_cache().upsert({"bsuid": "CO.77"})
+    resolver = IndexedIdentityResolver("memory")
+
+    assert await resolver.resolve("CO.77") == "CO.77"
+
+    set_request_context(inbox_id="resolve-inbox")
+    try:
+        assert await resolver.resolve("CO.77") == "u-7"
+        assert await resolver.resolve("573000000000") == "573000000000"
+    finally:
+        clear_request_context()
@@ -0,0 +1,336 @@
+"""Tests for redelivery deduplication in the Inbound Runtime."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from wappa.core.events.event_dispatcher import WappaEventDispatcher
+from wappa.core.events.event_handler import WappaEventHandler
+from wappa.core.inbound import (
+    InboundQueueFullError,
+    InboundRuntime,
+    InboundRuntimeDependencies,
+    InboundScheduler,
+    MemoryInboundDeduplicator,
+)
+from wappa.core.lifecycle import BackgroundWorkTracker
+from wappa.domain.interfaces.inbox_credential_store import (
+    IInboxCredentialStore,
+    InboxCredentials,
+    InboxNotFoundError,
+)
+from wappa.schemas.core.types import PlatformType
+from wappa.webhooks import InboundMessageWebhook, StatusWebhook
+
+INBOX_ID = "123456789012345"
+WABA_ID = "535497026314662"
+
+
+def _payload(value: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": WABA_ID,
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "metadata": {
+                                "display_phone_number": "15550001111",
+                                "phone_number_id": INBOX_ID,
+                            },
+                            **value,
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def _message_payload(*message_ids: str) -> dict[str, Any]:
+    return _payload(
+        {
+            "contacts": [{"wa_id": "573001110001", "profile": {"name": "Ana"}}],
+            "messages": [
+                {
+                    "from": "573001110001",
+                    "id": message_id,
+                    "timestamp": "1785772800",
+                    "type": "text",
+                    "text": {"body": "hi"},
+                }
+                for message_id in message_ids
+            ],
+        }
+    )
+
+
+def _status_payload(message_id: str, status: str) -> dict[str, Any]:
+    return _payload(
+        {
+            "statuses": [
+                {
+                    "id": message_id,
+                    "status": status,
+                    "timestamp": "1785772800",
+                    "recipient_id": "573001110001",
+                }
+            ]
+        }
+    )
+
+
+class _CountingCredentialStore(IInboxCredentialStore):
+    def __init__(self, failures: int = 0) -> None:
+        self.credential_lookups = 0
+        self.validations = 0
+        self.failures = failures
+
+    async def get_credentials(self, inbox_id: str) -> InboxCredentials:
+        self.credential_lookups += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("credential backend unavailable")
+        if inbox_id != INBOX_ID:
+            raise InboxNotFoundError(inbox_id)
+        return InboxCredentials(
+            inbox_id=INBOX_ID, access_token="token", platform_account_id=WABA_ID
+        )
+
+    async def validate_inbox(self, inbox_id: str) -> bool:
+        self.validations += 1
+        return inbox_id == INBOX_ID
+
+
+class _RecordingHandler(WappaEventHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen: list[str] = []
+
+    async def process_message(self, webhook: InboundMessageWebhook) -> None:
+        self.seen.append(webhook.message.message_id)
+
+    async def process_status(self, webhook: StatusWebhook) -> None:
+        self.seen.append(f"{webhook.message_id}:{webhook.status.value}")
+
+
+def _dependencies(
+    store: IInboxCredentialStore,
+    deduplicator: MemoryInboundDeduplicator,
+    scheduler: InboundScheduler | None = None,
+    tracker: BackgroundWorkTracker | None = None,
+) -> InboundRuntimeDependencies:
+    return InboundRuntimeDependencies(
+        session_provider=lambda: None,  # type: ignore[arg-type,return-value]
+        inbox_credential_store=store,
+        messenger_middleware=[],
+        cache_type="memory",
+        background_work_tracker=tracker or BackgroundWorkTracker(),
+        media_download_client_provider=lambda: None,  # type: ignore[arg-type,return-value]
+        inbound_scheduler=scheduler,
+        inbound_deduplicator=deduplicator,
+    )
+
+
+async def _deliver(runtime, payload, dependencies) -> list[Any]:
+    contexts = await runtime.build_dispatch_contexts(
+        platform=PlatformType.WHATSAPP,
+        inbox_id=INBOX_ID,
+        payload=payload,
+        dependencies=dependencies,
+    )
+    await runtime.dispatch_all(contexts)
+    return contexts
+
+
+class TestMemoryInboundDeduplicator:
+    @pytest.mark.asyncio
+    async def test_claims_each_key_once_within_a_delivery_and_across(self):
+        deduplicator = MemoryInboundDeduplicator()
+
+        assert await deduplicator.claim(["a", "b", "a"]) == [True, True, False]
+        assert await deduplicator.claim(["b", "c"]) == [False, True]
+
+        stats = deduplicator.get_stats()
+        assert stats.checked == 5
+        assert stats.duplicates == 2
+        assert stats.hit_rate == 0.4
+
+    @pytest.mark.asyncio
+    async def test_expired_and_released_keys_are_claimable_again(self):
+        deduplicator = MemoryInboundDeduplicator(ttl_seconds=0)
+        assert await deduplicator.claim(["a"]) == [True]
+        assert await deduplicator.claim(["a"]) == [True]
+
+        deduplicator = MemoryInboundDeduplicator()
+        await deduplicator.claim(["a"])
+        await deduplicator.release(["a"])
+        assert await deduplicator.claim(["a"]) == [True]
+
+    @pytest.mark.asyncio
+    async def test_leased_claim_lapses_unless_confirmed(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("wappa.core.inbound.dedup.time.monotonic", lambda: clock[0])
+        deduplicator = MemoryInboundDeduplicator(ttl_seconds=60)
+
+        assert await deduplicator.claim(["a", "b"], lease_seconds=5) == [True, True]
+        assert await deduplicator.claim(["a", "b"]) == [False, False]
+        await deduplicator.confirm(["a"])
+        clock[0] += 10
+
+        assert await deduplicator.claim(["a", "b"]) == [False, True]
+
+    @pytest.mark.asyncio
+    async def test_extended_lease_outlives_the_first_but_not_lapsed_keys(
+        self, monkeypatch
+    ):
+        clock = [1000.0]
+        monkeypatch.setattr("wappa.core.inbound.dedup.time.monotonic", lambda: clock[0])
+        deduplicator = MemoryInboundDeduplicator(ttl_seconds=60)
+        await deduplicator.claim(["a", "b"], lease_seconds=5)
+        clock[0] += 6
+
+        await deduplicator.extend(["a", "b"], 5)
+        assert await deduplicator.claim(["a"]) == [True]
+
+        await deduplicator.claim(["c"], lease_seconds=5)
+        clock[0] += 4
+        await deduplicator.extend(["c"], 5)
+        clock[0] += 4
+        assert await deduplicator.claim(["c"]) == [False]
+
+    @pytest.mark.asyncio
+    async def test_size_is_bounded_by_evicting_oldest_keys(self):
+        deduplicator = MemoryInboundDeduplicator(max_entries=2)
+        await deduplicator.claim(["a", "b", "c"])
+
+        assert len(deduplicator) == 2
+        assert await deduplicator.claim(["c", "a"]) == [False, True]
+
+
+class TestRuntimeDeduplication:
+    @pytest.mark.asyncio
+    async def test_redelivery_is_dropped_before_credential_lookup(self):
+        handler = _RecordingHandler()
+        runtime = InboundRuntime(WappaEventDispatcher(handler))
+        store = _CountingCredentialStore()
+        dependencies = _dependencies(store, MemoryInboundDeduplicator())
+
+        await _deliver(runtime, _message_payload("wamid.dedup-m1"), dependencies)
+        lookups = (store.validations, store.credential_lookups)
+        contexts = await _deliver(
+            runtime, _message_payload("wamid.dedup-m1"), dependencies
+        )
+
+        assert contexts == []
+        assert handler.seen == ["wamid.dedup-m1"]
+        assert (store.validations, store.credential_lookups) == lookups
+
+    @pytest.mark.asyncio
+    async def test_only_new_events_of_a_partial_redelivery_are_dispatched(self):
+        handler = _RecordingHandler()
+        runtime = InboundRuntime(WappaEventDispatcher(handler))
+        dependencies = _dependencies(
+            _CountingCredentialStore(), MemoryInboundDeduplicator()
+        )
+
+        await _deliver(runtime, _message_payload("wamid.dedup-m1"), dependencies)
+        await _deliver(
+            runtime,
+            _message_payload("wamid.dedup-m1", "wamid.dedup-m2"),
+            dependencies,
+        )
+
+        assert handler.seen == ["wamid.dedup-m1", "wamid.dedup-m2"]
+
+    @pytest.mark.asyncio
+    async def test_status_transitions_are_distinct_events(self):
+        handler = _RecordingHandler()
+        runtime = InboundRuntime(WappaEventDispatcher(handler))
+        dependencies = _dependencies(
+            _CountingCredentialStore(), MemoryInboundDeduplicator()
+        )
+
+        for status in ("sent", "delivered", "delivered", "read"):
+            await _deliver(
+                runtime, _status_payload("wamid.dedup-s1", status), dependencies
+            )
+
+        assert handler.seen == [
+            "wamid.dedup-s1:sent",
+            "wamid.dedup-s1:delivered",
+            "wamid.dedup-s1:read",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_releases_its_keys_for_the_retry(self):
+        handler = _RecordingHandler()
+        runtime = InboundRuntime(WappaEventDispatcher(handler))
+        dependencies = _dependencies(
+            _CountingCredentialStore(failures=1), MemoryInboundDeduplicator()
+        )
+
+        with pytest.raises(RuntimeError):
+            await _deliver(runtime, _message_payload("wamid.dedup-m1"), dependencies)
+        await _deliver(runtime, _message_payload("wamid.dedup-m1"), dependencies)
+
+        assert handler.seen == ["wamid.dedup-m1"]
+
+    @pytest.mark.asyncio
+    async def test_fully_duplicate_delivery_is_acknowledged(self):
+        runtime = InboundRuntime(WappaEventDispatcher(_RecordingHandler()))
+        dependencies = _dependencies(
+            _CountingCredentialStore(), MemoryInboundDeduplicator()
+        )
+        payload = _message_payload("wamid.dedup-m1")
+
+        first = await runtime.accept_webhook(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=payload,
+            dependencies=dependencies,
+        )
+        second = await runtime.accept_webhook(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=payload,
+            dependencies=dependencies,
+        )
+        await dependencies.background_work_tracker.drain(timeout=5.0)
+
+        assert first == {"status": "accepted"}
+        assert second == {"status": "duplicate"}
+
+    @pytest.mark.asyncio
+    async def test_shed_delivery_is_not_a_duplicate_on_retry(self):
+        handler = _RecordingHandler()
+        runtime = InboundRuntime(WappaEventDispatcher(handler))
+        tracker = BackgroundWorkTracker()
+        scheduler = InboundScheduler(tracker, max_queued=1)
+        dependencies = _dependencies(
+            _CountingCredentialStore(),
+            MemoryInboundDeduplicator(),
+            scheduler=scheduler,
+            tracker=tracker,
+        )
+
+        async def accept(payload: dict[str, Any]) -> dict[str, str]:
+            return await runtime.accept_webhook(
+                platform=PlatformType.WHATSAPP,
+                inbox_id=INBOX_ID,
+                payload=payload,
+                dependencies=dependencies,
+            )
+
+        with pytest.raises(InboundQueueFullError):
+            await accept(_message_payload("wamid.dedup-m1", "wamid.dedup-m2"))
+        retried = await accept(_message_payload("wamid.dedup-m1"))
+        await tracker.drain(timeout=5.0)
+
+        assert retried == {"status": "accepted"}
+        assert handler.seen == ["wamid.dedup-m1"]
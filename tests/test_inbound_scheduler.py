@@ -0,0 +1,122 @@
+"""Tests for InboundScheduler mailboxes, concurrency cap, and load shedding."""
+
+import asyncio
+
+import pytest
+
+from wappa.core.inbound import InboundQueueFullError, InboundScheduler
+from wappa.core.lifecycle import BackgroundWorkTracker, RuntimeDrainingError
+
+
+def _job(key, log, label, delay=0.01, gate=None):
+    async def run():
+        log.append(("start", key, label))
+        if gate is not None:
+            await gate.wait()
+        await asyncio.sleep(delay)
+        log.append(("end", key, label))
+
+    return (key, run)
+
+
+class TestInboundScheduler:
+    @pytest.mark.asyncio
+    async def test_events_for_same_user_run_serially_in_order(self):
+        tracker = BackgroundWorkTracker()
+        scheduler = InboundScheduler(tracker, max_concurrency=8)
+        log = []
+        key = ("inbox", "user-a")
+
+        scheduler.submit([_job(key, log, n) for n in range(3)])
+        scheduler.submit([_job(key, log, 3)])
+        await tracker.drain(timeout=5.0)
+
+        assert log == [(phase, key, n) for n in range(4) for phase in ("start", "end")]
+
+    @pytest.mark.asyncio
+    async def test_different_users_run_concurrently_up_to_cap(self):
+        tracker = BackgroundWorkTracker()
+        scheduler = InboundScheduler(tracker, max_concurrency=2)
+        gate = asyncio.Event()
+        log = []
+
+        scheduler.submit(
+            [_job(("inbox", f"user-{n}"), log, n, gate=gate) for n in range(4)]
+        )
+        await asyncio.sleep(0.02)
+
+        assert scheduler.in_flight_count == 2
+        assert scheduler.queued_count == 2
+        assert sum(1 for entry in log if entry[0] == "start") == 2
+
+        gate.set()
+        await tracker.drain(timeout=5.0)
+        assert sum(1 for entry in log if entry[0] == "end") == 4
+
+    @pytest.mark.asyncio
+    async def test_delivery_over_queue_bound_is_refused_whole(self):
+        tracker = BackgroundWorkTracker()
+        scheduler = InboundScheduler(
+            tracker, max_concurrency=1, max_queued=2, retry_after_seconds=7
+        )
+        gate = asyncio.Event()
+        log = []
+
+        scheduler.submit([_job(("inbox", "a"), log, 0, gate=gate)])
+        await asyncio.sleep(0)
+        scheduler.submit([_job(("inbox", "b"), log, 1)])
+
+        with pytest.raises(InboundQueueFullError) as exc_info:
+            scheduler.submit(
+                [_job(("inbox", "c"), log, 2), _job(("inbox", "d"), log, 3)]
+            )
+        assert exc_info.value.retry_after == 7
+
+        gate.set()
+        await tracker.drain(timeout=5.0)
+        stats = scheduler.get_stats()
+        assert stats.accepted == 2
+        assert stats.shed == 2
+        assert stats.completed == 2
+        assert stats.queued == 0
+        assert stats.mailboxes == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_after_drain_begins_raises(self):
+        tracker = BackgroundWorkTracker()
+        scheduler = InboundScheduler(tracker)
+        tracker.begin_drain()
+
+        with pytest.raises(RuntimeDrainingError):
+            scheduler.submit([_job(("inbox", "a"), [], 0)])
+
+    @pytest.mark.asyncio
+    async def test_failing_event_does_not_block_its_mailbox(self):
+        tracker = BackgroundWorkTracker()
+        scheduler = InboundScheduler(tracker)
+        log = []
+        key = ("inbox", "user-a")
+
+        async def boom():
+            raise ValueError("handler failed")
+
+        scheduler.submit([(key, boom), _job(key, log, "after")])
+        await tracker.drain(timeout=5.0)
+
+        assert log[-1] == ("end", key, "after")
+        assert scheduler.get_stats().completed == 2
+
+    @pytest.mark.asyncio
+    async def test_stats_record_queue_wait(self):
+        tracker = BackgroundWorkTracker()
+        scheduler = InboundScheduler(tracker, max_concurrency=1)
+        log = []
+
+        scheduler.submit(
+            [_job(("inbox", "a"), log, 0, delay=0.02), _job(("inbox", "b"), log, 1)]
+        )
+        await tracker.drain(timeout=5.0)
+
+        stats = scheduler.get_stats()
+        assert stats.peak_queued == 2
+        assert stats.wait_ms_max >= 15
@@ -0,0 +1,407 @@
+"""Tests for the durable inbound queue using the in-memory stream backend."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from wappa.core.events.event_dispatcher import WappaEventDispatcher
+from wappa.core.events.event_handler import WappaEventHandler
+from wappa.core.inbound import (
+    InboundRuntime,
+    InboundRuntimeDependencies,
+    InboundStreamTransport,
+    InboundStreamWorker,
+    InvalidInboxError,
+    MemoryInboundDeduplicator,
+    MemoryInboundStreamBackend,
+)
+from wappa.core.lifecycle import BackgroundWorkTracker
+from wappa.domain.interfaces.inbox_credential_store import (
+    IInboxCredentialStore,
+    InboxCredentials,
+    InboxNotFoundError,
+)
+from wappa.schemas.core.types import PlatformType
+from wappa.webhooks import InboundMessageWebhook
+
+INBOX_ID = "123456789012345"
+WABA_ID = "535497026314662"
+
+
+def _payload(*messages: tuple[str, str]) -> dict[str, Any]:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": WABA_ID,
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "metadata": {
+                                "display_phone_number": "15550001111",
+                                "phone_number_id": INBOX_ID,
+                            },
+                            "contacts": [
+                                {"wa_id": sender, "profile": {"name": "Ana"}}
+                                for _, sender in messages
+                            ],
+                            "messages": [
+                                {
+                                    "from": sender,
+                                    "id": message_id,
+                                    "timestamp": "1785772800",
+                                    "type": "text",
+                                    "text": {"body": "hi"},
+                                }
+                                for message_id, sender in messages
+                            ],
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+class _CredentialStore(IInboxCredentialStore):
+    async def get_credentials(self, inbox_id: str) -> InboxCredentials:
+        if inbox_id != INBOX_ID:
+            raise InboxNotFoundError(inbox_id)
+        return InboxCredentials(
+            inbox_id=INBOX_ID, access_token="token", platform_account_id=WABA_ID
+        )
+
+    async def validate_inbox(self, inbox_id: str) -> bool:
+        return inbox_id == INBOX_ID
+
+
+class _FlakyCredentialStore(_CredentialStore):
+    """Fails the first ``failures`` credential lookups."""
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+
+    async def get_credentials(self, inbox_id: str) -> InboxCredentials:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("credential backend unavailable")
+        return await super().get_credentials(inbox_id)
+
+
+class _RecordingHandler(WappaEventHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen: list[str] = []
+
+    async def process_message(self, webhook: InboundMessageWebhook) -> None:
+        self.seen.append(webhook.message.message_id)
+
+
+def _dependencies(
+    store: IInboxCredentialStore,
+    transport: InboundStreamTransport | None = None,
+    deduplicator: MemoryInboundDeduplicator | None = None,
+) -> InboundRuntimeDependencies:
+    return InboundRuntimeDependencies(
+        session_provider=lambda: None,  # type: ignore[arg-type,return-value]
+        inbox_credential_store=store,
+        messenger_middleware=[],
+        cache_type="memory",
+        background_work_tracker=BackgroundWorkTracker(),
+        media_download_client_provider=lambda: None,  # type: ignore[arg-type,return-value]
+        inbound_transport=transport,
+        inbound_deduplicator=deduplicator,
+    )
+
+
+async def _transport(**kwargs: Any) -> InboundStreamTransport:
+    transport = InboundStreamTransport(MemoryInboundStreamBackend(), **kwargs)
+    await transport.ensure_groups()
+    return transport
+
+
+def _worker(
+    transport: InboundStreamTransport,
+    handler: WappaEventHandler,
+    store: IInboxCredentialStore,
+    consumer_name: str = "worker-0",
+    deduplicator: MemoryInboundDeduplicator | None = None,
+    **kwargs: Any,
+) -> InboundStreamWorker:
+    return InboundStreamWorker(
+        transport,
+        InboundRuntime(WappaEventDispatcher(handler)),
+        lambda: _dependencies(store, deduplicator=deduplicator),
+        consumer_name=consumer_name,
+        **kwargs,
+    )
+
+
+async def _read(transport: InboundStreamTransport, consumer: str = "worker-0"):
+    return await transport.backend.read_group(
+        transport.streams, transport.group, consumer, count=10, block_ms=0
+    )
+
+
+class TestInboundStreamTransport:
+    @pytest.mark.asyncio
+    async def test_accept_enqueues_without_dispatching(self):
+        handler = _RecordingHandler()
+        transport = await _transport()
+        runtime = InboundRuntime(WappaEventDispatcher(handler))
+
+        result = await runtime.accept_webhook(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(("wamid.stream-m1", "573001110001")),
+            dependencies=_dependencies(_CredentialStore(), transport),
+        )
+
+        assert result == {"status": "accepted"}
+        assert handler.seen == []
+        assert transport.enqueued == 1
+        assert len(await _read(transport)) == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_inbox_is_rejected_before_enqueue(self):
+        transport = await _transport()
+        runtime = InboundRuntime(WappaEventDispatcher(_RecordingHandler()))
+
+        with pytest.raises(InvalidInboxError):
+            await runtime.accept_webhook(
+                platform=PlatformType.WHATSAPP,
+                inbox_id="999999999999999",
+                payload=_payload(("wamid.stream-m1", "573001110001")),
+                dependencies=_dependencies(_CredentialStore(), transport),
+            )
+        assert transport.enqueued == 0
+
+    @pytest.mark.asyncio
+    async def test_worker_dispatches_in_order_and_acknowledges(self):
+        handler = _RecordingHandler()
+        transport = await _transport()
+        await transport.enqueue(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(
+                ("wamid.stream-m1", "573001110001"),
+                ("wamid.stream-m2", "573001110002"),
+            ),
+        )
+        await transport.enqueue(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(("wamid.stream-m3", "573001110001")),
+        )
+        worker = _worker(transport, handler, _CredentialStore())
+
+        await worker.process_records(await _read(transport))
+
+        assert handler.seen.index("wamid.stream-m1") < handler.seen.index(
+            "wamid.stream-m3"
+        )
+        assert sorted(handler.seen) == [
+            "wamid.stream-m1",
+            "wamid.stream-m2",
+            "wamid.stream-m3",
+        ]
+        assert worker.acknowledged == 2
+        assert (
+            transport.backend.pending_count(transport.streams[0], transport.group) == 0
+        )
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_stays_pending_and_is_reclaimed(self):
+        handler = _RecordingHandler()
+        transport = await _transport()
+        store = _FlakyCredentialStore(failures=1)
+        await transport.enqueue(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(("wamid.stream-m1", "573001110001")),
+        )
+
+        first = _worker(transport, handler, store, "worker-0")
+        await first.process_records(await _read(transport, "worker-0"))
+        assert first.retried == 1
+        assert handler.seen == []
+        assert (
+            transport.backend.pending_count(transport.streams[0], transport.group) == 1
+        )
+
+        second = _worker(
+            transport, handler, store, "worker-1", reclaim_idle_ms=0, reclaim_interval=0
+        )
+        reclaimed = await second._claim_stale()
+        await second.process_records(reclaimed)
+
+        assert second.reclaimed == 1
+        assert handler.seen == ["wamid.stream-m1"]
+        assert (
+            transport.backend.pending_count(transport.streams[0], transport.group) == 0
+        )
+
+    @pytest.mark.asyncio
+    async def test_entry_of_a_crashed_worker_is_reclaimed_not_deduplicated(
+        self, monkeypatch
+    ):
+        clock = [1000.0]
+        monkeypatch.setattr("wappa.core.inbound.dedup.time.monotonic", lambda: clock[0])
+        handler = _RecordingHandler()
+        store = _CredentialStore()
+        deduplicator = MemoryInboundDeduplicator()
+        transport = await _transport()
+        await transport.enqueue(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(("wamid.stream-m1", "573001110001")),
+        )
+
+        # The first worker claims the entry's keys, then dies before dispatch.
+        crashed = _worker(transport, handler, store, deduplicator=deduplicator)
+        [record] = await _read(transport, "worker-0")
+        await crashed._build_contexts(record, _dependencies(store, None, deduplicator))
+        clock[0] += crashed.reclaim_idle_ms / 1000
+
+        second = _worker(
+            transport,
+            handler,
+            store,
+            "worker-1",
+            deduplicator=deduplicator,
+            reclaim_idle_ms=0,
+            reclaim_interval=0,
+        )
+        await second.process_records(await second._claim_stale())
+
+        assert second.dropped == 0
+        assert handler.seen == ["wamid.stream-m1"]
+        assert (
+            transport.backend.pending_count(transport.streams[0], transport.group) == 0
+        )
+
+        # Once dispatched and acknowledged, a redelivery is dropped.
+        await transport.enqueue(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(("wamid.stream-m1", "573001110001")),
+        )
+        await second.process_records(await _read(transport, "worker-1"))
+        assert handler.seen == ["wamid.stream-m1"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_releases_its_keys_for_the_reclaim(self):
+        cancellations = [1]
+
+        class _CancelledOnce(_RecordingHandler):
+            async def process_message(self, webhook: InboundMessageWebhook) -> None:
+                if cancellations[0]:
+                    cancellations[0] -= 1
+                    raise asyncio.CancelledError
+                await super().process_message(webhook)
+
+        handler = _CancelledOnce()
+        store = _CredentialStore()
+        deduplicator = MemoryInboundDeduplicator()
+        transport = await _transport()
+        await transport.enqueue(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(("wamid.stream-m1", "573001110001")),
+        )
+
+        first = _worker(transport, handler, store, deduplicator=deduplicator)
+        with pytest.raises(asyncio.CancelledError):
+            await first.process_records(await _read(transport, "worker-0"))
+        assert first.acknowledged == 0
+
+        second = _worker(
+            transport,
+            handler,
+            store,
+            "worker-1",
+            deduplicator=deduplicator,
+            reclaim_idle_ms=0,
+            reclaim_interval=0,
+        )
+        await second.process_records(await second._claim_stale())
+
+        assert handler.seen == ["wamid.stream-m1"]
+        assert second.acknowledged == 1
+
+    @pytest.mark.asyncio
+    async def test_a_slow_batch_keeps_its_entries_and_keys(self):
+        release = asyncio.Event()
+
+        class _Slow(_RecordingHandler):
+            async def process_message(self, webhook: InboundMessageWebhook) -> None:
+                await release.wait()
+                await super().process_message(webhook)
+
+        handler = _Slow()
+        store = _CredentialStore()
+        deduplicator = MemoryInboundDeduplicator()
+        transport = await _transport()
+        await transport.enqueue(
+            platform=PlatformType.WHATSAPP,
+            inbox_id=INBOX_ID,
+            payload=_payload(("wamid.stream-m1", "573001110001")),
+        )
+        first = _worker(
+            transport, handler, store, deduplicator=deduplicator, reclaim_idle_ms=200
+        )
+        second = _worker(
+            transport,
+            handler,
+            store,
+            "worker-1",
+            deduplicator=deduplicator,
+            reclaim_idle_ms=200,
+            reclaim_interval=0,
+        )
+
+        batch = asyncio.create_task(
+            first.process_records(await _read(transport, "worker-0"))
+        )
+        # Well past both the reclaim idle time and the first lease
+        await asyncio.sleep(0.5)
+
+        assert await second._claim_stale() == []
+        assert await deduplicator.claim([f"msg:{INBOX_ID}:wamid.stream-m1"]) == [False]
+        release.set()
+        await batch
+
+        assert handler.seen == ["wamid.stream-m1"]
+        assert first.acknowledged == 1
+        assert (
+            transport.backend.pending_count(transport.streams[0], "wappa-inbound") == 0
+        )
+
+    @pytest.mark.asyncio
+    async def test_undecodable_entry_is_dropped_and_acknowledged(self):
+        transport = await _transport()
+        await transport.backend.append(
+            transport.streams[0], {"platform": "whatsapp", "payload": "{"}
+        )
+        worker = _worker(transport, _RecordingHandler(), _CredentialStore())
+
+        await worker.process_records(await _read(transport))
+
+        assert worker.dropped == 1
+        assert worker.acknowledged == 1
+        assert (
+            transport.backend.pending_count(transport.streams[0], transport.group) == 0
+        )
+
+    @pytest.mark.asyncio
+    async def test_inbox_always_maps_to_the_same_shard(self):
+        transport = await _transport(shards=4)
+
+        assert len(transport.streams) == 4
+        assert transport.stream_for(INBOX_ID) == transport.stream_for(INBOX_ID)
+        assert transport.stream_for(INBOX_ID) in transport.streams
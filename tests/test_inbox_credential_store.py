@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Any
 
@@ -23,28 +24,90 @@ def _credentials_cache_key(inbox_id: str) -> str:
     return f"inbox:{inbox_id}:credentials"
 
 
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._queued: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def __aenter__(self) -> _FakePipeline:
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        return None
+
+    def delete(self, key: str) -> _FakePipeline:
+        self._queued.append(("delete", (key,)))
+        return self
+
+    def hset(self, key: str, mapping: dict[str, str]) -> _FakePipeline:
+        self._queued.append(("hset", (key, mapping)))
+        return self
+
+    def expire(self, key: str, ttl: int) -> _FakePipeline:
+        self._queued.append(("expire", (key, ttl)))
+        return self
+
+    async def execute(self) -> list[Any]:
+        self._redis.round_trips += 1
+        for name, args in self._queued:
+            self._redis.calls.append((name, args[0]))
+            if name == "delete":
+                self._redis.hashes.pop(args[0], None)
+            elif name == "hset":
+                self._redis.hashes[args[0]] = dict(args[1])
+            else:
+                self._redis.expirations[args[0]] = args[1]
+        return [True] * len(self._queued)
+
+
+class _FakePubSub:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self._redis.subscribers.setdefault(channel, []).append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self) -> None:
+        for subscribers in self._redis.subscribers.values():
+            if self in subscribers:
+                subscribers.remove(self)
+
+
 class _FakeRedis:
     def __init__(self) -> None:
         self.hashes: dict[str, dict[str, str]] = {}
         self.expirations: dict[str, int] = {}
         self.calls: list[tuple[str, str]] = []
+        self.subscribers: dict[str, list[_FakePubSub]] = {}
+        self.round_trips = 0
 
     async def hgetall(self, key: str) -> dict[str, str]:
+        self.round_trips += 1
         self.calls.append(("hgetall", key))
         return self.hashes.get(key, {})
 
-    async def hset(self, key: str, mapping: dict[str, str]) -> None:
-        self.calls.append(("hset", key))
-        self.hashes[key] = dict(mapping)
-
-    async def expire(self, key: str, ttl: int) -> None:
-        self.calls.append(("expire", key))
-        self.expirations[key] = ttl
-
     async def delete(self, key: str) -> None:
+        self.round_trips += 1
         self.calls.append(("delete", key))
         self.hashes.pop(key, None)
 
+    async def publish(self, channel: str, message: str) -> int:
+        subscribers = self.subscribers.get(channel, [])
+        for pubsub in subscribers:
+            pubsub.queue.put_nowait({"type": "message", "data": message})
+        return len(subscribers)
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+    def pubsub(self) -> _FakePubSub:
+        return _FakePubSub(self)
+
 
 class _FakeMappings:
     def __init__(self, row: dict[str, Any] | None) -> None:
@@ -69,6 +132,7 @@ class _FakeSession:
 
     async def execute(self, *_args: Any, **_kwargs: Any) -> _FakeResult:
         self.execute_calls += 1
+        await asyncio.sleep(0)
         return _FakeResult(self.row)
 
 
@@ -80,6 +144,14 @@ def _session_factory(session: _FakeSession):
     return _factory
 
 
+def _row(access_token: str) -> dict[str, Any]:
+    return {
+        "inbox_id": INBOX_1,
+        "access_token": access_token,
+        "platform_account_id": None,
+    }
+
+
 class _CustomStore(IInboxCredentialStore):
     async def get_credentials(self, inbox_id: str) -> InboxCredentials:
         return InboxCredentials(inbox_id=inbox_id, access_token="custom-token")
@@ -137,16 +209,71 @@ async def test_database_store_cache_miss_queries_database_and_populates_cache()
 
 
 @pytest.mark.asyncio
-async def test_database_store_unknown_inbox_raises_without_negative_cache() -> None:
+async def test_database_store_cache_write_is_one_round_trip() -> None:
+    redis = _FakeRedis()
+    session = _FakeSession(row=_row("db-token"))
+    store = DatabaseInboxCredentialStore(
+        _session_factory(session), redis, invalidation_channel=None
+    )
+
+    await store.get_credentials(INBOX_1)
+
+    # One HGETALL miss, then DELETE + HSET + EXPIRE in a single pipeline.
+    assert redis.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_database_store_local_cache_skips_redis() -> None:
+    redis = _FakeRedis()
+    session = _FakeSession(row=_row("db-token"))
+    store = DatabaseInboxCredentialStore(
+        _session_factory(session), redis, invalidation_channel=None
+    )
+
+    for _ in range(5):
+        await store.get_credentials(INBOX_1)
+
+    assert session.execute_calls == 1
+    assert redis.calls.count(("hgetall", _credentials_cache_key(INBOX_1))) == 1
+
+
+@pytest.mark.asyncio
+async def test_database_store_unknown_inbox_is_negatively_cached() -> None:
     redis = _FakeRedis()
     session = _FakeSession(row=None)
-    store = DatabaseInboxCredentialStore(_session_factory(session), redis)
+    store = DatabaseInboxCredentialStore(
+        _session_factory(session), redis, negative_cache_ttl=7
+    )
+
+    for _ in range(3):
+        with pytest.raises(InboxNotFoundError):
+            await store.get_credentials("missing")
+    assert await store.validate_inbox("missing") is False
 
+    # A second worker with a cold local cache is answered by Redis.
+    other = DatabaseInboxCredentialStore(_session_factory(session), redis)
     with pytest.raises(InboxNotFoundError):
-        await store.get_credentials("missing")
+        await other.get_credentials("missing")
 
     assert session.execute_calls == 1
-    assert "inbox:missing:credentials" not in redis.hashes
+    assert redis.hashes["inbox:missing:credentials"]["is_active"] == "false"
+    assert redis.expirations["inbox:missing:credentials"] == 7
+    await store.close()
+    await other.close()
+
+
+@pytest.mark.asyncio
+async def test_database_store_concurrent_misses_share_one_lookup() -> None:
+    redis = _FakeRedis()
+    session = _FakeSession(row=_row("db-token"))
+    store = DatabaseInboxCredentialStore(
+        _session_factory(session), redis, invalidation_channel=None
+    )
+
+    results = await asyncio.gather(*(store.get_credentials(INBOX_1) for _ in range(25)))
+
+    assert {credentials.access_token for credentials in results} == {"db-token"}
+    assert session.execute_calls == 1
 
 
 @pytest.mark.asyncio
@@ -165,6 +292,29 @@ async def test_database_store_invalidate_cache_deletes_redis_key() -> None:
     assert ("delete", _credentials_cache_key(INBOX_1)) in redis.calls
 
 
+@pytest.mark.asyncio
+async def test_database_store_invalidation_reaches_other_workers() -> None:
+    redis = _FakeRedis()
+    session = _FakeSession(row=_row("token-1"))
+    worker_a = DatabaseInboxCredentialStore(_session_factory(session), redis)
+    worker_b = DatabaseInboxCredentialStore(_session_factory(session), redis)
+    invalidated: list[str] = []
+    worker_b.add_invalidation_listener(invalidated.append)
+
+    await worker_a.get_credentials(INBOX_1)
+    await worker_b.get_credentials(INBOX_1)
+    await asyncio.sleep(0)  # let both subscribers attach
+
+    session.row = _row("token-2")
+    await worker_a.invalidate_cache(INBOX_1)
+    await asyncio.sleep(0)
+
+    assert invalidated == [INBOX_1]
+    assert (await worker_b.get_credentials(INBOX_1)).access_token == "token-2"
+    await worker_a.close()
+    await worker_b.close()
+
+
 @pytest.mark.asyncio
 async def test_settings_store_default_behavior_still_uses_environment(
     monkeypatch: pytest.MonkeyPatch,
@@ -0,0 +1,209 @@
+"""Per-key expiry and locking of the JSON cache backend, on both engines."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from wappa.core.config.settings import settings
+from wappa.persistence.json import engines as engines_module
+from wappa.persistence.json import log_engine as log_engine_module
+from wappa.persistence.json.engines import FileEngine, JSONEngine
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.json.handlers.utils.lock_table import LockTable
+from wappa.persistence.json.json_cache_factory import JSONCacheFactory
+from wappa.persistence.json.log_engine import LogEngine
+from wappa.persistence.json.storage_manager import storage_manager
+
+storage_manager_module = importlib.import_module(
+    "wappa.persistence.json.storage_manager"
+)
+
+INBOX = "inbox-ttl"
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = time.time()
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    for module in (engines_module, log_engine_module, storage_manager_module):
+        monkeypatch.setattr(module, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["file", "log"])
+async def engine(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> AsyncIterator[JSONEngine]:
+    file_manager._cache_root = tmp_path / "cache"
+    file_manager.ensure_cache_directories()
+    engine = storage_manager.use_engine(
+        FileEngine() if request.param == "file" else LogEngine(fsync_interval=0)
+    )
+    try:
+        yield engine
+    finally:
+        await storage_manager.close()
+        storage_manager.use_engine(settings.json_cache_engine)
+
+
+@pytest.fixture
+def factory(engine: JSONEngine) -> JSONCacheFactory:
+    return JSONCacheFactory(inbox_id=INBOX, user_id="u-1")
+
+
+async def test_rows_of_one_table_expire_on_their_own(
+    factory: JSONCacheFactory, clock: Clock
+) -> None:
+    table = factory.create_table_cache()
+    await table.upsert("otp", "short", {"code": 1}, ttl=60)
+    await table.upsert("otp", "long", {"code": 2}, ttl=600)
+    await table.upsert("otp", "forever", {"code": 3})
+
+    assert 0 < await table.get_ttl("otp", "short") <= 60
+    assert await table.get_ttl("otp", "long") > 60
+    assert await table.get_ttl("otp", "forever") == -1
+
+    clock.now += 61
+    assert await table.get("otp", "short") is None
+    assert await table.get_ttl("otp", "short") == -2
+    assert not await table.renew_ttl("otp", "short", 60)
+    assert await table.list_pkids("otp") == ["forever", "long"]
+
+    assert await table.renew_ttl("otp", "forever", 10)
+    clock.now += 11
+    assert await table.list_pkids("otp") == ["long"]
+
+
+async def test_a_write_without_ttl_leaves_other_keys_expiry_alone(
+    factory: JSONCacheFactory, clock: Clock
+) -> None:
+    state = factory.create_state_cache()
+    await state.upsert("checkout", {"step": 1}, ttl=60)
+    await state.upsert("profile", {"name": "Ana"})
+    await state.merge("profile", {"city": "Bogotá"})
+
+    assert 0 < await state.get_ttl("checkout") <= 60
+    assert await state.get_ttl("profile") == -1
+
+    await state.upsert("checkout", {"step": 2})
+    assert await state.get_ttl("checkout") == -1
+
+
+async def test_stores_nobody_touches_again_are_purged_when_due(
+    engine: JSONEngine, factory: JSONCacheFactory, clock: Clock
+) -> None:
+    state = factory.create_state_cache()
+    await state.upsert("otp", {"code": 1}, ttl=60)
+    await state.upsert("flow", {"step": 1}, ttl=120)
+    (path,) = await engine.paths("states", INBOX)
+
+    assert await storage_manager.expire_due() == 0
+    clock.now += 61
+    assert await storage_manager.expire_due() == 1
+    assert await engine.read(path) is not None
+    clock.now += 60
+    assert await storage_manager.expire_due() == 1
+
+    assert not path.exists()
+
+
+async def test_the_first_sweep_purges_stores_of_earlier_runs(
+    engine: JSONEngine,
+    factory: JSONCacheFactory,
+    clock: Clock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await factory.create_state_cache().upsert("otp", {"code": 1}, ttl=60)
+    (path,) = await engine.paths("states", INBOX)
+
+    # A restart forgets the deadlines; the sweeper finds them on disk
+    storage_manager.use_engine(type(engine)())
+    monkeypatch.setattr(storage_manager, "sweep_interval", 0.01)
+    clock.now += 61
+    assert await factory.create_user_cache().get() is None
+    await asyncio.sleep(0.05)
+
+    assert not path.exists()
+
+
+async def test_legacy_file_wide_expiry_becomes_per_key_on_write(
+    tmp_path: Path, clock: Clock
+) -> None:
+    file_manager._cache_root = tmp_path / "cache"
+    file_manager.ensure_cache_directories()
+    storage_manager.use_engine(FileEngine())
+    state = JSONCacheFactory(inbox_id=INBOX, user_id="u-1").create_state_cache()
+    path = file_manager.get_cache_file_path("states", INBOX, "u-1")
+    path.write_text(
+        json.dumps(
+            {
+                "_metadata": {
+                    "created_at": datetime.now().isoformat(),
+                    "expires_at": datetime.fromtimestamp(clock.now + 60).isoformat(),
+                    "version": "1.0",
+                },
+                "data": {state._key("flow"): {"step": 1}},
+            }
+        )
+    )
+
+    assert 0 < await state.get_ttl("flow") <= 60
+    await state.upsert("profile", {"name": "Ana"})
+
+    metadata = json.loads(path.read_text())["_metadata"]
+    assert metadata["version"] == "1.1"
+    assert list(metadata["expires"]) == [state._key("flow")]
+    clock.now += 61
+    assert await state.get("flow") is None
+    assert await state.get("profile") == {"name": "Ana"}
+    await storage_manager.close()
+    storage_manager.use_engine(settings.json_cache_engine)
+
+
+async def test_concurrent_writers_to_one_store_all_land(
+    engine: JSONEngine, factory: JSONCacheFactory
+) -> None:
+    table = factory.create_table_cache()
+    await asyncio.gather(
+        *(table.upsert("orders", f"o{i}", {"n": i}, ttl=60) for i in range(30)),
+        *(table.delete("orders", f"missing-{i}") for i in range(10)),
+    )
+
+    assert len(await table.list_pkids("orders")) == 30
+    assert len(file_manager._file_locks) == 0
+    assert len(getattr(engine, "_locks", ())) == 0
+
+
+async def test_the_lock_table_only_holds_locks_in_use() -> None:
+    table = LockTable()
+    order: list[str] = []
+
+    async def hold(name: str) -> None:
+        async with table.hold("store"):
+            order.append(f"{name}+")
+            await asyncio.sleep(0.01)
+            order.append(f"{name}-")
+
+    await asyncio.gather(hold("a"), hold("b"), hold("c"))
+    assert order == ["a+", "a-", "b+", "b-", "c+", "c-"]
+    assert len(table) == 0
+
+    for i in range(100):
+        async with table.hold(f"store-{i}"):
+            assert len(table) == 1
+    assert len(table) == 0
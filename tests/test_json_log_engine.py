@@ -0,0 +1,240 @@
+"""Append-only log engine of the JSON cache backend."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from typer.testing import CliRunner
+
+from wappa.cli.main import app as cli
+from wappa.persistence import field_indexes
+from wappa.persistence.json import log_engine as log_engine_module
+from wappa.persistence.json.engines import FileEngine
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.json.json_cache_factory import JSONCacheFactory
+from wappa.persistence.json.log_engine import LogEngine, dump_log
+from wappa.persistence.json.storage_manager import storage_manager
+
+INBOX = "inbox-log"
+
+
+@pytest.fixture
+async def engine(tmp_path: Path) -> AsyncIterator[LogEngine]:
+    file_manager._cache_root = tmp_path / "cache"
+    file_manager.ensure_cache_directories()
+    engine = LogEngine(fsync_interval=0, compact_min_records=20)
+    storage_manager.use_engine(engine)
+    try:
+        yield engine
+    finally:
+        await engine.close()
+        storage_manager.use_engine(FileEngine())
+
+
+@pytest.fixture
+def factory(engine: LogEngine) -> JSONCacheFactory:
+    return JSONCacheFactory(inbox_id=INBOX, user_id="u-1")
+
+
+def tables_log() -> Path:
+    return file_manager.get_cache_file_path("tables", INBOX).with_suffix(".log")
+
+
+def log_size(cache_type: str) -> int:
+    path = file_manager.get_cache_file_path(cache_type, INBOX).with_suffix(".log")
+    return path.stat().st_size if path.exists() else 0
+
+
+async def test_a_new_process_rebuilds_the_index_from_the_log(
+    factory: JSONCacheFactory,
+) -> None:
+    table = factory.create_table_cache()
+    await table.upsert_many("orders", {f"o{i}": {"n": i} for i in range(5)})
+    await table.update_field("orders", "o1", "n", 10)
+    await table.delete("orders", "o2")
+    await factory.create_state_cache().upsert("checkout", {"step": 2})
+
+    storage_manager.use_engine(LogEngine(fsync_interval=0))
+
+    assert await table.list_pkids("orders") == ["o0", "o1", "o3", "o4"]
+    assert await table.get("orders", "o1") == {"n": 10}
+    assert await factory.create_state_cache().get("checkout") == {"step": 2}
+    assert not file_manager.get_cache_file_path("tables", INBOX).exists()
+
+
+async def test_a_write_costs_the_entry_not_the_table(factory: JSONCacheFactory) -> None:
+    table = factory.create_table_cache()
+    appended = []
+    for size in (10, 2000):
+        await table.upsert_many("rows", {f"r{i}": {"n": i} for i in range(size)})
+        before = tables_log().stat().st_size
+        await table.upsert("rows", "r0", {"n": -1})
+        appended.append(tables_log().stat().st_size - before)
+
+    assert appended[0] == appended[1] < 200
+
+
+async def test_an_indexed_write_costs_its_index_entries_not_the_table(
+    factory: JSONCacheFactory,
+) -> None:
+    field_indexes.declare("orders", "customer_id")
+    table = factory.create_table_cache()
+    appended = []
+    try:
+        for size in (10, 2000):
+            await table.upsert_many(
+                "orders", {f"o{i}": {"customer_id": f"c{i}"} for i in range(size)}
+            )
+            before = log_size("tables") + log_size("indexes")
+            await table.upsert("orders", "o0", {"customer_id": "c-moved"})
+            appended.append(log_size("tables") + log_size("indexes") - before)
+    finally:
+        field_indexes.clear()
+
+    assert appended[0] == appended[1] < 400
+    assert await table.find_by_field("orders", "customer_id", "c-moved") == {
+        "customer_id": "c-moved"
+    }
+
+
+async def test_a_user_upsert_costs_its_identities_not_the_inbox(
+    factory: JSONCacheFactory,
+) -> None:
+    users = factory.create_user_cache()
+    appended = []
+    for size in (10, 500):
+        await users.upsert_many(
+            {f"u{i}": {"phone_number": f"5730{i:08d}"} for i in range(size)}
+        )
+        before = log_size("identities")
+        await factory.create_user_cache(user_id="u0").upsert(
+            {"phone_number": "573099999999"}
+        )
+        appended.append(log_size("identities") - before)
+
+    assert appended[0] == appended[1] < 200
+    index = factory.create_identity_index()
+    assert await index.get_user_ids(["573099999999"]) == {"573099999999": "u0"}
+
+
+async def test_compaction_keeps_writes_made_while_it_copies(
+    engine: LogEngine, factory: JSONCacheFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    copy_live = LogEngine._copy_live
+
+    def slow_copy(*args: object) -> object:
+        time.sleep(0.05)
+        return copy_live(*args)
+
+    monkeypatch.setattr(LogEngine, "_copy_live", staticmethod(slow_copy))
+    table = factory.create_table_cache()
+    await table.upsert_many("hot", {f"h{i}": {"v": 0} for i in range(5)})
+    for version in range(1, 5):
+        await table.upsert_many("hot", {f"h{i}": {"v": version} for i in range(5)})
+    assert engine._compactions
+
+    await asyncio.sleep(0.01)
+    await table.upsert("hot", "h0", {"v": "during"})
+    await table.delete("hot", "h1")
+    await asyncio.gather(*engine._compactions)
+
+    lines = tables_log().read_text().splitlines()
+    assert len(lines) == 5 + 2
+    assert await table.get("hot", "h0") == {"v": "during"}
+    assert await table.get("hot", "h1") is None
+    assert await table.get("hot", "h4") == {"v": 4}
+
+    storage_manager.use_engine(LogEngine(fsync_interval=0))
+    assert await table.list_pkids("hot") == ["h0", "h2", "h3", "h4"]
+
+
+async def test_a_torn_last_line_is_cut_off(factory: JSONCacheFactory) -> None:
+    table = factory.create_table_cache()
+    await table.upsert("orders", "o1", {"n": 1})
+    with tables_log().open("ab") as log:
+        log.write(b'{"k":"inbox-log:df:orders:o2","v":{"n"')
+
+    storage_manager.use_engine(LogEngine(fsync_interval=0))
+    await table.upsert("orders", "o3", {"n": 3})
+
+    assert await table.list_pkids("orders") == ["o1", "o3"]
+    assert len(tables_log().read_text().splitlines()) == 2
+
+
+async def test_keys_expire_one_by_one_and_the_empty_log_is_removed(
+    engine: LogEngine, factory: JSONCacheFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    state = factory.create_state_cache()
+    await state.upsert("checkout", {"step": 1}, ttl=60)
+    await state.upsert("profile", {"name": "Ana"}, ttl=60)
+    assert 0 < await state.get_ttl("checkout") <= 60
+    assert await state.renew_ttl("checkout", 600)
+    assert await state.get_ttl("checkout") > 500
+    assert await state.get_ttl("profile") <= 60
+
+    later = time.time() + 61
+    monkeypatch.setattr(log_engine_module, "time", SimpleNamespace(time=lambda: later))
+    assert await state.get("profile") is None
+    assert await state.get("checkout") == {"step": 1}
+
+    # A fresh index sees the renewed expiry on the renewal line
+    (log_path,) = file_manager.get_cache_root().glob("states/*.log")
+    assert await LogEngine().get_ttl(log_path, state._key("checkout")) > 500
+
+    later += 600
+    assert await engine.purge(log_path) is None
+    assert not log_path.exists()
+
+
+async def test_deleting_every_key_removes_the_log(factory: JSONCacheFactory) -> None:
+    table = factory.create_table_cache()
+    await table.upsert_many("orders", {"o1": {"n": 1}, "o2": {"n": 2}})
+
+    assert await table.delete_table("orders") == 2
+
+    assert not tables_log().exists()
+
+
+async def test_writes_are_fsynced_on_the_interval(
+    engine: LogEngine, factory: JSONCacheFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    synced: list[int] = []
+    monkeypatch.setattr(log_engine_module.os, "fsync", synced.append)
+    engine.fsync_interval = 0.01
+
+    await factory.create_table_cache().upsert("orders", "o1", {"n": 1})
+    assert engine._dirty == {tables_log()} and not synced
+
+    await asyncio.sleep(0.05)
+    assert not engine._dirty and len(synced) == 1
+
+
+async def test_dump_shows_live_entries_and_every_line(
+    factory: JSONCacheFactory,
+) -> None:
+    table = factory.create_table_cache()
+    await table.upsert("orders", "o1", {"n": 1})
+    await table.upsert("orders", "o1", {"n": 2})
+    await table.upsert("orders", "o2", {"n": 3})
+    await table.delete("orders", "o2")
+
+    dumped = dump_log(tables_log())
+    assert dumped["data"] == {f"{INBOX}:df:orders:pkid:o1": {"n": 2}}
+    assert dumped["_metadata"]["records"] == 4
+    assert dumped["_metadata"]["live"] == 1
+
+    result = CliRunner().invoke(cli, ["cache-dump", str(tables_log()), "--records"])
+    assert result.exit_code == 0
+    lines = json.loads(result.output)
+    assert [line["offset"] for line in lines][0] == 0
+    assert lines[-1] == {
+        "offset": lines[-1]["offset"],
+        "k": f"{INBOX}:df:orders:pkid:o2",
+        "d": 1,
+    }
@@ -0,0 +1,210 @@
+"""Size-bounded MemoryStore: byte accounting, limits and eviction policies."""
+
+from __future__ import annotations
+
+import pytest
+
+from wappa.persistence.memory.handlers.utils import memory_store
+from wappa.persistence.memory.handlers.utils.eviction import (
+    ENTRY_OVERHEAD,
+    FrequencySketch,
+    estimate_size,
+)
+from wappa.persistence.memory.handlers.utils.memory_store import MemoryStore
+
+
+@pytest.fixture
+async def store() -> MemoryStore:
+    store = MemoryStore()
+    yield store
+    store.stop_cleanup_task()
+
+
+async def test_footprint_follows_writes_and_deletes(store: MemoryStore) -> None:
+    store.configure_limits(max_bytes=1 << 30)
+    value = {"name": "Ana", "tags": ["a", "b"], "age": 31}
+    await store.set("users", "inbox_u1", "profile", value)
+    expected = ENTRY_OVERHEAD + estimate_size("profile") + estimate_size(value)
+    assert store.stats()["users"].bytes == expected
+
+    await store.set("users", "inbox_u1", "profile", {"name": "Ana"}, ttl=60)
+    await store.set_many("users", [("inbox_u2", "profile", {}), ("inbox_u3", "x", 1)])
+    assert store.stats()["users"].entries == 3
+
+    await store.delete("users", "inbox_u1", "profile")
+    await store.delete_many("users", [("inbox_u2", "profile"), ("inbox_u3", "x")])
+    assert store.stats()["users"].entries == store.stats()["users"].bytes == 0
+
+
+async def test_unbounded_stores_size_nothing(
+    store: MemoryStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def refuse(value: object) -> int:
+        raise AssertionError("sized a write to an unbounded store")
+
+    monkeypatch.setattr(memory_store, "estimate_size", refuse)
+    await store.set("identities", "inbox", "phone:1", "u1")
+    await store.set_many("users", [("inbox_u1", "profile", {"name": "Ana"})])
+    await store.update("users", "inbox_u1", "profile", lambda v: {**v, "age": 31})
+    await store.update_many("indexes", "inbox", ["a"], lambda _: {"a": ["p1"]})
+    assert store.stats()["users"].entries == 1
+    assert store.stats()["users"].bytes == 0
+
+    monkeypatch.undo()
+    store.configure_limits(max_bytes=1 << 30)
+    expected = ENTRY_OVERHEAD + estimate_size("profile")
+    expected += estimate_size({"name": "Ana", "age": 31})
+    assert store.stats()["users"].bytes == expected
+
+
+async def test_updates_charge_only_the_fields_they_change(
+    store: MemoryStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store.configure_limits(max_bytes=1 << 30)
+    history = [f"message {i}" for i in range(1000)]
+    await store.set("states", "inbox_u1", "flow", {"step": 1, "history": history})
+
+    def refuse(value: object) -> int:
+        raise AssertionError("sized the whole value again")
+
+    monkeypatch.setattr(memory_store, "estimate_size", refuse)
+    await store.update("states", "inbox_u1", "flow", lambda v: {**v, "step": 2})
+    await store.update("states", "inbox_u1", "flow", lambda v: {**v, "done": True})
+    monkeypatch.undo()
+
+    value = {"step": 2, "history": history, "done": True}
+    expected = ENTRY_OVERHEAD + estimate_size("flow") + estimate_size(value)
+    assert store.stats()["states"].bytes == expected
+
+
+async def test_identities_and_indexes_are_never_evicted(store: MemoryStore) -> None:
+    await store.set_many(
+        "indexes", [("inbox", f"idx{i}", "x" * 500) for i in range(20)]
+    )
+    await store.set("identities", "inbox", "phone:1", "u1")
+    store.configure_limits(max_bytes=4000)
+
+    await store.set("tables", "inbox", "row", "small")
+    await store.set("users", "inbox_u1", "profile", "x" * 1000)
+
+    stats = store.stats()
+    assert stats["indexes"].entries == 20 and stats["indexes"].evictions == 0
+    assert await store.get("identities", "inbox", "phone:1") == "u1"
+    assert stats["tables"].evictions == 1
+    with pytest.raises(ValueError, match="never evicted"):
+        store.configure_limits(namespace_max_entries={"indexes": 10})
+
+
+async def test_lru_evicts_the_least_recently_used_entry(store: MemoryStore) -> None:
+    store.configure_limits(namespace_max_entries={"states": 2})
+    await store.set("states", "inbox_u1", "flow", 1)
+    await store.set("states", "inbox_u2", "flow", 2)
+    await store.get("states", "inbox_u1", "flow")
+
+    await store.set("states", "inbox_u3", "flow", 3)
+
+    assert await store.get("states", "inbox_u2", "flow") is None
+    assert await store.get("states", "inbox_u1", "flow") == 1
+    assert store.stats()["states"].evictions == 1
+    assert store.stats()["states"].entries == 2
+
+
+async def test_store_byte_limit_evicts_from_the_largest_namespace(
+    store: MemoryStore,
+) -> None:
+    big = "x" * 4000
+    store.configure_limits(max_bytes=12_000)
+    await store.set("ai_states", "inbox_u1", "agent", big)
+    await store.set("ai_states", "inbox_u2", "agent", big)
+    await store.set("users", "inbox_u1", "profile", "small")
+
+    await store.set("users", "inbox_u2", "profile", big)
+
+    stats = store.stats()
+    assert stats["ai_states"].evictions == 1 and stats["users"].evictions == 0
+    assert sum(s.bytes for s in stats.values()) <= 12_000
+    assert await store.get("users", "inbox_u1", "profile") == "small"
+
+
+async def test_ttl_policy_evicts_expiring_entries_first(store: MemoryStore) -> None:
+    store.configure_limits(namespace_max_entries={"tables": 2}, eviction="ttl")
+    await store.set("tables", "inbox", "config", "keep")
+    await store.set("tables", "inbox", "session", "goes", ttl=600)
+
+    await store.set("tables", "inbox", "other", "new")
+
+    assert await store.get("tables", "inbox", "config") == "keep"
+    assert await store.get("tables", "inbox", "session") is None
+
+
+@pytest.mark.parametrize(("eviction", "survivors"), [("tinylfu", 50), ("lru", 0)])
+async def test_tinylfu_keeps_hot_entries_through_a_scan(
+    store: MemoryStore, eviction: str, survivors: int
+) -> None:
+    store.configure_limits(namespace_max_entries={"users": 100}, eviction=eviction)
+    hot = [(f"inbox_u{i}", "profile") for i in range(50)]
+    await store.set_many("users", [(c, k, {"hot": True}) for c, k in hot])
+    for _ in range(5):
+        await store.get_many("users", hot)
+
+    for i in range(1000):
+        await store.set("users", f"inbox_scan{i}", "profile", {"hot": False})
+
+    kept = [value for value in await store.get_many("users", hot) if value]
+    assert len(kept) == survivors
+    assert store.stats()["users"].entries == 100
+
+
+async def test_entries_larger_than_a_limit_are_refused(store: MemoryStore) -> None:
+    store.configure_limits(namespace_max_bytes={"ai_states": 1024})
+    await store.set("ai_states", "inbox_u1", "agent", "small")
+
+    assert not await store.set("ai_states", "inbox_u1", "big", "x" * 2048)
+    assert not await store.set_many(
+        "ai_states", [("inbox_u1", "a", "ok"), ("inbox_u1", "b", "x" * 2048)]
+    )
+    with pytest.raises(ValueError, match="exceeds the 1024-byte limit"):
+        await store.create_if_absent("ai_states", "inbox_u1", "big", "x" * 2048)
+
+    assert await store.get_all_keys("ai_states", "inbox_u1") == {"agent": "small"}
+
+
+async def test_new_limits_evict_entries_already_stored(store: MemoryStore) -> None:
+    await store.set_many("tables", [("inbox", f"row{i}", i) for i in range(10)])
+
+    store.configure_limits(max_entries=4)
+
+    assert store.stats()["tables"].entries == 4
+    assert await store.get_all_keys("tables", "inbox") == {
+        f"row{i}": i for i in range(6, 10)
+    }
+
+
+def test_bad_limits_are_refused(store: MemoryStore) -> None:
+    with pytest.raises(ValueError, match="Unknown eviction policy"):
+        store.configure_limits(max_entries=10, eviction="random")
+    with pytest.raises(ValueError, match="Invalid namespace"):
+        store.configure_limits(namespace_max_entries={"sessions": 10})
+    with pytest.raises(ValueError, match="negative"):
+        store.configure_limits(max_bytes=-1)
+
+
+async def test_expired_entries_leave_the_footprint(store: MemoryStore) -> None:
+    await store.set("states", "inbox_u1", "flow", "x", ttl=5)
+    entry = store._store["states"]["inbox_u1"]["flow"]
+    store._store["states"]["inbox_u1"]["flow"] = (entry[0], 0.0, entry[2])
+
+    assert await store.get("states", "inbox_u1", "flow") is None
+    stats = store.stats()["states"]
+    assert (stats.entries, stats.bytes, stats.expired) == (0, 0, 1)
+
+
+def test_frequency_sketch_counts_and_ages() -> None:
+    sketch = FrequencySketch(width=16)
+    for _ in range(20):
+        sketch.increment(("inbox", "hot"))
+
+    assert sketch.frequency(("inbox", "hot")) == 15
+    for i in range(200):
+        sketch.increment(("inbox", f"cold{i}"))
+    assert sketch.frequency(("inbox", "hot")) < 15
@@ -0,0 +1,152 @@
+"""Striped locks and heap-driven expiry of the in-process MemoryStore."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+
+from wappa.persistence.memory.handlers.utils import memory_store as memory_store_module
+from wappa.persistence.memory.handlers.utils.memory_store import MemoryStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeClock]:
+    fake = FakeClock()
+    monkeypatch.setattr(memory_store_module, "time", fake)
+    yield fake
+
+
+@pytest.fixture
+async def store() -> MemoryStore:
+    store = MemoryStore(stripes=8, expiry_batch=10, expiry_interval=0.01)
+    yield store
+    store.stop_cleanup_task()
+
+
+async def test_ttls_follow_the_monotonic_clock(
+    store: MemoryStore, clock: FakeClock
+) -> None:
+    await store.set("states", "inbox_u1", "flow", {"step": 1}, ttl=60)
+    assert await store.get_ttl("states", "inbox_u1", "flow") == 60
+
+    clock.now += 59.5
+    assert await store.get("states", "inbox_u1", "flow") == {"step": 1}
+
+    clock.now += 1
+    assert await store.get("states", "inbox_u1", "flow") is None
+    assert store._store["states"] == {}
+
+
+async def test_each_tick_expires_a_bounded_batch(
+    store: MemoryStore, clock: FakeClock
+) -> None:
+    entries = [("inbox", f"row{i}", i) for i in range(25)]
+    await store.set_many("tables", entries, ttl=5)
+    await store.set("tables", "inbox", "kept", "yes")
+    clock.now += 10
+
+    assert store._expire_due() == (10, 10)
+    assert len(store._store["tables"]["inbox"]) == 16
+    assert store._expire_due() == (10, 10)
+    assert store._expire_due() == (5, 5)
+    assert list(store._store["tables"]["inbox"]) == ["kept"]
+
+
+async def test_rewritten_entries_keep_their_new_deadline(
+    store: MemoryStore, clock: FakeClock
+) -> None:
+    await store.set("users", "inbox_u1", "profile", "old", ttl=5)
+    await store.set("users", "inbox_u1", "profile", "new")
+    await store.set("users", "inbox_u2", "profile", "old", ttl=5)
+    await store.set_ttl("users", "inbox_u2", "profile", 100)
+    clock.now += 10
+
+    assert store._expire_due() == (2, 0)
+    assert await store.get("users", "inbox_u1", "profile") == "new"
+    assert await store.get_ttl("users", "inbox_u2", "profile") == 90
+
+
+async def test_superseded_deadlines_are_compacted(
+    store: MemoryStore, clock: FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(memory_store_module, "_COMPACT_MIN", 10)
+    for step in range(50):
+        await store.set("ai_states", "inbox_u1", "agent", step, ttl=300)
+        clock.now += 1
+
+    store._expire_due()
+
+    assert len(store._deadlines) == 1
+    clock.now += 300
+    assert store._expire_due() == (1, 1)
+
+
+async def test_background_task_expires_due_entries(
+    store: MemoryStore, clock: FakeClock
+) -> None:
+    await store.set("states", "inbox_u1", "flow", "x", ttl=1)
+    assert store._cleanup_task is not None
+
+    clock.now += 2
+    await asyncio.sleep(0.05)
+
+    assert store._store["states"] == {}
+
+
+async def test_writers_on_other_stripes_do_not_wait(store: MemoryStore) -> None:
+    held = ("inbox_u1", "flow")
+    other = next(
+        ("inbox_u2", f"flow{i}")
+        for i in range(100)
+        if store._stripe("inbox_u2", f"flow{i}") != store._stripe(*held)
+    )
+
+    async with store._lock("states", *held):
+        assert await asyncio.wait_for(store.set("states", *other, 1), 0.1)
+        blocked = asyncio.create_task(store.set("states", *held, 2))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+    assert await blocked
+    assert await store.get("states", *held) == 2
+
+
+async def test_overlapping_batches_do_not_deadlock(store: MemoryStore) -> None:
+    refs = [(f"inbox_u{i}", "flow") for i in range(20)]
+
+    async def write(order: list[tuple[str, str]], value: int) -> None:
+        for _ in range(20):
+            await store.set_many("states", [(c, k, value) for c, k in order])
+            await asyncio.sleep(0)
+
+    await asyncio.wait_for(
+        asyncio.gather(
+            write(refs, 1), write(refs[::-1], 2), store.get_many("states", refs)
+        ),
+        1,
+    )
+
+    assert set(await store.get_many("states", refs)) <= {1, 2}
+
+
+async def test_first_key_per_context_skips_expired_and_other_inboxes(
+    store: MemoryStore, clock: FakeClock
+) -> None:
+    await store.set("states", "inbox_u1", "inbox:h:checkout:u1", 1)
+    await store.set("states", "inbox_u2", "inbox:h:checkout:u2", 1, ttl=5)
+    await store.set("states", "other_u3", "other:h:checkout:u3", 1)
+    clock.now += 10
+
+    keys = await store.first_key_per_context("states", "inbox_", "inbox:h:checkout:")
+
+    assert keys == ["inbox:h:checkout:u1"]
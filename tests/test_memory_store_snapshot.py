@@ -0,0 +1,152 @@
+"""Snapshots and warm restarts of the memory cache store."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from wappa.core.plugins.wappa_core_plugin import WappaCorePlugin
+from wappa.core.types import CacheType
+from wappa.persistence.memory.handlers.utils import memory_store as memory_store_module
+from wappa.persistence.memory.handlers.utils.memory_store import MemoryStore
+
+
+class FakeTime:
+    """Wall and monotonic clocks that advance together, like across a restart."""
+
+    def __init__(self) -> None:
+        self.wall = 1_800_000_000.0
+        self.mono = 500.0
+
+    def time(self) -> float:
+        return self.wall
+
+    def monotonic(self) -> float:
+        return self.mono
+
+    def perf_counter(self) -> float:
+        return time.perf_counter()
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeTime:
+    fake = FakeTime()
+    monkeypatch.setattr(memory_store_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    return tmp_path / "cache" / "memory.snapshot"
+
+
+async def test_restart_restores_entries_with_the_ttl_they_had_left(
+    path: Path, clock: FakeTime
+) -> None:
+    store = MemoryStore()
+    await store.set("users", "inbox_u1", "profile", {"name": "Ana"})
+    await store.set("states", "inbox_u1", "flow", {"step": 2}, ttl=600)
+    await store.set("ai_states", "inbox_u1", "agent", "short", ttl=30)
+    await store.set_many("tables", [("inbox", f"row{i}", i) for i in range(50)])
+
+    assert await store.save_snapshot(path, chunk_size=7) == 53
+    assert path.stat().st_mode & 0o777 == 0o600
+    store.stop_cleanup_task()
+
+    # The process restarts 100s later: a fresh monotonic clock
+    clock.wall += 100
+    clock.mono = 5.0
+    restarted = MemoryStore()
+    assert await restarted.load_snapshot(path) == 52
+    restarted.stop_cleanup_task()
+
+    assert await restarted.get("users", "inbox_u1", "profile") == {"name": "Ana"}
+    assert await restarted.get_ttl("users", "inbox_u1", "profile") == -1
+    assert await restarted.get_ttl("states", "inbox_u1", "flow") == 500
+    assert await restarted.get("ai_states", "inbox_u1", "agent") is None
+    assert len(await restarted.get_all_keys("tables", "inbox")) == 50
+
+
+async def test_keys_written_since_startup_win_over_the_snapshot(path: Path) -> None:
+    store = MemoryStore()
+    await store.set("states", "inbox_u1", "flow", "saved")
+    await store.set("states", "inbox_u2", "flow", "saved")
+    await store.save_snapshot(path)
+
+    restarted = MemoryStore()
+    await restarted.set("states", "inbox_u1", "flow", "fresh")
+    assert await restarted.load_snapshot(path) == 1
+
+    assert await restarted.get("states", "inbox_u1", "flow") == "fresh"
+    assert await restarted.get("states", "inbox_u2", "flow") == "saved"
+
+
+async def test_a_truncated_snapshot_restores_its_complete_frames(path: Path) -> None:
+    store = MemoryStore()
+    await store.set_many("tables", [(f"inbox{i}", "row", i) for i in range(10)])
+    await store.save_snapshot(path, chunk_size=1)
+    path.write_bytes(path.read_bytes()[:-5])
+
+    assert await MemoryStore().load_snapshot(path) == 9
+
+
+async def test_missing_and_foreign_files(path: Path) -> None:
+    assert await MemoryStore().load_snapshot(path) == 0
+
+    path.parent.mkdir(parents=True)
+    path.write_text('{"not": "a snapshot"}')
+    with pytest.raises(ValueError, match="not a Wappa memory cache snapshot"):
+        await MemoryStore().load_snapshot(path)
+
+
+async def test_a_failed_snapshot_keeps_the_previous_file(path: Path) -> None:
+    store = MemoryStore()
+    await store.set("users", "inbox_u1", "profile", "ok")
+    await store.save_snapshot(path)
+    before = path.read_bytes()
+
+    await store.set("users", "inbox_u2", "profile", lambda: None)
+    with pytest.raises(Exception, match="pickle"):
+        await store.save_snapshot(path)
+
+    assert path.read_bytes() == before
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+
+async def test_stop_snapshots_writes_a_final_snapshot(path: Path) -> None:
+    store = MemoryStore()
+    store.start_snapshots(path, interval=0)
+    await store.set("users", "inbox_u1", "profile", "ok")
+
+    await store.stop_snapshots()
+
+    assert await MemoryStore().load_snapshot(path) == 1
+
+
+async def test_core_plugin_warms_the_cache_and_saves_on_shutdown(
+    path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    saved = MemoryStore()
+    await saved.set("users", "inbox_u1", "profile", "warm")
+    await saved.save_snapshot(path)
+    store = MemoryStore()
+    monkeypatch.setattr(memory_store_module, "_global_memory_store", store)
+    settings = memory_store_module.settings
+    monkeypatch.setattr(settings, "memory_cache_snapshot_path", str(path))
+    monkeypatch.setattr(settings, "memory_cache_snapshot_interval", 0)
+    plugin = WappaCorePlugin(cache_type=CacheType.MEMORY)
+
+    await plugin._warm_memory_cache(MagicMock())
+    assert await store.get("users", "inbox_u1", "profile") == "warm"
+    await store.set("users", "inbox_u2", "profile", "new")
+
+    app = AsyncMock()
+    app.state = type("State", (), {"wappa_cache_type": "memory"})()
+    with patch.object(store, "save_snapshot", wraps=store.save_snapshot) as save:
+        await plugin._core_shutdown(app)
+
+    save.assert_awaited_once_with(path)
+    assert await MemoryStore().load_snapshot(path) == 2
@@ -0,0 +1,175 @@
+"""Tests for the app-scoped MessengerRegistry."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from wappa.core.inbound import InboundRuntimeDependencies
+from wappa.core.messaging import MessengerPipeline, MessengerRegistry
+from wappa.domain.interfaces.inbox_credential_store import (
+    IInboxCredentialStore,
+    InboxCredentials,
+    InboxNotFoundError,
+)
+from wappa.messaging.template_transport import OutboundRuntime
+
+INBOX_ID = "123456789012345"
+
+
+class _CountingCredentialStore(IInboxCredentialStore):
+    def __init__(self) -> None:
+        self.credential_lookups = 0
+        self.validations = 0
+        self.token = "token-1"
+
+    async def get_credentials(self, inbox_id: str) -> InboxCredentials:
+        self.credential_lookups += 1
+        await asyncio.sleep(0)
+        if inbox_id != INBOX_ID:
+            raise InboxNotFoundError(inbox_id)
+        return InboxCredentials(inbox_id=inbox_id, access_token=self.token)
+
+    async def validate_inbox(self, inbox_id: str) -> bool:
+        self.validations += 1
+        return inbox_id == INBOX_ID
+
+
+class _Sessions:
+    def __init__(self) -> None:
+        self.session = httpx.AsyncClient()
+        self.media = httpx.AsyncClient()
+
+    def get_session(self) -> httpx.AsyncClient:
+        return self.session
+
+    def get_media_download_client(self) -> httpx.AsyncClient:
+        return self.media
+
+
+def _registry(
+    store: IInboxCredentialStore, sessions: _Sessions, middleware: list | None = None
+) -> MessengerRegistry:
+    return MessengerRegistry(
+        session_provider=sessions.get_session,
+        media_download_client_provider=sessions.get_media_download_client,
+        credential_store=store,
+        messenger_middleware=middleware if middleware is not None else [],
+    )
+
+
+def _token(pipeline: MessengerPipeline) -> str:
+    return pipeline.raw_messenger.client.access_token
+
+
+class TestMessengerRegistry:
+    @pytest.mark.asyncio
+    async def test_warm_cache_does_no_credential_lookups(self):
+        store = _CountingCredentialStore()
+        registry = _registry(store, _Sessions())
+
+        first = await registry.get(INBOX_ID)
+        for _ in range(10):
+            assert await registry.get(INBOX_ID) is first
+
+        assert store.credential_lookups == 1
+        assert store.validations == 0
+        assert registry.get_stats()["hits"] == 10
+
+    @pytest.mark.asyncio
+    async def test_store_invalidation_rebuilds_with_new_credentials(self):
+        store = _CountingCredentialStore()
+        registry = MessengerRegistry.from_app_state(
+            SimpleNamespace(session_lifecycle=_Sessions(), inbox_credential_store=store)
+        )
+        first = await registry.get(INBOX_ID)
+
+        store.token = "token-2"
+        await store.invalidate_cache(INBOX_ID)
+        second = await registry.get(INBOX_ID)
+
+        assert second is not first
+        assert _token(second) == "token-2"
+        assert store.credential_lookups == 2
+
+    @pytest.mark.asyncio
+    async def test_replaced_session_or_new_middleware_rebuilds(self):
+        store = _CountingCredentialStore()
+        sessions = _Sessions()
+        middleware: list = []
+        registry = _registry(store, sessions, middleware)
+        first = await registry.get(INBOX_ID)
+
+        sessions.session = httpx.AsyncClient()
+        second = await registry.get(INBOX_ID)
+        middleware.append((SimpleNamespace(), 50))
+        third = await registry.get(INBOX_ID)
+
+        assert len({id(first), id(second), id(third)}) == 3
+        assert third.middleware_chain == (middleware[0][0],)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_build_once(self):
+        store = _CountingCredentialStore()
+        registry = _registry(store, _Sessions())
+
+        pipelines = await asyncio.gather(*(registry.get(INBOX_ID) for _ in range(20)))
+
+        assert len({id(pipeline) for pipeline in pipelines}) == 1
+        assert store.credential_lookups == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_inbox_is_not_cached(self):
+        store = _CountingCredentialStore()
+        registry = _registry(store, _Sessions())
+
+        for _ in range(2):
+            with pytest.raises(InboxNotFoundError):
+                await registry.get("999")
+
+        assert store.credential_lookups == 2
+        assert registry.get_stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_app_paths_share_one_registry(self):
+        store = _CountingCredentialStore()
+        sessions = _Sessions()
+        state = SimpleNamespace(
+            session_lifecycle=sessions,
+            inbox_credential_store=store,
+            messenger_middleware=[],
+        )
+        app = SimpleNamespace(state=state)
+
+        registry = MessengerRegistry.from_app_state(state)
+        outbound = OutboundRuntime.from_app(app)
+
+        assert MessengerRegistry.from_app_state(state) is registry
+        assert await outbound._messenger(INBOX_ID) is await registry.get(INBOX_ID)
+        assert store.credential_lookups == 1
+
+    @pytest.mark.asyncio
+    async def test_only_the_app_registry_listens_for_invalidations(self):
+        store = _CountingCredentialStore()
+        sessions = _Sessions()
+        state = SimpleNamespace(
+            session_lifecycle=sessions, inbox_credential_store=store
+        )
+
+        for _ in range(3):
+            _registry(store, sessions)
+            InboundRuntimeDependencies(
+                session_provider=sessions.get_session,
+                inbox_credential_store=store,
+                messenger_middleware=[],
+                cache_type="memory",
+                background_work_tracker=None,
+                media_download_client_provider=sessions.get_media_download_client,
+            )
+        MessengerRegistry.from_app_state(state)
+        MessengerRegistry.from_app_state(state)
+
+        assert len(store.__dict__["_invalidation_listeners"]) == 1
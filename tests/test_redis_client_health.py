@@ -0,0 +1,72 @@
+"""RedisClient keeps health checks off the hot path.
+
+Runs without a Redis server: pools point at a closed local port, so every
+PING fails fast with a connection error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from wappa.persistence.redis.redis_client import RedisClient
+
+UNREACHABLE_URL = "redis://127.0.0.1:1"
+
+
+@pytest.fixture
+async def pools() -> AsyncIterator[None]:
+    await RedisClient.close()
+    RedisClient.setup_single_url(UNREACHABLE_URL, health_check_interval=15)
+    try:
+        yield
+    finally:
+        await RedisClient.close()
+
+
+async def test_get_is_a_lookup_without_a_round_trip(pools: None) -> None:
+    # Against an unreachable server the old per-call PING raised here.
+    client = await RedisClient.get("users")
+
+    assert client is await RedisClient.get("users")
+    assert client.connection_pool.connection_kwargs["health_check_interval"] == 15
+
+
+async def test_consecutive_failures_mark_unhealthy_then_rebuild(pools: None) -> None:
+    before = await RedisClient.get("table")
+
+    assert await RedisClient.check_pool("table", failure_threshold=2) is False
+    health = RedisClient.get_pool_health()["table"]
+    assert health["healthy"] is False
+    assert health["consecutive_failures"] == 1
+    assert health["rebuilds"] == 0
+    assert health["last_error"]
+    assert not RedisClient.is_healthy("table")
+
+    await RedisClient.check_pool("table", failure_threshold=2)
+    health = RedisClient.get_pool_health()["table"]
+    assert health["rebuilds"] == 1
+    assert health["consecutive_failures"] == 0
+    assert await RedisClient.get("table") is not before
+    assert RedisClient.get_pool_health()["users"]["rebuilds"] == 0
+
+
+async def test_watchdog_runs_in_background_and_stops_on_close(pools: None) -> None:
+    RedisClient.start_watchdog(interval=0.01, failure_threshold=1)
+    RedisClient.start_watchdog(interval=0.01, failure_threshold=1)
+
+    for _ in range(100):
+        if RedisClient.get_pool_health()["expiry"]["rebuilds"]:
+            break
+        await asyncio.sleep(0.01)
+
+    health = RedisClient.get_pool_health()
+    assert health["expiry"]["rebuilds"] >= 1
+    assert all(pool["watchdog"] for pool in health.values())
+
+    await RedisClient.close()
+    assert RedisClient.get_pool_health() == {}
+    with pytest.raises(RuntimeError):
+        await RedisClient.get("users")
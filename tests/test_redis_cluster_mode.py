@@ -0,0 +1,149 @@
+"""Shared-pool and cluster modes keep every key of an inbox in one hash slot.
+
+The live tests need a server: shared-pool mode uses ``WAPPA_TEST_REDIS_URL``
+(default ``redis://localhost:6379``), cluster mode
+``WAPPA_TEST_REDIS_CLUSTER_URL`` (no default). Each is skipped when nothing
+answers.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncIterator
+
+import pytest
+from redis.crc import key_slot
+
+from wappa.core.expiry.context_helpers import parse_inbox_from_expired_key
+from wappa.persistence.redis.lua_scripts import script_registry
+from wappa.persistence.redis.redis_client import SHARED_POOL, RedisClient
+from wappa.persistence.redis.redis_handler import (
+    RedisStateHandler,
+    RedisTable,
+    RedisUser,
+)
+from wappa.persistence.redis.redis_handler.utils.key_factory import (
+    KeyFactory,
+    default_key_factory,
+)
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+CLUSTER_URL = os.getenv("WAPPA_TEST_REDIS_CLUSTER_URL")
+
+TAGGED = KeyFactory(hash_tags=True)
+
+
+def test_tagged_keys_hash_only_the_inbox() -> None:
+    inbox = "inbox-1"
+    keys = [
+        TAGGED.user(inbox, "u1"),
+        TAGGED.handler(inbox, "flow", "u1"),
+        TAGGED.table(inbox, "orders", "o-1"),
+        TAGGED.table_members(inbox, "orders"),
+        TAGGED.trigger(inbox, "remind", "u1"),
+        TAGGED.aistate(inbox, "agent", "u1"),
+        TAGGED.identity_index(inbox),
+        TAGGED.field_index(inbox, "orders", "status"),
+    ]
+
+    assert TAGGED.user(inbox, "u1") == "{inbox-1}:user:u1"
+    assert {key_slot(key.encode()) for key in keys} == {key_slot(b"inbox-1")}
+    # Patterns match the tagged keys; channels are not keys and stay untagged.
+    assert TAGGED.table_pattern("a[1]", "rows") == r"{a\[1\]}:df:rows:pkid:*"
+    assert TAGGED.channel(inbox, "u1", "status_change") == (
+        default_key_factory.channel(inbox, "u1", "status_change")
+    )
+    assert default_key_factory.user(inbox, "u1") == "inbox-1:user:u1"
+
+
+def test_tagged_trigger_keys_parse_back_to_the_bare_inbox() -> None:
+    key = TAGGED.trigger("acme", "remind", "TXN_1")
+
+    assert TAGGED.parse_trigger(key) == ("acme", "remind", "TXN_1")
+    assert parse_inbox_from_expired_key(key) == "acme"
+    assert parse_inbox_from_expired_key("acme:EXPTRIGGER:remind:TXN_1") == "acme"
+
+
+async def test_shared_pool_routes_every_alias_to_one_client() -> None:
+    await RedisClient.close()
+    try:
+        RedisClient.setup_shared_url(REDIS_URL)
+        clients = {id(await RedisClient.get(alias)) for alias in RedisClient.aliases()}
+
+        assert len(clients) == 1
+        assert RedisClient.uses_hash_tags()
+        assert RedisClient.pool_name("table") == SHARED_POOL
+        assert list(RedisClient.get_pool_health()) == [SHARED_POOL]
+        # Closing one alias keeps the pool the others still use.
+        await RedisClient.close("users")
+        assert await RedisClient.get("table") is not None
+    finally:
+        await RedisClient.close()
+
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        assert not RedisClient.uses_hash_tags()
+    finally:
+        await RedisClient.close()
+
+
+async def _keyspace(inbox: str) -> AsyncIterator[str]:
+    async with RedisClient.connection(alias="users") as redis:
+        async for key in redis.scan_iter(f"{{{KeyFactory.glob_escape(inbox)}}}:*"):
+            yield key
+
+
+@pytest.fixture(params=["shared", "cluster"])
+async def inbox(request: pytest.FixtureRequest) -> AsyncIterator[str]:
+    """An inbox of its own on a shared pool or a cluster; skip when none answers."""
+    await RedisClient.close()
+    if request.param == "cluster":
+        if not CLUSTER_URL:
+            pytest.skip("WAPPA_TEST_REDIS_CLUSTER_URL is not set")
+        RedisClient.setup_cluster(CLUSTER_URL)
+        url = CLUSTER_URL
+    else:
+        RedisClient.setup_shared_url(REDIS_URL)
+        url = REDIS_URL
+    try:
+        async with RedisClient.connection(alias="users") as redis:
+            await redis.ping()
+    except Exception:
+        await RedisClient.close()
+        pytest.skip(f"No Redis reachable at {url}")
+
+    name = f"tagged-{request.node.name}"
+    try:
+        yield name
+    finally:
+        keys = [key async for key in _keyspace(name)]
+        if keys:
+            async with RedisClient.connection(alias="users") as redis:
+                for key in keys:
+                    await redis.delete(key)
+        await RedisClient.close()
+
+
+async def test_every_space_of_an_inbox_lands_in_one_slot(inbox: str) -> None:
+    assert await script_registry.load_all() == len(script_registry)
+
+    table = RedisTable(inbox=inbox)
+    user = RedisUser(inbox=inbox, user_id="u1")
+    state = RedisStateHandler(inbox=inbox, user_id="u1")
+
+    await table.upsert_many("orders", {"o-1": {"n": 1}, "o-2": {"n": 2}})
+    assert (await table.create_if_absent("orders", "o-3", {"n": 3})).written
+    await user.upsert({"name": "Ana", "phone_number": "+15550001"})
+    await state.upsert("checkout", {"step": 1})
+    await state.merge("checkout", {"step": 2})
+
+    keys = [key async for key in _keyspace(inbox)]
+    assert keys and all(key.startswith(f"{{{inbox}}}:") for key in keys)
+    assert {key_slot(key.encode()) for key in keys} == {key_slot(inbox.encode())}
+
+    assert await table.list_pkids("orders") == ["o-1", "o-2", "o-3"]
+    assert (await table.find_by_field("orders", "n", 2))["n"] == 2
+    assert await state.list_handlers() == ["checkout"]
+    assert await RedisStateHandler.list_users_with_handler(inbox, "checkout") == ["u1"]
+    assert await state.delete_all_for_user() == 1
+    assert await table.delete_all_by_pkid("o-1") == 1
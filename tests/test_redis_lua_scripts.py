@@ -0,0 +1,112 @@
+"""Lua scripts run by EVALSHA and survive a flushed script cache.
+
+The Redis tests need a live server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``) and are skipped when none is reachable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import AsyncIterator
+
+import pytest
+from redis.exceptions import ResponseError
+
+from wappa.persistence.redis import ops
+from wappa.persistence.redis.lua_scripts import (
+    RedisScript,
+    ScriptRegistry,
+    script_registry,
+)
+from wappa.persistence.redis.redis_client import RedisClient
+from wappa.persistence.redis.redis_handler import RedisTable
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+ECHO = RedisScript.from_source("return {KEYS[1], ARGV[1]}", "test.echo")
+
+
+@pytest.fixture
+async def redis_pools(request: pytest.FixtureRequest) -> AsyncIterator[str]:
+    """Fresh pools with an empty script cache; yields an inbox for the test."""
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="table") as redis:
+            await redis.script_flush()
+    except Exception:
+        await RedisClient.close()
+        pytest.skip(f"No Redis reachable at {REDIS_URL}")
+
+    inbox = f"lua-{request.node.name}"
+    try:
+        yield inbox
+    finally:
+        async with RedisClient.connection(alias="table") as redis:
+            keys = [key async for key in redis.scan_iter(f"{inbox}:*")]
+            if keys:
+                await redis.delete(*keys)
+        await RedisClient.close()
+
+
+async def _cached(*scripts: RedisScript) -> list[bool]:
+    async with RedisClient.connection(alias="table") as redis:
+        return list(await redis.script_exists(*(s.sha for s in scripts)))
+
+
+def test_registry_names_scripts_by_their_digest() -> None:
+    registry = ScriptRegistry()
+    script = registry.register("app.one", "return 1")
+
+    assert script.sha == hashlib.sha1(b"return 1").hexdigest()
+    assert registry.register("app.one", "return 1") is script
+    assert registry.get("app.one") is script and "app.one" in registry
+    with pytest.raises(ValueError):
+        registry.register("app.one", "return 2")
+    with pytest.raises(ValueError):
+        registry.register("", "return 1")
+
+    # Framework scripts register themselves on import.
+    assert "wappa.table.replace_if" in script_registry
+
+
+async def test_eval_script_reloads_after_noscript(redis_pools: str) -> None:
+    assert await _cached(ECHO) == [False]
+
+    assert await ops.eval_script(ECHO, ["k"], ["v"], alias="table") == ["k", "v"]
+    assert await _cached(ECHO) == [True]
+
+    # Raw source still works, by digest too.
+    assert await ops.eval_script("return 7", [], [], alias="table") == 7
+
+
+async def test_pipelined_calls_reload_only_what_is_missing(redis_pools: str) -> None:
+    other = RedisScript.from_source("return ARGV[1] + 1", "test.incr")
+    await ops.eval_script(other, [], [1], alias="table")
+
+    replies = await ops.eval_scripts(
+        [(ECHO, ["a"], [1]), (other, [], [2]), (ECHO, ["b"], [3])], alias="table"
+    )
+    assert replies == [["a", "1"], 3, ["b", "3"]]
+    assert await ops.eval_script_many(ECHO, [(["c"], ["x"])], alias="table") == [
+        ["c", "x"]
+    ]
+
+    failing = RedisScript.from_source("return redis.error_reply('nope')", "test.fail")
+    with pytest.raises(ResponseError):
+        await ops.eval_scripts([(ECHO, ["a"], [1]), (failing, [], [])], alias="table")
+
+
+async def test_load_all_preloads_framework_scripts(redis_pools: str) -> None:
+    loaded = await script_registry.load_all(["table"])
+
+    assert loaded == len(script_registry)
+    assert all(await _cached(*script_registry))
+
+    # Conditional writes keep working after the server forgets every script.
+    table = RedisTable(inbox=redis_pools)
+    assert (await table.create_if_absent("orders", "o-1", {"n": 1})).written
+    async with RedisClient.connection(alias="table") as redis:
+        await redis.script_flush()
+    assert not (await table.create_if_absent("orders", "o-1", {"n": 2})).written
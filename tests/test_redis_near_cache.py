@@ -0,0 +1,214 @@
+"""The Redis near-cache: bounds, coherence rules and read-your-writes.
+
+Most tests give a ``NearCache`` a stand-in for its tracked connections, so the
+bookkeeping runs without a server. The Redis tests need a live server
+(``WAPPA_TEST_REDIS_URL``, default ``redis://localhost:6379``) and are skipped
+when none is reachable; the tracking test is also skipped when the server has
+no ``CLIENT TRACKING``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any
+
+import pytest
+
+from wappa.persistence.redis import NearCache, near_caches
+from wappa.persistence.redis.redis_client import RedisClient
+from wappa.persistence.redis.redis_handler import RedisTable
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+
+class FakeConnections:
+    """Serves HGETALL from a dict, standing in for the tracked readers."""
+
+    def __init__(self, data: dict[str, dict[str, str]] | None = None) -> None:
+        self.data = data or {}
+        self.reads: list[str] = []
+        self.before_reply: Callable[[], None] | None = None
+
+    async def call_many(self, commands: Sequence[Sequence[Any]]) -> list[Any]:
+        keys = [command[1] for command in commands]
+        self.reads.extend(keys)
+        if self.before_reply is not None:
+            self.before_reply()
+        return [
+            [item for pair in self.data.get(key, {}).items() for item in pair]
+            for key in keys
+        ]
+
+    async def close(self) -> None:
+        pass
+
+
+def _near(
+    data: dict[str, dict[str, str]], **options: Any
+) -> tuple[NearCache, FakeConnections]:
+    cache = NearCache("users", **options)
+    connections = FakeConnections(data)
+    cache._connections = connections  # type: ignore[assignment]
+    return cache, connections
+
+
+async def test_hits_are_served_locally_and_absent_keys_cached() -> None:
+    cache, connections = _near({"a": {"n": "1"}})
+
+    assert await cache.get_hash("a") == {"n": "1"}
+    assert await cache.get_hashes(["a", "missing"]) == [{"n": "1"}, {}]
+    assert await cache.get_hash("missing") == {}
+
+    assert connections.reads == ["a", "missing"]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 2, 2)
+
+
+async def test_entries_and_bytes_are_bounded_least_recently_used_first() -> None:
+    data = {key: {"f": "x" * 10} for key in "abcd"}
+    cache, _ = _near(data, max_entries=2)
+
+    for key in "abc":
+        await cache.get_hash(key)
+    assert cache.stats().entries == 2 and cache.stats().evictions == 1
+    await cache.get_hash("b")  # a was evicted; b is now the most recent
+    await cache.get_hash("d")
+    assert list(cache._entries) == ["b", "d"]
+
+    small, _ = _near(data, max_bytes=2 * (64 + 1 + 11))
+    for key in "abc":
+        await small.get_hash(key)
+    assert small.stats().entries == 2
+    assert small.stats().bytes <= small.max_bytes
+
+
+async def test_entries_expire_after_the_ttl_cap(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [10.0]
+    monkeypatch.setattr(
+        "wappa.persistence.redis.near_cache.time.monotonic", lambda: now[0]
+    )
+    cache, connections = _near({"a": {"n": "1"}}, max_ttl=5)
+
+    await cache.get_hash("a")
+    now[0] += 4
+    await cache.get_hash("a")
+    now[0] += 2
+    await cache.get_hash("a")
+
+    assert connections.reads == ["a", "a"]
+
+
+async def test_a_read_overtaken_by_an_invalidation_is_not_cached() -> None:
+    cache, connections = _near({"a": {"n": "1"}})
+    connections.before_reply = lambda: cache.discard(["a"])
+
+    assert await cache.get_hash("a") == {"n": "1"}
+    assert cache.stats().entries == 0
+
+    connections.before_reply = None
+    await cache.get_hash("a")
+    cache.discard(["a"])
+    assert cache.stats().invalidations == 1 and cache.stats().entries == 0
+
+
+def test_limits_are_validated() -> None:
+    with pytest.raises(ValueError):
+        NearCache("users", max_entries=0)
+    with pytest.raises(ValueError):
+        NearCache("users", max_ttl=0)
+    assert near_caches.get("users") is None
+
+
+# ---------------------------------------------------------------------------
+# Redis
+# ---------------------------------------------------------------------------
+
+
+class PoolConnections(FakeConnections):
+    """Reads through the pool: no tracking, so only local writes invalidate."""
+
+    async def call_many(self, commands: Sequence[Sequence[Any]]) -> list[Any]:
+        replies = []
+        async with RedisClient.connection(alias="table") as redis:
+            for _, key in commands:
+                self.reads.append(key)
+                raw = await redis.hgetall(key)
+                replies.append([item for pair in raw.items() for item in pair])
+        return replies
+
+
+@pytest.fixture
+async def inbox(request: pytest.FixtureRequest) -> AsyncIterator[str]:
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="table") as redis:
+            await redis.ping()
+    except Exception:
+        await RedisClient.close()
+        pytest.skip(f"No Redis reachable at {REDIS_URL}")
+
+    name = f"near-{request.node.name}"
+    try:
+        yield name
+    finally:
+        await near_caches.stop()
+        async with RedisClient.connection(alias="table") as redis:
+            keys = [key async for key in redis.scan_iter(f"{name}:*")]
+            if keys:
+                await redis.delete(*keys)
+        await RedisClient.close()
+
+
+async def test_a_process_reads_its_own_writes(inbox: str) -> None:
+    cache = near_caches.enable("table")
+    connections = PoolConnections()
+    cache._connections = connections  # type: ignore[assignment]
+    table = RedisTable(inbox=inbox)
+
+    await table.upsert("orders", "o-1", {"n": 1})
+    assert await table.get("orders", "o-1") == {"n": 1}
+    assert await table.get("orders", "o-1") == {"n": 1}
+    assert len(connections.reads) == 1
+
+    # Plain writes and the atomic script paths both drop the entry
+    await table.update_field("orders", "o-1", "n", 2)
+    assert await table.get("orders", "o-1") == {"n": 2}
+    await table.append_to_list("orders", "o-1", "log", "paid")
+    assert await table.get("orders", "o-1") == {"n": 2, "log": ["paid"]}
+    await table.increment_field("orders", "o-1", "n")
+    assert (await table.get_many("orders", ["o-1"]))["o-1"] == {
+        "n": 3,
+        "log": ["paid"],
+    }
+    await table.delete("orders", "o-1")
+    assert await table.get("orders", "o-1") is None
+
+    stats = near_caches.stats()["table"]
+    assert stats.hits == 1 and stats.invalidations == 4
+
+
+async def test_tracking_reports_writes_from_other_clients(inbox: str) -> None:
+    cache = near_caches.enable("table")
+    try:
+        await cache.start()
+    except Exception as e:
+        pytest.skip(f"Client-side tracking unavailable: {e}")
+
+    table = RedisTable(inbox=inbox)
+    await table.upsert("orders", "o-1", {"n": 1})
+    assert await table.get("orders", "o-1") == {"n": 1}
+
+    # A write that bypasses this process's ops layer
+    key = table._key("orders", "o-1")
+    async with RedisClient.connection(alias="table") as redis:
+        await redis.hset(key, "n", "2")
+
+    deadline = asyncio.get_running_loop().time() + 2
+    while cache.stats().entries and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+    assert await table.get("orders", "o-1") == {"n": 2}
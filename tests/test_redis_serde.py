@@ -0,0 +1,200 @@
+"""Serde codecs and schema-directed reads of Redis hash values.
+
+The default codec writes exactly what Wappa always wrote (pinned in
+``test_redis_value_encoding.py``); these tests cover switching codecs, reading
+values written by another one, and model reads that validate the stored data
+instead of guessing types from strings.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from pydantic import BaseModel, field_validator
+
+from wappa.persistence.redis.redis_handler.utils import serde
+from wappa.persistence.redis.redis_handler.utils.serde import (
+    SerdeCodec,
+    dumps,
+    dumps_hash,
+    dumps_list_item,
+    get_codec,
+    loads,
+    loads_hash,
+    register_codec,
+    use_codec,
+)
+
+
+class ReversedJsonCodec(SerdeCodec):
+    """A marked codec of the test's own: JSON text, reversed."""
+
+    name = "reversed"
+    marker = "\x1f"
+
+    def encode(self, value: Any) -> str:
+        return self.marker + json.dumps(value)[::-1]
+
+    def decode(self, text: str) -> Any:
+        return json.loads(text[::-1])
+
+
+@pytest.fixture(autouse=True)
+def codecs(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(serde, "_codecs", dict(serde._codecs))
+    monkeypatch.setattr(serde, "_marked", dict(serde._marked))
+    yield
+    use_codec("json")
+
+
+class Message(BaseModel):
+    text: str
+    sent_at: datetime
+    read: bool
+
+
+class Conversation(BaseModel):
+    title: str
+    messages: list[Message]
+
+
+class Row(BaseModel):
+    sku: str
+    note: str | None = None
+    qty: int
+    paid: bool
+    meta: dict[str, int] = {}
+
+
+# ── codecs ──────────────────────────────────────────────────────────────────
+
+
+def test_json_is_the_default_and_unknown_codecs_are_refused() -> None:
+    assert get_codec().name == "json"
+    assert dumps({"a": [1, True]}) == '{"a": [1, true]}'
+
+    with pytest.raises(ValueError, match="not available"):
+        use_codec("nope")
+    with pytest.raises(ValueError, match="control character"):
+        register_codec(type("Bad", (ReversedJsonCodec,), {"marker": "{"})())
+
+
+def test_a_marked_codec_reads_alongside_values_written_before_it() -> None:
+    before = dumps({"step": 1})
+    register_codec(ReversedJsonCodec())
+    use_codec("reversed")
+
+    after = dumps({"step": 2})
+    assert after.startswith("\x1f")
+    assert loads(before) == {"step": 1} and loads(after) == {"step": 2}
+
+    # Lists stay JSON text, for the append script and external readers
+    assert dumps([1, 2]) == "[1, 2]"
+    assert dumps_list_item({"k": "v"}) == '{"k": "v"}'
+
+    # Scalars keep their plain spelling whatever the codec (ADR-0008)
+    assert dumps_hash({"on": True, "n": 3, "name": "Ada"}) == {
+        "on": "1",
+        "n": "3",
+        "name": "Ada",
+    }
+
+    with pytest.raises(ValueError, match="taken"):
+        register_codec(type("Other", (ReversedJsonCodec,), {"name": "other"})())
+
+
+def test_plain_text_that_looks_marked_or_like_json_reads_as_text() -> None:
+    register_codec(ReversedJsonCodec())
+    for text in ("\x1fnot reversed json", "Nancy", "true love", "[draft"):
+        assert loads(text) == text
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgpack"])
+def test_optional_codecs_round_trip_models_and_read_json(name: str) -> None:
+    pytest.importorskip(name)
+    stored_json = dumps({"a": 1})
+    use_codec(name)
+
+    conversation = Conversation(
+        title="Support",
+        messages=[Message(text="hi", sent_at=datetime.now(UTC), read=True)],
+    )
+    assert loads(dumps(conversation), Conversation) == conversation
+    assert loads(dumps({"big": 2**70, "n": [1.5, None]})) == {
+        "big": 2**70,
+        "n": [1.5, None],
+    }
+    assert loads(stored_json) == {"a": 1}
+
+
+def test_msgpack_is_stored_as_utf8_text_and_is_not_always_smaller() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    readings = {"sensor": "s-1", "samples": [1000.5 + i for i in range(50)]}
+    stored = {}
+    for name in ("json", "orjson", "msgpack"):
+        if name in serde._codecs:
+            use_codec(name)
+            stored[name] = len(dumps(readings).encode())
+
+    # Every packed byte at 0x80 or above takes two bytes once Redis holds it
+    packed = msgpack.packb(readings, use_bin_type=True)
+    high = sum(byte >= 0x80 for byte in packed)
+    assert stored["msgpack"] == 1 + len(packed) + high
+
+    # Float samples pack to nine bytes each, most of them high
+    assert stored["msgpack"] > stored["json"]
+    assert stored["msgpack"] > stored.get("orjson", 0)
+
+
+# ── schema-directed reads ───────────────────────────────────────────────────
+
+
+def test_a_model_read_validates_the_stored_json_directly() -> None:
+    conversation = Conversation(
+        title="2024-05-01T10:00:00 recap",
+        messages=[
+            Message(text="42", sent_at=datetime(2024, 5, 1, 10, 0), read=False),
+        ],
+    )
+
+    restored = loads(dumps(conversation), Conversation)
+
+    # A str that looks like a datetime or a number is no longer guessed at
+    assert restored == conversation
+    assert serde._model_plan(Conversation).direct
+
+
+def test_models_with_untyped_or_custom_parts_keep_converted_reads() -> None:
+    class Loose(BaseModel):
+        extra: dict[str, Any]
+
+    class Checked(BaseModel):
+        when: datetime
+
+        @field_validator("when", mode="before")
+        @classmethod
+        def needs_a_datetime(cls, value: Any) -> Any:
+            assert isinstance(value, datetime)
+            return value
+
+    when = datetime(2024, 5, 1, 10, 0)
+    loose = loads(dumps(Loose(extra={"on": True, "at": when})), Loose)
+    assert loose.extra == {"on": True, "at": when}
+    assert loads(dumps(Checked(when=when)), Checked).when == when
+    assert not serde._model_plan(Loose).direct
+    assert not serde._model_plan(Checked).direct
+
+
+def test_hash_reads_take_str_fields_as_stored() -> None:
+    row = Row(sku="4711", note="2024-05-01T10:00:00", qty=2, paid=True)
+    stored = dumps_hash(row)
+
+    assert loads_hash(stored, models=Row) == row
+    assert loads_hash({**stored, "note": "null"}, models=Row).note is None
+    assert serde._model_plan(Row).text_fields == {"sku", "note"}
+    # Untyped reads are unchanged: the digits decode as a number
+    assert loads_hash(stored)["sku"] == 4711
@@ -0,0 +1,142 @@
+"""Redis tables list their rows from a per-table membership set, not a SCAN.
+
+Needs a live server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``); skipped when none is reachable.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncIterator
+
+import pytest
+
+from wappa.persistence.redis.lua_scripts import RedisScript
+from wappa.persistence.redis.redis_client import PoolAlias, RedisClient
+from wappa.persistence.redis.redis_handler.table import RedisTable
+from wappa.persistence.redis.redis_handler.utils import inbox_cache
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+
+@pytest.fixture
+async def table(request: pytest.FixtureRequest) -> AsyncIterator[RedisTable]:
+    """A RedisTable on an inbox of its own; skip when no server answers."""
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="table") as redis:
+            await redis.ping()
+    except Exception:
+        await RedisClient.close()
+        pytest.skip(f"No Redis reachable at {REDIS_URL}")
+
+    inbox = f"members-{request.node.name}"
+    try:
+        yield RedisTable(inbox=inbox)
+    finally:
+        async with RedisClient.connection(alias="table") as redis:
+            keys = [key async for key in redis.scan_iter(f"{inbox}:*")]
+            if keys:
+                await redis.delete(*keys)
+        await RedisClient.close()
+
+
+async def _members(table: RedisTable, table_name: str) -> list[str]:
+    async with RedisClient.connection(alias="table") as redis:
+        return await redis.zrange(
+            table.keys.table_members(table.inbox, table_name), 0, -1
+        )
+
+
+async def test_rows_are_listed_in_insertion_order(table: RedisTable) -> None:
+    for pkid in ("c", "a", "b"):
+        await table.upsert("orders", pkid, {"pkid": pkid})
+    await table.upsert("orders", "c", {"pkid": "c", "again": True})
+    await table.upsert("other", "z", {"pkid": "z"})
+
+    assert await table.list_pkids("orders") == ["c", "a", "b"]
+    assert [row["pkid"] for row in await table.get_all("orders")] == ["c", "a", "b"]
+
+    await table.delete("orders", "a")
+    assert await table.list_pkids("orders") == ["c", "b"]
+
+
+async def test_rows_written_before_the_set_existed_are_backfilled_once(
+    table: RedisTable,
+) -> None:
+    await table.upsert_many("orders", {"o-1": {"n": 1}, "o-2": {"n": 2}})
+    # As if written by a version without membership sets.
+    await table.delete_key(table.keys.table_members(table.inbox, "orders"))
+    await table.upsert("orders", "o-3", {"n": 3})
+
+    assert sorted(await table.list_pkids("orders")) == ["o-1", "o-2", "o-3"]
+    assert sorted(await _members(table, "orders")) == [":", "o-1", "o-2", "o-3"]
+
+
+async def test_expired_rows_are_pruned_from_the_set(table: RedisTable) -> None:
+    await table.upsert_many("orders", {"o-1": {"n": 1}, "o-2": {"n": 2}})
+    assert await table.list_pkids("orders") == ["o-1", "o-2"]
+
+    # Expiry (or a raw DEL) bypasses the repository.
+    await table.delete_key(table._key("orders", "o-1"))
+
+    assert await table.get_all("orders") == [{"n": 2}]
+    assert await _members(table, "orders") == [":", "o-2"]
+
+
+async def test_delete_table_and_delete_all_by_pkid_keep_the_set_current(
+    table: RedisTable,
+) -> None:
+    await table.upsert_many("t1", {"shared": {"v": 1}, "own": {"v": 2}})
+    await table.upsert("t2", "shared", {"v": 3})
+    await table.list_pkids("t1")
+
+    assert await table.delete_all_by_pkid("shared") == 2
+    assert await table.list_pkids("t1") == ["own"]
+    assert await table.list_pkids("t2") == []
+
+    assert await table.delete_table("t1") == 1
+    assert await _members(table, "t1") == []
+    assert await table.get_all("t1") == []
+
+
+async def test_a_row_write_tracks_membership_in_its_own_script_call(
+    table: RedisTable, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[list[str]] = []
+    run = inbox_cache.eval_script
+
+    async def spy(
+        script: RedisScript, keys: list[str], args: list[str | int], *, alias: PoolAlias
+    ) -> object:
+        calls.append(list(keys))
+        return await run(script, keys, args, alias=alias)
+
+    monkeypatch.setattr(inbox_cache, "eval_script", spy)
+    await table.upsert("orders", "o-1", {"n": 1})
+
+    # Every key the script touches is declared (cluster mode needs it).
+    members = table.keys.table_members(table.inbox, "orders")
+    assert calls == [[table._key("orders", "o-1"), members]]
+    assert await _members(table, "orders") == ["o-1"]
+
+
+async def test_generation_reads_follow_bumps_made_elsewhere(
+    table: RedisTable,
+) -> None:
+    other = RedisTable(inbox=table.inbox)
+    await table.upsert("agents@v1", "a-1", {"name": "old"})
+    await table.upsert("agents@v2", "a-1", {"name": "new"})
+    assert await table.get_in_generation("versions", "agents", "agents@v", "a-1") == (
+        1,
+        {"name": "old"},
+    )
+
+    assert await other.bump_generation("versions", "agents", 60) == 2
+
+    assert await table.get_in_generation("versions", "agents", "agents@v", "a-1") == (
+        2,
+        {"name": "new"},
+    )
+    assert await table.list_pkids("versions") == ["agents"]
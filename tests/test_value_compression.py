@@ -0,0 +1,227 @@
+"""Threshold-based compression of large cached values.
+
+Covers the shared ``value_compression`` settings and counters, the Redis serde
+(dict and model values compressed per cache space, lists and scalars never)
+and the JSON file backend, which compresses whole entries. The live Redis
+round trip needs a server (``WAPPA_TEST_REDIS_URL``, default
+``redis://localhost:6379``) and is skipped when none is reachable.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pydantic import BaseModel
+
+from wappa.persistence.json.handlers.utils.file_manager import file_manager
+from wappa.persistence.json.json_cache_factory import JSONCacheFactory
+from wappa.persistence.redis.redis_cache_factory import RedisCacheFactory
+from wappa.persistence.redis.redis_client import RedisClient
+from wappa.persistence.redis.redis_handler.utils.serde import (
+    dumps,
+    dumps_hash,
+    dumps_list_item,
+    loads,
+    loads_hash,
+)
+from wappa.persistence.value_compression import ValueCompression, value_compression
+
+REDIS_URL = os.getenv("WAPPA_TEST_REDIS_URL", "redis://localhost:6379")
+
+HISTORY = {
+    "messages": [
+        {"role": "user", "text": f"message number {i}", "seen": True}
+        for i in range(200)
+    ]
+}
+
+
+@pytest.fixture(autouse=True)
+def compression() -> Iterator[ValueCompression]:
+    value_compression.configure("zlib", threshold=512)
+    value_compression.reset_stats()
+    yield value_compression
+    value_compression.configure("off")
+    value_compression.reset_stats()
+
+
+class Turn(BaseModel):
+    role: str
+    text: str
+    seen: bool
+
+
+class History(BaseModel):
+    messages: list[Turn]
+
+
+# ── settings and counters ───────────────────────────────────────────────────
+
+
+def test_only_values_past_their_space_threshold_are_packed() -> None:
+    compression = ValueCompression()
+    text = json.dumps(HISTORY)
+    assert compression.pack(text, "ai_state") is None  # off by default
+
+    compression.configure(
+        "zlib", threshold=len(text) + 1, thresholds={"ai_state": 1024}
+    )
+    assert compression.pack(text, "table") is None
+    packed = compression.pack(text, "ai_state")
+
+    assert packed is not None and packed.startswith("\x02")
+    assert compression.unpack(packed) == text
+    assert compression.unpack(text) is None
+    stats = compression.stats()["ai_state"]
+    assert stats.compressed == 1
+    assert stats.bytes_in == len(text) and stats.bytes_out == len(packed)
+    assert stats.ratio > 5
+
+
+def test_incompressible_values_stay_as_they_are() -> None:
+    compression = ValueCompression()
+    compression.configure("zlib", threshold=16)
+    assert compression.pack('["a1b2c3d4e5f6a7b8"]', "table") is None
+    assert compression.stats()["table"].incompressible == 1
+
+
+def test_unknown_algorithms_and_bad_thresholds_are_refused() -> None:
+    compression = ValueCompression()
+    with pytest.raises(ValueError, match="not available"):
+        compression.configure("brotli")
+    with pytest.raises(ValueError, match="positive"):
+        compression.configure("zlib", thresholds={"users": 0})
+    assert compression.algorithm == "off"
+
+
+@pytest.mark.parametrize(("name", "module"), [("zstd", "zstandard"), ("lz4", "lz4")])
+def test_optional_algorithms_round_trip(name: str, module: str) -> None:
+    pytest.importorskip(module)
+    compression = ValueCompression()
+    compression.configure(name, threshold=64)
+    text = json.dumps(HISTORY)
+
+    packed = compression.pack(text, "ai_state")
+
+    assert packed is not None and compression.unpack(packed) == text
+    # Another worker's configuration does not matter to readers
+    assert ValueCompression().unpack(packed) == text
+
+
+def test_a_garbled_value_reads_as_plain_text() -> None:
+    assert value_compression.unpack("\x02not base64!") is None
+    assert loads("\x02not base64!") == "\x02not base64!"
+
+
+# ── Redis serde ─────────────────────────────────────────────────────────────
+
+
+def test_dict_and_model_values_are_compressed_for_their_space() -> None:
+    stored = dumps(HISTORY, "ai_state")
+    model = History.model_validate(HISTORY)
+    stored_model = dumps(model, "ai_state")
+
+    assert stored.startswith("\x02") and len(stored) < len(dumps(HISTORY)) / 4
+    assert loads(stored) == HISTORY
+    assert loads(stored_model, History) == model
+    # Without a space (comparisons, expiry payloads) nothing is compressed
+    assert dumps(HISTORY) == json.dumps(HISTORY, ensure_ascii=False)
+
+
+def test_lists_and_scalars_are_never_compressed() -> None:
+    row = {"status": "paid" * 200, "total": 10**30, "lines": HISTORY["messages"]}
+
+    stored = dumps_hash(row, "table")
+
+    # HGET of one field still compares equal, and the append script can
+    # still splice the list
+    assert stored["status"] == "paid" * 200
+    assert stored["total"] == str(10**30)
+    assert stored["lines"].startswith("[")
+    assert dumps_list_item(HISTORY).startswith("{")
+
+
+def test_compressed_and_plain_values_read_back_side_by_side() -> None:
+    plain = dumps_hash({"history": HISTORY})
+    compressed = dumps_hash({"history": HISTORY}, "ai_state")
+    value_compression.configure("off")
+
+    assert loads_hash(plain) == loads_hash(compressed) == {"history": HISTORY}
+    assert dumps_hash({"history": HISTORY}, "ai_state") == plain
+
+
+async def test_redis_state_merges_and_appends_around_compressed_fields() -> None:
+    await RedisClient.close()
+    RedisClient.setup_single_url(REDIS_URL)
+    try:
+        async with RedisClient.connection(alias="ai_state") as redis:
+            await redis.ping()
+    except Exception:
+        await RedisClient.close()
+        pytest.skip(f"No Redis reachable at {REDIS_URL}")
+
+    ai_state = RedisCacheFactory(
+        inbox_id="inbox-z", user_id="u-1"
+    ).create_ai_state_cache()
+    try:
+        await ai_state.upsert("agent", {"memory": HISTORY, "turns": []})
+        merged = await ai_state.merge("agent", {"summary": HISTORY})
+        await ai_state.append_to_list("agent", "turns", HISTORY)
+
+        async with RedisClient.connection(alias="ai_state") as redis:
+            raw = await redis.hgetall("inbox-z:aistate:agent:u-1")
+        assert raw["memory"].startswith("\x02") and raw["summary"].startswith("\x02")
+        stored = await ai_state.get("agent")
+        assert merged is not None and stored is not None
+        assert merged["summary"] == merged["memory"] == HISTORY
+        assert stored["turns"] == [HISTORY] and stored["summary"] == HISTORY
+    finally:
+        await ai_state.delete("agent")
+        await RedisClient.close()
+
+
+# ── JSON file backend ───────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def json_factory(tmp_path: Path) -> JSONCacheFactory:
+    file_manager._cache_root = tmp_path / "cache"
+    file_manager.ensure_cache_directories()
+    return JSONCacheFactory(inbox_id="inbox-z", user_id="u-1")
+
+
+async def test_json_entries_past_the_threshold_are_stored_compressed(
+    json_factory: JSONCacheFactory,
+) -> None:
+    ai_state = json_factory.create_ai_state_cache()
+    await ai_state.upsert("agent", HISTORY)
+    await ai_state.upsert("small", {"step": 1})
+
+    path = file_manager.get_cache_file_path("ai_states", "inbox-z", "u-1")
+    entries = json.loads(path.read_text())["data"]
+    stored = [value for key, value in entries.items() if key.endswith(":u-1")]
+
+    assert any(isinstance(v, str) and v.startswith("\x02") for v in stored)
+    assert {"step": 1} in stored
+    assert await ai_state.get("agent") == HISTORY
+    assert await ai_state.get("agent", models=History) == History(**HISTORY)
+    assert value_compression.stats()["ai_state"].compressed == 1
+
+
+async def test_json_table_rows_read_back_through_every_path(
+    json_factory: JSONCacheFactory,
+) -> None:
+    table = json_factory.create_table_cache()
+    rows = {f"r{i}": {"pkid": f"r{i}", **HISTORY} for i in range(2)}
+    await table.upsert_many("chats", rows)
+
+    assert await table.get("chats", "r0") == rows["r0"]
+    assert await table.get_all("chats") == list(rows.values())
+    assert await table.list_pkids("chats") == ["r0", "r1"]
+
+    value_compression.configure("off")
+    assert await table.get_many("chats", ["r1"]) == {"r1": rows["r1"]}
@@ -0,0 +1,111 @@
+"""Parity tests for the fast WhatsApp status decoder against strict validation."""
+
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from wappa.processors.base_processor import ProcessorError
+from wappa.processors.whatsapp_processor import WhatsAppWebhookProcessor
+from wappa.webhooks import StatusWebhook
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "meta" / "v25.0"
+STATUS_FIXTURES = ["template_status_webhook.json", "status_batch_webhook.json"]
+
+
+def _fixture(name: str) -> dict[str, Any]:
+    return json.loads((FIXTURE_DIR / name).read_text())
+
+
+def _statuses(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    return payload["entry"][0]["changes"][0]["value"]["statuses"]
+
+
+class _FastOnlyProcessor(WhatsAppWebhookProcessor):
+    """Fails loudly if a delivery leaves the fast path."""
+
+    def parse_webhook_container(self, payload, **kwargs):
+        raise AssertionError("status delivery fell back to strict validation")
+
+
+async def _decode(processor, payload: dict[str, Any]) -> list[Any]:
+    return await processor.create_universal_webhooks(copy.deepcopy(payload))
+
+
+def _comparable(webhooks: list[Any]) -> list[dict[str, Any]]:
+    # webhook_id hashes the receive time, which differs between the two runs.
+    return [webhook.model_dump(exclude={"webhook_id"}) for webhook in webhooks]
+
+
+class TestFastStatusDecoder:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("fixture", STATUS_FIXTURES)
+    async def test_matches_strict_validation_on_fixtures(self, fixture):
+        payload = _fixture(fixture)
+
+        fast = await _decode(_FastOnlyProcessor(), payload)
+        strict = await _decode(
+            WhatsAppWebhookProcessor(strict_validation=True), payload
+        )
+
+        assert all(isinstance(webhook, StatusWebhook) for webhook in fast)
+        assert _comparable(fast) == _comparable(strict)
+        assert [webhook.raw_webhook_data for webhook in fast] == [
+            webhook.raw_webhook_data for webhook in strict
+        ]
+
+    @pytest.mark.asyncio
+    async def test_decodes_recipient_identity_context_and_billing(self):
+        sent, _, read, group = await _decode(
+            _FastOnlyProcessor(), _fixture("status_batch_webhook.json")
+        )
+
+        assert sent.user_id == "CO.2186878922080769"
+        assert sent.user.username == "@ana_customer"
+        assert sent.business_opaque_data == "campaign-42"
+        assert sent.conversation.pricing_category == "utility"
+        assert sent.conversation.expiration_timestamp.timestamp() == 1785859200
+        assert read.conversation is None
+        assert group.user_id == "CO.9912345678901234"
+        assert group.user is None
+        assert len({sent.webhook_id, read.webhook_id}) == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_status_keys_go_through_strict_validation(self):
+        payload = _fixture("template_status_webhook.json")
+        _statuses(payload)[0]["new_meta_field"] = "x"
+
+        with pytest.raises(ProcessorError):
+            await _decode(WhatsAppWebhookProcessor(), payload)
+
+    @pytest.mark.asyncio
+    async def test_failed_statuses_keep_full_error_details(self):
+        payload = _fixture("template_status_webhook.json")
+        _statuses(payload)[0].update(
+            status="failed",
+            errors=[
+                {
+                    "code": 131026,
+                    "title": "Message undeliverable",
+                    "message": "Message undeliverable",
+                    "error_data": {"details": "Receiver is incapable"},
+                }
+            ],
+        )
+
+        (webhook,) = await _decode(WhatsAppWebhookProcessor(), payload)
+
+        assert webhook.errors[0].error_code == 131026
+        assert webhook.errors[0].error_details == "Receiver is incapable"
+
+    @pytest.mark.asyncio
+    async def test_invalid_status_values_are_still_rejected(self):
+        payload = _fixture("template_status_webhook.json")
+        _statuses(payload)[0]["id"] = "not-a-wamid"
+
+        with pytest.raises(ProcessorError):
+            await _decode(WhatsAppWebhookProcessor(), payload)
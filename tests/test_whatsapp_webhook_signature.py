@@ -0,0 +1,193 @@
+"""Tests for X-Hub-Signature-256 enforcement on the WhatsApp webhook route."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+
+from wappa.api.controllers import WebhookController
+from wappa.core.events.event_dispatcher import WappaEventDispatcher
+from wappa.core.events.event_handler import WappaEventHandler
+from wappa.core.inbound.payload_codec import PayloadDecodeError, decode_payload
+from wappa.core.lifecycle import BackgroundWorkTracker, SessionLifecycle
+from wappa.domain.interfaces.inbox_credential_store import (
+    IInboxCredentialStore,
+    InboxCredentials,
+    InboxNotFoundError,
+)
+from wappa.processors.whatsapp_processor import WhatsAppWebhookProcessor
+
+INBOX_ID = "123456789012345"
+WABA_ID = "535497026314662"
+APP_SECRET = "meta-app-secret"
+
+BODY = json.dumps(
+    {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": WABA_ID,
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "metadata": {
+                                "display_phone_number": "15550001111",
+                                "phone_number_id": INBOX_ID,
+                            },
+                            "statuses": [
+                                {
+                                    "id": "wamid.signed-s1",
+                                    "status": "delivered",
+                                    "timestamp": "1785772800",
+                                    "recipient_id": "573001110001",
+                                }
+                            ],
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+).encode()
+
+
+def _sign(body: bytes, secret: str = APP_SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class _CountingCredentialStore(IInboxCredentialStore):
+    def __init__(self, app_secret: str | None = APP_SECRET) -> None:
+        self.app_secret = app_secret
+        self.credential_lookups = 0
+        self.validations = 0
+
+    async def get_credentials(self, inbox_id: str) -> InboxCredentials:
+        self.credential_lookups += 1
+        if inbox_id != INBOX_ID:
+            raise InboxNotFoundError(inbox_id)
+        return InboxCredentials(
+            inbox_id=INBOX_ID,
+            access_token="token",
+            platform_account_id=WABA_ID,
+            app_secret=self.app_secret,
+        )
+
+    async def validate_inbox(self, inbox_id: str) -> bool:
+        self.validations += 1
+        return inbox_id == INBOX_ID
+
+
+class _NoopHandler(WappaEventHandler):
+    async def process_message(self, webhook: Any) -> None:
+        return None
+
+
+def _request(store: IInboxCredentialStore, headers: dict[str, str]) -> Any:
+    return SimpleNamespace(
+        headers=Headers(headers),
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                session_lifecycle=SessionLifecycle(SimpleNamespace()),
+                inbox_credential_store=store,
+                messenger_middleware=[],
+                wappa_cache_type="memory",
+                background_work_tracker=BackgroundWorkTracker(),
+            )
+        ),
+    )
+
+
+async def _receive(store: IInboxCredentialStore, body: bytes, headers: dict):
+    controller = WebhookController(WappaEventDispatcher(_NoopHandler()))
+    request = _request(store, headers)
+    result = await controller.receive_webhook(
+        request=request, inbox_id=INBOX_ID, platform="whatsapp", body=body
+    )
+    await request.app.state.background_work_tracker.drain(timeout=5.0)
+    return result
+
+
+class TestWhatsAppSignatureValidation:
+    def test_valid_signature_over_raw_body_is_accepted(self):
+        processor = WhatsAppWebhookProcessor()
+        assert processor.validate_webhook_signature(
+            BODY, _sign(BODY), app_secret=APP_SECRET
+        )
+
+    def test_tampered_body_and_missing_prefix_are_rejected(self):
+        processor = WhatsAppWebhookProcessor()
+        assert not processor.validate_webhook_signature(
+            BODY + b" ", _sign(BODY), app_secret=APP_SECRET
+        )
+        assert not processor.validate_webhook_signature(
+            BODY, _sign(BODY).removeprefix("sha256="), app_secret=APP_SECRET
+        )
+        assert not processor.validate_webhook_signature(BODY, "", app_secret=APP_SECRET)
+
+
+class TestWebhookIntake:
+    @pytest.mark.asyncio
+    async def test_signed_delivery_is_accepted(self):
+        store = _CountingCredentialStore()
+
+        result = await _receive(store, BODY, {"X-Hub-Signature-256": _sign(BODY)})
+
+        assert result == {"status": "accepted"}
+
+    @pytest.mark.asyncio
+    async def test_bad_signature_is_rejected_before_runtime_work(self):
+        store = _CountingCredentialStore()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _receive(
+                store, BODY, {"X-Hub-Signature-256": _sign(BODY, "wrong-secret")}
+            )
+
+        assert exc_info.value.status_code == 401
+        assert store.credential_lookups == 1
+        assert store.validations == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_signature_is_rejected_when_secret_is_known(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await _receive(_CountingCredentialStore(), BODY, {})
+
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_unsigned_delivery_is_accepted_without_a_secret(self):
+        result = await _receive(_CountingCredentialStore(app_secret=None), BODY, {})
+
+        assert result == {"status": "accepted"}
+
+    @pytest.mark.asyncio
+    async def test_signed_body_that_is_not_json_is_a_bad_request(self):
+        body = b"not json"
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _receive(
+                _CountingCredentialStore(),
+                body,
+                {"X-Hub-Signature-256": _sign(body)},
+            )
+
+        assert exc_info.value.status_code == 400
+
+
+class TestPayloadCodec:
+    def test_decodes_objects_and_rejects_other_json(self):
+        assert decode_payload(b'{"a": 1}') == {"a": 1}
+        assert decode_payload('{"a": 1}') == {"a": 1}
+        with pytest.raises(PayloadDecodeError):
+            decode_payload(b"[1, 2]")
+        with pytest.raises(PayloadDecodeError):
+            decode_payload(b"\xff")
@@ -1,4 +1,4 @@
-from typing import Any, cast
+from typing import Any
 
 from fastapi import HTTPException, Request
 from fastapi.responses import PlainTextResponse
@@ -6,6 +6,7 @@ from fastapi.responses import PlainTextResponse
 from wappa.core.config.settings import settings
 from wappa.core.events import WappaEventDispatcher
 from wappa.core.inbound import (
+    InboundQueueFullError,
     InboundRuntime,
     InboundRuntimeDependencies,
     InvalidInboxError,
@@ -13,15 +14,20 @@ from wappa.core.inbound import (
     ProcessorFailureError,
     UnsupportedPlatformError,
 )
+from wappa.core.inbound.payload_codec import PayloadDecodeError, decode_payload
 from wappa.core.logging.context import get_current_inbox_context
 from wappa.core.logging.logger import get_logger
-from wappa.domain.interfaces.inbox_credential_store import IInboxCredentialStore
+from wappa.domain.interfaces.inbox_credential_store import InboxNotFoundError
+from wappa.domain.interfaces.session_provider import RuntimeDrainingError
+from wappa.processors.factory import processor_factory
 from wappa.schemas.core.types import PlatformType
 
 
 class WebhookController:
     """HTTP adapter for platform webhook routes."""
 
+    _SIGNATURE_HEADER = "X-Hub-Signature-256"
+
     def __init__(self, event_dispatcher: WappaEventDispatcher):
         self.event_dispatcher = event_dispatcher
         self.inbound_runtime = InboundRuntime(event_dispatcher)
@@ -98,12 +104,54 @@ class WebhookController:
             ),
         )
 
+    async def receive_webhook(
+        self,
+        request: Request,
+        inbox_id: str,
+        platform: str,
+        body: bytes,
+    ) -> dict[str, str]:
+        """Verify and decode a raw webhook body, then process it.
+
+        The route reads the body once. Its signature is checked over those
+        exact bytes before any cache or dispatch work, and the decoded dict is
+        handed down as-is, so the body is never re-read or re-encoded.
+        """
+        if not self._is_supported_platform(platform):
+            raise HTTPException(
+                status_code=400, detail=f"Unsupported platform: {platform}"
+            )
+        platform_type = self._parse_platform_type(platform)
+
+        await self._verify_signature(request, platform_type, inbox_id, body)
+
+        try:
+            payload = decode_payload(body)
+        except PayloadDecodeError as exc:
+            self.logger.error("Failed to parse webhook payload: %s", exc)
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Webhook payload is not valid JSON for inbox '{inbox_id}' "
+                    f"on platform '{platform}': {exc}"
+                ),
+            ) from exc
+
+        return await self.process_webhook(
+            request=request,
+            inbox_id=inbox_id,
+            platform=platform,
+            payload=payload,
+            raw_body=body,
+        )
+
     async def process_webhook(
         self,
         request: Request,
         inbox_id: str,
         platform: str,
         payload: dict[str, Any],
+        raw_body: bytes | None = None,
     ) -> dict[str, str]:
         self.logger.debug(
             "Processing webhook for platform: %s, routed inbox: %s",
@@ -133,6 +181,7 @@ class WebhookController:
                 inbox_id=inbox_id,
                 payload=payload,
                 dependencies=self._create_runtime_dependencies(request),
+                raw_body=raw_body,
             )
         except UnsupportedPlatformError as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -142,6 +191,15 @@ class WebhookController:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
         except ProcessorFailureError as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
+        except InboundQueueFullError as exc:
+            self.logger.warning("Shedding inbound delivery: %s", exc)
+            raise HTTPException(
+                status_code=503,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after)},
+            ) from exc
+        except RuntimeDrainingError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
         except Exception as exc:
             self.logger.error("Inbound Runtime failed: %s", exc, exc_info=True)
             raise HTTPException(
@@ -152,42 +210,44 @@ class WebhookController:
                 ),
             ) from exc
 
-    def _create_runtime_dependencies(
+    async def _verify_signature(
         self,
         request: Request,
-    ) -> InboundRuntimeDependencies:
-        app_state = request.app.state
-        session_lifecycle = getattr(app_state, "session_lifecycle", None)
-        if session_lifecycle is None:
-            raise RuntimeError(
-                "app.state.session_lifecycle is not set — WappaCorePlugin "
-                "must run startup before handling webhooks"
-            )
-        return InboundRuntimeDependencies(
-            session_provider=session_lifecycle.get_session,
-            inbox_credential_store=self._get_inbox_credential_store(request),
-            messenger_middleware=getattr(app_state, "messenger_middleware", ()),
-            cache_type=getattr(app_state, "wappa_cache_type", "memory"),
-            background_work_tracker=app_state.background_work_tracker,
-            redis_manager=getattr(app_state, "redis_manager", None),
-            postgres_session_manager=getattr(
-                app_state, "postgres_session_manager", None
-            ),
-            media_download_client_provider=(
-                session_lifecycle.get_media_download_client
-            ),
-        )
+        platform: PlatformType,
+        inbox_id: str,
+        body: bytes,
+    ) -> None:
+        processor = processor_factory.get_processor(platform)
+        if not processor.capabilities.supports_signature_validation:
+            return
 
-    def _get_inbox_credential_store(self, request: Request) -> IInboxCredentialStore:
-        app_state = request.app.state
-        store = getattr(app_state, "inbox_credential_store", None)
-        if store is None:
-            raise RuntimeError(
-                "IInboxCredentialStore not found in app.state — ensure "
-                "WappaBuilder.with_whatsapp() or a credential store plugin "
-                "was configured before startup"
+        app_secret = None
+        store = getattr(request.app.state, "inbox_credential_store", None)
+        if store is not None and inbox_id:
+            try:
+                app_secret = (await store.get_credentials(inbox_id)).app_secret
+            except InboxNotFoundError as exc:
+                raise HTTPException(
+                    status_code=401, detail=f"Invalid or inactive inbox: {inbox_id}"
+                ) from exc
+
+        signature = request.headers.get(self._SIGNATURE_HEADER, "")
+        if not processor.validate_webhook_signature(
+            body, signature, app_secret=app_secret
+        ):
+            self.logger.warning(
+                "Rejected %s webhook for inbox %s: invalid %s",
+                platform.value,
+                inbox_id,
+                self._SIGNATURE_HEADER,
             )
-        return cast(IInboxCredentialStore, store)
+            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    def _create_runtime_dependencies(
+        self,
+        request: Request,
+    ) -> InboundRuntimeDependencies:
+        return InboundRuntimeDependencies.from_app_state(request.app.state)
 
     def _parse_platform_type(self, platform: str) -> PlatformType:
         try:
@@ -10,17 +10,15 @@ from typing import cast
 
 from fastapi import Depends, Request
 
-from wappa.api.dependencies.whatsapp_media_dependencies import (
-    get_whatsapp_media_factory,
-)
 from wappa.api.utils.inbox_helpers import require_inbox_context
 from wappa.core.logging.logger import get_logger
+from wappa.core.messaging.registry import MessengerRegistry
 from wappa.domain.builders.message_builder import MessageBuilder
-from wappa.domain.factories.media_factory import WhatsAppMediaFactory
 from wappa.domain.factories.message_factory import WhatsAppMessageFactory
 from wappa.domain.interfaces.inbox_credential_store import (
     IInboxCredentialStore,
     InboxCredentials,
+    InboxNotFoundError,
 )
 from wappa.domain.interfaces.messaging_interface import IMessenger
 from wappa.messaging.whatsapp.client.whatsapp_client import WhatsAppClient
@@ -36,8 +34,8 @@ from wappa.messaging.whatsapp.handlers.whatsapp_specialized_handler import (
 from wappa.messaging.whatsapp.handlers.whatsapp_template_handler import (
     WhatsAppTemplateHandler,
 )
-from wappa.messaging.whatsapp.messenger.whatsapp_messenger import WhatsAppMessenger
 from wappa.messaging.whatsapp.services import WhatsAppTemplateInfoService
+from wappa.schemas.core.types import PlatformType
 
 
 async def get_whatsapp_message_factory() -> WhatsAppMessageFactory:
@@ -192,31 +190,23 @@ async def get_whatsapp_template_info_service(
     )
 
 
-async def get_whatsapp_messenger(
-    client: WhatsAppClient = Depends(get_whatsapp_client),
-    media_handler: WhatsAppMediaHandler = Depends(get_whatsapp_media_handler),
-    interactive_handler: WhatsAppInteractiveHandler = Depends(
-        get_whatsapp_interactive_handler
-    ),
-    template_handler: WhatsAppTemplateHandler = Depends(get_whatsapp_template_handler),
-    specialized_handler: WhatsAppSpecializedHandler = Depends(
-        get_whatsapp_specialized_handler
-    ),
-    message_factory: WhatsAppMessageFactory = Depends(get_whatsapp_message_factory),
-    media_factory: WhatsAppMediaFactory = Depends(get_whatsapp_media_factory),
-) -> IMessenger:
-    """Get unified WhatsApp messenger implementation with complete functionality."""
+async def get_whatsapp_messenger(request: Request) -> IMessenger:
+    """Get the inbox's WhatsApp messenger from the app-scoped registry.
+
+    Returns the raw transport messenger: API routes emit their own events
+    (``event_decorators``), so the middleware chain is not applied here.
+    """
     inbox_id = require_inbox_context()
-    return WhatsAppMessenger(
-        client=client,
-        media_handler=media_handler,
-        interactive_handler=interactive_handler,
-        template_handler=template_handler,
-        specialized_handler=specialized_handler,
-        inbox_id=inbox_id,
-        message_factory=message_factory,
-        media_factory=media_factory,
-    )
+    registry = MessengerRegistry.from_app_state(request.app.state)
+    try:
+        pipeline = await registry.get(inbox_id, PlatformType.WHATSAPP)
+    except InboxNotFoundError as exc:
+        raise ValueError(
+            f"Inbox '{inbox_id}' failed credential validation — either the "
+            f"inbox does not exist in the credential store, or its credentials "
+            f"are missing/inactive. Check your IInboxCredentialStore configuration."
+        ) from exc
+    return pipeline.raw_messenger
 
 
 async def get_message_builder(
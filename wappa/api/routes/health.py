@@ -3,12 +3,14 @@ Health check endpoints for the Wappa framework.
 """
 
 import time
+from dataclasses import asdict
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 from wappa.core.config.settings import settings
 from wappa.core.logging.logger import get_logger
+from wappa.persistence.redis.redis_client import RedisClient
 
 logger = get_logger(__name__)
 router = APIRouter(tags=["Health"])
@@ -51,7 +53,7 @@ async def health_check() -> dict[str, Any]:
 
 
 @router.get("/health/detailed")
-async def detailed_health_check() -> dict[str, Any]:
+async def detailed_health_check(request: Request) -> dict[str, Any]:
     """
     Detailed health check with configuration information.
 
@@ -93,8 +95,43 @@ async def detailed_health_check() -> dict[str, Any]:
             },
             "openai": {"configured": bool(settings.openai_api_key)},
         },
+        "inbound": _inbound_scheduler_health(request),
+        "inbound_dedup": _inbound_dedup_health(request),
+        "redis_pools": _redis_pool_health(request),
+        "memory_cache": _memory_cache_health(request),
     }
 
     logger.info("Detailed health check completed")
 
     return detailed_data
+
+
+def _inbound_scheduler_health(request: Request) -> dict[str, Any] | None:
+    scheduler = getattr(request.app.state, "inbound_scheduler", None)
+    if scheduler is None:
+        return None
+    return asdict(scheduler.get_stats())
+
+
+def _inbound_dedup_health(request: Request) -> dict[str, Any] | None:
+    deduplicator = getattr(request.app.state, "inbound_deduplicator", None)
+    if deduplicator is None:
+        return None
+    return asdict(deduplicator.get_stats())
+
+
+def _redis_pool_health(request: Request) -> dict[str, Any] | None:
+    redis_manager = getattr(request.app.state, "redis_manager", None)
+    if redis_manager is None:
+        return None
+    return RedisClient.get_pool_health()
+
+
+def _memory_cache_health(request: Request) -> dict[str, Any] | None:
+    if getattr(request.app.state, "wappa_cache_type", None) != "memory":
+        return None
+    from wappa.persistence.memory.handlers.utils.memory_store import (
+        get_memory_store,
+    )
+
+    return {ns: asdict(stats) for ns, stats in get_memory_store().stats().items()}
@@ -108,7 +108,8 @@ def create_webhook_router(event_dispatcher: WappaEventDispatcher) -> APIRouter:
         """
         Process incoming webhook payload from a messaging platform.
 
-        Parses JSON and delegates accepted payloads to the Inbound Runtime.
+        Reads the raw body once; the controller verifies its signature,
+        decodes it, and delegates accepted payloads to the Inbound Runtime.
 
         Args:
             request: FastAPI request object
@@ -118,23 +119,11 @@ def create_webhook_router(event_dispatcher: WappaEventDispatcher) -> APIRouter:
         Returns:
             Dict with status confirmation
         """
-        try:
-            payload = await request.json()
-        except Exception as exc:
-            logger.error("Failed to parse webhook payload: %s", exc)
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    f"Webhook payload is not valid JSON for inbox '{inbox_id}' "
-                    f"on platform '{platform}': {type(exc).__name__}: {exc}"
-                ),
-            ) from exc
-
-        return await webhook_controller.process_webhook(
+        return await webhook_controller.receive_webhook(
             request=request,
             inbox_id=inbox_id,
             platform=platform,
-            payload=payload,
+            body=await request.body(),
         )
 
     @router.get("/inboxes/{inbox_id}/{platform}/status")
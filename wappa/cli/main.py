@@ -1,3 +1,4 @@
+import json
 import os
 import shutil
 import subprocess
@@ -371,6 +372,27 @@ def examples(
     _show_examples_menu(directory)
 
 
+@app.command("cache-dump")
+def cache_dump(
+    path: str = typer.Argument(
+        ...,
+        help="Log of the JSON cache log engine (e.g. cache/users/<inbox>_<user>.log)",
+    ),
+    records: bool = typer.Option(
+        False, "--records", "-r", help="Print every line with its offset"
+    ),
+) -> None:
+    """Print the live entries of a JSON cache log as JSON."""
+    from wappa.persistence.json.log_engine import dump_log
+
+    try:
+        dumped = dump_log(path, records=records)
+    except (OSError, ValueError) as e:
+        typer.echo(f"❌ Cannot dump {path}: {e}", err=True)
+        raise typer.Exit(1) from None
+    typer.echo(json.dumps(dumped, indent=2, ensure_ascii=False))
+
+
 def _show_examples_menu(target_directory: str) -> None:
     console.print("\n🚀 [bold blue]Wappa Example Projects[/bold blue]")
     console.print("Choose an example to copy to your project:\n")
@@ -40,7 +40,7 @@ def _get_version_from_pyproject() -> str:
 
 def _is_cli_context() -> bool:
     if len(sys.argv) > 1:
-        cli_only_commands = {"--help", "-h", "init", "examples"}
+        cli_only_commands = {"--help", "-h", "init", "examples", "cache-dump"}
         for arg in sys.argv[1:]:
             if arg in cli_only_commands:
                 return True
@@ -51,6 +51,17 @@ def _is_cli_context() -> bool:
     return False
 
 
+def _parse_limits(raw: str) -> dict[str, int]:
+    """Parse ``"name=123,other=456"`` into ``{"name": 123, "other": 456}``."""
+    limits: dict[str, int] = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        name, _, limit = item.partition("=")
+        limits[name.strip()] = int(limit)
+    return limits
+
+
 class Settings:
     """Application settings with environment-based configuration."""
 
@@ -71,6 +82,86 @@ class Settings:
             True if _rich_raw == "TRUE" else False if _rich_raw == "FALSE" else None
         )
 
+        # ── Inbound dispatch (SYSTEM_INBOUND_*) ──────────────────
+        self.inbound_max_concurrency: int = int(
+            os.getenv("SYSTEM_INBOUND_MAX_CONCURRENCY", "64")
+        )
+        self.inbound_max_queued: int = int(
+            os.getenv("SYSTEM_INBOUND_MAX_QUEUED", "10000")
+        )
+        self.inbound_retry_after: int = int(
+            os.getenv("SYSTEM_INBOUND_RETRY_AFTER", "5")
+        )
+        # 0 disables redelivery deduplication.
+        self.inbound_dedup_ttl: int = int(
+            os.getenv("SYSTEM_INBOUND_DEDUP_TTL", "86400")
+        )
+        self.inbound_dedup_max_entries: int = int(
+            os.getenv("SYSTEM_INBOUND_DEDUP_MAX_ENTRIES", "100000")
+        )
+        # TRUE validates status-only deliveries with the full pydantic models.
+        self.inbound_strict_validation: bool = (
+            os.getenv("SYSTEM_INBOUND_STRICT_VALIDATION", "").strip().upper() == "TRUE"
+        )
+
+        # ── Cached value compression (SYSTEM_CACHE_COMPRESSION*) ─
+        # off, zlib, zstd (wappa[zstd]) or lz4 (wappa[lz4]); applies to the
+        # Redis and JSON cache backends.
+        self.cache_compression: str = os.getenv("SYSTEM_CACHE_COMPRESSION", "off")
+        self.cache_compression_threshold: int = int(
+            os.getenv("SYSTEM_CACHE_COMPRESSION_THRESHOLD", "4096")
+        )
+        # Per cache space overrides, e.g. "ai_state=1024,table=8192".
+        self.cache_compression_thresholds: dict[str, int] = _parse_limits(
+            os.getenv("SYSTEM_CACHE_COMPRESSION_THRESHOLDS", "")
+        )
+
+        # ── Memory cache bounds (SYSTEM_MEMORY_CACHE_*) ──────────
+        # 0 leaves a bound off; bytes are estimated when entries are written.
+        self.memory_cache_max_entries: int = int(
+            os.getenv("SYSTEM_MEMORY_CACHE_MAX_ENTRIES", "0")
+        )
+        self.memory_cache_max_bytes: int = int(
+            os.getenv("SYSTEM_MEMORY_CACHE_MAX_BYTES", "0")
+        )
+        # Per namespace bounds, e.g. "ai_states=20000,users=100000".
+        self.memory_cache_namespace_max_entries: dict[str, int] = _parse_limits(
+            os.getenv("SYSTEM_MEMORY_CACHE_NAMESPACE_MAX_ENTRIES", "")
+        )
+        self.memory_cache_namespace_max_bytes: dict[str, int] = _parse_limits(
+            os.getenv("SYSTEM_MEMORY_CACHE_NAMESPACE_MAX_BYTES", "")
+        )
+        # lru, tinylfu or ttl (entries with a TTL go first).
+        self.memory_cache_eviction: str = os.getenv(
+            "SYSTEM_MEMORY_CACHE_EVICTION", "lru"
+        )
+        # Snapshot file for warm restarts; empty disables snapshots. Written
+        # every INTERVAL seconds (0: only at shutdown) and loaded at startup.
+        self.memory_cache_snapshot_path: str = os.getenv(
+            "SYSTEM_MEMORY_CACHE_SNAPSHOT_PATH", ""
+        )
+        self.memory_cache_snapshot_interval: float = float(
+            os.getenv("SYSTEM_MEMORY_CACHE_SNAPSHOT_INTERVAL", "300")
+        )
+
+        # ── JSON cache engine (SYSTEM_JSON_CACHE_*) ──────────────
+        # file: one JSON document per store, rewritten on every write;
+        # log: append-only change log per store, indexed in memory.
+        self.json_cache_engine: str = os.getenv("SYSTEM_JSON_CACHE_ENGINE", "file")
+        # Log engine: seconds between fsyncs (0: after every write) and the
+        # share of dead lines that triggers a background compaction.
+        self.json_cache_fsync_interval: float = float(
+            os.getenv("SYSTEM_JSON_CACHE_FSYNC_INTERVAL", "1")
+        )
+        self.json_cache_compact_ratio: float = float(
+            os.getenv("SYSTEM_JSON_CACHE_COMPACT_RATIO", "0.5")
+        )
+        # Seconds between purges of stores whose entries expired (0: expired
+        # entries are only hidden and dropped by the next write of their store).
+        self.json_cache_sweep_interval: float = float(
+            os.getenv("SYSTEM_JSON_CACHE_SWEEP_INTERVAL", "1")
+        )
+
         # ── Meta / WhatsApp (META_* / WP_*) ─────────────────────
         self.api_version: str = os.getenv("META_API_VERSION", "v25.0")
         self.base_url: str = os.getenv("META_BASE_URL", "https://graph.facebook.com/")
@@ -79,6 +170,8 @@ class Settings:
         self.wp_phone_id: str | None = os.getenv("WP_PHONE_ID")
         self.wp_bid: str | None = os.getenv("WP_BID")
         self.wp_webhook_verify_token: str | None = os.getenv("WP_WEBHOOK_VERIFY_TOKEN")
+        # Meta app secret; when set, X-Hub-Signature-256 is required on webhooks.
+        self.wp_app_secret: str | None = os.getenv("WP_APP_SECRET")
 
         # ── AI (OPENAI_*) ────────────────────────────────────────
         self.openai_api_key: str | None = os.getenv("OPENAI_API_KEY")
@@ -86,12 +179,43 @@ class Settings:
         # ── Persistence (REDIS_*) ────────────────────────────────
         self.redis_url: str | None = os.getenv("REDIS_URL")
         self.redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+        # pools: one pool per cache space on databases 0-4 of REDIS_URL;
+        # shared: one pool on REDIS_URL's database; cluster: Redis Cluster.
+        self.redis_mode: str = os.getenv("REDIS_MODE", "pools")
+        # off, or how VersionedTableCache generations are cached in process:
+        # pubsub (bump announcements) or tracking (client-side caching).
+        self.redis_generation_sync: str = os.getenv("REDIS_GENERATION_SYNC", "off")
+        # Cache spaces (pool aliases) whose hash reads are near-cached in
+        # process, comma separated; empty disables the near-cache.
+        self.redis_near_cache: list[str] = [
+            alias.strip()
+            for alias in os.getenv("REDIS_NEAR_CACHE", "").split(",")
+            if alias.strip()
+        ]
+        self.redis_near_cache_max_entries: int = int(
+            os.getenv("REDIS_NEAR_CACHE_MAX_ENTRIES", "10000")
+        )
+        self.redis_near_cache_max_bytes: int = int(
+            os.getenv("REDIS_NEAR_CACHE_MAX_BYTES", str(32 << 20))
+        )
+        self.redis_near_cache_ttl: float = float(
+            os.getenv("REDIS_NEAR_CACHE_TTL", "60")
+        )
+        # Encoding of dict and model values in Redis hashes: json (stdlib),
+        # orjson (wappa[speedups]) or msgpack (wappa[msgpack]).
+        self.redis_serde_codec: str = os.getenv("REDIS_SERDE_CODEC", "json")
         self.redis_connection_timeout: int = int(
             os.getenv("REDIS_CONNECTION_TIMEOUT", "30")
         )
         self.redis_health_check_interval: int = int(
             os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "60")
         )
+        self.redis_watchdog_interval: float = float(
+            os.getenv("REDIS_WATCHDOG_INTERVAL", "5")
+        )
+        self.redis_watchdog_failure_threshold: int = int(
+            os.getenv("REDIS_WATCHDOG_FAILURE_THRESHOLD", "3")
+        )
 
         self._validate_settings()
         if not _is_cli_context():
@@ -107,6 +231,44 @@ class Settings:
             self.environment = "DEV"
         self.environment = self.environment.upper()
 
+        valid_redis_modes = ["pools", "shared", "cluster"]
+        self.redis_mode = self.redis_mode.lower()
+        if self.redis_mode not in valid_redis_modes:
+            raise ValueError(f"REDIS_MODE must be one of {valid_redis_modes}")
+
+        valid_generation_syncs = ["off", "pubsub", "tracking"]
+        self.redis_generation_sync = self.redis_generation_sync.lower()
+        if self.redis_generation_sync not in valid_generation_syncs:
+            raise ValueError(
+                f"REDIS_GENERATION_SYNC must be one of {valid_generation_syncs}"
+            )
+
+        valid_compressions = ["off", "zlib", "zstd", "lz4"]
+        self.cache_compression = self.cache_compression.lower()
+        if self.cache_compression not in valid_compressions:
+            raise ValueError(
+                f"SYSTEM_CACHE_COMPRESSION must be one of {valid_compressions}"
+            )
+
+        valid_evictions = ["lru", "tinylfu", "ttl"]
+        self.memory_cache_eviction = self.memory_cache_eviction.lower()
+        if self.memory_cache_eviction not in valid_evictions:
+            raise ValueError(
+                f"SYSTEM_MEMORY_CACHE_EVICTION must be one of {valid_evictions}"
+            )
+
+        valid_json_engines = ["file", "log"]
+        self.json_cache_engine = self.json_cache_engine.lower()
+        if self.json_cache_engine not in valid_json_engines:
+            raise ValueError(
+                f"SYSTEM_JSON_CACHE_ENGINE must be one of {valid_json_engines}"
+            )
+
+        valid_serde_codecs = ["json", "orjson", "msgpack"]
+        self.redis_serde_codec = self.redis_serde_codec.lower()
+        if self.redis_serde_codec not in valid_serde_codecs:
+            raise ValueError(f"REDIS_SERDE_CODEC must be one of {valid_serde_codecs}")
+
     def _validate_whatsapp_credentials(self) -> None:
         missing = [
             name
@@ -148,9 +148,9 @@ class WappaContextFactory:
         user_id: str | None,
         platform: PlatformType,
     ) -> IMessenger | None:
-        """Create messenger using SessionLifecycle provider."""
+        """Get the inbox's messenger from the app-scoped MessengerRegistry."""
         try:
-            from wappa.domain.factories.messenger_factory import MessengerFactory
+            from wappa.core.messaging.registry import MessengerRegistry
 
             session_lifecycle = getattr(self._app.state, "session_lifecycle", None)
             if not session_lifecycle:
@@ -159,26 +159,8 @@ class WappaContextFactory:
                 )
                 return None
 
-            credential_store = getattr(self._app.state, "inbox_credential_store", None)
-            messenger_factory = MessengerFactory(
-                credential_store=credential_store,
-                session_provider=session_lifecycle.get_session,
-                media_download_client_provider=(
-                    session_lifecycle.get_media_download_client
-                ),
-            )
-            raw_messenger = await messenger_factory.create_messenger(
-                platform=platform,
-                inbox_id=inbox_id,
-            )
-
-            from wappa.core.messaging.pipeline import MessengerPipeline
-
-            messenger_middleware = getattr(self._app.state, "messenger_middleware", ())
-            return MessengerPipeline(
-                raw=raw_messenger,
-                middleware=messenger_middleware,
-            )
+            registry = MessengerRegistry.from_app_state(self._app.state)
+            return await registry.get(inbox_id, platform)
 
         except Exception as e:
             self.logger.error("Messenger creation failed: %s", e)
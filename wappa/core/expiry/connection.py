@@ -4,9 +4,13 @@ Redis Connection Manager - Handles Redis connection lifecycle for expiry listene
 Single Responsibility: Redis connection setup, teardown, and keyspace notification config.
 """
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Optional, cast
+from typing import TYPE_CHECKING, Any, Optional, cast
+
+from redis.asyncio.cluster import RedisCluster
 
 from ...persistence.redis.redis_client import PoolAlias, RedisClient
 
@@ -54,17 +58,20 @@ class RedisConnectionManager:
         - Create and manage PubSub subscription
         - Extract database index for channel construction
 
+    Keyspace notifications are local to the node that expired the key, so in
+    cluster mode one subscription is opened per primary.
+
     Usage:
         manager = RedisConnectionManager(config=ConnectionConfig(alias="expiry"))
-        async with manager.connect() as connection:
-            async for msg in connection.pubsub.listen():
-                # Process messages
-                pass
+        connection = await manager.connect()
+        async for msg in connection.listen():
+            # Process messages
+            pass
     """
 
     config: ConnectionConfig = field(default_factory=ConnectionConfig)
     _redis: Optional["Redis"] = field(default=None, init=False, repr=False)
-    _pubsub: Optional["PubSub"] = field(default=None, init=False, repr=False)
+    _pubsubs: list["PubSub"] = field(default_factory=list, init=False, repr=False)
     _channel: str | None = field(default=None, init=False)
 
     async def connect(self) -> "RedisConnection":
@@ -90,32 +97,48 @@ class RedisConnectionManager:
 
         await self._configure_keyspace_notifications()
 
-        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
-        await self._pubsub.subscribe(self._channel)
-        _disable_pubsub_read_timeout(self._pubsub)
+        for pubsub in await self._open_pubsubs():
+            self._pubsubs.append(pubsub)
+            await pubsub.subscribe(self._channel)
+            _disable_pubsub_read_timeout(pubsub)
 
         logger.info("Expiry listener active and listening")
 
         return RedisConnection(
             redis=self._redis,
-            pubsub=self._pubsub,
+            pubsub=self._pubsubs[0],
             channel=self._channel,
             db_index=db_index,
+            pubsubs=list(self._pubsubs),
         )
 
+    async def _open_pubsubs(self) -> list["PubSub"]:
+        """One PubSub for a single server; one per primary in cluster mode."""
+        redis = cast("Redis", self._redis)
+        if not isinstance(redis, RedisCluster):
+            return [redis.pubsub(ignore_subscribe_messages=True)]
+
+        await redis.initialize()
+        primaries = redis.get_primaries()
+        logger.info("Subscribing to expiry events on %d primaries", len(primaries))
+        return [
+            redis.pubsub(node=node, ignore_subscribe_messages=True)
+            for node in primaries
+        ]
+
     async def disconnect(self) -> None:
         """
         Clean up Redis connection resources.
 
         Unsubscribes from PubSub and closes connection.
         """
-        if self._pubsub:
+        for pubsub in self._pubsubs:
             try:
-                await self._pubsub.unsubscribe()
-                await self._pubsub.close()
+                await pubsub.unsubscribe()
+                await pubsub.close()
             except Exception as e:
                 logger.warning("Error closing PubSub: %s", e)
-            self._pubsub = None
+        self._pubsubs.clear()
 
         self._redis = None
         self._channel = None
@@ -123,7 +146,8 @@ class RedisConnectionManager:
 
     def _extract_db_index(self) -> int:
         """Extract database number from Redis connection pool."""
-        if not self._redis:
+        if not self._redis or isinstance(self._redis, RedisCluster):
+            # a cluster only has database 0
             return 0
         return int(self._redis.connection_pool.connection_kwargs.get("db", 0))
 
@@ -161,3 +185,42 @@ class RedisConnection:
     pubsub: "PubSub"
     channel: str
     db_index: int
+    pubsubs: list["PubSub"] = field(default_factory=list)
+
+    async def listen(self) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yield messages from every subscription, in arrival order.
+
+        Raises:
+            ConnectionError: If any subscription fails or ends, so the listener
+                reconnects all of them together.
+        """
+        pubsubs = self.pubsubs or [self.pubsub]
+        if len(pubsubs) == 1:
+            async for msg in pubsubs[0].listen():
+                yield msg
+            return
+
+        queue: asyncio.Queue[dict[str, Any] | BaseException] = asyncio.Queue()
+
+        async def pump(pubsub: "PubSub") -> None:
+            try:
+                async for msg in pubsub.listen():
+                    await queue.put(msg)
+                await queue.put(ConnectionError("Expiry subscription ended"))
+            except Exception as e:
+                await queue.put(e)
+
+        tasks = [asyncio.create_task(pump(pubsub)) for pubsub in pubsubs]
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, BaseException):
+                    raise ConnectionError(
+                        f"Expiry subscription failed: {item}"
+                    ) from item
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
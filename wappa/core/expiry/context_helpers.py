@@ -25,6 +25,7 @@ from wappa.domain.factories.messenger_factory import MessengerFactory
 from wappa.domain.interfaces.cache_factory import ICacheFactory
 from wappa.domain.interfaces.messaging_interface import IMessenger
 from wappa.persistence.cache_factory import create_cache_factory
+from wappa.persistence.redis.redis_handler.utils.key_factory import KeyFactory
 from wappa.schemas.core.types import PlatformType
 
 logger = get_logger(__name__)
@@ -187,9 +188,11 @@ def parse_inbox_from_expired_key(full_key: str) -> str:
     Example:
         >>> parse_inbox_from_expired_key("acme:EXPTRIGGER:reminder:USER123")
         "acme"
+        >>> parse_inbox_from_expired_key("{acme}:EXPTRIGGER:reminder:USER123")
+        "acme"
         >>> parse_inbox_from_expired_key("simple_key")
         "wappa"
     """
     if ":" in full_key:
-        return full_key.split(":")[0]
+        return KeyFactory.strip_hash_tag(full_key.split(":")[0])
     return "wappa"
@@ -128,7 +128,7 @@ async def _run_listener_loop(
 
     logger.info("Expiry listener active and listening")
 
-    async for msg in connection.pubsub.listen():
+    async for msg in connection.listen():
         event = parser.parse(msg)
         if event:
             dispatcher.dispatch(event)
@@ -1,7 +1,15 @@
 """Inbound Runtime boundary for accepted platform webhooks."""
 
+from .dedup import (
+    IInboundDeduplicator,
+    InboundDedupStats,
+    MemoryInboundDeduplicator,
+    RedisInboundDeduplicator,
+    dedup_key,
+)
 from .runtime import (
     DispatchContext,
+    DuplicateDeliveryError,
     InboundRuntime,
     InboundRuntimeDependencies,
     InboundRuntimeError,
@@ -10,14 +18,44 @@ from .runtime import (
     ProcessorFailureError,
     UnsupportedPlatformError,
 )
+from .scheduler import (
+    InboundQueueFullError,
+    InboundScheduler,
+    InboundSchedulerStats,
+    MailboxKey,
+)
+from .streams import (
+    IInboundStreamBackend,
+    InboundStreamRecord,
+    InboundStreamTransport,
+    InboundStreamWorker,
+    MemoryInboundStreamBackend,
+    RedisInboundStreamBackend,
+)
 
 __all__ = (
     "DispatchContext",
+    "DuplicateDeliveryError",
+    "IInboundDeduplicator",
+    "IInboundStreamBackend",
+    "InboundDedupStats",
+    "InboundQueueFullError",
     "InboundRuntime",
     "InboundRuntimeDependencies",
     "InboundRuntimeError",
+    "InboundScheduler",
+    "InboundSchedulerStats",
+    "InboundStreamRecord",
+    "InboundStreamTransport",
+    "InboundStreamWorker",
     "InvalidInboxError",
+    "MailboxKey",
+    "MemoryInboundDeduplicator",
+    "MemoryInboundStreamBackend",
     "PayloadInboxMismatchError",
     "ProcessorFailureError",
+    "RedisInboundDeduplicator",
+    "RedisInboundStreamBackend",
     "UnsupportedPlatformError",
+    "dedup_key",
 )
@@ -0,0 +1,224 @@
+"""Redelivery deduplication for inbound messages and status updates.
+
+Meta redelivers a webhook whenever it does not see a timely ``200``, so the
+same ``wamid`` (or the same status transition for it) can arrive several
+times. The deduplicator claims one key per event before any credential
+lookup or cache factory construction, and the runtime drops events whose key
+was already claimed.
+"""
+
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from wappa.webhooks.core.webhook_interfaces import (
+    InboundMessageWebhook,
+    StatusWebhook,
+    UniversalWebhook,
+)
+
+if TYPE_CHECKING:
+    from wappa.persistence.redis.redis_client import PoolAlias
+
+
+def dedup_key(inbox_id: str, universal_webhook: UniversalWebhook) -> str | None:
+    """Key identifying one delivery of an event, or None if it is never deduped.
+
+    Messages are keyed by ``wamid``. Statuses are keyed by ``wamid`` plus
+    status, because ``sent`` → ``delivered`` → ``read`` for one message are
+    distinct events that share an id.
+    """
+    if isinstance(universal_webhook, InboundMessageWebhook):
+        message_id = universal_webhook.message.message_id
+        return f"msg:{inbox_id}:{message_id}" if message_id else None
+    if isinstance(universal_webhook, StatusWebhook):
+        if not universal_webhook.message_id:
+            return None
+        status = getattr(universal_webhook.status, "value", universal_webhook.status)
+        return f"status:{inbox_id}:{universal_webhook.message_id}:{status}"
+    return None
+
+
+@dataclass(frozen=True)
+class InboundDedupStats:
+    """Point-in-time view of the deduplicator."""
+
+    backend: str
+    checked: int
+    duplicates: int
+    hit_rate: float
+
+
+class IInboundDeduplicator(ABC):
+    """Claims event keys so each event is dispatched once per TTL window."""
+
+    def __init__(self) -> None:
+        self._checked = 0
+        self._duplicates = 0
+
+    ttl_seconds: int
+
+    async def claim(
+        self, keys: Sequence[str], *, lease_seconds: float | None = None
+    ) -> list[bool]:
+        """Claim every key; True where the key is new, False for duplicates.
+
+        A key repeated inside ``keys`` is new only at its first position.
+        With ``lease_seconds`` the claim lapses after that long unless
+        :meth:`confirm` extends it, so a claimant that dies before
+        dispatching does not hide the event from the next attempt.
+        """
+        if not keys:
+            return []
+        ttl = self.ttl_seconds if lease_seconds is None else lease_seconds
+        claimed = await self._claim(keys, ttl)
+        self._checked += len(keys)
+        self._duplicates += claimed.count(False)
+        return claimed
+
+    @abstractmethod
+    async def _claim(self, keys: Sequence[str], ttl_seconds: float) -> list[bool]: ...
+
+    @abstractmethod
+    async def confirm(self, keys: Sequence[str]) -> None:
+        """Hold leased keys for the full TTL once their events were dispatched."""
+
+    @abstractmethod
+    async def extend(self, keys: Sequence[str], lease_seconds: float) -> None:
+        """Renew the lease on keys still being dispatched.
+
+        Keys that are no longer held are left alone.
+        """
+
+    @abstractmethod
+    async def release(self, keys: Sequence[str]) -> None:
+        """Forget claimed keys so a redelivery is processed again.
+
+        The runtime releases a delivery's keys when it fails before dispatch.
+        """
+
+    def get_stats(self) -> InboundDedupStats:
+        return InboundDedupStats(
+            backend=type(self).__name__,
+            checked=self._checked,
+            duplicates=self._duplicates,
+            hit_rate=round(self._duplicates / self._checked, 4)
+            if self._checked
+            else 0.0,
+        )
+
+
+class MemoryInboundDeduplicator(IInboundDeduplicator):
+    """Bounded in-process LRU of recently seen keys with a per-key TTL.
+
+    Used for the memory and JSON cache backends, where one process sees
+    every delivery. When ``max_entries`` is reached the least recently
+    claimed key is evicted, so a very late redelivery may slip through.
+    """
+
+    def __init__(self, *, ttl_seconds: int = 86_400, max_entries: int = 100_000):
+        super().__init__()
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    async def _claim(self, keys: Sequence[str], ttl_seconds: float) -> list[bool]:
+        now = time.monotonic()
+        claimed: list[bool] = []
+        for key in keys:
+            expires_at = self._seen.get(key)
+            if expires_at is not None and expires_at > now:
+                claimed.append(False)
+                continue
+            self._seen[key] = now + ttl_seconds
+            self._seen.move_to_end(key)
+            claimed.append(True)
+        self._evict()
+        return claimed
+
+    async def confirm(self, keys: Sequence[str]) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        for key in keys:
+            self._seen[key] = expires_at
+            self._seen.move_to_end(key)
+        self._evict()
+
+    async def extend(self, keys: Sequence[str], lease_seconds: float) -> None:
+        now = time.monotonic()
+        for key in keys:
+            expires_at = self._seen.get(key)
+            if expires_at is not None and expires_at > now:
+                self._seen[key] = max(expires_at, now + lease_seconds)
+
+    def _evict(self) -> None:
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+    async def release(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._seen.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class RedisInboundDeduplicator(IInboundDeduplicator):
+    """``SET NX EX`` per key, pipelined per delivery, shared by all workers."""
+
+    def __init__(
+        self,
+        *,
+        alias: PoolAlias = "state_handler",
+        ttl_seconds: int = 86_400,
+        key_prefix: str = "wappa:dedup",
+    ):
+        super().__init__()
+        self.alias = alias
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    async def _client(self):
+        from wappa.persistence.redis.redis_manager import RedisManager
+
+        return await RedisManager.get_client(self.alias)
+
+    async def _claim(self, keys: Sequence[str], ttl_seconds: float) -> list[bool]:
+        ttl_ms = max(1, int(ttl_seconds * 1000))
+        redis = await self._client()
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(f"{self.key_prefix}:{key}", "1", nx=True, px=ttl_ms)
+            results = await pipe.execute()
+        return [bool(result) for result in results]
+
+    async def confirm(self, keys: Sequence[str]) -> None:
+        if not keys:
+            return
+        redis = await self._client()
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(f"{self.key_prefix}:{key}", "1", ex=self.ttl_seconds)
+            await pipe.execute()
+
+    async def extend(self, keys: Sequence[str], lease_seconds: float) -> None:
+        if not keys:
+            return
+        lease_ms = max(1, int(lease_seconds * 1000))
+        redis = await self._client()
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.pexpire(f"{self.key_prefix}:{key}", lease_ms)
+            await pipe.execute()
+
+    async def release(self, keys: Sequence[str]) -> None:
+        if not keys:
+            return
+        redis = await self._client()
+        await redis.delete(*(f"{self.key_prefix}:{key}" for key in keys))
@@ -0,0 +1,42 @@
+"""JSON decoding for inbound webhook bodies.
+
+Uses ``orjson`` when it is installed (``pip install wappa[speedups]``) and
+the standard library otherwise. Both paths take the raw request bytes, so a
+body is read once, verified once and decoded once.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+class PayloadDecodeError(ValueError):
+    """Raised when a webhook body is not a JSON object."""
+
+
+def decode_payload(body: bytes | str) -> dict[str, Any]:
+    """Decode a webhook body into the dict the processors consume."""
+    try:
+        payload = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError as exc:
+        raise PayloadDecodeError(f"Webhook body is not valid JSON: {exc}") from exc
+    if not isinstance(payload, dict):
+        raise PayloadDecodeError(
+            f"Webhook body must be a JSON object, got {type(payload).__name__}"
+        )
+    return payload
+
+
+def encode_payload(payload: dict[str, Any]) -> str:
+    """Encode a payload compactly, for queues that did not keep the raw body."""
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload, separators=(",", ":"))
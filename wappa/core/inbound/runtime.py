@@ -3,18 +3,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any
+from functools import partial
+from typing import TYPE_CHECKING, Any, cast
 
 from wappa.core.events import WappaEventDispatcher
 from wappa.core.logging.context import set_request_context
 from wappa.core.logging.logger import get_logger
-from wappa.core.messaging.pipeline import MessengerPipeline
+from wappa.core.messaging.registry import MessengerRegistry
 from wappa.core.sse.context import (
     classify_meta_identifier,
     derive_identifiers,
     sse_event_scope,
 )
-from wappa.domain.factories import MessengerFactory
 from wappa.domain.interfaces.inbox_credential_store import IInboxCredentialStore
 from wappa.persistence.cache_factory import create_cache_factory
 from wappa.processors.base_processor import ProcessorError
@@ -29,6 +29,8 @@ from wappa.webhooks.core.webhook_interfaces import (
     UniversalWebhook,
 )
 
+from .dedup import IInboundDeduplicator, dedup_key
+
 if TYPE_CHECKING:
     from collections.abc import Callable, Sequence
 
@@ -59,6 +61,10 @@ class ProcessorFailureError(InboundRuntimeError):
     """Raised when platform payload translation fails."""
 
 
+class DuplicateDeliveryError(InboundRuntimeError):
+    """Raised when a single-event build finds only redelivered events."""
+
+
 @dataclass(frozen=True)
 class InboundRuntimeDependencies:
     """Dependencies needed to build a Dispatch Context for one inbound event."""
@@ -71,6 +77,61 @@ class InboundRuntimeDependencies:
     media_download_client_provider: Callable[[], httpx.AsyncClient]
     redis_manager: Any | None = None
     postgres_session_manager: Any | None = None
+    inbound_scheduler: Any | None = None
+    inbound_transport: Any | None = None
+    inbound_deduplicator: IInboundDeduplicator | None = None
+    messenger_registry: MessengerRegistry | None = None
+
+    def __post_init__(self) -> None:
+        # Ad-hoc dependencies (tests, scripts) get a private registry; it is
+        # not subscribed to credential invalidations, so building many of
+        # them leaves nothing behind on the long-lived credential store.
+        if self.messenger_registry is None:
+            object.__setattr__(
+                self,
+                "messenger_registry",
+                MessengerRegistry(
+                    session_provider=self.session_provider,
+                    media_download_client_provider=self.media_download_client_provider,
+                    credential_store=self.inbox_credential_store,
+                    messenger_middleware=self.messenger_middleware,
+                ),
+            )
+
+    @classmethod
+    def from_app_state(cls, app_state: Any) -> InboundRuntimeDependencies:
+        """Assemble dependencies from what Wappa's plugins publish on app.state."""
+        session_lifecycle = getattr(app_state, "session_lifecycle", None)
+        if session_lifecycle is None:
+            raise RuntimeError(
+                "app.state.session_lifecycle is not set — WappaCorePlugin "
+                "must run startup before handling webhooks"
+            )
+        store = getattr(app_state, "inbox_credential_store", None)
+        if store is None:
+            raise RuntimeError(
+                "IInboxCredentialStore not found in app.state — ensure "
+                "WappaBuilder.with_whatsapp() or a credential store plugin "
+                "was configured before startup"
+            )
+        return cls(
+            session_provider=session_lifecycle.get_session,
+            inbox_credential_store=cast(IInboxCredentialStore, store),
+            messenger_middleware=getattr(app_state, "messenger_middleware", ()),
+            cache_type=getattr(app_state, "wappa_cache_type", "memory"),
+            background_work_tracker=app_state.background_work_tracker,
+            redis_manager=getattr(app_state, "redis_manager", None),
+            postgres_session_manager=getattr(
+                app_state, "postgres_session_manager", None
+            ),
+            media_download_client_provider=(
+                session_lifecycle.get_media_download_client
+            ),
+            inbound_scheduler=getattr(app_state, "inbound_scheduler", None),
+            inbound_transport=getattr(app_state, "inbound_transport", None),
+            inbound_deduplicator=getattr(app_state, "inbound_deduplicator", None),
+            messenger_registry=MessengerRegistry.from_app_state(app_state),
+        )
 
 
 @dataclass(frozen=True)
@@ -87,6 +148,7 @@ class DispatchContext:
     sse_phone_number: str | None
     sse_platform: str
     background_work_tracker: Any = None
+    dedup_key: str | None = None
 
 
 class InboundRuntime:
@@ -96,7 +158,7 @@ class InboundRuntime:
         self.event_dispatcher = event_dispatcher
         self.logger = get_logger(__name__)
         self._system_user_fallback = "__system__"
-        self._status_cache_scan_user = "__scan__"
+        self._status_index_user = "__identity_index__"
 
     async def accept_webhook(
         self,
@@ -105,19 +167,108 @@ class InboundRuntime:
         inbox_id: str,
         payload: dict[str, Any],
         dependencies: InboundRuntimeDependencies,
+        raw_body: bytes | None = None,
     ) -> dict[str, str]:
-        """Validate, build Dispatch Context, and schedule event dispatch."""
-        dispatch_context = await self.build_dispatch_context(
+        """Validate, build Dispatch Contexts, and schedule event dispatch.
+
+        With an ``InboundStreamTransport`` the delivery is only appended to
+        its inbound stream and dispatched later by a stream worker. With an
+        ``InboundScheduler`` each event joins its (inbox, user) mailbox;
+        without either the whole delivery runs as one tracked task.
+
+        ``raw_body`` is the verified request body ``payload`` was decoded
+        from; the stream transport stores it instead of re-encoding.
+        """
+        transport = dependencies.inbound_transport
+        if transport is not None:
+            if not inbox_id:
+                raise InvalidInboxError("Inbox ID is required")
+            if not await dependencies.inbox_credential_store.validate_inbox(inbox_id):
+                raise InvalidInboxError(f"Invalid or inactive inbox: {inbox_id}")
+            await transport.enqueue(
+                platform=platform,
+                inbox_id=inbox_id,
+                payload=payload,
+                raw_body=raw_body,
+            )
+            return {"status": "accepted"}
+
+        dispatch_contexts = await self.build_dispatch_contexts(
             platform=platform,
             inbox_id=inbox_id,
             payload=payload,
             dependencies=dependencies,
         )
+        if not dispatch_contexts:
+            return {"status": "duplicate"}
+
+        try:
+            self._schedule(inbox_id, dispatch_contexts, dependencies)
+        except BaseException:
+            # A shed or draining hand-off is retried by the platform, and that
+            # retry must not be mistaken for a redelivery.
+            await self.release_claims(dispatch_contexts, dependencies)
+            raise
+        return {"status": "accepted"}
+
+    def _schedule(
+        self,
+        inbox_id: str,
+        dispatch_contexts: Sequence[DispatchContext],
+        dependencies: InboundRuntimeDependencies,
+    ) -> None:
+        scheduler = dependencies.inbound_scheduler
+        if scheduler is not None:
+            scheduler.submit(
+                [
+                    (
+                        (dispatch_context.inbox_id, dispatch_context.user_id),
+                        partial(self.dispatch, dispatch_context),
+                    )
+                    for dispatch_context in dispatch_contexts
+                ]
+            )
+            return
+
+        if len(dispatch_contexts) == 1:
+            task_name = f"inbound:{inbox_id}:{dispatch_contexts[0].user_id}"
+        else:
+            task_name = f"inbound:{inbox_id}:batch[{len(dispatch_contexts)}]"
         dependencies.background_work_tracker.track(
-            self.dispatch(dispatch_context),
-            name=f"inbound:{dispatch_context.inbox_id}:{dispatch_context.user_id}",
+            self.dispatch_all(dispatch_contexts),
+            name=task_name,
         )
-        return {"status": "accepted"}
+
+    async def release_claims(
+        self,
+        dispatch_contexts: Sequence[DispatchContext],
+        dependencies: InboundRuntimeDependencies,
+    ) -> None:
+        """Release the dedup keys of contexts that will not be dispatched."""
+        keys = _claimed_keys(dispatch_contexts)
+        if keys and dependencies.inbound_deduplicator is not None:
+            await dependencies.inbound_deduplicator.release(keys)
+
+    async def extend_claims(
+        self,
+        dispatch_contexts: Sequence[DispatchContext],
+        dependencies: InboundRuntimeDependencies,
+        lease_seconds: float,
+    ) -> None:
+        """Renew the dedup leases of contexts that are still being dispatched."""
+        keys = _claimed_keys(dispatch_contexts)
+        if keys and dependencies.inbound_deduplicator is not None:
+            await dependencies.inbound_deduplicator.extend(keys, lease_seconds)
+
+    async def confirm_claims(
+        self,
+        dispatch_contexts: Sequence[DispatchContext],
+        dependencies: InboundRuntimeDependencies,
+    ) -> None:
+        """Hold the dedup keys of dispatched contexts for the full TTL."""
+        keys = _claimed_keys(dispatch_contexts)
+        if keys and dependencies.inbound_deduplicator is not None:
+            await dependencies.inbound_deduplicator.confirm(keys)
 
     async def build_dispatch_context(
         self,
@@ -127,22 +278,135 @@ class InboundRuntime:
         payload: dict[str, Any],
         dependencies: InboundRuntimeDependencies,
     ) -> DispatchContext:
+        """Build the Dispatch Context for the first event in the payload.
+
+        Batched deliveries carry several events; use
+        :meth:`build_dispatch_contexts` to receive one context per event.
+        """
+        dispatch_contexts = await self.build_dispatch_contexts(
+            platform=platform,
+            inbox_id=inbox_id,
+            payload=payload,
+            dependencies=dependencies,
+        )
+        if not dispatch_contexts:
+            raise DuplicateDeliveryError(
+                f"Every event in the delivery for inbox {inbox_id} was already seen"
+            )
+        return dispatch_contexts[0]
+
+    async def build_dispatch_contexts(
+        self,
+        *,
+        platform: PlatformType,
+        inbox_id: str,
+        payload: dict[str, Any],
+        dependencies: InboundRuntimeDependencies,
+        dedup_lease_seconds: float | None = None,
+    ) -> list[DispatchContext]:
+        """Build one Dispatch Context per message and status in the payload.
+
+        With an ``inbound_deduplicator`` configured, events already seen are
+        left out; a delivery made only of redeliveries yields no contexts.
+        Each context carries the key it claimed. ``dedup_lease_seconds``
+        claims keys for that long only; the caller then confirms them with
+        :meth:`confirm_claims` after dispatch.
+
+        The inbox, its credentials, the messenger and the cache factory are
+        resolved once per delivery and shared by every context in it, so a
+        batched delivery does less work per event than a single one.
+        """
         if not inbox_id:
             raise InvalidInboxError("Inbox ID is required")
 
-        if not await dependencies.inbox_credential_store.validate_inbox(inbox_id):
-            raise InvalidInboxError(f"Invalid or inactive inbox: {inbox_id}")
-
-        universal_webhook = await self._create_universal_webhook(
+        universal_webhooks = await self._create_universal_webhooks(
             platform=platform,
             inbox_id=inbox_id,
             payload=payload,
         )
-        self._validate_payload_inbox(inbox_id, universal_webhook)
+        for universal_webhook in universal_webhooks:
+            self._validate_payload_inbox(inbox_id, universal_webhook)
+
+        # Redeliveries are dropped before any credential or cache work.
+        fresh = await self._drop_duplicates(
+            inbox_id, universal_webhooks, dependencies, dedup_lease_seconds
+        )
+        if not fresh:
+            return []
+        universal_webhooks = [webhook for webhook, _ in fresh]
+        claimed_keys = [key for _, key in fresh if key is not None]
+
+        try:
+            if not await dependencies.inbox_credential_store.validate_inbox(inbox_id):
+                raise InvalidInboxError(f"Invalid or inactive inbox: {inbox_id}")
+
+            statuses = [
+                webhook
+                for webhook in universal_webhooks
+                if isinstance(webhook, StatusWebhook)
+            ]
+            if statuses:
+                await self._enrich_status_user_ids(statuses, inbox_id, dependencies)
+
+            envelope = await self._create_dispatch_envelope(
+                platform=platform,
+                inbox_id=inbox_id,
+                dependencies=dependencies,
+            )
+        except BaseException:
+            # Nothing was dispatched, so the redelivery must not count as seen.
+            if claimed_keys:
+                await dependencies.inbound_deduplicator.release(claimed_keys)
+            raise
+
+        return [
+            self._build_dispatch_context(
+                platform=platform,
+                inbox_id=inbox_id,
+                universal_webhook=universal_webhook,
+                envelope=envelope,
+                dependencies=dependencies,
+                dedup_key=key,
+            )
+            for universal_webhook, key in fresh
+        ]
 
-        if isinstance(universal_webhook, StatusWebhook):
-            await self._enrich_status_user_id(universal_webhook, inbox_id, dependencies)
+    async def _drop_duplicates(
+        self,
+        inbox_id: str,
+        universal_webhooks: list[UniversalWebhook],
+        dependencies: InboundRuntimeDependencies,
+        lease_seconds: float | None,
+    ) -> list[tuple[UniversalWebhook, str | None]]:
+        """New events paired with the key claimed for them (None if unkeyed)."""
+        deduplicator = dependencies.inbound_deduplicator
+        if deduplicator is None:
+            return [(webhook, None) for webhook in universal_webhooks]
+
+        keyed = [
+            (webhook, dedup_key(inbox_id, webhook)) for webhook in universal_webhooks
+        ]
+        keys = [key for _, key in keyed if key is not None]
+        claimed = iter(await deduplicator.claim(keys, lease_seconds=lease_seconds))
+
+        fresh: list[tuple[UniversalWebhook, str | None]] = []
+        for webhook, key in keyed:
+            if key is None or next(claimed):
+                fresh.append((webhook, key))
+            else:
+                self.logger.info("Dropping redelivered event %s", key)
+        return fresh
 
+    def _build_dispatch_context(
+        self,
+        *,
+        platform: PlatformType,
+        inbox_id: str,
+        universal_webhook: UniversalWebhook,
+        envelope: _DispatchEnvelope,
+        dependencies: InboundRuntimeDependencies,
+        dedup_key: str | None = None,
+    ) -> DispatchContext:
         user_id = self._resolve_handler_user_id(universal_webhook)
         set_request_context(inbox_id=inbox_id, user_id=user_id)
 
@@ -155,11 +419,11 @@ class InboundRuntime:
             else platform.value
         )
 
-        request_handler = await self._create_dispatch_handler(
+        request_handler = self._create_dispatch_handler(
             platform=platform,
             inbox_id=inbox_id,
             user_id=user_id,
-            dependencies=dependencies,
+            envelope=envelope,
         )
 
         self.logger.info(
@@ -181,8 +445,18 @@ class InboundRuntime:
             sse_phone_number=sse_phone_number,
             sse_platform=sse_platform,
             background_work_tracker=dependencies.background_work_tracker,
+            dedup_key=dedup_key,
         )
 
+    async def dispatch_all(self, dispatch_contexts: Sequence[DispatchContext]) -> None:
+        """Dispatch every context of one delivery in payload order.
+
+        Each dispatch isolates its own failures, so one failing event never
+        prevents the rest of the batch from reaching its handler.
+        """
+        for dispatch_context in dispatch_contexts:
+            await self.dispatch(dispatch_context)
+
     async def dispatch(self, dispatch_context: DispatchContext) -> None:
         """Dispatch a UniversalWebhook using its Dispatch Context."""
         set_request_context(
@@ -226,20 +500,19 @@ class InboundRuntime:
                 exc_info=True,
             )
 
-    async def _create_universal_webhook(
+    async def _create_universal_webhooks(
         self,
         *,
         platform: PlatformType,
         inbox_id: str,
         payload: dict[str, Any],
-    ) -> UniversalWebhook:
+    ) -> list[UniversalWebhook]:
         try:
             processor = processor_factory.get_processor(platform)
-            universal_webhook = await processor.create_universal_webhook(
+            universal_webhooks = await processor.create_universal_webhooks(
                 payload=payload,
                 inbox_id=inbox_id,
             )
-            return universal_webhook
         except UnsupportedPlatformError:
             raise
         except ProcessorError as exc:
@@ -249,6 +522,12 @@ class InboundRuntime:
                 f"Failed to transform {platform.value} webhook: {exc}"
             ) from exc
 
+        if not universal_webhooks:
+            raise ProcessorFailureError(
+                f"{platform.value} webhook carried no events to dispatch"
+            )
+        return universal_webhooks
+
     def _validate_payload_inbox(
         self,
         routed_inbox_id: str,
@@ -260,34 +539,18 @@ class InboundRuntime:
                 f"Payload inbox_id {payload_inbox_id!r} does not match routed inbox_id {routed_inbox_id!r}"
             )
 
-    async def _create_dispatch_handler(
+    async def _create_dispatch_envelope(
         self,
         *,
         platform: PlatformType,
         inbox_id: str,
-        user_id: str,
         dependencies: InboundRuntimeDependencies,
-    ) -> WappaEventHandler:
+    ) -> _DispatchEnvelope:
         try:
-            messenger_factory = MessengerFactory(
-                session_provider=dependencies.session_provider,
-                credential_store=dependencies.inbox_credential_store,
-                media_download_client_provider=dependencies.media_download_client_provider,
-            )
-            raw_messenger = await messenger_factory.create_messenger(
-                platform=platform,
-                inbox_id=inbox_id,
-            )
-            messenger: IMessenger = MessengerPipeline(
-                raw=raw_messenger,
-                middleware=dependencies.messenger_middleware,
-            )
+            registry = cast(MessengerRegistry, dependencies.messenger_registry)
+            messenger: IMessenger = await registry.get(inbox_id, platform)
 
-            cache_factory = self._create_cache_factory(
-                dependencies=dependencies,
-                inbox_id=inbox_id,
-                user_id=user_id,
-            )
+            cache_factory_class = self._resolve_cache_factory_class(dependencies)
 
             session_manager = dependencies.postgres_session_manager
             db = session_manager.get_session if session_manager else None
@@ -300,14 +563,39 @@ class InboundRuntime:
                     "call app.register_handler() or WappaBuilder.with_event_handler() "
                     "before processing webhooks"
                 )
+        except Exception as exc:
+            raise RuntimeError(
+                f"Dispatch Context creation failed for inbox '{inbox_id}', "
+                f"platform '{platform.value}': "
+                f"{type(exc).__name__}: {exc}"
+            ) from exc
+
+        return _DispatchEnvelope(
+            base_handler=base_handler,
+            messenger=messenger,
+            cache_factory_class=cache_factory_class,
+            db=db,
+            db_read=db_read,
+        )
 
-            return base_handler.with_context(
+    def _create_dispatch_handler(
+        self,
+        *,
+        platform: PlatformType,
+        inbox_id: str,
+        user_id: str,
+        envelope: _DispatchEnvelope,
+    ) -> WappaEventHandler:
+        try:
+            return envelope.base_handler.with_context(
                 inbox_id=inbox_id,
                 user_id=user_id,
-                messenger=messenger,
-                cache_factory=cache_factory,
-                db=db,
-                db_read=db_read,
+                messenger=envelope.messenger,
+                cache_factory=envelope.cache_factory_class(
+                    inbox_id=inbox_id, user_id=user_id
+                ),
+                db=envelope.db,
+                db_read=envelope.db_read,
             )
         except Exception as exc:
             raise RuntimeError(
@@ -316,13 +604,10 @@ class InboundRuntime:
                 f"{type(exc).__name__}: {exc}"
             ) from exc
 
-    def _create_cache_factory(
+    def _resolve_cache_factory_class(
         self,
-        *,
         dependencies: InboundRuntimeDependencies,
-        inbox_id: str,
-        user_id: str,
-    ) -> ICacheFactory:
+    ) -> type[ICacheFactory]:
         cache_type = dependencies.cache_type
         if cache_type == "redis":
             redis_manager = dependencies.redis_manager
@@ -337,8 +622,7 @@ class InboundRuntime:
                     "Check Redis server connectivity and startup logs."
                 )
 
-        factory_class = create_cache_factory(cache_type)
-        return factory_class(inbox_id=inbox_id, user_id=user_id)
+        return create_cache_factory(cache_type)
 
     def _resolve_handler_user_id(self, universal_webhook: UniversalWebhook) -> str:
         if isinstance(universal_webhook, InboundMessageWebhook):
@@ -379,29 +663,65 @@ class InboundRuntime:
         bsuid, phone = classify_meta_identifier(fallback_user_id)
         return fallback_user_id, bsuid, phone
 
-    async def _enrich_status_user_id(
+    async def _enrich_status_user_ids(
         self,
-        status: StatusWebhook,
+        statuses: Sequence[StatusWebhook],
         inbox_id: str,
         dependencies: InboundRuntimeDependencies,
     ) -> None:
-        phone = status.recipient_phone_id
-        if not phone or dependencies.cache_type != "redis":
+        phones = {
+            status.recipient_phone_id
+            for status in statuses
+            if status.recipient_phone_id
+        }
+        if not phones:
             return
 
         try:
-            redis_manager = dependencies.redis_manager
-            if redis_manager is None or not redis_manager.is_initialized():
-                return
-
-            factory_class = create_cache_factory("redis")
+            factory_class = self._resolve_cache_factory_class(dependencies)
             cache_factory = factory_class(
                 inbox_id=inbox_id,
-                user_id=self._status_cache_scan_user,
+                user_id=self._status_index_user,
             )
-            user_cache: Any = cache_factory.create_user_cache()
-            result = await user_cache.find_by_field("phone_number", phone)
-            if result:
-                status.user_id = result.get("user_id") or result.get("bsuid")
+            # One batched index read per delivery, however many statuses and
+            # recipients it carries.
+            index = cache_factory.create_identity_index()
+            resolved = await index.get_user_ids(phones)
+            missing = phones - resolved.keys()
+            # Users stored before the index existed are only indexed once
+            # ``rebuild`` ran; until then a miss falls back to the user scan.
+            if missing and not await index.is_complete():
+                user_cache: Any = cache_factory.create_user_cache()
+                for phone in sorted(missing):
+                    result = await user_cache.find_by_field("phone_number", phone)
+                    if result and (
+                        user_id := result.get("user_id") or result.get("bsuid")
+                    ):
+                        resolved[phone] = user_id
         except Exception as exc:
             self.logger.debug("Status user_id enrichment skipped: %s", exc)
+            return
+
+        for status in statuses:
+            user_id = resolved.get(status.recipient_phone_id or "")
+            if user_id:
+                status.user_id = user_id
+
+
+def _claimed_keys(dispatch_contexts: Sequence[DispatchContext]) -> list[str]:
+    return [
+        dispatch_context.dedup_key
+        for dispatch_context in dispatch_contexts
+        if dispatch_context.dedup_key is not None
+    ]
+
+
+@dataclass(frozen=True)
+class _DispatchEnvelope:
+    """Inbox-scoped dispatch dependencies resolved once per delivery."""
+
+    base_handler: WappaEventHandler
+    messenger: IMessenger
+    cache_factory_class: type[ICacheFactory]
+    db: Any
+    db_read: Any
@@ -0,0 +1,206 @@
+"""Per-user ordered mailboxes with bounded concurrency for inbound dispatch."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from wappa.core.logging.logger import get_logger
+from wappa.domain.interfaces.session_provider import RuntimeDrainingError
+
+from .runtime import InboundRuntimeError
+
+if TYPE_CHECKING:
+    from wappa.core.lifecycle import BackgroundWorkTracker
+
+MailboxKey = tuple[str, str]
+"""``(inbox_id, user_id)`` — events sharing a key run strictly in order."""
+
+InboundJob = tuple[MailboxKey, Callable[[], Awaitable[None]]]
+
+
+class InboundQueueFullError(InboundRuntimeError):
+    """Raised when accepting a delivery would exceed the inbound queue bound."""
+
+    def __init__(self, queued: int, incoming: int, retry_after: int) -> None:
+        self.queued = queued
+        self.incoming = incoming
+        self.retry_after = retry_after
+        super().__init__(
+            f"Inbound queue is full ({queued} events waiting, {incoming} more "
+            f"offered) — retry after {retry_after}s"
+        )
+
+
+@dataclass(frozen=True)
+class InboundSchedulerStats:
+    """Point-in-time view of the inbound scheduler."""
+
+    mailboxes: int
+    queued: int
+    in_flight: int
+    max_concurrency: int
+    max_queued: int
+    peak_queued: int
+    accepted: int
+    shed: int
+    completed: int
+    wait_ms_avg: float
+    wait_ms_max: float
+
+
+@dataclass
+class _Job:
+    run: Callable[[], Awaitable[None]]
+    enqueued_at: float
+
+
+class InboundScheduler:
+    """Runs accepted inbound events through one mailbox per (inbox, user).
+
+    Events in the same mailbox run one at a time in acceptance order, so a
+    handler never races another handler for the same conversation. Across
+    mailboxes, at most ``max_concurrency`` handlers run at once. Events that
+    have been accepted but have not started are bounded by ``max_queued``;
+    a delivery that would exceed it is refused whole with
+    :class:`InboundQueueFullError` so the platform redelivers it later.
+
+    Each active mailbox is drained by one task registered with the
+    ``BackgroundWorkTracker``, so shutdown drain waits for queued work
+    exactly as it waits for any other tracked task.
+    """
+
+    def __init__(
+        self,
+        tracker: BackgroundWorkTracker,
+        *,
+        max_concurrency: int = 64,
+        max_queued: int = 10_000,
+        retry_after_seconds: int = 5,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queued < 1:
+            raise ValueError("max_queued must be at least 1")
+
+        self._tracker = tracker
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.retry_after_seconds = retry_after_seconds
+        self.logger = get_logger(__name__)
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._mailboxes: dict[MailboxKey, deque[_Job]] = {}
+        self._queued = 0
+        self._in_flight = 0
+        self._peak_queued = 0
+        self._accepted = 0
+        self._shed = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, jobs: Sequence[InboundJob]) -> None:
+        """Enqueue one delivery's events, all or nothing.
+
+        Raises:
+            RuntimeDrainingError: The runtime is shutting down.
+            InboundQueueFullError: The delivery would exceed ``max_queued``.
+        """
+        if self._tracker.is_draining:
+            raise RuntimeDrainingError(
+                "Wappa runtime is draining — cannot accept new inbound work. "
+                "This delivery arrived after shutdown began."
+            )
+        if self._queued + len(jobs) > self.max_queued:
+            self._shed += len(jobs)
+            raise InboundQueueFullError(
+                queued=self._queued,
+                incoming=len(jobs),
+                retry_after=self.retry_after_seconds,
+            )
+
+        enqueued_at = time.monotonic()
+        for key, run in jobs:
+            mailbox = self._mailboxes.get(key)
+            start_drainer = mailbox is None
+            if mailbox is None:
+                mailbox = self._mailboxes[key] = deque()
+            mailbox.append(_Job(run=run, enqueued_at=enqueued_at))
+            self._queued += 1
+            if start_drainer:
+                self._tracker.track(
+                    self._drain_mailbox(key, mailbox),
+                    name=f"inbound:{key[0]}:{key[1]}",
+                )
+
+        self._accepted += len(jobs)
+        self._peak_queued = max(self._peak_queued, self._queued)
+
+    async def _drain_mailbox(self, key: MailboxKey, mailbox: deque[_Job]) -> None:
+        # The mailbox stays registered until it is empty, so new events for
+        # the same key are appended here instead of starting a second drainer.
+        try:
+            while mailbox:
+                job = mailbox[0]
+                async with self._slots:
+                    mailbox.popleft()
+                    self._queued -= 1
+                    self._record_wait(time.monotonic() - job.enqueued_at)
+                    self._in_flight += 1
+                    try:
+                        await job.run()
+                    except Exception as exc:
+                        self.logger.error(
+                            "Inbound event failed in mailbox %s:%s: %s",
+                            key[0],
+                            key[1],
+                            exc,
+                            exc_info=True,
+                        )
+                    finally:
+                        self._in_flight -= 1
+                        self._completed += 1
+        finally:
+            if mailbox:
+                self.logger.warning(
+                    "Dropping %d queued inbound event(s) for %s:%s after cancellation",
+                    len(mailbox),
+                    key[0],
+                    key[1],
+                )
+                self._queued -= len(mailbox)
+                mailbox.clear()
+            del self._mailboxes[key]
+
+    def _record_wait(self, waited: float) -> None:
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def get_stats(self) -> InboundSchedulerStats:
+        started = self._completed + self._in_flight
+        return InboundSchedulerStats(
+            mailboxes=len(self._mailboxes),
+            queued=self._queued,
+            in_flight=self._in_flight,
+            max_concurrency=self.max_concurrency,
+            max_queued=self.max_queued,
+            peak_queued=self._peak_queued,
+            accepted=self._accepted,
+            shed=self._shed,
+            completed=self._completed,
+            wait_ms_avg=round(self._wait_total / started * 1000, 3) if started else 0.0,
+            wait_ms_max=round(self._wait_max * 1000, 3),
+        )
+
+    @property
+    def queued_count(self) -> int:
+        return self._queued
+
+    @property
+    def in_flight_count(self) -> int:
+        return self._in_flight
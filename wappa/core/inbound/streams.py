@@ -0,0 +1,663 @@
+"""Durable inbound queue on Redis Streams with consumer-group workers.
+
+In queue mode the webhook route only appends the verified payload to a
+stream and answers; :class:`InboundStreamWorker` instances — in the same
+process or in dedicated worker processes — read the stream through a
+consumer group, run the payload through :class:`InboundRuntime`, and
+acknowledge it once every event in it has been dispatched. Entries whose
+worker died before acknowledging are reclaimed by the next worker after
+``reclaim_idle_ms``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from wappa.core.logging.logger import get_logger
+from wappa.schemas.core.types import PlatformType
+
+from .payload_codec import decode_payload, encode_payload
+from .runtime import InboundRuntimeError
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+    from .runtime import DispatchContext, InboundRuntime, InboundRuntimeDependencies
+
+
+@dataclass(frozen=True)
+class InboundStreamRecord:
+    """One stream entry as delivered to a consumer."""
+
+    stream: str
+    entry_id: str
+    fields: Mapping[str, str]
+
+
+class IInboundStreamBackend(ABC):
+    """The handful of stream commands the inbound queue needs.
+
+    :class:`RedisInboundStreamBackend` maps them onto Redis Streams;
+    :class:`MemoryInboundStreamBackend` is an in-process stand-in with the
+    same delivery semantics for tests and single-process development.
+    """
+
+    @abstractmethod
+    async def append(
+        self, stream: str, fields: Mapping[str, str], *, maxlen: int | None = None
+    ) -> str:
+        """Append an entry and return its id (``XADD``)."""
+
+    @abstractmethod
+    async def ensure_group(self, stream: str, group: str) -> None:
+        """Create the consumer group and stream if missing (``XGROUP CREATE``)."""
+
+    @abstractmethod
+    async def read_group(
+        self,
+        streams: Sequence[str],
+        group: str,
+        consumer: str,
+        *,
+        count: int,
+        block_ms: int,
+    ) -> list[InboundStreamRecord]:
+        """Read entries never delivered to the group (``XREADGROUP >``)."""
+
+    @abstractmethod
+    async def ack(self, stream: str, group: str, entry_ids: Sequence[str]) -> int:
+        """Acknowledge processed entries (``XACK``)."""
+
+    @abstractmethod
+    async def touch(
+        self, stream: str, group: str, consumer: str, entry_ids: Sequence[str]
+    ) -> None:
+        """Reset the idle time of entries still being processed (``XCLAIM JUSTID``)."""
+
+    @abstractmethod
+    async def autoclaim(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        *,
+        min_idle_ms: int,
+        count: int,
+    ) -> list[InboundStreamRecord]:
+        """Take over entries pending longer than ``min_idle_ms`` (``XAUTOCLAIM``)."""
+
+    async def close(self) -> None:
+        """Release backend resources."""
+        return None
+
+
+class RedisInboundStreamBackend(IInboundStreamBackend):
+    """Redis Streams backend. The client must use ``decode_responses=True``."""
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def append(
+        self, stream: str, fields: Mapping[str, str], *, maxlen: int | None = None
+    ) -> str:
+        return await self.redis.xadd(
+            stream, dict(fields), maxlen=maxlen, approximate=True
+        )
+
+    async def ensure_group(self, stream: str, group: str) -> None:
+        from redis.exceptions import ResponseError
+
+        try:
+            await self.redis.xgroup_create(stream, group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def read_group(
+        self,
+        streams: Sequence[str],
+        group: str,
+        consumer: str,
+        *,
+        count: int,
+        block_ms: int,
+    ) -> list[InboundStreamRecord]:
+        response = await self.redis.xreadgroup(
+            group,
+            consumer,
+            dict.fromkeys(streams, ">"),
+            count=count,
+            block=block_ms,
+        )
+        if not response:
+            return []
+        # RESP2 answers a list of [stream, entries]; RESP3 a mapping.
+        items = response.items() if isinstance(response, dict) else response
+        records: list[InboundStreamRecord] = []
+        for stream, entries in items:
+            if isinstance(entries, list) and entries and isinstance(entries[0], list):
+                entries = entries[0]
+            records.extend(
+                InboundStreamRecord(stream=stream, entry_id=entry_id, fields=fields)
+                for entry_id, fields in entries
+                if fields
+            )
+        return records
+
+    async def ack(self, stream: str, group: str, entry_ids: Sequence[str]) -> int:
+        if not entry_ids:
+            return 0
+        return await self.redis.xack(stream, group, *entry_ids)
+
+    async def touch(
+        self, stream: str, group: str, consumer: str, entry_ids: Sequence[str]
+    ) -> None:
+        if not entry_ids:
+            return
+        await self.redis.xclaim(
+            stream,
+            group,
+            consumer,
+            min_idle_time=0,
+            message_ids=list(entry_ids),
+            justid=True,
+        )
+
+    async def autoclaim(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        *,
+        min_idle_ms: int,
+        count: int,
+    ) -> list[InboundStreamRecord]:
+        response = await self.redis.xautoclaim(
+            stream, group, consumer, min_idle_time=min_idle_ms, count=count
+        )
+        # Trimmed entries come back with no fields; they cannot be replayed.
+        return [
+            InboundStreamRecord(stream=stream, entry_id=entry_id, fields=fields)
+            for entry_id, fields in response[1]
+            if fields
+        ]
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+@dataclass
+class _MemoryPending:
+    consumer: str
+    delivered_at: float
+    deliveries: int = 1
+
+
+@dataclass
+class _MemoryGroup:
+    next_index: int = 0
+    pending: dict[str, _MemoryPending] = field(default_factory=dict)
+
+
+@dataclass
+class _MemoryStream:
+    entries: deque[tuple[str, dict[str, str]]] = field(default_factory=deque)
+    trimmed: int = 0
+    sequence: int = 0
+    groups: dict[str, _MemoryGroup] = field(default_factory=dict)
+
+
+class MemoryInboundStreamBackend(IInboundStreamBackend):
+    """In-process stream backend with consumer-group delivery semantics.
+
+    Entries survive only as long as the process, so this backend gives the
+    ordering, acknowledgement and reclaim behaviour of queue mode without
+    its durability.
+    """
+
+    def __init__(self) -> None:
+        self._streams: dict[str, _MemoryStream] = {}
+        self._appended = asyncio.Event()
+
+    def _stream(self, name: str) -> _MemoryStream:
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = _MemoryStream()
+        return stream
+
+    async def append(
+        self, stream: str, fields: Mapping[str, str], *, maxlen: int | None = None
+    ) -> str:
+        state = self._stream(stream)
+        state.sequence += 1
+        entry_id = f"{int(time.time() * 1000)}-{state.sequence}"
+        state.entries.append((entry_id, dict(fields)))
+        if maxlen is not None:
+            while len(state.entries) > maxlen:
+                state.entries.popleft()
+                state.trimmed += 1
+        self._appended.set()
+        return entry_id
+
+    async def ensure_group(self, stream: str, group: str) -> None:
+        self._stream(stream).groups.setdefault(group, _MemoryGroup())
+
+    async def read_group(
+        self,
+        streams: Sequence[str],
+        group: str,
+        consumer: str,
+        *,
+        count: int,
+        block_ms: int,
+    ) -> list[InboundStreamRecord]:
+        deadline = time.monotonic() + block_ms / 1000
+        while True:
+            records = self._take_new(streams, group, consumer, count)
+            remaining = deadline - time.monotonic()
+            if records or remaining <= 0:
+                return records
+            self._appended.clear()
+            try:
+                await asyncio.wait_for(self._appended.wait(), timeout=remaining)
+            except TimeoutError:
+                return []
+
+    def _take_new(
+        self, streams: Sequence[str], group: str, consumer: str, count: int
+    ) -> list[InboundStreamRecord]:
+        records: list[InboundStreamRecord] = []
+        now = time.monotonic()
+        for name in streams:
+            state = self._stream(name)
+            group_state = state.groups.get(group)
+            if group_state is None:
+                raise RuntimeError(f"NOGROUP no consumer group '{group}' for '{name}'")
+            group_state.next_index = max(group_state.next_index, state.trimmed)
+            while len(records) < count:
+                position = group_state.next_index - state.trimmed
+                if position >= len(state.entries):
+                    break
+                entry_id, fields = state.entries[position]
+                group_state.next_index += 1
+                group_state.pending[entry_id] = _MemoryPending(consumer, now)
+                records.append(InboundStreamRecord(name, entry_id, fields))
+        return records
+
+    async def ack(self, stream: str, group: str, entry_ids: Sequence[str]) -> int:
+        group_state = self._stream(stream).groups.get(group)
+        if group_state is None:
+            return 0
+        return sum(
+            group_state.pending.pop(entry_id, None) is not None
+            for entry_id in entry_ids
+        )
+
+    async def touch(
+        self, stream: str, group: str, consumer: str, entry_ids: Sequence[str]
+    ) -> None:
+        group_state = self._stream(stream).groups.get(group)
+        if group_state is None:
+            return
+        now = time.monotonic()
+        for entry_id in entry_ids:
+            pending = group_state.pending.get(entry_id)
+            if pending is not None:
+                pending.consumer = consumer
+                pending.delivered_at = now
+
+    async def autoclaim(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        *,
+        min_idle_ms: int,
+        count: int,
+    ) -> list[InboundStreamRecord]:
+        state = self._stream(stream)
+        group_state = state.groups.get(group)
+        if group_state is None:
+            return []
+        now = time.monotonic()
+        entries = dict(state.entries)
+        records: list[InboundStreamRecord] = []
+        for entry_id, pending in list(group_state.pending.items()):
+            if len(records) >= count:
+                break
+            if (now - pending.delivered_at) * 1000 < min_idle_ms:
+                continue
+            fields = entries.get(entry_id)
+            if fields is None:
+                del group_state.pending[entry_id]
+                continue
+            pending.consumer = consumer
+            pending.delivered_at = now
+            pending.deliveries += 1
+            records.append(InboundStreamRecord(stream, entry_id, fields))
+        return records
+
+    def pending_count(self, stream: str, group: str) -> int:
+        group_state = self._stream(stream).groups.get(group)
+        return len(group_state.pending) if group_state else 0
+
+
+class InboundStreamTransport:
+    """Routes accepted deliveries onto one of ``shards`` inbound streams.
+
+    Every delivery for an inbox lands on the same shard, so one inbox's
+    events are read back in acceptance order.
+    """
+
+    def __init__(
+        self,
+        backend: IInboundStreamBackend,
+        *,
+        shards: int = 1,
+        stream_prefix: str = "wappa:inbound",
+        group: str = "wappa-inbound",
+        maxlen: int | None = None,
+    ) -> None:
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.backend = backend
+        self.shards = shards
+        self.stream_prefix = stream_prefix
+        self.group = group
+        self.maxlen = maxlen
+        self.enqueued = 0
+
+    @property
+    def streams(self) -> list[str]:
+        return [f"{self.stream_prefix}:{shard}" for shard in range(self.shards)]
+
+    def stream_for(self, inbox_id: str) -> str:
+        shard = zlib.crc32(inbox_id.encode()) % self.shards
+        return f"{self.stream_prefix}:{shard}"
+
+    async def ensure_groups(self) -> None:
+        for stream in self.streams:
+            await self.backend.ensure_group(stream, self.group)
+
+    async def enqueue(
+        self,
+        *,
+        platform: PlatformType,
+        inbox_id: str,
+        payload: dict[str, Any],
+        raw_body: bytes | None = None,
+    ) -> str:
+        """Append one verified delivery and return its entry id.
+
+        The verified request body is stored as received when it is given,
+        so the delivery is not re-encoded on its way into the stream.
+        """
+        entry_id = await self.backend.append(
+            self.stream_for(inbox_id),
+            {
+                "platform": platform.value,
+                "inbox_id": inbox_id,
+                "payload": raw_body.decode()
+                if raw_body is not None
+                else encode_payload(payload),
+                "received_at": str(time.time()),
+            },
+            maxlen=self.maxlen,
+        )
+        self.enqueued += 1
+        return entry_id
+
+
+class InboundStreamWorker:
+    """Consumes one consumer-group member's share of the inbound streams.
+
+    Each read batch is turned into Dispatch Contexts, grouped by (inbox,
+    user), and dispatched with every group running concurrently and every
+    event inside a group running in stream order. Entries are acknowledged
+    after their events are dispatched; handler failures are isolated by
+    :meth:`InboundRuntime.dispatch` and do not hold an entry back.
+
+    Redelivery keys are only leased while an entry is in flight — for half
+    of ``reclaim_idle_ms`` — and are confirmed after dispatch, just before
+    the entry is acknowledged. Every quarter of ``reclaim_idle_ms`` while a
+    batch runs, the worker resets its entries' idle time (``XCLAIM
+    JUSTID``) and renews their leases, so a slow batch is neither reclaimed
+    by another worker nor mistaken for a redelivery. A worker that dies
+    mid-batch stops renewing, leaving its entries claimable by
+    ``XAUTOCLAIM``; one that is cancelled releases its keys straight away.
+
+    Entries that cannot ever succeed — undecodable fields, unknown inboxes,
+    payloads the processor rejects — are acknowledged and logged. Any other
+    failure while building contexts leaves the entry pending so it is
+    retried through ``XAUTOCLAIM`` once it has been idle ``reclaim_idle_ms``.
+    """
+
+    def __init__(
+        self,
+        transport: InboundStreamTransport,
+        runtime: InboundRuntime,
+        dependencies_provider: Callable[[], InboundRuntimeDependencies],
+        *,
+        consumer_name: str,
+        batch_size: int = 32,
+        block_ms: int = 2000,
+        reclaim_idle_ms: int = 60_000,
+        reclaim_interval: float = 30.0,
+    ) -> None:
+        self.transport = transport
+        self.runtime = runtime
+        self.dependencies_provider = dependencies_provider
+        self.consumer_name = consumer_name
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.reclaim_idle_ms = reclaim_idle_ms
+        self.reclaim_interval = reclaim_interval
+        self.logger = get_logger(__name__)
+
+        self.acknowledged = 0
+        self.dropped = 0
+        self.retried = 0
+        self.reclaimed = 0
+        self._stopping = asyncio.Event()
+        self._last_reclaim = 0.0
+
+    def stop(self) -> None:
+        """Finish the batch in hand, then return from :meth:`run`."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        self.logger.info(
+            "Inbound stream worker %s consuming %s (group %s)",
+            self.consumer_name,
+            ", ".join(self.transport.streams),
+            self.transport.group,
+        )
+        while not self._stopping.is_set():
+            try:
+                records = await self._claim_stale()
+                if not records:
+                    records = await self.transport.backend.read_group(
+                        self.transport.streams,
+                        self.transport.group,
+                        self.consumer_name,
+                        count=self.batch_size,
+                        block_ms=self.block_ms,
+                    )
+                if records:
+                    await self.process_records(records)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.logger.error(
+                    "Inbound stream worker %s failed: %s",
+                    self.consumer_name,
+                    exc,
+                    exc_info=True,
+                )
+                await asyncio.sleep(1.0)
+
+    async def _claim_stale(self) -> list[InboundStreamRecord]:
+        now = time.monotonic()
+        if now - self._last_reclaim < self.reclaim_interval:
+            return []
+        self._last_reclaim = now
+
+        records: list[InboundStreamRecord] = []
+        for stream in self.transport.streams:
+            records.extend(
+                await self.transport.backend.autoclaim(
+                    stream,
+                    self.transport.group,
+                    self.consumer_name,
+                    min_idle_ms=self.reclaim_idle_ms,
+                    count=self.batch_size,
+                )
+            )
+        if records:
+            self.reclaimed += len(records)
+            self.logger.warning(
+                "Inbound stream worker %s reclaimed %d stale entr(ies)",
+                self.consumer_name,
+                len(records),
+            )
+        return records
+
+    async def process_records(self, records: Sequence[InboundStreamRecord]) -> None:
+        """Build, dispatch and acknowledge one batch of stream entries."""
+        dependencies = self.dependencies_provider()
+        done: list[InboundStreamRecord] = []
+        mailboxes: dict[tuple[str, str], list[DispatchContext]] = {}
+
+        built: list[DispatchContext] = []
+        heartbeat = asyncio.create_task(self._keep_alive(records, built, dependencies))
+
+        try:
+            for record in records:
+                contexts = await self._build_contexts(record, dependencies)
+                if contexts is None:
+                    continue
+                done.append(record)
+                built.extend(contexts)
+                for context in contexts:
+                    mailboxes.setdefault(
+                        (context.inbox_id, context.user_id), []
+                    ).append(context)
+
+            await asyncio.gather(
+                *(
+                    self.runtime.dispatch_all(contexts)
+                    for contexts in mailboxes.values()
+                )
+            )
+            await self._stop(heartbeat)
+            await self.runtime.confirm_claims(built, dependencies)
+        except BaseException:
+            await self._stop(heartbeat)
+            # Unacknowledged entries are reclaimed later; their keys must not
+            # make them look like redeliveries when that happens.
+            await self.runtime.release_claims(built, dependencies)
+            raise
+
+        await self._ack(done)
+        self.acknowledged += len(done)
+
+    @property
+    def _lease_seconds(self) -> float:
+        return self.reclaim_idle_ms / 2000
+
+    async def _keep_alive(
+        self,
+        records: Sequence[InboundStreamRecord],
+        contexts: Sequence[DispatchContext],
+        dependencies: InboundRuntimeDependencies,
+    ) -> None:
+        """Renew a running batch's entries and leases until it is cancelled.
+
+        ``contexts`` grows as the batch is built; each beat renews what has
+        been claimed so far.
+        """
+        by_stream: dict[str, list[str]] = {}
+        for record in records:
+            by_stream.setdefault(record.stream, []).append(record.entry_id)
+        while True:
+            await asyncio.sleep(self.reclaim_idle_ms / 4000)
+            try:
+                for stream, entry_ids in by_stream.items():
+                    await self.transport.backend.touch(
+                        stream, self.transport.group, self.consumer_name, entry_ids
+                    )
+                await self.runtime.extend_claims(
+                    list(contexts), dependencies, self._lease_seconds
+                )
+            except Exception as exc:
+                self.logger.warning(
+                    "Inbound stream worker %s could not renew its batch: %s",
+                    self.consumer_name,
+                    exc,
+                )
+
+    @staticmethod
+    async def _stop(task: asyncio.Task[None]) -> None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    async def _build_contexts(
+        self,
+        record: InboundStreamRecord,
+        dependencies: InboundRuntimeDependencies,
+    ) -> list[DispatchContext] | None:
+        """Contexts for one entry; empty when it is dropped, None to retry it."""
+        try:
+            platform = PlatformType(record.fields["platform"])
+            inbox_id = record.fields["inbox_id"]
+            payload = decode_payload(record.fields["payload"])
+        except (KeyError, ValueError) as exc:
+            self._drop(record, f"undecodable entry: {exc}")
+            return []
+
+        try:
+            return await self.runtime.build_dispatch_contexts(
+                platform=platform,
+                inbox_id=inbox_id,
+                payload=payload,
+                dependencies=dependencies,
+                dedup_lease_seconds=self._lease_seconds,
+            )
+        except InboundRuntimeError as exc:
+            self._drop(record, str(exc))
+            return []
+        except Exception as exc:
+            self.retried += 1
+            self.logger.error(
+                "Inbound entry %s on %s left pending for retry: %s",
+                record.entry_id,
+                record.stream,
+                exc,
+                exc_info=True,
+            )
+            return None
+
+    def _drop(self, record: InboundStreamRecord, reason: str) -> None:
+        self.dropped += 1
+        self.logger.error(
+            "Dropping inbound entry %s on %s: %s",
+            record.entry_id,
+            record.stream,
+            reason,
+        )
+
+    async def _ack(self, records: Sequence[InboundStreamRecord]) -> None:
+        by_stream: dict[str, list[str]] = {}
+        for record in records:
+            by_stream.setdefault(record.stream, []).append(record.entry_id)
+        for stream, entry_ids in by_stream.items():
+            await self.transport.backend.ack(stream, self.transport.group, entry_ids)
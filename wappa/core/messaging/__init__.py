@@ -7,6 +7,8 @@ of :class:`MessengerMiddleware` instances.
 Consumers and first-party plugins register middleware via
 ``WappaBuilder.add_messenger_middleware(mw, priority=...)``. The controller
 stays agnostic — it only constructs the pipeline from the registered list.
+Pipelines are built once per inbox and shared through the app-scoped
+:class:`MessengerRegistry`.
 """
 
 from .pipeline import (
@@ -16,10 +18,12 @@ from .pipeline import (
     SendInvocation,
     SendNext,
 )
+from .registry import MessengerRegistry
 
 __all__ = [
     "MessengerMiddleware",
     "MessengerPipeline",
+    "MessengerRegistry",
     "MiddlewareEntry",
     "SendInvocation",
     "SendNext",
@@ -0,0 +1,208 @@
+"""App-scoped registry of ready-to-use messenger pipelines.
+
+Building a messenger means resolving inbox credentials, creating the
+platform client and its four handlers, and composing the middleware chain.
+None of that changes between deliveries for the same inbox, so the
+inbound runtime, ``OutboundRuntime``, ``WappaContextFactory`` and the API
+dependencies all share one :class:`MessengerRegistry` on ``app.state``
+and reuse its :class:`MessengerPipeline` instances.
+
+An entry is rebuilt when:
+
+- the credential store reports the inbox as changed
+  (``IInboxCredentialStore.invalidate_cache``) — only the app-scoped
+  registry from :meth:`MessengerRegistry.from_app_state` listens for this,
+  so short-lived registries never pile listeners onto the store,
+- the shared HTTP session or media download client was replaced,
+- the middleware list grew (plugins register during startup), or
+- it is older than ``max_age`` — a safety net for credentials changed
+  by another process without an invalidation call.
+
+On a warm entry :meth:`MessengerRegistry.get` performs no credential
+store calls at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, cast
+
+from ...schemas.core.types import PlatformType
+from ..logging.logger import get_logger
+from .pipeline import MessengerPipeline, MiddlewareEntry
+
+if TYPE_CHECKING:
+    import httpx
+
+    from ...domain.factories import MessengerFactory
+    from ...domain.interfaces.inbox_credential_store import IInboxCredentialStore
+
+DEFAULT_MAX_AGE_SECONDS = 300.0
+
+_RegistryKey = tuple[PlatformType, str]
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    pipeline: MessengerPipeline
+    version: int
+    session: httpx.AsyncClient
+    media_download_client: httpx.AsyncClient
+    middleware_count: int
+    built_at: float
+
+
+class MessengerRegistry:
+    """Hands out cached :class:`MessengerPipeline` instances per inbox."""
+
+    def __init__(
+        self,
+        *,
+        session_provider: Callable[[], httpx.AsyncClient],
+        media_download_client_provider: Callable[[], httpx.AsyncClient],
+        credential_store: IInboxCredentialStore,
+        messenger_middleware: Sequence[MiddlewareEntry] = (),
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+    ) -> None:
+        # Local import prevents ``wappa.core.messaging`` from cycling while
+        # MessengerFactory imports its WhatsApp adapter modules.
+        from ...domain.factories import MessengerFactory
+
+        self._session_provider = session_provider
+        self._media_download_client_provider = media_download_client_provider
+        self._credential_store = credential_store
+        self._factory: MessengerFactory = MessengerFactory(
+            session_provider=session_provider,
+            media_download_client_provider=media_download_client_provider,
+            credential_store=credential_store,
+        )
+        # Kept by reference: plugins append to app.state.messenger_middleware
+        # during startup, after the registry may already exist.
+        self._middleware = messenger_middleware
+        self._max_age = max_age
+
+        self._entries: dict[_RegistryKey, _Entry] = {}
+        self._build_locks: dict[_RegistryKey, asyncio.Lock] = {}
+        self._versions: dict[str, int] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._builds = 0
+        self._invalidations = 0
+        self.logger = get_logger(__name__)
+
+    @classmethod
+    def from_app_state(cls, app_state: Any) -> MessengerRegistry:
+        """Return the app's registry, creating it on first use.
+
+        The app's registry is the one subscribed to the credential store's
+        invalidations; other registries fall back to ``max_age``.
+        """
+        existing = getattr(app_state, "messenger_registry", None)
+        if isinstance(existing, cls):
+            return existing
+
+        lifecycle = getattr(app_state, "session_lifecycle", None)
+        if lifecycle is None:
+            raise RuntimeError(
+                "SessionLifecycle is not available; Wappa startup is incomplete"
+            )
+        credential_store = cast(
+            "IInboxCredentialStore | None",
+            getattr(app_state, "inbox_credential_store", None),
+        )
+        if credential_store is None:
+            raise RuntimeError("IInboxCredentialStore is not configured")
+
+        registry = cls(
+            session_provider=lifecycle.get_session,
+            media_download_client_provider=lifecycle.get_media_download_client,
+            credential_store=credential_store,
+            messenger_middleware=getattr(app_state, "messenger_middleware", ()),
+        )
+        credential_store.add_invalidation_listener(registry.invalidate)
+        app_state.messenger_registry = registry
+        return registry
+
+    async def get(
+        self, inbox_id: str, platform: PlatformType = PlatformType.WHATSAPP
+    ) -> MessengerPipeline:
+        """Return the inbox's messenger pipeline, building it if needed.
+
+        Raises whatever the credential store or session provider raises
+        (``InboxNotFoundError``, ``HTTPSessionClosedError``, ...).
+        """
+        key = (platform, inbox_id)
+        entry = self._entries.get(key)
+        if entry is not None and self._is_current(entry, inbox_id):
+            self._hits += 1
+            return entry.pipeline
+
+        self._misses += 1
+        lock = self._build_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_current(entry, inbox_id):
+                return entry.pipeline
+            return await self._build(key)
+
+    def invalidate(self, inbox_id: str | None = None) -> None:
+        """Drop cached messengers for ``inbox_id``, or for every inbox."""
+        self._invalidations += 1
+        if inbox_id is None:
+            self._generation += 1
+            self._entries.clear()
+            return
+        self._versions[inbox_id] = self._versions.get(inbox_id, 0) + 1
+        for key in [key for key in self._entries if key[1] == inbox_id]:
+            del self._entries[key]
+
+    def get_stats(self) -> dict[str, int]:
+        """Counters for health endpoints and tests."""
+        return {
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "builds": self._builds,
+            "invalidations": self._invalidations,
+        }
+
+    def _version(self, inbox_id: str) -> int:
+        return self._generation + self._versions.get(inbox_id, 0)
+
+    def _is_current(self, entry: _Entry, inbox_id: str) -> bool:
+        return (
+            entry.version == self._version(inbox_id)
+            and entry.session is self._session_provider()
+            and entry.media_download_client is self._media_download_client_provider()
+            and entry.middleware_count == len(self._middleware)
+            and time.monotonic() - entry.built_at < self._max_age
+        )
+
+    async def _build(self, key: _RegistryKey) -> MessengerPipeline:
+        platform, inbox_id = key
+        version = self._version(inbox_id)
+        credentials = await self._credential_store.get_credentials(inbox_id)
+
+        session = self._session_provider()
+        media_download_client = self._media_download_client_provider()
+        raw = self._factory.build_messenger(platform, credentials)
+        pipeline = MessengerPipeline(raw=raw, middleware=self._middleware)
+        self._builds += 1
+        self.logger.debug("Built %s messenger for inbox %s", platform.value, inbox_id)
+
+        # Credentials changed while we were fetching them: serve this
+        # caller, but let the next one resolve them again.
+        if version == self._version(inbox_id):
+            self._entries[key] = _Entry(
+                pipeline=pipeline,
+                version=version,
+                session=session,
+                media_download_client=media_download_client,
+                middleware_count=len(self._middleware),
+                built_at=time.monotonic(),
+            )
+        return pipeline
@@ -7,6 +7,7 @@ This module contains all the core plugins that extend Wappa functionality:
 - Redis plugin for caching and session management
 - SSEEventsPlugin for native FastAPI SSE event streaming
 - ExpiryPlugin: Redis expiry action listener for time-based automation
+- InboundStreamPlugin: Durable Redis Streams inbound queue with worker consumers
 - Middleware plugins (CORS, Auth, Rate Limiting)
 - Webhook plugins for payment providers and custom endpoints
 """
@@ -23,6 +24,7 @@ from .cors_plugin import CORSPlugin
 from .cron_plugin import CronPlugin
 from .custom_middleware_plugin import CustomMiddlewarePlugin
 from .expiry_plugin import ExpiryPlugin
+from .inbound_stream_plugin import InboundStreamPlugin
 from .postgres_database_plugin import PostgresDatabasePlugin
 from .rate_limit_plugin import RateLimitPlugin, RateLimitProfile, rate_limit
 from .redis_plugin import RedisPlugin
@@ -41,6 +43,7 @@ __all__ = [
     "RedisPubSubPlugin",
     "SSEEventsPlugin",
     "ExpiryPlugin",
+    "InboundStreamPlugin",
     # Middleware
     "CORSPlugin",
     "AuthPlugin",
@@ -0,0 +1,220 @@
+"""
+InboundStreamPlugin - Durable Inbound Queue Lifecycle Management
+
+Switches webhook intake to queue mode: the webhook route appends each
+verified delivery to a Redis Stream and answers immediately, and consumer
+group workers dispatch it through the Inbound Runtime.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+from ..config.settings import settings
+from ..inbound import (
+    IInboundStreamBackend,
+    InboundRuntime,
+    InboundRuntimeDependencies,
+    InboundStreamTransport,
+    InboundStreamWorker,
+    RedisInboundStreamBackend,
+)
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+    from ..factory.wappa_builder import WappaBuilder
+
+logger = logging.getLogger(__name__)
+
+
+class InboundStreamPlugin:
+    """
+    Plugin for the durable inbound queue.
+
+    Responsibilities:
+    - Create the consumer group on every inbound stream shard
+    - Publish the transport on app.state so webhooks are enqueued
+    - Run ``workers`` consumer tasks in this process (0 = enqueue only)
+    - Stop the consumers before the runtime begins draining
+
+    Usage:
+        # Web and workers in one process
+        builder.add_plugin(InboundStreamPlugin("redis://localhost:6379/5"))
+
+        # Web nodes only enqueue; dedicated processes consume
+        builder.add_plugin(InboundStreamPlugin(workers=0, shards=4))
+
+    Entries a worker read but never acknowledged are reclaimed by any
+    worker of the same group after ``reclaim_idle_ms``, so a crashed
+    process loses no accepted delivery.
+    """
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        *,
+        backend: IInboundStreamBackend | None = None,
+        shards: int = 1,
+        workers: int = 4,
+        batch_size: int = 32,
+        block_ms: int = 2000,
+        maxlen: int | None = 1_000_000,
+        reclaim_idle_ms: int = 60_000,
+        stream_prefix: str = "wappa:inbound",
+        group: str = "wappa-inbound",
+        consumer_prefix: str | None = None,
+    ) -> None:
+        """
+        Initialize inbound stream plugin.
+
+        Args:
+            redis_url: Redis URL for the streams (default: settings.redis_url)
+            backend: Explicit stream backend, e.g. MemoryInboundStreamBackend
+            shards: Number of streams; an inbox always maps to the same one
+            workers: Consumer tasks started in this process
+            batch_size: Entries read per XREADGROUP call
+            block_ms: How long an idle consumer blocks waiting for entries
+            maxlen: Approximate stream cap applied on XADD (None = unbounded)
+            reclaim_idle_ms: Idle time before a pending entry is reclaimed
+            stream_prefix: Stream key prefix, shards are ``{prefix}:{n}``
+            group: Consumer group shared by every worker process
+            consumer_prefix: Consumer name prefix (default: host-pid)
+        """
+        if workers < 0:
+            raise ValueError("workers must be zero or more")
+        self.redis_url = redis_url
+        self.backend = backend
+        self.shards = shards
+        self.workers = workers
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.maxlen = maxlen
+        self.reclaim_idle_ms = reclaim_idle_ms
+        self.stream_prefix = stream_prefix
+        self.group = group
+        self.consumer_prefix = (
+            consumer_prefix or f"{socket.gethostname()}-{os.getpid()}"
+        )
+
+        self._transport: InboundStreamTransport | None = None
+        self._workers: list[InboundStreamWorker] = []
+        self._tasks: list[asyncio.Task] = []
+
+    def configure(self, builder: "WappaBuilder") -> None:
+        """Register startup/shutdown hooks (startup priority 30, shutdown priority 95)."""
+        builder.add_startup_hook(self._startup_hook, priority=30)
+        builder.add_shutdown_hook(self._shutdown_hook, priority=95)
+        logger.debug("🔧 InboundStreamPlugin configured - registered hooks")
+
+    async def _startup_hook(self, app: "FastAPI") -> None:
+        logger.info("=== INBOUND STREAM INITIALIZATION ===")
+
+        backend = self.backend or self._create_redis_backend()
+        transport = InboundStreamTransport(
+            backend,
+            shards=self.shards,
+            stream_prefix=self.stream_prefix,
+            group=self.group,
+            maxlen=self.maxlen,
+        )
+        await transport.ensure_groups()
+        self._transport = transport
+        app.state.inbound_transport = transport
+
+        if self.workers:
+            dispatcher = getattr(app.state, "webhook_event_dispatcher", None)
+            if dispatcher is None:
+                raise RuntimeError(
+                    "InboundStreamPlugin workers need app.state.webhook_event_dispatcher "
+                    "— build the app through Wappa so the webhook dispatcher is set"
+                )
+            runtime = InboundRuntime(dispatcher)
+
+            # Dependencies are resolved per batch; app.state.inbound_transport
+            # is dropped so workers always dispatch instead of re-enqueueing.
+            def dependencies_provider() -> InboundRuntimeDependencies:
+                return replace(
+                    InboundRuntimeDependencies.from_app_state(app.state),
+                    inbound_transport=None,
+                )
+
+            for index in range(self.workers):
+                worker = InboundStreamWorker(
+                    transport,
+                    runtime,
+                    dependencies_provider,
+                    consumer_name=f"{self.consumer_prefix}-{index}",
+                    batch_size=self.batch_size,
+                    block_ms=self.block_ms,
+                    reclaim_idle_ms=self.reclaim_idle_ms,
+                )
+                self._workers.append(worker)
+                self._tasks.append(
+                    asyncio.create_task(
+                        worker.run(), name=f"inbound_stream_worker:{index}"
+                    )
+                )
+
+        logger.info(
+            "✅ Inbound queue mode on %d shard(s), group '%s', %d local worker(s)",
+            self.shards,
+            self.group,
+            self.workers,
+        )
+
+    def _create_redis_backend(self) -> RedisInboundStreamBackend:
+        from redis.asyncio import Redis
+
+        redis_url = self.redis_url or settings.redis_url
+        if not redis_url:
+            raise RuntimeError(
+                "InboundStreamPlugin requires a Redis URL — pass redis_url, "
+                "set REDIS_URL, or provide a backend"
+            )
+        return RedisInboundStreamBackend(
+            Redis.from_url(redis_url, decode_responses=True)
+        )
+
+    async def _shutdown_hook(self, app: "FastAPI") -> None:
+        logger.info("=== INBOUND STREAM SHUTDOWN ===")
+
+        try:
+            for worker in self._workers:
+                worker.stop()
+            if self._tasks:
+                # A blocked XREADGROUP returns within block_ms; in-flight
+                # batches finish and acknowledge before the worker exits.
+                _, pending = await asyncio.wait(
+                    self._tasks, timeout=self.block_ms / 1000 + 10.0
+                )
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    logger.warning(
+                        "⚠️ %d inbound stream worker(s) cancelled; their "
+                        "unacknowledged entries will be reclaimed",
+                        len(pending),
+                    )
+            self._tasks.clear()
+            self._workers.clear()
+
+            if hasattr(app.state, "inbound_transport"):
+                del app.state.inbound_transport
+            if self._transport is not None:
+                await self._transport.backend.close()
+                self._transport = None
+
+            logger.info("✅ InboundStreamPlugin shutdown completed")
+        except Exception as e:
+            logger.error(
+                f"❌ Error during InboundStreamPlugin shutdown hook: {e}", exc_info=True
+            )
+
+    @staticmethod
+    def get_transport(app: "FastAPI") -> InboundStreamTransport | None:
+        """Get the inbound stream transport from app state (for monitoring)."""
+        return getattr(app.state, "inbound_transport", None)
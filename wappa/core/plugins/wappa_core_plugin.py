@@ -10,6 +10,12 @@ from wappa.api.middleware.request_id import RequestIdMiddleware
 from wappa.api.middleware.request_logging import RequestLoggingMiddleware
 from wappa.api.routes.health import router as health_router
 from wappa.api.routes.whatsapp_combined import create_whatsapp_router
+from wappa.core.inbound import (
+    IInboundDeduplicator,
+    InboundScheduler,
+    MemoryInboundDeduplicator,
+    RedisInboundDeduplicator,
+)
 from wappa.core.lifecycle import BackgroundWorkTracker, SessionLifecycle
 
 from ..config.settings import settings
@@ -43,6 +49,7 @@ class WappaCorePlugin:
         self.include_state_handler_api = include_state_handler_api
         self._session_lifecycle: SessionLifecycle | None = None
         self._background_work_tracker: BackgroundWorkTracker | None = None
+        self._inbound_scheduler: InboundScheduler | None = None
 
     def configure(self, builder: "WappaBuilder") -> None:
         logger = get_app_logger()
@@ -72,13 +79,15 @@ class WappaCorePlugin:
         # Shutdown phases (highest priority runs first):
         # 90: mark draining — reject new background work
         # 70: drain tracked background tasks
+        # 60: close the inbox credential store (before Redis pools close)
         # 10: close HTTP session and clean up app state
         builder.add_shutdown_hook(self._begin_drain, priority=90)
         builder.add_shutdown_hook(self._drain_background_work, priority=70)
+        builder.add_shutdown_hook(self._close_credential_store, priority=60)
         builder.add_shutdown_hook(self._core_shutdown, priority=10)
 
         logger.debug(
-            "✅ WappaCorePlugin configured - cache_type: %s, middleware: 4, routes: 2, hooks: 4",
+            "✅ WappaCorePlugin configured - cache_type: %s, middleware: 4, routes: 2, hooks: 5",
             self.cache_type.value,
         )
 
@@ -101,6 +110,11 @@ class WappaCorePlugin:
             logger.debug(
                 "💾 Set app.state.wappa_cache_type = %s", self.cache_type.value
             )
+            if (
+                self.cache_type == CacheType.MEMORY
+                and settings.memory_cache_snapshot_path
+            ):
+                await self._warm_memory_cache(logger)
 
             logger.info("🌐 Creating persistent HTTP client...")
             client = SessionLifecycle._default_client_factory()
@@ -113,6 +127,27 @@ class WappaCorePlugin:
             self._background_work_tracker = BackgroundWorkTracker()
             app.state.background_work_tracker = self._background_work_tracker
 
+            self._inbound_scheduler = InboundScheduler(
+                self._background_work_tracker,
+                max_concurrency=settings.inbound_max_concurrency,
+                max_queued=settings.inbound_max_queued,
+                retry_after_seconds=settings.inbound_retry_after,
+            )
+            app.state.inbound_scheduler = self._inbound_scheduler
+            logger.info(
+                "📬 Inbound scheduler ready - concurrency: %d, queue bound: %d",
+                settings.inbound_max_concurrency,
+                settings.inbound_max_queued,
+            )
+
+            app.state.inbound_deduplicator = self._create_inbound_deduplicator()
+            if app.state.inbound_deduplicator is not None:
+                logger.info(
+                    "🔁 Inbound dedup ready - %s, ttl: %ds",
+                    type(app.state.inbound_deduplicator).__name__,
+                    settings.inbound_dedup_ttl,
+                )
+
             base_url = (
                 f"http://localhost:{settings.port}"
                 if settings.is_development
@@ -139,6 +174,21 @@ class WappaCorePlugin:
                 print(f"💥 Critical error during logging setup: {e}")  # noqa: T201
             raise
 
+    async def _warm_memory_cache(self, logger: ContextLogger) -> None:
+        """Load the memory cache snapshot and start taking new ones."""
+        from wappa.persistence.memory.handlers.utils.memory_store import (
+            get_memory_store,
+        )
+
+        store = get_memory_store()
+        path = settings.memory_cache_snapshot_path
+        try:
+            restored = await store.load_snapshot(path)
+            logger.info("♻️ Memory cache warmed with %d entries from %s", restored, path)
+        except ValueError as e:
+            logger.warning("Memory cache snapshot not loaded: %s", e)
+        store.start_snapshots(path, settings.memory_cache_snapshot_interval)
+
     async def _begin_drain(self, app: FastAPI) -> None:
         """Phase 1 (priority 90): mark runtime as draining."""
         logger = get_app_logger()
@@ -148,13 +198,38 @@ class WappaCorePlugin:
         if self._background_work_tracker:
             self._background_work_tracker.begin_drain()
 
+    def _create_inbound_deduplicator(self) -> IInboundDeduplicator | None:
+        """Redis dedup is shared across workers; memory/json keep a local LRU.
+
+        The Redis deduplicator resolves its client per call, so it can be
+        created here before RedisPlugin initializes the pools.
+        """
+        if settings.inbound_dedup_ttl <= 0:
+            return None
+        if self.cache_type == CacheType.REDIS:
+            return RedisInboundDeduplicator(ttl_seconds=settings.inbound_dedup_ttl)
+        return MemoryInboundDeduplicator(
+            ttl_seconds=settings.inbound_dedup_ttl,
+            max_entries=settings.inbound_dedup_max_entries,
+        )
+
     async def _drain_background_work(self, app: FastAPI) -> None:
         """Phase 2 (priority 70): drain remaining tracked background tasks."""
         if self._background_work_tracker:
             await self._background_work_tracker.drain(timeout=30.0)
 
+    async def _close_credential_store(self, app: FastAPI) -> None:
+        """Phase 3 (priority 60): stop credential store background work."""
+        store = getattr(app.state, "inbox_credential_store", None)
+        if store is None:
+            return
+        try:
+            await store.close()
+        except Exception as e:
+            get_app_logger().warning("Inbox credential store close failed: %s", e)
+
     async def _core_shutdown(self, app: FastAPI) -> None:
-        """Phase 3 (priority 10): close HTTP session and clean up app state."""
+        """Phase 4 (priority 10): close HTTP session and clean up app state."""
         logger = get_app_logger()
         logger.info("🛑 Closing Wappa core resources...")
 
@@ -165,11 +240,26 @@ class WappaCorePlugin:
                         get_memory_store,
                     )
 
-                    get_memory_store().stop_cleanup_task()
+                    store = get_memory_store()
+                    # Final snapshot after background work drained (phase 2)
+                    try:
+                        await store.stop_snapshots()
+                    finally:
+                        store.stop_cleanup_task()
                     logger.debug("🧹 Memory store cleanup task stopped")
                 except Exception as e:
                     logger.warning("Memory store cleanup stop failed: %s", e)
 
+            if self.cache_type == CacheType.JSON:
+                try:
+                    from wappa.persistence.json.storage_manager import (
+                        storage_manager,
+                    )
+
+                    await storage_manager.close()
+                except Exception as e:
+                    logger.warning("JSON cache close failed: %s", e)
+
             if self._session_lifecycle:
                 await self._session_lifecycle.close()
                 logger.info("🌐 Persistent HTTP client closed cleanly")
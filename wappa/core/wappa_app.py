@@ -276,8 +276,10 @@ class Wappa:
 
         app = self._builder.build()
 
-        # Store API dispatcher in app.state for dependency injection
+        # Store dispatchers in app.state for dependency injection and for
+        # inbound stream workers that dispatch outside the webhook route.
         app.state.api_event_dispatcher = api_dispatcher
+        app.state.webhook_event_dispatcher = webhook_dispatcher
 
         logger.info(
             f"✅ Wappa ASGI app built synchronously - cache: {self.cache_type.value}, "
@@ -6,7 +6,10 @@ from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 from wappa.core.logging.logger import get_logger
-from wappa.domain.interfaces.inbox_credential_store import IInboxCredentialStore
+from wappa.domain.interfaces.inbox_credential_store import (
+    IInboxCredentialStore,
+    InboxCredentials,
+)
 from wappa.domain.interfaces.messaging_interface import IMessenger
 from wappa.domain.interfaces.session_provider import HTTPSessionClosedError
 from wappa.messaging.whatsapp.client.whatsapp_client import WhatsAppClient
@@ -105,7 +108,24 @@ class MessengerFactory:
             raise ValueError(f"Invalid or inactive inbox: {inbox_id}")
 
         credentials = await self._credential_store.get_credentials(inbox_id)
+        return self._build_whatsapp_messenger(credentials, session)
 
+    def build_messenger(
+        self, platform: PlatformType, credentials: InboxCredentials
+    ) -> IMessenger:
+        """Build a messenger from already-resolved credentials.
+
+        No credential store calls are made; callers that cache messengers
+        (``MessengerRegistry``) resolve credentials once and build here.
+        """
+        if platform != PlatformType.WHATSAPP:
+            raise ValueError(f"Unsupported platform: {platform.value}")
+        return self._build_whatsapp_messenger(credentials, self._get_session())
+
+    def _build_whatsapp_messenger(
+        self, credentials: InboxCredentials, session: httpx.AsyncClient
+    ) -> WhatsAppMessenger:
+        inbox_id = credentials.inbox_id
         client = WhatsAppClient(
             session=session,
             access_token=credentials.access_token,
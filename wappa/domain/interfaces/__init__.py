@@ -5,7 +5,13 @@ Defines the contracts that infrastructure layer must implement.
 """
 
 from .cache_factory import ICacheFactory
-from .cache_interfaces import IExpiryCache, IStateCache, ITableCache, IUserCache
+from .cache_interfaces import (
+    IExpiryCache,
+    IIdentityIndex,
+    IStateCache,
+    ITableCache,
+    IUserCache,
+)
 from .identity_resolver import IIdentityResolver, PassthroughIdentityResolver
 from .inbox_credential_store import (
     IInboxCredentialStore,
@@ -37,6 +43,7 @@ __all__ = [
     "IUserCache",
     "IStateCache",
     "ITableCache",
+    "IIdentityIndex",
     "ICacheFactory",
     # PubSub interface
     "IPubSubPublisher",
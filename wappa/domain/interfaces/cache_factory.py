@@ -9,6 +9,7 @@ from abc import ABC, abstractmethod
 from .cache_interfaces import (
     IAIStateCache,
     IExpiryCache,
+    IIdentityIndex,
     IStateCache,
     ITableCache,
     IUserCache,
@@ -228,3 +229,20 @@ class ICacheFactory(ABC):
             ai_state = factory.create_ai_state_cache(user_id=recipient_id)
         """
         pass
+
+    def create_identity_index(self, inbox_id: str | None = None) -> IIdentityIndex:
+        """
+        Create the inbox-wide identity index (phone number / BSUID -> user_id).
+
+        Args:
+            inbox_id: Optional override (uses default if None)
+
+        Returns:
+            Inbox-bound identity index implementing IIdentityIndex
+
+        Raises:
+            NotImplementedError: The cache backend keeps no identity index
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not provide an identity index"
+        )
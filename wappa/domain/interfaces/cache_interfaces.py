@@ -10,13 +10,15 @@ Each interface defines methods specific to its domain:
 - IStateCache: Handler/session state (keyed by handler_name)
 - ITableCache: Table/row data (composite key: table_name + pkid)
 - IExpiryCache: Expiry triggers (composite key: action + identifier)
+- IIdentityIndex: Inbox-wide phone number / BSUID -> user_id lookups
 """
 
 from abc import ABC, abstractmethod
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from enum import StrEnum
-from typing import Any
+from typing import Any, cast
 
 from pydantic import BaseModel
 
@@ -175,7 +177,11 @@ class IUserCache(ABC):
 
     @abstractmethod
     async def append_to_list(
-        self, field: str, value: Any, ttl: int | None = None
+        self,
+        field: str,
+        value: Any,
+        ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
         Append value to a list field.
@@ -184,6 +190,7 @@ class IUserCache(ABC):
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
@@ -213,6 +220,194 @@ class IUserCache(ABC):
         """
         pass
 
+    # ---- Bulk operations --------------------------------------------------
+    # A user cache is bound to one user; these reach other users of the same
+    # inbox in one round trip (Redis), one lock (memory) or one pass (JSON).
+
+    async def get_many(
+        self,
+        user_ids: Iterable[str],
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Get several users' data in this inbox at once.
+
+        Args:
+            user_ids: Users to read (duplicates are read once)
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Mapping of user_id to data, None for each user not found
+
+        Example:
+            users = await user_cache.get_many(["user1", "user2"])
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support get_many")
+
+    async def upsert_many(
+        self,
+        users: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """
+        Create or update several users' data in this inbox at once.
+
+        Args:
+            users: Mapping of user_id to data to store
+            ttl: Time to live in seconds, applied to every user
+
+        Returns:
+            True if every write succeeded, False otherwise
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support upsert_many")
+
+    async def delete_many(self, user_ids: Iterable[str]) -> int:
+        """
+        Delete several users' data in this inbox at once.
+
+        Args:
+            user_ids: Users to delete
+
+        Returns:
+            Count of users that existed and were deleted
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support delete_many")
+
+    async def find_by_field(
+        self, field: str, value: Any, models: type[BaseModel] | None = None
+    ) -> dict[str, Any] | None:
+        """
+        Find the first user of this inbox whose field equals value.
+
+        Args:
+            field: Field name to search
+            value: Value to match
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Matching user data or None if no user matches
+
+        Example:
+            user = await user_cache.find_by_field("email", "ana@example.com")
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support find_by_field"
+        )
+
+    async def rebuild_field_indexes(self) -> int:
+        """
+        Re-create the declared user field indexes from the inbox's user records.
+
+        Returns:
+            Number of users indexed
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support rebuild_field_indexes"
+        )
+
+
+class IIdentityIndex(ABC):
+    """
+    Interface for the inbox-wide identity index.
+
+    Maps transport identities stored on user records (``phone_number`` and
+    ``bsuid`` fields) to the ``user_id`` that owns the record. User caches
+    keep it current on upsert, field update and delete, so lookups are a
+    single read instead of a scan over every user in the inbox.
+
+    Example:
+        index = factory.create_identity_index()
+        user_id = await index.get_user_id("573001112233")
+    """
+
+    async def get_user_id(self, identity: str) -> str | None:
+        """
+        Get the user_id owning one identity.
+
+        Args:
+            identity: Phone number or BSUID
+
+        Returns:
+            The owning user_id, None if no user record carries the identity
+        """
+        return (await self.get_user_ids([identity])).get(identity)
+
+    @abstractmethod
+    async def get_user_ids(self, identities: Iterable[str]) -> dict[str, str]:
+        """
+        Get the owning user_id for several identities in one read.
+
+        Args:
+            identities: Phone numbers and/or BSUIDs
+
+        Returns:
+            Mapping of identity to user_id; unknown identities are omitted
+        """
+        pass
+
+    @abstractmethod
+    async def link(
+        self,
+        user_id: str,
+        identities: Iterable[str],
+        *,
+        replaced: Iterable[str] = (),
+    ) -> None:
+        """
+        Point identities at a user and drop the ones it no longer carries.
+
+        Args:
+            user_id: Owner of the user record
+            identities: Identities the record now carries
+            replaced: Identities the record carried before; each is removed
+                only while it still points at ``user_id``
+        """
+        pass
+
+    async def link_many(
+        self, changes: Iterable[tuple[str, Iterable[str], Iterable[str]]]
+    ) -> None:
+        """
+        Apply several ``link`` calls at once.
+
+        Args:
+            changes: ``(user_id, identities, replaced)`` triples
+        """
+        for user_id, identities, replaced in changes:
+            await self.link(user_id, identities, replaced=replaced)
+
+    async def unlink(self, user_id: str, identities: Iterable[str]) -> None:
+        """
+        Remove identities that still point at ``user_id``.
+
+        Args:
+            user_id: Owner of the deleted record or field
+            identities: Identities the record carried
+        """
+        await self.link(user_id, (), replaced=identities)
+
+    async def rebuild(self) -> int:
+        """
+        Re-create the index from the inbox's user records.
+
+        Run once per inbox for users stored before the index existed; until
+        then ``is_complete`` is False and lookups may miss them. Entries of
+        users that expired or no longer carry the identity are dropped.
+
+        Returns:
+            Number of users indexed
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support rebuild")
+
+    async def is_complete(self) -> bool:
+        """
+        Whether ``rebuild`` has run over this inbox.
+
+        Returns:
+            True when every stored user record is known to be indexed
+        """
+        return False
+
 
 class IStateCache(ABC):
     """
@@ -354,6 +549,7 @@ class IStateCache(ABC):
         field: str,
         value: Any,
         ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
         Append value to a list field in handler state.
@@ -363,6 +559,7 @@ class IStateCache(ABC):
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
@@ -477,6 +674,118 @@ class IStateCache(ABC):
         """
         pass
 
+    async def merge(
+        self,
+        handler_name: str,
+        state_data: dict[str, Any],
+        ttl: int | None = None,
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Merge new data into the existing handler state.
+
+        Concrete so custom caches keep working (as a read then a write);
+        Wappa's backends override it to write only the given fields, atomically.
+
+        Args:
+            handler_name: Handler name identifier
+            state_data: New state data to merge
+            ttl: Optional TTL override
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Final merged state or None on failure
+        """
+        existing = await self.get(handler_name) or {}
+        if isinstance(existing, BaseModel):
+            existing = existing.model_dump()
+        merged = {
+            **existing,
+            **state_data,
+            "handler_type": handler_name,
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+        if not await self.upsert(handler_name, merged, ttl):
+            return None
+        return cast(dict[str, Any], models.model_validate(merged)) if models else merged
+
+    # ---- Bulk operations --------------------------------------------------
+    # Concrete so custom caches keep working; Wappa's backends override them
+    # with one round trip (Redis), one lock (memory) or one file pass (JSON).
+
+    async def get_many(
+        self,
+        handler_names: Iterable[str],
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Get several handler states at once.
+
+        Args:
+            handler_names: Handler names to read (duplicates are read once)
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Mapping of handler name to data, None for each one not found
+
+        Example:
+            states = await state_cache.get_many(["checkout", "survey"])
+        """
+        return {
+            name: await self.get(name, models) for name in dict.fromkeys(handler_names)
+        }
+
+    async def upsert_many(
+        self,
+        states: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """
+        Create or update several handler states at once.
+
+        Args:
+            states: Mapping of handler name to data to store
+            ttl: Time to live in seconds, applied to every entry
+
+        Returns:
+            True if every write succeeded, False otherwise
+
+        Example:
+            await state_cache.upsert_many({"checkout": {"step": 1}, "survey": {"q": 3}})
+        """
+        results = [await self.upsert(name, data, ttl) for name, data in states.items()]
+        return all(results)
+
+    async def delete_many(self, handler_names: Iterable[str]) -> int:
+        """
+        Delete several handler states at once.
+
+        Args:
+            handler_names: Handler names to delete
+
+        Returns:
+            Count of entries that existed and were deleted
+        """
+        return sum([await self.delete(name) for name in dict.fromkeys(handler_names)])
+
+
+# Generation counters (see ``wappa.persistence.VersionedTableCache``): a
+# counter row per versioned table whose field counts *bumps*, so a table that
+# was never invalidated needs no row at all — absent counter == generation 1.
+GENERATION_FIELD = "bumps"
+FIRST_GENERATION = 1
+
+
+def generation_of(bumps: object) -> int:
+    """The generation a stored bump count stands for (1 when absent or invalid)."""
+    if not isinstance(bumps, (str, bytes, bytearray, int, float)):
+        return FIRST_GENERATION
+    try:
+        counter = int(bumps)
+    except (TypeError, ValueError):
+        counter = 0
+    return FIRST_GENERATION + max(counter, 0)
+
 
 class ITableCache(ABC):
     """
@@ -691,6 +1000,7 @@ class ITableCache(ABC):
         field: str,
         value: Any,
         ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
         Append value to a list field in table row.
@@ -701,6 +1011,7 @@ class ITableCache(ABC):
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
@@ -791,6 +1102,192 @@ class ITableCache(ABC):
         """
         pass
 
+    # ---- Bulk operations --------------------------------------------------
+
+    async def get_many(
+        self,
+        table_name: str,
+        pkids: Iterable[str],
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Get several rows of one table at once.
+
+        Args:
+            table_name: Table name identifier
+            pkids: Primary key IDs to read (duplicates are read once)
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Mapping of pkid to row data, None for each row not found
+
+        Example:
+            rows = await table_cache.get_many("products", ["sku1", "sku2"])
+        """
+        return {
+            pkid: await self.get(table_name, pkid, models)
+            for pkid in dict.fromkeys(pkids)
+        }
+
+    async def upsert_many(
+        self,
+        table_name: str,
+        rows: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """
+        Create or update several rows of one table at once.
+
+        Args:
+            table_name: Table name identifier
+            rows: Mapping of pkid to row data
+            ttl: Time to live in seconds, applied to every row
+
+        Returns:
+            True if every write succeeded, False otherwise
+
+        Example:
+            await table_cache.upsert_many("products", {"sku1": {...}, "sku2": {...}})
+        """
+        results = [
+            await self.upsert(table_name, pkid, data, ttl)
+            for pkid, data in rows.items()
+        ]
+        return all(results)
+
+    async def delete_many(self, table_name: str, pkids: Iterable[str]) -> int:
+        """
+        Delete several rows of one table at once.
+
+        Args:
+            table_name: Table name identifier
+            pkids: Primary key IDs to delete
+
+        Returns:
+            Count of rows that existed and were deleted
+        """
+        return sum(
+            [await self.delete(table_name, pkid) for pkid in dict.fromkeys(pkids)]
+        )
+
+    # ---- Field lookups ----------------------------------------------------
+    # Wappa's backends answer these from declared field indexes when present
+    # (see ``wappa.persistence.field_index``); the defaults check every row.
+
+    async def find_by_field(
+        self,
+        table_name: str,
+        field: str,
+        value: Any,
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Find the first row of a table whose field equals value.
+
+        Args:
+            table_name: Table name identifier
+            field: Field name to search
+            value: Value to match
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Matching row data or None if no row matches
+
+        Example:
+            order = await table_cache.find_by_field("orders", "status", "pending")
+        """
+        for row in await self.get_all(table_name):
+            if row.get(field) == value:
+                return (
+                    cast(dict[str, Any], models.model_validate(row))
+                    if models is not None
+                    else row
+                )
+        return None
+
+    async def rebuild_field_indexes(self, table_name: str) -> int:
+        """
+        Re-create a table's declared field indexes from the rows it holds.
+
+        Args:
+            table_name: Table name identifier
+
+        Returns:
+            Number of rows indexed (0 when the cache keeps no indexes)
+        """
+        return 0
+
+    # ---- Generation counters ----------------------------------------------
+    # Back ``VersionedTableCache``: the counter of ``name`` is the row ``name``
+    # of ``counter_table``, and generation ``g`` of a table lives in the table
+    # ``f"{table_prefix}{g}"``. The defaults cost one read per resolution;
+    # backends resolve and read together where they can.
+
+    def generation_key(self, counter_table: str, name: str) -> str | None:
+        """
+        Name the counter of ``name`` the way invalidation notices do.
+
+        Returns None when generations of this cache must not be cached in
+        process (the default): only a backend that can announce every change
+        of the counter, like Redis, names it.
+        """
+        return None
+
+    async def get_generation(self, counter_table: str, name: str) -> int:
+        """
+        Current generation of ``name`` (1 when it was never bumped).
+
+        Args:
+            counter_table: Table holding the generation counters
+            name: Counter row (the logical table name)
+        """
+        return generation_of(
+            await self.get_field(counter_table, name, GENERATION_FIELD)
+        )
+
+    async def bump_generation(
+        self, counter_table: str, name: str, ttl: int
+    ) -> int | None:
+        """
+        Start a new generation of ``name`` and return it.
+
+        Args:
+            counter_table: Table holding the generation counters
+            name: Counter row (the logical table name)
+            ttl: TTL of the counter row, refreshed by every bump
+
+        Returns:
+            The new generation, or None if the counter could not be written
+        """
+        bumps = await self.increment_field(
+            counter_table, name, GENERATION_FIELD, increment=1, ttl=ttl
+        )
+        return None if bumps is None else generation_of(bumps)
+
+    async def get_in_generation(
+        self,
+        counter_table: str,
+        name: str,
+        table_prefix: str,
+        pkid: str,
+        models: type[BaseModel] | None = None,
+    ) -> tuple[int, dict[str, Any] | None]:
+        """
+        Resolve the current generation of ``name`` and read a row of it.
+
+        Args:
+            counter_table: Table holding the generation counters
+            name: Counter row (the logical table name)
+            table_prefix: Table name of a generation, without the number
+            pkid: Primary key ID to read
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            ``(generation, row)``; row is None when not found
+        """
+        generation = await self.get_generation(counter_table, name)
+        return generation, await self.get(f"{table_prefix}{generation}", pkid, models)
+
 
 class IExpiryCache(ABC):
     """
@@ -1042,7 +1539,12 @@ class IAIStateCache(ABC):
 
     @abstractmethod
     async def append_to_list(
-        self, agent_name: str, field: str, value: Any, ttl: int | None = None
+        self,
+        agent_name: str,
+        field: str,
+        value: Any,
+        ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
         Append value to list field in AI agent state.
@@ -1052,6 +1554,7 @@ class IAIStateCache(ABC):
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
@@ -1141,3 +1644,60 @@ class IAIStateCache(ABC):
             count = await ai_state_cache.delete_by_agent_prefix("summarizer-")
         """
         pass
+
+    # ---- Bulk operations --------------------------------------------------
+
+    async def get_many(
+        self,
+        agent_names: Iterable[str],
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Get several agent states at once.
+
+        Args:
+            agent_names: Agent names to read (duplicates are read once)
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Mapping of agent name to data, None for each one not found
+
+        Example:
+            states = await ai_state_cache.get_many(["summarizer", "router"])
+        """
+        return {
+            name: await self.get(name, models) for name in dict.fromkeys(agent_names)
+        }
+
+    async def upsert_many(
+        self,
+        states: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """
+        Create or update several agent states at once.
+
+        Args:
+            states: Mapping of agent name to data to store
+            ttl: Time to live in seconds, applied to every entry
+
+        Returns:
+            True if every write succeeded, False otherwise
+
+        Example:
+            await ai_state_cache.upsert_many({"summarizer": {"turns": 4}})
+        """
+        results = [await self.upsert(name, data, ttl) for name, data in states.items()]
+        return all(results)
+
+    async def delete_many(self, agent_names: Iterable[str]) -> int:
+        """
+        Delete several agent states at once.
+
+        Args:
+            agent_names: Agent names to delete
+
+        Returns:
+            Count of entries that existed and were deleted
+        """
+        return sum([await self.delete(name) for name in dict.fromkeys(agent_names)])
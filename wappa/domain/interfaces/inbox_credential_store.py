@@ -6,6 +6,7 @@ Implementations can be backed by env vars, database, or any external store.
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
 
 
@@ -16,6 +17,8 @@ class InboxCredentials:
     inbox_id: str
     access_token: str
     platform_account_id: str | None = None
+    app_secret: str | None = None
+    """Secret Meta signs webhook bodies with (``X-Hub-Signature-256``)."""
 
 
 class InboxNotFoundError(Exception):
@@ -68,7 +71,29 @@ class IInboxCredentialStore(ABC):
         """
         Invalidate any cached credentials for an inbox.
 
-        Stores without a cache may keep the default no-op implementation.
         Host applications should call this after updating inbox credentials.
+        The default implementation only notifies invalidation listeners;
+        stores with a cache override it, clear their cache and then call
+        ``super().invalidate_cache(inbox_id)``.
+        """
+        self._notify_invalidated(inbox_id)
+
+    async def close(self) -> None:
+        """
+        Release background resources (subscribers, connections).
+
+        Called by Wappa during shutdown, after background work has drained
+        and before Redis pools close. Stores without resources may keep the
+        default no-op implementation.
         """
         return None
+
+    def add_invalidation_listener(self, listener: Callable[[str], object]) -> None:
+        """Call ``listener(inbox_id)`` whenever an inbox's credentials change."""
+        listeners = self.__dict__.setdefault("_invalidation_listeners", [])
+        if listener not in listeners:
+            listeners.append(listener)
+
+    def _notify_invalidated(self, inbox_id: str) -> None:
+        for listener in self.__dict__.get("_invalidation_listeners", ()):
+            listener(inbox_id)
@@ -3,19 +3,29 @@ Database-backed inbox credential store.
 
 The host application owns the ``wappa_inboxes`` table and its migrations.
 Wappa reads the table through the supplied async session factory and keeps
-hot-path credentials in Redis.
+hot-path credentials in two cache layers: a small in-process TTL/LRU in
+front of a shared Redis hash per inbox. Unknown inboxes are cached too,
+briefly, and ``invalidate_cache`` is broadcast over Redis pub/sub so every
+worker drops its in-process copy at once.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import math
+import time
+import uuid
+from collections import OrderedDict
 from collections.abc import Callable, Mapping
-from contextlib import AbstractAsyncContextManager
+from contextlib import AbstractAsyncContextManager, suppress
 from datetime import UTC, datetime
 from typing import Any
 
 from sqlalchemy import text
 from sqlmodel import Field, SQLModel
 
+from wappa.core.logging.logger import get_logger
 from wappa.domain.interfaces.inbox_credential_store import (
     IInboxCredentialStore,
     InboxCredentials,
@@ -24,6 +34,10 @@ from wappa.domain.interfaces.inbox_credential_store import (
 
 type DBSessionFactory = Callable[[], AbstractAsyncContextManager[Any]]
 
+DEFAULT_INVALIDATION_CHANNEL = "wappa:inbox:credentials:invalidate"
+
+logger = get_logger(__name__)
+
 
 class WappaInbox(SQLModel, table=True):
     """
@@ -39,13 +53,23 @@ class WappaInbox(SQLModel, table=True):
     platform: str = Field(default="whatsapp")
     access_token: str
     platform_account_id: str | None = None
+    app_secret: str | None = None
     is_active: bool = Field(default=True)
 
 
 class DatabaseInboxCredentialStore(IInboxCredentialStore):
-    """Multi-inbox credential store with Redis cache and DB fallback."""
+    """Multi-inbox credential store with in-process and Redis caches and DB fallback.
 
-    _REDIS_CLIENT_METHODS = ("hgetall", "hset")
+    Lookups go L1 (in-process) → Redis → database. Concurrent misses for the
+    same inbox share one Redis/database round trip. Unknown or inactive
+    inboxes are remembered for ``negative_cache_ttl`` seconds in both layers,
+    so repeated lookups for them stop reaching the database.
+
+    Set ``local_cache_ttl=0`` to disable the in-process layer and
+    ``invalidation_channel=None`` to disable cross-worker invalidation.
+    """
+
+    _REDIS_CLIENT_METHODS = ("hgetall", "pipeline")
 
     def __init__(
         self,
@@ -54,20 +78,53 @@ class DatabaseInboxCredentialStore(IInboxCredentialStore):
         *,
         cache_ttl: int = 300,
         redis_alias: str = "table",
+        local_cache_ttl: float = 60.0,
+        local_cache_max_entries: int = 10_000,
+        negative_cache_ttl: float = 15.0,
+        invalidation_channel: str | None = DEFAULT_INVALIDATION_CHANNEL,
     ) -> None:
         self._db_session_factory = db_session_factory
         self._redis_manager = redis_manager
         self._cache_ttl = cache_ttl
         self._redis_alias = redis_alias
+        self._local_cache_ttl = local_cache_ttl
+        self._local_cache_max_entries = local_cache_max_entries
+        self._negative_cache_ttl = negative_cache_ttl
+        self._invalidation_channel = invalidation_channel
+
+        # inbox_id -> (expires_at, credentials or None for "not found")
+        self._local: OrderedDict[str, tuple[float, InboxCredentials | None]] = (
+            OrderedDict()
+        )
+        self._loads: dict[str, asyncio.Future[InboxCredentials]] = {}
+        # Bumped by every invalidation so a load that raced one is not cached.
+        self._epoch = 0
+        self._instance_id = uuid.uuid4().hex
+        self._subscriber_task: asyncio.Task[None] | None = None
+        self._closed = False
 
     async def get_credentials(self, inbox_id: str) -> InboxCredentials:
-        cached = await self._get_cached_credentials(inbox_id)
-        if cached is not None:
-            return cached
-
-        credentials = await self._get_database_credentials(inbox_id)
-        await self._cache_credentials(credentials)
-        return credentials
+        self._ensure_invalidation_subscriber()
+
+        entry = self._local.get(inbox_id)
+        if entry is not None:
+            expires_at, credentials = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(inbox_id)
+                if credentials is None:
+                    raise InboxNotFoundError(inbox_id)
+                return credentials
+            del self._local[inbox_id]
+
+        load = self._loads.get(inbox_id)
+        if load is None:
+            load = asyncio.ensure_future(self._load_credentials(inbox_id))
+            self._loads[inbox_id] = load
+            load.add_done_callback(
+                lambda done, key=inbox_id: self._finish_load(key, done)
+            )
+        # Shielded so one cancelled caller does not fail the others.
+        return await asyncio.shield(load)
 
     async def validate_inbox(self, inbox_id: str) -> bool:
         try:
@@ -77,8 +134,132 @@ class DatabaseInboxCredentialStore(IInboxCredentialStore):
             return False
 
     async def invalidate_cache(self, inbox_id: str) -> None:
+        self._drop_local(inbox_id)
         redis = await self._get_redis()
         await redis.delete(self._cache_key(inbox_id))
+        if self._invalidation_channel:
+            message = json.dumps({"inbox_id": inbox_id, "origin": self._instance_id})
+            try:
+                await redis.publish(self._invalidation_channel, message)
+            except Exception as e:
+                logger.warning(
+                    "Credential invalidation for inbox %s was not broadcast: %s",
+                    inbox_id,
+                    e,
+                )
+        await super().invalidate_cache(inbox_id)
+
+    async def close(self) -> None:
+        self._closed = True
+        task, self._subscriber_task = self._subscriber_task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _load_credentials(self, inbox_id: str) -> InboxCredentials:
+        epoch = self._epoch
+        try:
+            credentials = await self._get_cached_credentials(inbox_id)
+            if credentials is None:
+                try:
+                    credentials = await self._get_database_credentials(inbox_id)
+                except InboxNotFoundError:
+                    await self._cache_missing(inbox_id)
+                    raise
+                await self._cache_credentials(credentials)
+        except InboxNotFoundError:
+            if epoch == self._epoch:
+                self._remember(inbox_id, None, self._negative_cache_ttl)
+            raise
+
+        if epoch == self._epoch:
+            self._remember(inbox_id, credentials, self._local_cache_ttl)
+        return credentials
+
+    def _finish_load(
+        self, inbox_id: str, load: asyncio.Future[InboxCredentials]
+    ) -> None:
+        if self._loads.get(inbox_id) is load:
+            del self._loads[inbox_id]
+        # Mark the exception retrieved even if every waiter was cancelled.
+        if not load.cancelled():
+            load.exception()
+
+    def _remember(
+        self, inbox_id: str, credentials: InboxCredentials | None, ttl: float
+    ) -> None:
+        if self._local_cache_ttl <= 0 or ttl <= 0:
+            return
+        self._local[inbox_id] = (time.monotonic() + ttl, credentials)
+        self._local.move_to_end(inbox_id)
+        while len(self._local) > self._local_cache_max_entries:
+            self._local.popitem(last=False)
+
+    def _drop_local(self, inbox_id: str) -> None:
+        self._epoch += 1
+        self._local.pop(inbox_id, None)
+        self._loads.pop(inbox_id, None)
+
+    def _ensure_invalidation_subscriber(self) -> None:
+        if (
+            self._subscriber_task is None
+            and self._invalidation_channel
+            and not self._closed
+        ):
+            self._subscriber_task = asyncio.create_task(
+                self._listen_for_invalidations(),
+                name="wappa-inbox-credential-invalidation",
+            )
+
+    async def _listen_for_invalidations(self) -> None:
+        retry_delay = 1.0
+        while True:
+            try:
+                redis = await self._get_redis()
+                pubsub = redis.pubsub()
+                try:
+                    await pubsub.subscribe(self._invalidation_channel)
+                    # Invalidations published while we were not subscribed
+                    # are lost, so nothing cached locally can be trusted.
+                    self._drop_all_local()
+                    retry_delay = 1.0
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self._on_invalidation_message(message.get("data"))
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "Inbox credential invalidation subscriber failed, "
+                    "retrying in %.0fs: %s",
+                    retry_delay,
+                    e,
+                )
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30.0)
+
+    def _on_invalidation_message(self, data: Any) -> None:
+        try:
+            payload = json.loads(data)
+            inbox_id = str(payload["inbox_id"])
+        except (TypeError, ValueError, KeyError) as e:
+            logger.warning("Ignoring malformed credential invalidation: %s", e)
+            return
+        if payload.get("origin") == self._instance_id:
+            return
+        self._drop_local(inbox_id)
+        self._notify_invalidated(inbox_id)
+
+    def _drop_all_local(self) -> None:
+        inbox_ids = list(self._local)
+        self._epoch += 1
+        self._local.clear()
+        self._loads.clear()
+        for inbox_id in inbox_ids:
+            self._notify_invalidated(inbox_id)
 
     async def _get_cached_credentials(self, inbox_id: str) -> InboxCredentials | None:
         redis = await self._get_redis()
@@ -87,7 +268,10 @@ class DatabaseInboxCredentialStore(IInboxCredentialStore):
             return None
 
         normalized = self._normalize_mapping(cached)
-        if normalized.get("is_active", "").lower() != "true":
+        is_active = normalized.get("is_active", "").lower()
+        if is_active == "false":
+            raise InboxNotFoundError(inbox_id)
+        if is_active != "true":
             return None
 
         access_token = normalized.get("access_token")
@@ -98,14 +282,17 @@ class DatabaseInboxCredentialStore(IInboxCredentialStore):
             inbox_id=inbox_id,
             access_token=access_token,
             platform_account_id=normalized.get("platform_account_id") or None,
+            app_secret=normalized.get("app_secret") or None,
         )
 
     async def _get_database_credentials(self, inbox_id: str) -> InboxCredentials:
+        # SELECT * keeps hosts whose table predates the optional
+        # app_secret column working unchanged.
         async with self._db_session_factory() as session:
             result = await session.execute(
                 text(
                     """
-                    SELECT inbox_id, access_token, platform_account_id
+                    SELECT *
                     FROM wappa_inboxes
                     WHERE inbox_id = :inbox_id
                       AND is_active = TRUE
@@ -123,22 +310,40 @@ class DatabaseInboxCredentialStore(IInboxCredentialStore):
             inbox_id=str(row["inbox_id"]),
             access_token=str(row["access_token"]),
             platform_account_id=row["platform_account_id"],
+            app_secret=row.get("app_secret"),
         )
 
     async def _cache_credentials(self, credentials: InboxCredentials) -> None:
-        redis = await self._get_redis()
-        key = self._cache_key(credentials.inbox_id)
-        await redis.hset(
-            key,
-            mapping={
+        await self._write_cache(
+            credentials.inbox_id,
+            {
                 "access_token": credentials.access_token,
                 "platform_account_id": credentials.platform_account_id or "",
+                "app_secret": credentials.app_secret or "",
                 "platform": "whatsapp",
                 "is_active": "true",
-                "cached_at": datetime.now(UTC).isoformat(),
             },
+            self._cache_ttl,
         )
-        await redis.expire(key, self._cache_ttl)
+
+    async def _cache_missing(self, inbox_id: str) -> None:
+        ttl = math.ceil(self._negative_cache_ttl)
+        if ttl > 0:
+            await self._write_cache(inbox_id, {"is_active": "false"}, ttl)
+
+    async def _write_cache(
+        self, inbox_id: str, mapping: dict[str, str], ttl: int
+    ) -> None:
+        # HSET and EXPIRE go in one MULTI so the hash never lives without a TTL.
+        redis = await self._get_redis()
+        key = self._cache_key(inbox_id)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(
+                key, mapping={**mapping, "cached_at": datetime.now(UTC).isoformat()}
+            )
+            pipe.expire(key, ttl)
+            await pipe.execute()
 
     async def _get_redis(self) -> Any:
         if all(
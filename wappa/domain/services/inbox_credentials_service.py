@@ -32,6 +32,7 @@ class SettingsInboxCredentialStore(IInboxCredentialStore):
             inbox_id=inbox_id,
             access_token=access_token,
             platform_account_id=settings.wp_bid or None,
+            app_secret=settings.wp_app_secret or None,
         )
 
     async def validate_inbox(self, inbox_id: str) -> bool:
@@ -39,6 +40,3 @@ class SettingsInboxCredentialStore(IInboxCredentialStore):
             return bool(settings.wp_access_token and settings.wp_phone_id == inbox_id)
         except Exception:
             return False
-
-    async def invalidate_cache(self, inbox_id: str) -> None:
-        return None
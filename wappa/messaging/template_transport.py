@@ -17,7 +17,8 @@ from typing import TYPE_CHECKING, Annotated, Literal, TypedDict, cast
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-from wappa.core.messaging.pipeline import MessengerPipeline, MiddlewareEntry
+from wappa.core.messaging.pipeline import MiddlewareEntry
+from wappa.core.messaging.registry import MessengerRegistry
 from wappa.domain.interfaces.inbox_credential_store import IInboxCredentialStore
 from wappa.domain.interfaces.session_provider import (
     HTTPSessionClosedError,
@@ -31,7 +32,6 @@ if TYPE_CHECKING:
     import httpx
     from fastapi import FastAPI
 
-    from wappa.domain.factories import MessengerFactory
     from wappa.domain.interfaces.messaging_interface import IMessenger
 
 
@@ -395,17 +395,14 @@ class OutboundRuntime:
         media_download_client_provider: Callable[[], httpx.AsyncClient],
         credential_store: IInboxCredentialStore,
         messenger_middleware: Sequence[MiddlewareEntry] = (),
+        messenger_registry: MessengerRegistry | None = None,
     ) -> None:
-        # Local import prevents the public ``wappa.messaging`` package from
-        # cycling while MessengerFactory imports its WhatsApp adapter modules.
-        from wappa.domain.factories import MessengerFactory
-
-        self._messenger_factory: MessengerFactory = MessengerFactory(
+        self._messenger_registry = messenger_registry or MessengerRegistry(
             session_provider=session_provider,
             credential_store=credential_store,
             media_download_client_provider=media_download_client_provider,
+            messenger_middleware=messenger_middleware,
         )
-        self._messenger_middleware = tuple(messenger_middleware)
 
     @classmethod
     def from_app(cls, app: FastAPI) -> OutboundRuntime:
@@ -428,6 +425,7 @@ class OutboundRuntime:
             credential_store=cast(IInboxCredentialStore, credential_store),
             messenger_middleware=getattr(app.state, "messenger_middleware", ()),
             media_download_client_provider=lifecycle.get_media_download_client,
+            messenger_registry=MessengerRegistry.from_app_state(app.state),
         )
         app.state.outbound_runtime = runtime
         return runtime
@@ -437,11 +435,7 @@ class OutboundRuntime:
         return InboxTemplateTransport(runtime=self, inbox_id=inbox_id)
 
     async def _messenger(self, inbox_id: str) -> IMessenger:
-        raw = await self._messenger_factory.create_messenger(
-            platform=PlatformType.WHATSAPP,
-            inbox_id=inbox_id,
-        )
-        return MessengerPipeline(raw=raw, middleware=self._messenger_middleware)
+        return await self._messenger_registry.get(inbox_id, PlatformType.WHATSAPP)
 
 
 async def _send_request(
@@ -24,6 +24,7 @@ Usage (User Request: Quick access to create_cache_factory):
 from ..domain.interfaces.cache_factory import ICacheFactory
 from ..domain.interfaces.cache_interfaces import (
     IExpiryCache,
+    IIdentityIndex,
     IStateCache,
     ITableCache,
     IUserCache,
@@ -32,12 +33,16 @@ from ..domain.interfaces.cache_interfaces import (
 )
 from .cache_factory import create_cache_factory, get_cache_factory
 from .cache_space import build_table_name
+from .field_index import FieldIndexRegistry, field_indexes
+from .generation_cache import GenerationCache, table_generations
+from .identity_index import IndexedIdentityResolver
 
 # Redis implementation re-exports
 from .redis import RedisClient
 from .redis import ops as redis_ops
 from .redis.redis_cache_factory import RedisCacheFactory
 from .typed_table_cache import TypedRowTransition, TypedTableCache
+from .value_compression import CompressionStats, ValueCompression, value_compression
 from .versioned_table_cache import VersionedTableCache
 
 __all__ = [
@@ -46,14 +51,26 @@ __all__ = [
     "get_cache_factory",
     # Cache key composition
     "build_table_name",
+    # Declared field indexes for find_by_field
+    "FieldIndexRegistry",
+    "field_indexes",
     # Core Interfaces
     "ICacheFactory",
     "IUserCache",
     "IStateCache",
     "IExpiryCache",
     "ITableCache",
+    "IIdentityIndex",
+    "IndexedIdentityResolver",
     "TypedTableCache",
     "VersionedTableCache",
+    # In-process generation cache for VersionedTableCache
+    "GenerationCache",
+    "table_generations",
+    # Compression of large cached values
+    "CompressionStats",
+    "ValueCompression",
+    "value_compression",
     # Atomic row transitions
     "TableRowTransition",
     "TableTransitionResult",
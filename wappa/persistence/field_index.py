@@ -0,0 +1,258 @@
+"""
+Declared secondary indexes for ``find_by_field`` on table and user caches.
+
+Without an index, ``find_by_field`` enumerates every row of the table (every
+user of the inbox) and compares the field one row at a time, so its cost grows
+with the inbox rather than with the number of matches. Declaring a field keeps
+a ``value -> {pkid}`` index next to the rows: every write through a Wappa
+cache re-indexes the row it touched, and ``find_by_field`` reads the index and
+only checks the candidates it names.
+
+Indexes are opt-in and process-wide; declare them at startup, before the
+first write:
+
+    field_indexes.declare("orders", "status", "customer_id")
+    field_indexes.declare_users("email")
+
+Rows written before a field was declared are not indexed until
+``rebuild_field_indexes()`` runs once over the table (or the users).
+
+An index may name rows that no longer match (a row expired, or was removed
+by pattern): lookups verify every candidate and drop the stale ones, so a
+stale entry costs one extra read and never produces a wrong answer.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Awaitable, Callable, Collection, Mapping, Sequence
+from typing import Any, Protocol
+
+from pydantic import BaseModel
+
+USER_SCOPE = "@user"
+"""Index scope of user records; table scopes are the table names."""
+
+
+class FieldIndexRegistry:
+    """Which fields are indexed, per table (and for user records)."""
+
+    def __init__(self) -> None:
+        self._fields: dict[str, tuple[str, ...]] = {}
+
+    def declare(self, table_name: str, *fields: str) -> None:
+        """Index ``fields`` of ``table_name`` rows (adds to earlier declarations)."""
+        if not table_name:
+            raise ValueError("table_name must not be empty")
+        self._add(table_name, fields)
+
+    def declare_users(self, *fields: str) -> None:
+        """Index ``fields`` of user records."""
+        self._add(USER_SCOPE, fields)
+
+    def fields(self, scope: str) -> tuple[str, ...]:
+        """Indexed fields of a table name (or ``USER_SCOPE``), in declaration order."""
+        return self._fields.get(scope, ())
+
+    def is_indexed(self, scope: str, field: str) -> bool:
+        return field in self._fields.get(scope, ())
+
+    def clear(self) -> None:
+        self._fields.clear()
+
+    def _add(self, scope: str, fields: tuple[str, ...]) -> None:
+        for field in fields:
+            if not field or ":" in field:
+                raise ValueError(f"Invalid index field name: {field!r}")
+        current = self._fields.get(scope, ())
+        self._fields[scope] = current + tuple(f for f in fields if f not in current)
+
+
+field_indexes = FieldIndexRegistry()
+
+
+def index_token(value: Any) -> str:
+    """Canonical text of a field value, as the memory and JSON indexes key it."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def row_value(row: Mapping[str, Any] | BaseModel | None, field: str) -> Any:
+    """A field of a row as stored (dict or model); None when absent."""
+    if row is None:
+        return None
+    if isinstance(row, BaseModel):
+        return getattr(row, field, None)
+    return row.get(field)
+
+
+class _IndexStorage(Protocol):
+    async def get_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        refs: Sequence[tuple[str | None, str]],
+    ) -> list[Any]: ...
+
+    async def update_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        keys: Collection[str],
+        mutate: Callable[[dict[str, Any]], Mapping[str, Any]],
+    ) -> None: ...
+
+    async def get_all_keys(
+        self, cache_type: str, inbox_id: str, user_id: str | None
+    ) -> dict[str, Any]: ...
+
+
+class StorageFieldIndex:
+    """Field indexes of one scope for the memory and JSON backends.
+
+    Each field keeps two kinds of entries in the inbox's ``indexes`` cache
+    type: one per value (``["<scope>","<field>"]=<token>`` -> pkids) and one
+    per row (``["<scope>","<field>"]@<pkid>`` -> token), recording what the
+    row was indexed under.
+    Re-indexing a row reads its row entries and writes only them and the
+    value entries of its old and new tokens, whatever the size of the table.
+    """
+
+    def __init__(self, storage: _IndexStorage, inbox: str, scope: str) -> None:
+        self.inbox = inbox
+        self.scope = scope
+        self._storage = storage
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return field_indexes.fields(self.scope)
+
+    def _field_prefix(self, field: str) -> str:
+        """Key prefix of one field's entries; a JSON array, so self-delimiting."""
+        return index_token([self.scope, field])
+
+    def _value_key(self, field: str, token: str) -> str:
+        return f"{self._field_prefix(field)}={token}"
+
+    def _row_key(self, field: str, pkid: str) -> str:
+        return f"{self._field_prefix(field)}@{pkid}"
+
+    async def reindex(
+        self, rows: Mapping[str, Mapping[str, Any] | BaseModel | None]
+    ) -> None:
+        """Record the current state of ``rows`` (pkid -> row, None if deleted)."""
+        fields = self.fields
+        if not fields or not rows:
+            return
+        moves: dict[tuple[str, str], str | None] = {}
+        for field in fields:
+            for pkid, row in rows.items():
+                value = row_value(row, field)
+                moves[field, pkid] = None if value is None else index_token(value)
+        while not await self._move(moves):
+            pass
+
+    async def _move(self, moves: Mapping[tuple[str, str], str | None]) -> bool:
+        """Point each ``(field, pkid)`` at its token (None removes the row).
+
+        Returns False, writing nothing, when a concurrent write moved one of
+        the rows after its row entry was read; the caller then reads again.
+        """
+        row_keys = {move: self._row_key(*move) for move in moves}
+        stored = await self._storage.get_many(
+            "indexes", self.inbox, [(None, key) for key in row_keys.values()]
+        )
+        previous = dict(zip(moves, stored, strict=True))
+        value_keys = {
+            self._value_key(field, token)
+            for (field, _), token in [*previous.items(), *moves.items()]
+            if token is not None
+        }
+        applied = False
+
+        def mutate(current: dict[str, Any]) -> dict[str, Any]:
+            nonlocal applied
+            if any(current.get(row_keys[m]) != t for m, t in previous.items()):
+                return {}
+            applied = True
+            changes: dict[str, Any] = {}
+
+            def members(key: str, pkid: str) -> list[str]:
+                pkids = changes.get(key, current.get(key)) or ()
+                return [member for member in pkids if member != pkid]
+
+            for (field, pkid), token in moves.items():
+                old = previous[field, pkid]
+                if old == token:
+                    continue
+                if old is not None:
+                    key = self._value_key(field, old)
+                    changes[key] = members(key, pkid) or None
+                if token is not None:
+                    key = self._value_key(field, token)
+                    changes[key] = [*members(key, pkid), pkid]
+                changes[row_keys[field, pkid]] = token
+            return changes
+
+        await self._storage.update_many(
+            "indexes", self.inbox, None, [*row_keys.values(), *value_keys], mutate
+        )
+        return applied
+
+    async def candidates(self, field: str, value: Any) -> list[str]:
+        """Pkids indexed under ``value``; verify each before trusting it."""
+        (pkids,) = await self._storage.get_many(
+            "indexes", self.inbox, [(None, self._value_key(field, index_token(value)))]
+        )
+        return sorted(pkids or ())
+
+    async def find(
+        self,
+        field: str,
+        value: Any,
+        load: Callable[[list[str]], Awaitable[Mapping[str, Any]]],
+    ) -> Any:
+        """First indexed row whose ``field`` equals ``value``, or None.
+
+        ``load`` reads candidate rows by pkid. Candidates that no longer match
+        are re-indexed from what ``load`` returned for them.
+        """
+        candidates = await self.candidates(field, value)
+        if not candidates:
+            return None
+        rows = await load(candidates)
+        stale: dict[str, Any] = {}
+        match = None
+        for pkid in candidates:
+            row = rows.get(pkid)
+            if row is not None and row_value(row, field) == value:
+                match = row
+                break
+            stale[pkid] = row
+        await self.reindex(stale)
+        return match
+
+    async def replace(self, rows: Mapping[str, Mapping[str, Any] | BaseModel]) -> None:
+        """Rebuild every declared field from a full listing of the scope's rows."""
+        fields = self.fields
+        if not fields:
+            return
+        entries: dict[str, Any] = {}
+        for field in fields:
+            for pkid, row in rows.items():
+                value = row_value(row, field)
+                if value is None:
+                    continue
+                token = index_token(value)
+                entries.setdefault(self._value_key(field, token), []).append(pkid)
+                entries[self._row_key(field, pkid)] = token
+        stored = await self._storage.get_all_keys("indexes", self.inbox, None)
+        prefixes = tuple(self._field_prefix(field) for field in fields)
+        dropped = [key for key in stored if key.startswith(prefixes)]
+
+        def mutate(current: dict[str, Any]) -> dict[str, Any]:
+            return {**dict.fromkeys(dropped), **entries}
+
+        await self._storage.update_many(
+            "indexes", self.inbox, None, [*dropped, *entries], mutate
+        )
@@ -0,0 +1,77 @@
+"""
+Field-level read-modify-write steps for the memory and JSON backends.
+
+Each builder returns the ``mutate`` callback that ``storage_manager.update``
+runs while it holds the namespace lock (memory) or the cache file's lock
+(JSON), so two handlers incrementing, appending to or merging into the same
+entry serialize instead of overwriting each other's change. Redis runs the
+same operations server-side in Lua (see ``redis_handler.utils.inbox_cache``).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from pydantic import BaseModel
+
+Mutation = Callable[[Any], dict[str, Any]]
+
+
+class NotNumericError(ValueError):
+    """The field to increment holds something other than a number."""
+
+
+def require_max_length(max_length: int | None) -> None:
+    """Reject a list cap that would keep nothing."""
+    if max_length is not None and max_length < 1:
+        raise ValueError(f"max_length must be at least 1, got {max_length}")
+
+
+def _as_dict(current: Any) -> dict[str, Any]:
+    if current is None:
+        return {}
+    if isinstance(current, BaseModel):
+        return current.model_dump()
+    return dict(current)
+
+
+def set_fields(fields: Mapping[str, Any]) -> Mutation:
+    """Overwrite ``fields``, keeping every other field of the entry."""
+
+    def mutate(current: Any) -> dict[str, Any]:
+        return {**_as_dict(current), **fields}
+
+    return mutate
+
+
+def increment(field: str, amount: int) -> Mutation:
+    """Add ``amount`` to an integer field (a missing field counts as 0)."""
+
+    def mutate(current: Any) -> dict[str, Any]:
+        data = _as_dict(current)
+        value = data.get(field, 0)
+        if not isinstance(value, int | float):
+            raise NotNumericError(
+                f"Cannot increment non-numeric field '{field}': {value}"
+            )
+        data[field] = int(value) + amount
+        return data
+
+    return mutate
+
+
+def append(field: str, value: Any, max_length: int | None = None) -> Mutation:
+    """Append to a list field, keeping only its newest ``max_length`` items.
+
+    A field holding anything but a list is replaced by a new list.
+    """
+
+    def mutate(current: Any) -> dict[str, Any]:
+        data = _as_dict(current)
+        items = data.get(field)
+        items = [*items, value] if isinstance(items, list) else [value]
+        data[field] = items[-max_length:] if max_length else items
+        return data
+
+    return mutate
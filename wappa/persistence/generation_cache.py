@@ -0,0 +1,136 @@
+"""Process-local cache of table generations for ``VersionedTableCache``.
+
+Resolving a generation costs a backend read, so every versioned operation
+would otherwise pay an extra round trip. A cached generation is only safe
+while the process hears about every bump another worker makes, so the cache
+serves nothing until an invalidation feed attaches to it (on Redis,
+``RedisGenerationSync``) and drops everything the moment that feed is lost.
+
+    from wappa.persistence.generation_cache import table_generations
+    from wappa.persistence.redis import RedisGenerationSync
+
+    sync = RedisGenerationSync(table_generations, mode="pubsub")
+    await sync.start()          # VersionedTableCache now skips the counter read
+
+Only caches that name their counters (``ITableCache.generation_key``) use it;
+the memory and JSON backends resolve the generation from their own store.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable, Iterable
+
+# Reads a counter by its key and returns the generation, through a path the
+# invalidation feed watches (Redis client-side tracking).
+GenerationLoader = Callable[[str], Awaitable[int]]
+
+# Upper bound on how long a cached generation is trusted even without an
+# invalidation: covers a counter expiring back to generation 1, which no bump
+# announces.
+DEFAULT_MAX_AGE = 300.0
+
+
+class GenerationCache:
+    """Generations by counter key, served only while invalidations flow.
+
+    Args:
+        max_age: Seconds a cached generation is trusted.
+    """
+
+    def __init__(self, *, max_age: float = DEFAULT_MAX_AGE) -> None:
+        if max_age <= 0:
+            raise ValueError("max_age must be a positive number of seconds")
+        self.max_age = max_age
+        self._entries: dict[str, tuple[int, float]] = {}
+        self._invalidations = 0
+        self._live = False
+        self._loader: GenerationLoader | None = None
+
+    @property
+    def live(self) -> bool:
+        """Whether an invalidation feed is attached and entries are served."""
+        return self._live
+
+    @property
+    def loads_reads(self) -> bool:
+        """Whether generations must be read through the attached loader."""
+        return self._live and self._loader is not None
+
+    def attach(self, loader: GenerationLoader | None = None) -> None:
+        """
+        Start serving cached generations; called once the feed is listening.
+
+        Args:
+            loader: Reads generations through the watched connection. When
+                set, only its reads are cached, since the feed reports changes
+                to the keys it read and nothing else.
+        """
+        self.invalidate()
+        self._loader = loader
+        self._live = True
+
+    def detach(self) -> None:
+        """Stop serving cached generations and drop them (the feed was lost)."""
+        self._live = False
+        self._loader = None
+        self.invalidate()
+
+    def get(self, key: str) -> int | None:
+        """The cached generation of ``key``, or None on a miss."""
+        if not self._live:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        generation, stored_at = entry
+        if time.monotonic() - stored_at > self.max_age:
+            del self._entries[key]
+            return None
+        return generation
+
+    def snapshot(self) -> int:
+        """Mark the start of a read; pass the result to ``offer``."""
+        return self._invalidations
+
+    def offer(self, key: str, generation: int, since: int) -> None:
+        """
+        Cache a generation read by the caller.
+
+        Refused when the feed is down, when any invalidation arrived since
+        ``since`` (the read may predate it), or when a loader is attached and
+        the read did not go through it.
+        """
+        if self._loader is None:
+            self._store(key, generation, since)
+
+    async def resolve(self, key: str, load: Callable[[], Awaitable[int]]) -> int:
+        """The generation of ``key``: cached, else read and cached."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        since = self._invalidations
+        if self._loader is not None:
+            generation = await self._loader(key)
+            self._store(key, generation, since)
+            return generation
+        generation = await load()
+        self.offer(key, generation, since)
+        return generation
+
+    def invalidate(self, keys: Iterable[str] | None = None) -> None:
+        """Drop ``keys`` (or every entry when None)."""
+        self._invalidations += 1
+        if keys is None:
+            self._entries.clear()
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def _store(self, key: str, generation: int, since: int) -> None:
+        if self._live and since == self._invalidations:
+            self._entries[key] = (generation, time.monotonic())
+
+
+# Shared by every VersionedTableCache unless one is given its own.
+table_generations = GenerationCache()
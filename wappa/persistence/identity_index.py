@@ -0,0 +1,324 @@
+"""
+Inbox-wide identity index: phone number / BSUID -> owning user_id.
+
+User caches keep the index current whenever a user record gains, changes or
+loses its ``phone_number`` or ``bsuid`` field, so resolving a transport
+identity is one read instead of a scan over every user in the inbox. A small
+process-wide LRU sits in front of every backend for the hottest recipients;
+writes made in this process evict their identities from it right away, and
+entries written elsewhere age out after ``ttl`` seconds.
+"""
+
+from __future__ import annotations
+
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
+from typing import Any, Protocol
+
+from pydantic import BaseModel
+
+from ..core.logging.context import get_current_inbox_context
+from ..domain.interfaces.cache_interfaces import IIdentityIndex
+from ..domain.interfaces.identity_resolver import IIdentityResolver
+from .cache_factory import create_cache_factory
+
+IDENTITY_FIELDS = ("phone_number", "bsuid")
+"""User record fields indexed as identities."""
+
+# Written by ``rebuild``; no phone number or BSUID looks like it
+_COMPLETE_KEY = ":"
+
+
+def record_identities(data: Mapping[str, Any] | BaseModel | None) -> set[str]:
+    """Identities carried by a user record (or a partial update of one)."""
+    if data is None:
+        return set()
+    if isinstance(data, BaseModel):
+        values = [getattr(data, field, None) for field in IDENTITY_FIELDS]
+    else:
+        values = [data.get(field) for field in IDENTITY_FIELDS]
+    return {value for value in values if isinstance(value, str) and value}
+
+
+class HotIdentityCache:
+    """Bounded LRU of recent ``(inbox, identity) -> user_id`` lookups.
+
+    Misses are remembered too, for ``negative_ttl`` seconds, because status
+    webhooks for a recipient without a user record arrive in bursts of three
+    (sent, delivered, read).
+    """
+
+    _MISSING = ""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+
+    def lookup(
+        self, inbox: str, identities: Iterable[str]
+    ) -> tuple[dict[str, str], list[str]]:
+        """Split identities into cached hits and the ones still to fetch."""
+        now = time.monotonic()
+        found: dict[str, str] = {}
+        missing: list[str] = []
+        for identity in identities:
+            key = (inbox, identity)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                missing.append(identity)
+                continue
+            self._entries.move_to_end(key)
+            if entry[1] != self._MISSING:
+                found[identity] = entry[1]
+        return found, missing
+
+    def store(
+        self, inbox: str, identities: Iterable[str], resolved: Mapping[str, str]
+    ) -> None:
+        now = time.monotonic()
+        for identity in identities:
+            user_id = resolved.get(identity)
+            ttl = self.ttl if user_id else self.negative_ttl
+            if ttl <= 0:
+                continue
+            key = (inbox, identity)
+            self._entries[key] = (now + ttl, user_id or self._MISSING)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, inbox: str, identities: Iterable[str]) -> None:
+        for identity in identities:
+            self._entries.pop((inbox, identity), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+hot_identities = HotIdentityCache()
+
+
+class CachedIdentityIndex(IIdentityIndex):
+    """Backend-agnostic half of an identity index: the hot LRU in front.
+
+    Subclasses provide an ``inbox`` attribute plus the two backend
+    operations. (``inbox`` is not annotated here: the Redis index is a
+    pydantic model that declares it as a field.)
+    """
+
+    async def get_user_ids(self, identities: Iterable[str]) -> dict[str, str]:
+        found, missing = hot_identities.lookup(self.inbox, dict.fromkeys(identities))
+        if missing:
+            fetched = await self._fetch_user_ids(missing)
+            hot_identities.store(self.inbox, missing, fetched)
+            found.update(fetched)
+        return found
+
+    async def link(
+        self,
+        user_id: str,
+        identities: Iterable[str],
+        *,
+        replaced: Iterable[str] = (),
+    ) -> None:
+        await self.link_many([(user_id, identities, replaced)])
+
+    async def link_many(
+        self, changes: Iterable[tuple[str, Iterable[str], Iterable[str]]]
+    ) -> None:
+        batch: list[tuple[str, set[str], set[str]]] = []
+        for user_id, identities, replaced in changes:
+            linked = set(identities)
+            dropped = set(replaced) - linked
+            if linked or dropped:
+                batch.append((user_id, linked, dropped))
+        if not batch:
+            return
+        try:
+            await self._write_many(batch)
+        finally:
+            for _, linked, dropped in batch:
+                hot_identities.discard(self.inbox, linked | dropped)
+
+    @abstractmethod
+    async def _fetch_user_ids(self, identities: list[str]) -> dict[str, str]:
+        """Read the owners of ``identities`` from the backend."""
+
+    @abstractmethod
+    async def _write_many(self, batch: list[tuple[str, set[str], set[str]]]) -> None:
+        """Apply ``(user_id, linked, dropped)`` changes in one backend write."""
+
+
+class _IndexStorage(Protocol):
+    async def get_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        refs: Sequence[tuple[str | None, str]],
+    ) -> list[Any]: ...
+
+    async def update_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        keys: Collection[str],
+        mutate: Callable[[dict[str, Any]], Mapping[str, Any]],
+    ) -> None: ...
+
+    async def get_all_keys(
+        self, cache_type: str, inbox_id: str, user_id: str | None
+    ) -> dict[str, Any]: ...
+
+    async def get_keys_by_prefix(
+        self, cache_type: str, inbox_id: str, key_prefix: str
+    ) -> dict[str, Any]: ...
+
+
+class StorageIdentityIndex(CachedIdentityIndex):
+    """Identity index for the memory and JSON backends.
+
+    One entry per identity (identity -> user_id) under the ``identities``
+    cache type, so a link touches only the identities that changed. Lookups
+    check the owning user record and drop entries whose user expired or no
+    longer carries the identity. ``user_key`` builds the key of a user record
+    from its user_id.
+    """
+
+    def __init__(
+        self, storage: _IndexStorage, inbox: str, user_key: Callable[[str], str]
+    ) -> None:
+        if not inbox:
+            raise ValueError(f"Missing required parameter: inbox={inbox}")
+        self.inbox = inbox
+        self._storage = storage
+        self._user_key = user_key
+
+    async def _fetch_user_ids(self, identities: list[str]) -> dict[str, str]:
+        values = await self._storage.get_many(
+            "identities", self.inbox, [(None, identity) for identity in identities]
+        )
+        found = {
+            identity: user_id
+            for identity, user_id in zip(identities, values, strict=True)
+            if user_id
+        }
+        return await self._prune(found) if found else {}
+
+    async def _write_many(self, batch: list[tuple[str, set[str], set[str]]]) -> None:
+        keys = {
+            identity for _, linked, dropped in batch for identity in linked | dropped
+        }
+
+        def mutate(current: dict[str, Any]) -> dict[str, Any]:
+            changes: dict[str, Any] = {}
+            for user_id, linked, dropped in batch:
+                for identity in dropped:
+                    if changes.get(identity, current.get(identity)) == user_id:
+                        changes[identity] = None
+                for identity in linked:
+                    changes[identity] = user_id
+            return changes
+
+        await self._storage.update_many("identities", self.inbox, None, keys, mutate)
+
+    async def _prune(self, entries: dict[str, str]) -> dict[str, str]:
+        """Keep the entries whose user record still carries the identity."""
+        owners = sorted(set(entries.values()))
+        records = await self._storage.get_many(
+            "users",
+            self.inbox,
+            [(user_id, self._user_key(user_id)) for user_id in owners],
+        )
+        carried = {
+            user_id: record_identities(record)
+            for user_id, record in zip(owners, records, strict=True)
+        }
+        stale = {
+            identity: user_id
+            for identity, user_id in entries.items()
+            if identity not in carried[user_id]
+        }
+        if stale:
+            hot_identities.discard(self.inbox, stale)
+
+            def mutate(current: dict[str, Any]) -> dict[str, Any]:
+                return {
+                    identity: None
+                    for identity, user_id in stale.items()
+                    if current.get(identity) == user_id
+                }
+
+            await self._storage.update_many(
+                "identities", self.inbox, None, stale.keys(), mutate
+            )
+        return {
+            identity: user_id
+            for identity, user_id in entries.items()
+            if identity not in stale
+        }
+
+    async def rebuild(self) -> int:
+        prefix = self._user_key("")
+        users = await self._storage.get_keys_by_prefix("users", self.inbox, prefix)
+        await self.link_many(
+            (key.removeprefix(prefix), record_identities(record), ())
+            for key, record in users.items()
+        )
+        existing = await self._storage.get_all_keys("identities", self.inbox, None)
+        await self._prune(
+            {
+                identity: user_id
+                for identity, user_id in existing.items()
+                if identity != _COMPLETE_KEY
+            }
+        )
+        await self._storage.update_many(
+            "identities",
+            self.inbox,
+            None,
+            (_COMPLETE_KEY,),
+            lambda _: {_COMPLETE_KEY: True},
+        )
+        return len(users)
+
+    async def is_complete(self) -> bool:
+        (sealed,) = await self._storage.get_many(
+            "identities", self.inbox, [(None, _COMPLETE_KEY)]
+        )
+        return bool(sealed)
+
+
+class IndexedIdentityResolver(IIdentityResolver):
+    """``IIdentityResolver`` backed by the identity index.
+
+    Resolves a phone number or BSUID to the user_id of the user record that
+    carries it, in the inbox bound to the current request. Recipients without
+    a user record (or calls outside an inbox context) resolve to themselves,
+    like ``PassthroughIdentityResolver``.
+
+    Example:
+        builder.with_identity_resolver(IndexedIdentityResolver("redis"))
+    """
+
+    def __init__(self, cache_type: str = "memory") -> None:
+        self._factory_class = create_cache_factory(cache_type)
+
+    async def resolve(self, recipient: str) -> str:
+        inbox_id = get_current_inbox_context()
+        if not inbox_id:
+            return recipient
+        index = self._factory_class(
+            inbox_id=inbox_id, user_id=recipient
+        ).create_identity_index()
+        return await index.get_user_id(recipient) or recipient
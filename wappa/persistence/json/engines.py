@@ -0,0 +1,237 @@
+"""
+Storage engines of the JSON cache backend.
+
+``JSONStorageManager`` keeps one store per cache file of the old layout (a
+user's entries, an inbox's tables, ...) and reaches it only through an engine:
+
+- ``file`` (default): one JSON document per store, rewritten whole on every
+  write, with the deadlines of expiring entries in its ``_metadata``.
+- ``log``: an append-only change log per store with an in-memory offset index
+  (see ``log_engine``), so a write costs the size of the entry, not the store.
+
+Entries are handed over in their stored form (``serialize_entry``). Every
+mutation goes through ``mutate``, which reads the entries it needs and writes
+the changes under one store lock.
+
+Each entry carries its own expiry. Expired entries are never returned, are
+dropped by the next write of their store, and ``purge`` removes them from a
+store nobody writes (``JSONStorageManager`` calls it when a deadline passes).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Collection, Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from ...core.config.settings import settings
+from .handlers.utils.file_manager import file_manager
+from .handlers.utils.serialization import (
+    create_cache_file_data,
+    extract_cache_file_data,
+)
+
+# Receives the live stored entries among the keys asked for and returns the
+# changes to write: key -> new stored entry, or None to delete the key.
+Change = Callable[[dict[str, Any]], Mapping[str, Any]]
+
+
+def ttl_left(deadlines: Iterable[float | None], now: float) -> int:
+    """``get_ttl`` of entries with these deadlines (None: no expiry).
+
+    -2 without entries, -1 if one never expires, else the seconds until the
+    last one does.
+    """
+    deadlines = list(deadlines)
+    if not deadlines:
+        return -2
+    if None in deadlines:
+        return -1
+    return int(max(d for d in deadlines if d is not None) - now)
+
+
+class JSONEngine(ABC):
+    """Where and how the JSON backend keeps its stores."""
+
+    name: str = ""
+    suffix: str = ".json"
+
+    @abstractmethod
+    def path(self, cache_type: str, inbox_id: str, user_id: str | None) -> Path:
+        """The file of one store."""
+
+    async def paths(self, cache_type: str, inbox_id: str) -> list[Path]:
+        """Every store file of the inbox in a cache space."""
+        pattern = self.path(cache_type, glob.escape(inbox_id), "*")
+        return await asyncio.to_thread(
+            lambda: sorted(pattern.parent.glob(pattern.name))
+        )
+
+    async def all_paths(self) -> list[Path]:
+        """Every store file of every inbox and cache space."""
+        root = file_manager.get_cache_root()
+        return await asyncio.to_thread(lambda: sorted(root.glob(f"*/*{self.suffix}")))
+
+    @abstractmethod
+    async def read(
+        self, path: Path, keys: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        """Live stored entries (all, or those among ``keys``).
+
+        Returns None when the store does not exist.
+        """
+
+    @abstractmethod
+    async def mutate(
+        self,
+        path: Path,
+        keys: Collection[str],
+        change: Change,
+        ttl: int | None = None,
+    ) -> bool:
+        """Read ``keys``, pass them to ``change`` and write what it returns.
+
+        Both happen under the store's lock. Each key written expires ``ttl``
+        seconds from now, or never when ``ttl`` is None; the other entries
+        keep their expiry. ``change`` returning nothing writes nothing. A store
+        left empty is removed. Returns False if the write failed.
+        """
+
+    @abstractmethod
+    async def get_ttl(self, path: Path, key: str | None = None) -> int:
+        """Seconds left, -1 without expiry, -2 if missing or expired.
+
+        Without ``key``, for the store as a whole (see ``ttl_left``).
+        """
+
+    @abstractmethod
+    async def set_ttl(self, path: Path, key: str | None, ttl: int) -> bool:
+        """Expire a live key (every live key when None) ``ttl`` seconds from now.
+
+        Returns False if there was none.
+        """
+
+    @abstractmethod
+    async def purge(self, path: Path) -> float | None:
+        """Remove a store's expired entries; returns the next deadline, if any."""
+
+    async def close(self) -> None:  # noqa: B027 - optional hook
+        """Finish background work and make written stores durable."""
+
+
+def _drop_expired(data: dict[str, Any], expiry: dict[str, float], now: float) -> bool:
+    """Remove expired entries from a file's contents; True if there were any."""
+    expired = [key for key, deadline in expiry.items() if deadline <= now]
+    for key in expired:
+        data.pop(key, None)
+        del expiry[key]
+    return bool(expired)
+
+
+class FileEngine(JSONEngine):
+    """One JSON document per store, replaced atomically on every write."""
+
+    name = "file"
+
+    def path(self, cache_type: str, inbox_id: str, user_id: str | None) -> Path:
+        return file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
+
+    async def _load(
+        self, path: Path, now: float
+    ) -> tuple[dict[str, Any], dict[str, float]] | None:
+        """Live entries of a file and their deadlines; None if it is missing."""
+        file_data = await file_manager.read_unlocked(path)
+        if not file_data:
+            return None
+        data, expiry = extract_cache_file_data(file_data)
+        _drop_expired(data, expiry, now)
+        return data, expiry
+
+    async def read(
+        self, path: Path, keys: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        loaded = await self._load(path, time.time())
+        if loaded is None:
+            return None
+        data = loaded[0]
+        if keys is None:
+            return data
+        return {key: data[key] for key in keys if key in data}
+
+    async def mutate(
+        self,
+        path: Path,
+        keys: Collection[str],
+        change: Change,
+        ttl: int | None = None,
+    ) -> bool:
+        async with file_manager.locked(path):
+            now = time.time()
+            data, expiry = await self._load(path, now) or ({}, {})
+            changes = change({key: data[key] for key in keys if key in data})
+            if not changes:
+                return True
+            for key, stored in changes.items():
+                expiry.pop(key, None)
+                if stored is None:
+                    data.pop(key, None)
+                    continue
+                data[key] = stored
+                if ttl:
+                    expiry[key] = now + ttl
+            return await self._save(path, data, expiry)
+
+    async def _save(
+        self, path: Path, data: dict[str, Any], expiry: dict[str, float]
+    ) -> bool:
+        if not data:
+            return await file_manager.delete_unlocked(path)
+        return await file_manager.write_unlocked(
+            path, create_cache_file_data(data, expiry)
+        )
+
+    async def get_ttl(self, path: Path, key: str | None = None) -> int:
+        now = time.time()
+        data, expiry = await self._load(path, now) or ({}, {})
+        keys = data if key is None else [key] if key in data else []
+        return ttl_left((expiry.get(k) for k in keys), now)
+
+    async def set_ttl(self, path: Path, key: str | None, ttl: int) -> bool:
+        async with file_manager.locked(path):
+            now = time.time()
+            data, expiry = await self._load(path, now) or ({}, {})
+            keys = list(data) if key is None else [key] if key in data else []
+            if not keys:
+                return False
+            expiry.update(dict.fromkeys(keys, now + ttl))
+            return await self._save(path, data, expiry)
+
+    async def purge(self, path: Path) -> float | None:
+        async with file_manager.locked(path):
+            file_data = await file_manager.read_unlocked(path)
+            if not file_data:
+                return None
+            data, expiry = extract_cache_file_data(file_data)
+            if _drop_expired(data, expiry, time.time()):
+                await self._save(path, data, expiry)
+            return min(expiry.values(), default=None)
+
+
+def create_engine(name: str) -> JSONEngine:
+    """The engine called ``name`` (``file`` or ``log``)."""
+    match name:
+        case "file":
+            return FileEngine()
+        case "log":
+            from .log_engine import LogEngine
+
+            return LogEngine(
+                fsync_interval=settings.json_cache_fsync_interval,
+                compact_ratio=settings.json_cache_compact_ratio,
+            )
+        case _:
+            raise ValueError(f"Unknown JSON cache engine: {name!r}")
@@ -5,12 +5,14 @@ Provides AI agent state cache operations using JSON file storage.
 """
 
 import logging
+from collections.abc import Iterable, Mapping
 from datetime import UTC, datetime
 from typing import Any, cast
 
 from pydantic import BaseModel
 
 from ....domain.interfaces.cache_interfaces import IAIStateCache
+from ... import field_updates
 from ..storage_manager import storage_manager
 from .utils.key_factory import default_key_factory
 
@@ -108,6 +110,40 @@ class JSONAIState(IAIStateCache):
         )
         return 1 if success else 0
 
+    async def get_many(
+        self, agent_names: Iterable[str], models: type[BaseModel] | None = None
+    ) -> dict[str, Any]:
+        """Get several agent states with one file read."""
+        names = list(dict.fromkeys(agent_names))
+        values = await storage_manager.get_many(
+            "ai_states",
+            self.inbox,
+            [(self.user_id, self._key(name)) for name in names],
+            models,
+        )
+        return dict(zip(names, values, strict=True))
+
+    async def upsert_many(
+        self,
+        states: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """Create or update several agent states with one file write."""
+        return await storage_manager.set_many(
+            "ai_states",
+            self.inbox,
+            [(self.user_id, self._key(name), data) for name, data in states.items()],
+            ttl,
+        )
+
+    async def delete_many(self, agent_names: Iterable[str]) -> int:
+        """Delete several agent states with one file write."""
+        return await storage_manager.delete_many(
+            "ai_states",
+            self.inbox,
+            [(self.user_id, self._key(name)) for name in dict.fromkeys(agent_names)],
+        )
+
     async def exists(self, agent_name: str) -> bool:
         """
         Check if AI agent state exists.
@@ -142,6 +178,22 @@ class JSONAIState(IAIStateCache):
             # BaseModel instance
             return getattr(state_data, field, None)
 
+    async def _update(
+        self, agent_name: str, mutate: field_updates.Mutation, ttl: int | None
+    ) -> dict[str, Any]:
+        """Read-modify-write one AI agent state under the cache file's lock."""
+        return cast(
+            dict[str, Any],
+            await storage_manager.update(
+                "ai_states",
+                self.inbox,
+                self.user_id,
+                self._key(agent_name),
+                mutate,
+                ttl,
+            ),
+        )
+
     async def update_field(
         self,
         agent_name: str,
@@ -161,15 +213,14 @@ class JSONAIState(IAIStateCache):
         Returns:
             True if successful, False otherwise
         """
-        state_data = await self.get(agent_name)
-        if state_data is None:
-            state_data = {}
-
-        if isinstance(state_data, BaseModel):
-            state_data = state_data.model_dump()
-
-        state_data[field] = value
-        return await self.upsert(agent_name, state_data, ttl)
+        try:
+            await self._update(
+                agent_name, field_updates.set_fields({field: value}), ttl
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update field '{field}' of '{agent_name}': {e}")
+            return False
 
     async def increment_field(
         self,
@@ -190,25 +241,17 @@ class JSONAIState(IAIStateCache):
         Returns:
             New value after increment or None on error
         """
-        state_data = await self.get(agent_name)
-        if state_data is None:
-            state_data = {}
-
-        if isinstance(state_data, BaseModel):
-            state_data = state_data.model_dump()
-
-        current_value = state_data.get(field, 0)
-        if not isinstance(current_value, int | float):
-            logger.warning(
-                f"Cannot increment non-numeric field '{field}': {current_value}"
+        try:
+            state_data = await self._update(
+                agent_name, field_updates.increment(field, increment), ttl
             )
+        except field_updates.NotNumericError as e:
+            logger.warning(str(e))
             return None
-
-        new_value = int(current_value) + increment
-        state_data[field] = new_value
-
-        success = await self.upsert(agent_name, state_data, ttl)
-        return new_value if success else None
+        except Exception as e:
+            logger.error(f"Failed to increment field '{field}' of '{agent_name}': {e}")
+            return None
+        return cast(int, state_data[field])
 
     async def append_to_list(
         self,
@@ -216,6 +259,7 @@ class JSONAIState(IAIStateCache):
         field: str,
         value: Any,
         ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
         Append value to a list field in AI agent state.
@@ -225,25 +269,20 @@ class JSONAIState(IAIStateCache):
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
         """
-        state_data = await self.get(agent_name)
-        if state_data is None:
-            state_data = {}
-
-        if isinstance(state_data, BaseModel):
-            state_data = state_data.model_dump()
-
-        current_list = state_data.get(field, [])
-        if not isinstance(current_list, list):
-            current_list = []
-
-        current_list.append(value)
-        state_data[field] = current_list
-
-        return await self.upsert(agent_name, state_data, ttl)
+        field_updates.require_max_length(max_length)
+        try:
+            await self._update(
+                agent_name, field_updates.append(field, value, max_length), ttl
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to append to field '{field}' of '{agent_name}': {e}")
+            return False
 
     async def get_ttl(self, agent_name: str) -> int:
         """
@@ -305,31 +344,27 @@ class JSONAIState(IAIStateCache):
         models: type[BaseModel] | None = None,
     ) -> dict[str, Any] | None:
         """
-        Merge new data with existing AI agent state.
+        Merge new data into the existing AI agent state under the cache file's lock.
 
         Args:
             agent_name: AI agent name
             state_data: New state data to merge
             ttl: Optional TTL override
-            models: Optional mapping for BaseModel deserialization
+            models: Optional BaseModel class for deserialization
 
         Returns:
             Final merged state or None on failure
         """
-        # Get existing state with optional BaseModel deserialization
-        existing_state = await self.get(agent_name, models=models) or {}
-
-        if isinstance(existing_state, BaseModel):
-            existing_state = existing_state.model_dump()
-
-        # Merge new data with existing
-        new_state = {
-            **existing_state,
+        fields = {
             **state_data,
             "agent_type": agent_name,
             "timestamp": datetime.now(UTC).isoformat(),
         }
-
-        # Save merged state
-        success = await self.upsert(agent_name, new_state, ttl)
-        return new_state if success else None
+        try:
+            merged = await self._update(
+                agent_name, field_updates.set_fields(fields), ttl
+            )
+        except Exception as e:
+            logger.error(f"Failed to merge into '{agent_name}': {e}")
+            return None
+        return cast(dict[str, Any], models.model_validate(merged)) if models else merged
@@ -5,16 +5,20 @@ Provides table cache operations using JSON file storage.
 """
 
 import logging
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from typing import Any, cast
 
 from pydantic import BaseModel
 
 from ....domain.interfaces.cache_interfaces import (
+    GENERATION_FIELD,
     ITableCache,
     TableRowTransition,
     TableTransitionResult,
+    generation_of,
 )
+from ... import field_updates
+from ...field_index import StorageFieldIndex, field_indexes, row_value
 from ...row_conditions import require_full_row, row_predicate
 from ..storage_manager import storage_manager
 from .utils.key_factory import default_key_factory
@@ -47,6 +51,32 @@ class JSONTable(ITableCache):
         """Build table key using KeyFactory (same as Redis)."""
         return self.keys.table(self.inbox, table_name, pkid)
 
+    def _index(self, table_name: str) -> StorageFieldIndex:
+        return StorageFieldIndex(storage_manager, self.inbox, table_name)
+
+    async def _reindex(
+        self, table_name: str, rows: Mapping[str, dict[str, Any] | BaseModel | None]
+    ) -> None:
+        """Bring the table's declared field indexes in line with these rows."""
+        if field_indexes.fields(table_name):
+            prefix = self._key(table_name, "")
+            await self._index(table_name).reindex(
+                {
+                    self._key(table_name, pkid).removeprefix(prefix): row
+                    for pkid, row in rows.items()
+                }
+            )
+
+    async def _rows(self, table_name: str) -> dict[str, Any]:
+        """Every row of a table, by pkid."""
+        key_prefix = self._key(table_name, "")
+        all_keys = await storage_manager.get_all_keys("tables", self.inbox, None)
+        return {
+            key.removeprefix(key_prefix): value
+            for key, value in all_keys.items()
+            if key.startswith(key_prefix)
+        }
+
     # ---- Public API matching RedisTable ----
     async def get(
         self,
@@ -91,7 +121,10 @@ class JSONTable(ITableCache):
             True if successful, False otherwise
         """
         key = self._key(table_name, pkid)
-        return await storage_manager.set("tables", self.inbox, None, key, data, ttl)
+        success = await storage_manager.set("tables", self.inbox, None, key, data, ttl)
+        if success:
+            await self._reindex(table_name, {pkid: data})
+        return success
 
     async def create_if_absent(
         self,
@@ -110,6 +143,7 @@ class JSONTable(ITableCache):
             ttl,
         )
         if created:
+            await self._reindex(table_name, {pkid: data})
             return TableTransitionResult(TableRowTransition.CREATED)
         return TableTransitionResult(TableRowTransition.ALREADY_EXISTS, existing)
 
@@ -133,6 +167,7 @@ class JSONTable(ITableCache):
             ttl,
         )
         if outcome == "replaced":
+            await self._reindex(table_name, {pkid: data})
             return TableTransitionResult(TableRowTransition.REPLACED)
         if outcome == "missing":
             return TableTransitionResult(TableRowTransition.MISSING)
@@ -151,8 +186,53 @@ class JSONTable(ITableCache):
         """
         key = self._key(table_name, pkid)
         success = await storage_manager.delete("tables", self.inbox, None, key)
+        await self._reindex(table_name, {pkid: None})
         return 1 if success else 0
 
+    async def get_many(
+        self,
+        table_name: str,
+        pkids: Iterable[str],
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        """Get several rows with one file read."""
+        unique = list(dict.fromkeys(pkids))
+        values = await storage_manager.get_many(
+            "tables",
+            self.inbox,
+            [(None, self._key(table_name, pkid)) for pkid in unique],
+            models,
+        )
+        return dict(zip(unique, values, strict=True))
+
+    async def upsert_many(
+        self,
+        table_name: str,
+        rows: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """Create or update several rows with one file write."""
+        success = await storage_manager.set_many(
+            "tables",
+            self.inbox,
+            [(None, self._key(table_name, pkid), data) for pkid, data in rows.items()],
+            ttl,
+        )
+        if success:
+            await self._reindex(table_name, rows)
+        return success
+
+    async def delete_many(self, table_name: str, pkids: Iterable[str]) -> int:
+        """Delete several rows with one file write."""
+        unique = list(dict.fromkeys(pkids))
+        deleted = await storage_manager.delete_many(
+            "tables",
+            self.inbox,
+            [(None, self._key(table_name, pkid)) for pkid in unique],
+        )
+        await self._reindex(table_name, dict.fromkeys(unique))
+        return deleted
+
     async def exists(self, table_name: str, pkid: str) -> bool:
         """
         Check if table row exists.
@@ -189,6 +269,23 @@ class JSONTable(ITableCache):
             # BaseModel instance
             return getattr(row_data, field, None)
 
+    async def _update(
+        self,
+        table_name: str,
+        pkid: str,
+        mutate: field_updates.Mutation,
+        ttl: int | None,
+    ) -> dict[str, Any]:
+        """Read-modify-write one row under the cache file's lock, then re-index it."""
+        row = cast(
+            "dict[str, Any]",
+            await storage_manager.update(
+                "tables", self.inbox, None, self._key(table_name, pkid), mutate, ttl
+            ),
+        )
+        await self._reindex(table_name, {pkid: row})
+        return row
+
     async def update_field(
         self,
         table_name: str,
@@ -210,15 +307,16 @@ class JSONTable(ITableCache):
         Returns:
             True if successful, False otherwise
         """
-        row_data = await self.get(table_name, pkid)
-        if row_data is None:
-            row_data = {}
-
-        if isinstance(row_data, BaseModel):
-            row_data = row_data.model_dump()
-
-        row_data[field] = value
-        return await self.upsert(table_name, pkid, row_data, ttl)
+        try:
+            await self._update(
+                table_name, pkid, field_updates.set_fields({field: value}), ttl
+            )
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed to update field '{field}' of '{table_name}:{pkid}': {e}"
+            )
+            return False
 
     async def increment_field(
         self,
@@ -241,25 +339,19 @@ class JSONTable(ITableCache):
         Returns:
             New value after increment or None on error
         """
-        row_data = await self.get(table_name, pkid)
-        if row_data is None:
-            row_data = {}
-
-        if isinstance(row_data, BaseModel):
-            row_data = row_data.model_dump()
-
-        current_value = row_data.get(field, 0)
-        if not isinstance(current_value, int | float):
-            logger.warning(
-                f"Cannot increment non-numeric field '{field}': {current_value}"
+        try:
+            data = await self._update(
+                table_name, pkid, field_updates.increment(field, increment), ttl
             )
+        except field_updates.NotNumericError as e:
+            logger.warning(str(e))
             return None
-
-        new_value = int(current_value) + increment
-        row_data[field] = new_value
-
-        success = await self.upsert(table_name, pkid, row_data, ttl)
-        return new_value if success else None
+        except Exception as e:
+            logger.error(
+                f"Failed to increment field '{field}' of '{table_name}:{pkid}': {e}"
+            )
+            return None
+        return cast(int, data[field])
 
     async def append_to_list(
         self,
@@ -268,6 +360,7 @@ class JSONTable(ITableCache):
         field: str,
         value: Any,
         ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
         Append value to a list field in table row.
@@ -278,25 +371,109 @@ class JSONTable(ITableCache):
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
         """
-        row_data = await self.get(table_name, pkid)
-        if row_data is None:
-            row_data = {}
+        field_updates.require_max_length(max_length)
+        try:
+            await self._update(
+                table_name, pkid, field_updates.append(field, value, max_length), ttl
+            )
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed to append to field '{field}' of '{table_name}:{pkid}': {e}"
+            )
+            return False
+
+    async def find_by_field(
+        self,
+        table_name: str,
+        field: str,
+        value: Any,
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Find the first row in a table whose field equals value.
+
+        Reads the field index when one is declared for ``(table_name, field)``
+        (see ``field_indexes``); otherwise checks every row of the table.
+
+        Args:
+            table_name: Table name
+            field: Field name to search
+            value: Value to match
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Matching row data or None if no row matches
+        """
+        if field_indexes.is_indexed(table_name, field):
+            row = await self._index(table_name).find(
+                field, value, lambda pkids: self.get_many(table_name, pkids)
+            )
+        else:
+            row = next(
+                (
+                    row
+                    for _, row in sorted((await self._rows(table_name)).items())
+                    if row_value(row, field) == value
+                ),
+                None,
+            )
+        if row is not None and models is not None and isinstance(row, dict):
+            return cast(dict[str, Any], models.model_validate(row))
+        return row
+
+    async def rebuild_field_indexes(self, table_name: str) -> int:
+        """
+        Re-create the declared field indexes of a table from its rows.
 
-        if isinstance(row_data, BaseModel):
-            row_data = row_data.model_dump()
+        Run once after declaring an index on a table that already holds data.
 
-        current_list = row_data.get(field, [])
-        if not isinstance(current_list, list):
-            current_list = []
+        Returns:
+            Number of rows indexed
+        """
+        if not field_indexes.fields(table_name):
+            return 0
+        rows = await self._rows(table_name)
+        await self._index(table_name).replace(rows)
+        return len(rows)
+
+    async def get_generation(self, counter_table: str, name: str) -> int:
+        """Read the generation counter without taking the storage lock."""
+        key = self._key(counter_table, name)
+        return cast(
+            int,
+            await storage_manager.view(
+                "tables",
+                self.inbox,
+                None,
+                lambda lookup: generation_of(row_value(lookup(key), GENERATION_FIELD)),
+            ),
+        )
 
-        current_list.append(value)
-        row_data[field] = current_list
+    async def get_in_generation(
+        self,
+        counter_table: str,
+        name: str,
+        table_prefix: str,
+        pkid: str,
+        models: type[BaseModel] | None = None,
+    ) -> tuple[int, dict[str, Any] | None]:
+        """Resolve the generation and read the row from one view of the store."""
+        counter_key = self._key(counter_table, name)
+
+        def read(lookup: Any) -> tuple[int, Any]:
+            generation = generation_of(row_value(lookup(counter_key), GENERATION_FIELD))
+            return generation, lookup(self._key(f"{table_prefix}{generation}", pkid))
 
-        return await self.upsert(table_name, pkid, row_data, ttl)
+        generation, row = await storage_manager.view("tables", self.inbox, None, read)
+        if models is not None and isinstance(row, dict):
+            row = models.model_validate(row)
+        return generation, row
 
     async def get_ttl(self, table_name: str, pkid: str) -> int:
         """
@@ -309,7 +486,9 @@ class JSONTable(ITableCache):
         Returns:
             Remaining TTL in seconds, -1 if no expiry, -2 if doesn't exist
         """
-        return await storage_manager.get_ttl("tables", self.inbox, None)
+        return await storage_manager.get_ttl(
+            "tables", self.inbox, None, self._key(table_name, pkid)
+        )
 
     async def renew_ttl(self, table_name: str, pkid: str, ttl: int) -> bool:
         """
@@ -323,7 +502,9 @@ class JSONTable(ITableCache):
         Returns:
             True if successful, False otherwise
         """
-        return await storage_manager.set_ttl("tables", self.inbox, None, ttl)
+        return await storage_manager.set_ttl(
+            "tables", self.inbox, None, self._key(table_name, pkid), ttl
+        )
 
     async def get_all(
         self,
@@ -369,6 +550,9 @@ class JSONTable(ITableCache):
         if not table_name:
             raise ValueError("table_name must be non-empty")
 
+        if field_indexes.fields(table_name):
+            await self._index(table_name).replace({})
+
         deleted = 0
         key_prefix = self.keys.table(self.inbox, table_name, "")
         all_keys = await storage_manager.get_all_keys("tables", self.inbox, None)
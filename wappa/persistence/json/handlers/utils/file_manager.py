@@ -6,6 +6,7 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, cast
 
+from .lock_table import LockTable
 from .serialization import from_json_string, to_json_string
 
 logger = logging.getLogger("JSONFileManager")
@@ -14,12 +15,7 @@ logger = logging.getLogger("JSONFileManager")
 class FileManager:
     def __init__(self) -> None:
         self._cache_root: Path | None = None
-        self._file_locks: dict[str, asyncio.Lock] = {}
-
-    def _get_file_lock(self, file_path: str) -> asyncio.Lock:
-        if file_path not in self._file_locks:
-            self._file_locks[file_path] = asyncio.Lock()
-        return self._file_locks[file_path]
+        self._file_locks = LockTable()
 
     def get_cache_root(self) -> Path:
         if self._cache_root is None:
@@ -49,7 +45,7 @@ class FileManager:
     def ensure_cache_directories(self) -> None:
         cache_root = self.get_cache_root()
         cache_root.mkdir(exist_ok=True)
-        for sub in ("users", "tables", "states", "ai_states"):
+        for sub in ("users", "tables", "states", "ai_states", "identities", "indexes"):
             (cache_root / sub).mkdir(exist_ok=True)
         logger.debug(f"Cache directories ensured at: {cache_root}")
 
@@ -73,6 +69,10 @@ class FileManager:
                 if not user_id:
                     raise ValueError("user_id is required for ai_states cache")
                 return cache_root / "ai_states" / f"{inbox_id}_{user_id}_ai_state.json"
+            case "identities":
+                return cache_root / "identities" / f"{inbox_id}_identities.json"
+            case "indexes":
+                return cache_root / "indexes" / f"{inbox_id}_indexes.json"
             case _:
                 raise ValueError(f"Invalid cache_type: {cache_type}")
 
@@ -85,7 +85,7 @@ class FileManager:
         this block: the lock is not reentrant, so the public helpers would
         deadlock.
         """
-        async with self._get_file_lock(str(file_path)):
+        async with self._file_locks.hold(str(file_path)):
             yield
 
     async def read_unlocked(self, file_path: Path) -> dict[str, Any]:
@@ -113,22 +113,26 @@ class FileManager:
             return False
 
     async def read_file(self, file_path: Path) -> dict[str, Any]:
-        async with self._get_file_lock(str(file_path)):
+        async with self._file_locks.hold(str(file_path)):
             return await self.read_unlocked(file_path)
 
     async def write_file(self, file_path: Path, data: dict[str, Any]) -> bool:
-        async with self._get_file_lock(str(file_path)):
+        async with self._file_locks.hold(str(file_path)):
             return await self.write_unlocked(file_path, data)
 
+    async def delete_unlocked(self, file_path: Path) -> bool:
+        """Delete a cache file assuming the caller already holds its lock."""
+        try:
+            if file_path.exists():
+                await asyncio.to_thread(file_path.unlink)
+            return True
+        except OSError as e:
+            logger.error(f"Failed to delete file {file_path}: {e}")
+            return False
+
     async def delete_file(self, file_path: Path) -> bool:
-        async with self._get_file_lock(str(file_path)):
-            try:
-                if file_path.exists():
-                    await asyncio.to_thread(file_path.unlink)
-                return True
-            except OSError as e:
-                logger.error(f"Failed to delete file {file_path}: {e}")
-                return False
+        async with self._file_locks.hold(str(file_path)):
+            return await self.delete_unlocked(file_path)
 
     async def file_exists(self, file_path: Path) -> bool:
         return await asyncio.to_thread(file_path.exists)
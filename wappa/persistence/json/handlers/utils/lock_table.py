@@ -0,0 +1,43 @@
+"""
+Reference-counted table of per-file locks.
+
+A lock exists only while some coroutine holds or waits for it: the last one
+to leave removes it. The table therefore holds one lock per file in use at
+that moment, not one per file the process has ever touched, and no lock
+outlives the event loop it was used on.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+
+
+class _Entry:
+    __slots__ = ("lock", "refs")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.refs = 0
+
+
+class LockTable:
+    def __init__(self) -> None:
+        self._entries: dict[Hashable, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        """Hold ``key``'s lock for the block (not reentrant)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.refs += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.refs -= 1
+            if not entry.refs:
+                del self._entries[key]
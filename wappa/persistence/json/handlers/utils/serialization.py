@@ -7,13 +7,25 @@ while optimizing for file storage.
 
 import json
 import logging
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Any, cast
 
 from pydantic import BaseModel
 
+from ....value_compression import COMPRESSION_MARKERS, value_compression
+
 logger = logging.getLogger("JSONSerde")
 
+# Cache space whose compression threshold applies to each cache file type;
+# identities and indexes hold small entries and are never compressed.
+_COMPRESSION_SPACES = {
+    "users": "users",
+    "tables": "table",
+    "states": "state_handler",
+    "ai_states": "ai_state",
+}
+
 
 def _datetime_handler(obj: Any) -> str:
     """Handle datetime objects during JSON serialization."""
@@ -56,11 +68,36 @@ def serialize_for_json(obj: Any) -> Any:
     return obj
 
 
+def serialize_entry(cache_type: str, obj: Any) -> Any:
+    """Serialize one cache entry, compressed if large (see ``value_compression``)."""
+    data = serialize_for_json(obj)
+    space = _COMPRESSION_SPACES.get(cache_type)
+    if space is None or not value_compression.enabled:
+        return data
+    if not isinstance(data, dict | list):
+        return data
+    text = json.dumps(
+        data, ensure_ascii=False, separators=(",", ":"), default=_datetime_handler
+    )
+    return value_compression.pack(text, space) or data
+
+
+def inflate_entry(data: Any) -> Any:
+    """A stored entry with any compression undone."""
+    if isinstance(data, str) and data[:1] in COMPRESSION_MARKERS:
+        text = value_compression.unpack(data)
+        if text is not None:
+            return json.loads(text)
+    return data
+
+
 def deserialize_from_json(data: Any, model: type[BaseModel] | None = None) -> Any:
     """Deserialize data from JSON storage."""
     if data is None:
         return None
 
+    data = inflate_entry(data)
+
     # Convert datetime strings back to datetime objects
     data = _convert_iso_strings_to_datetime(data)
 
@@ -71,42 +108,57 @@ def deserialize_from_json(data: Any, model: type[BaseModel] | None = None) -> An
 
 
 def create_cache_file_data(
-    data: dict[str, Any], ttl: int | None = None
+    data: dict[str, Any], expiry: Mapping[str, float] | None = None
 ) -> dict[str, Any]:
-    """Create JSON cache file structure with metadata."""
-    now = datetime.now()
-    expires_at = None
-    if ttl:
-        expires_at = datetime.fromtimestamp(now.timestamp() + ttl)
+    """Create JSON cache file structure with metadata.
 
+    ``expiry`` maps the keys that expire to their deadline (epoch seconds).
+    """
     return {
         "_metadata": {
-            "created_at": now.isoformat(),
-            "expires_at": expires_at.isoformat() if expires_at else None,
-            "version": "1.0",
+            "created_at": datetime.now().isoformat(),
+            "expires": {
+                key: datetime.fromtimestamp(deadline).isoformat()
+                for key, deadline in sorted((expiry or {}).items())
+                if key in data
+            },
+            "version": "1.1",
         },
         "data": serialize_for_json(data),
     }
 
 
-def extract_cache_file_data(file_data: dict[str, Any]) -> dict[str, Any] | None:
-    """Extract data from JSON cache file, checking expiration."""
-    if not isinstance(file_data, dict):
+def _deadline(value: str) -> float | None:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid expiry format: {value}")
         return None
 
-    metadata = file_data.get("_metadata", {})
-    expires_at_str = metadata.get("expires_at")
 
-    # Check expiration
-    if expires_at_str:
-        try:
-            expires_at = datetime.fromisoformat(expires_at_str)
-            if datetime.now() > expires_at:
-                return None  # Expired
-        except ValueError:
-            logger.warning(f"Invalid expires_at format: {expires_at_str}")
+def extract_cache_file_data(
+    file_data: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, float]]:
+    """Entries of a JSON cache file and the deadlines of those that expire.
 
-    return cast(dict[str, Any], file_data.get("data", {}))
+    Expired entries are included; the caller drops them. In a version 1.0
+    file the file-wide ``expires_at`` applies to every entry.
+    """
+    if not isinstance(file_data, dict):
+        return {}, {}
+
+    data = cast(dict[str, Any], file_data.get("data", {}))
+    metadata = file_data.get("_metadata", {})
+    expiry: dict[str, float] = {}
+    for key, value in (metadata.get("expires") or {}).items():
+        deadline = _deadline(value)
+        if deadline is not None:
+            expiry[key] = deadline
+    if metadata.get("expires_at"):
+        deadline = _deadline(metadata["expires_at"])
+        if deadline is not None:
+            expiry = dict.fromkeys(data, deadline) | expiry
+    return data, expiry
 
 
 def to_json_string(data: Any) -> str:
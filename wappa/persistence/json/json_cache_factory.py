@@ -5,18 +5,24 @@ Creates JSON-backed cache instances using file-based storage
 with handlers implementing type-specific interfaces directly.
 """
 
+from functools import partial
+
 from ...domain.interfaces.cache_factory import ICacheFactory
 from ...domain.interfaces.cache_interfaces import (
     IAIStateCache,
     IExpiryCache,
+    IIdentityIndex,
     IStateCache,
     ITableCache,
     IUserCache,
 )
+from ..identity_index import StorageIdentityIndex
 from .handlers.ai_state import JSONAIState
 from .handlers.state_handler import JSONStateHandler
 from .handlers.table_handler import JSONTable
 from .handlers.user_handler import JSONUser
+from .handlers.utils.key_factory import default_key_factory
+from .storage_manager import storage_manager
 
 
 class JSONCacheFactory(ICacheFactory):
@@ -130,3 +136,20 @@ class JSONCacheFactory(ICacheFactory):
         """
         effective_inbox, effective_user = self._resolve_context(inbox_id, user_id)
         return JSONAIState(inbox=effective_inbox, user_id=effective_user)
+
+    def create_identity_index(self, inbox_id: str | None = None) -> IIdentityIndex:
+        """
+        Create JSON identity index (phone number / BSUID -> user_id).
+
+        Args:
+            inbox_id: Optional override (uses default if None)
+
+        Returns:
+            StorageIdentityIndex backed by one JSON file per inbox
+        """
+        effective_inbox, _ = self._resolve_context(inbox_id, None)
+        return StorageIdentityIndex(
+            storage_manager,
+            effective_inbox,
+            partial(default_key_factory.user, effective_inbox),
+        )
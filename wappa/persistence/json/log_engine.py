@@ -0,0 +1,460 @@
+"""
+Append-only log engine of the JSON cache backend.
+
+Each store is a ``.log`` file next to where the ``file`` engine keeps its
+``.json`` document. Every write appends one JSON line per changed key:
+
+    {"k": "inbox:df:orders:42", "v": {"status": "paid"}, "x": null}
+    {"k": "inbox:df:orders:41", "d": 1}
+    {"k": "inbox:df:orders:42", "x": 1767225600.0}
+
+``v`` puts a stored entry that expires at ``x`` (epoch seconds, null for
+never), ``d`` deletes the key, and a line with ``x`` alone only changes the
+key's expiry. The latest line of a key wins.
+
+The engine keeps an in-memory index of each store it has opened: the offset
+and length of every live key's value line and its expiry, built by reading
+the log once. An expired key leaves the index when a read or write meets it
+or ``purge`` runs, and its line becomes dead.
+A write appends its lines and updates the index, so its cost does not grow
+with the store; a read seeks to the lines it needs. Once dead lines (older
+versions, deletes, expiry changes and expired keys) pass ``compact_ratio`` of a log, a background task
+rewrites it with the live lines only (each carrying its current expiry), catching up on the lines appended
+meanwhile before it swaps the new file in. Logs are fsynced every
+``fsync_interval`` seconds, or after every write when it is 0.
+
+A log is plain text; ``dump_log`` (``wappa cache-dump``) prints a store's
+live entries, or every line with ``records=True``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from collections.abc import AsyncIterator, Collection, Iterable, Iterator
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from .engines import Change, JSONEngine, ttl_left
+from .handlers.utils.file_manager import file_manager
+from .handlers.utils.lock_table import LockTable
+
+logger = logging.getLogger("JSONLogEngine")
+
+# Logs shorter than this are never compacted: rewriting them saves nothing.
+COMPACT_MIN_RECORDS = 256
+
+
+def _encode(record: dict[str, Any]) -> bytes:
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+    return (line + "\n").encode("utf-8")
+
+
+def _lines(file: BinaryIO) -> Iterator[tuple[int, bytes]]:
+    """``(offset, line)`` for each complete line; stops at a torn last line."""
+    offset = 0
+    for line in file:
+        if not line.endswith(b"\n"):
+            return
+        yield offset, line
+        offset += len(line)
+
+
+class _Log:
+    """Index of one store's log."""
+
+    __slots__ = ("spans", "size", "records", "epoch", "compacting")
+
+    def __init__(self) -> None:
+        # key -> (offset, length, expires_at) of its latest value line
+        self.spans: dict[str, tuple[int, int, float | None]] = {}
+        self.size = 0
+        self.records = 0
+        # Bumped whenever the file is removed, so a compaction started
+        # before then knows its copy is stale
+        self.epoch = 0
+        self.compacting = False
+
+    def apply(self, record: dict[str, Any], offset: int, length: int) -> None:
+        self.records += 1
+        key = record.get("k")
+        if key is None:
+            return
+        if "v" in record:
+            self.spans[key] = (offset, length, record.get("x"))
+        elif "d" in record:
+            self.spans.pop(key, None)
+        elif key in self.spans:
+            self.spans[key] = (*self.spans[key][:2], record.get("x"))
+
+    def take(
+        self, keys: Iterable[str], now: float
+    ) -> list[tuple[str, int, int, float | None]]:
+        """Spans of the live keys among ``keys``; expired ones leave the index."""
+        found = []
+        for key in keys:
+            span = self.spans.get(key)
+            if span is None:
+                continue
+            if span[2] is not None and span[2] <= now:
+                del self.spans[key]
+                continue
+            found.append((key, *span))
+        return found
+
+    def reset(self) -> None:
+        self.spans = {}
+        self.size = self.records = 0
+        self.epoch += 1
+
+    @property
+    def dead(self) -> int:
+        return self.records - len(self.spans)
+
+
+def _scan(path: Path) -> _Log:
+    """Index a log; a line torn by a crash mid-append is cut off."""
+    log = _Log()
+    try:
+        file = open(path, "rb")  # noqa: SIM115 - closed below
+    except FileNotFoundError:
+        return log
+    with file:
+        for offset, line in _lines(file):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable line at {offset} of {path}")
+                log.records += 1
+            else:
+                log.apply(record, offset, len(line))
+            log.size = offset + len(line)
+        torn = file.tell() > log.size
+    if torn:
+        logger.warning(f"Truncating torn last line of {path}")
+        os.truncate(path, log.size)
+    return log
+
+
+def _read_spans(
+    path: Path, spans: list[tuple[str, int, int, float | None]]
+) -> dict[str, Any]:
+    with open(path, "rb") as file:
+        values: dict[str, Any] = {}
+        for key, offset, length, _ in sorted(spans, key=lambda span: span[1]):
+            file.seek(offset)
+            values[key] = json.loads(file.read(length))["v"]
+        return values
+
+
+def _append(path: Path, data: bytes, size: int, fsync: bool) -> None:
+    if size == 0:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as file:
+        try:
+            file.write(data)
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+        except OSError:
+            # Drop a partial line so the next append starts on a clean one
+            file.truncate(size)
+            raise
+
+
+def _fsync(path: Path) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class LogEngine(JSONEngine):
+    """Append-only change log per store (see the module docstring)."""
+
+    name = "log"
+    suffix = ".log"
+
+    def __init__(
+        self,
+        fsync_interval: float = 1.0,
+        compact_ratio: float = 0.5,
+        compact_min_records: int = COMPACT_MIN_RECORDS,
+    ) -> None:
+        if fsync_interval < 0:
+            raise ValueError("fsync_interval must not be negative")
+        if not 0 < compact_ratio < 1:
+            raise ValueError("compact_ratio must be between 0 and 1")
+        self.fsync_interval = fsync_interval
+        self.compact_ratio = compact_ratio
+        self.compact_min_records = compact_min_records
+        self._logs: dict[Path, _Log] = {}
+        self._locks = LockTable()
+        self._dirty: set[Path] = set()
+        self._flusher: asyncio.Task[None] | None = None
+        self._compactions: set[asyncio.Task[None]] = set()
+
+    def path(self, cache_type: str, inbox_id: str, user_id: str | None) -> Path:
+        return file_manager.get_cache_file_path(
+            cache_type, inbox_id, user_id
+        ).with_suffix(self.suffix)
+
+    @asynccontextmanager
+    async def _locked(self, path: Path) -> AsyncIterator[_Log]:
+        """Hold a store's lock; yields its index."""
+        async with self._locks.hold(path):
+            log = self._logs.get(path)
+            if log is None:
+                log = self._logs[path] = await asyncio.to_thread(_scan, path)
+            yield log
+
+    async def _remove(self, path: Path, log: _Log) -> None:
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+        self._dirty.discard(path)
+        log.reset()
+
+    async def _values(
+        self, path: Path, log: _Log, keys: Collection[str] | None
+    ) -> dict[str, Any]:
+        spans = log.take(list(log.spans) if keys is None else keys, time.time())
+        if not spans:
+            return {}
+        return await asyncio.to_thread(_read_spans, path, spans)
+
+    async def read(
+        self, path: Path, keys: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        # Reads take the lock too: a compaction moves every line
+        async with self._locked(path) as log:
+            if not log.size:
+                return None
+            return await self._values(path, log, keys)
+
+    async def mutate(
+        self,
+        path: Path,
+        keys: Collection[str],
+        change: Change,
+        ttl: int | None = None,
+    ) -> bool:
+        async with self._locked(path) as log:
+            changes = change(await self._values(path, log, keys))
+            expires_at = time.time() + ttl if ttl else None
+            records = [
+                {"k": key, "v": stored, "x": expires_at}
+                if stored is not None
+                else {"k": key, "d": 1}
+                for key, stored in changes.items()
+                if stored is not None or key in log.spans
+            ]
+            if not records:
+                return True
+            if all("d" in record for record in records) and len(records) == len(
+                log.spans
+            ):
+                await self._remove(path, log)
+                return True
+            return await self._write(path, log, records)
+
+    async def _write(
+        self, path: Path, log: _Log, records: list[dict[str, Any]]
+    ) -> bool:
+        lines = [_encode(record) for record in records]
+        try:
+            await asyncio.to_thread(
+                _append, path, b"".join(lines), log.size, self.fsync_interval == 0
+            )
+        except OSError as e:
+            logger.error(f"Failed to append to {path}: {e}")
+            return False
+        for record, line in zip(records, lines, strict=True):
+            log.apply(record, log.size, len(line))
+            log.size += len(line)
+        if self.fsync_interval:
+            self._dirty.add(path)
+            self._start_flusher()
+        self._maybe_compact(path, log)
+        return True
+
+    async def get_ttl(self, path: Path, key: str | None = None) -> int:
+        async with self._locked(path) as log:
+            now = time.time()
+            spans = log.take(list(log.spans) if key is None else (key,), now)
+            return ttl_left((span[3] for span in spans), now)
+
+    async def set_ttl(self, path: Path, key: str | None, ttl: int) -> bool:
+        async with self._locked(path) as log:
+            now = time.time()
+            spans = log.take(list(log.spans) if key is None else (key,), now)
+            if not spans:
+                return False
+            expires_at = now + ttl
+            return await self._write(
+                path, log, [{"k": span[0], "x": expires_at} for span in spans]
+            )
+
+    async def purge(self, path: Path) -> float | None:
+        async with self._locked(path) as log:
+            spans = log.take(list(log.spans), time.time())
+            if not spans:
+                if log.size:
+                    await self._remove(path, log)
+                return None
+            self._maybe_compact(path, log)
+            return min((span[3] for span in spans if span[3] is not None), default=None)
+
+    # ---- Durability ----
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """fsync every log written since the last flush."""
+        dirty, self._dirty = self._dirty, set()
+        for path in dirty:
+            try:
+                await asyncio.to_thread(_fsync, path)
+            except OSError as e:
+                logger.error(f"Failed to fsync {path}: {e}")
+
+    async def close(self) -> None:
+        """Wait for running compactions, stop the flusher and fsync what is left."""
+        if self._compactions:
+            await asyncio.gather(*self._compactions, return_exceptions=True)
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        await self.flush()
+
+    # ---- Compaction ----
+
+    def _maybe_compact(self, path: Path, log: _Log) -> None:
+        if (
+            log.compacting
+            or log.records < self.compact_min_records
+            or log.dead < log.records * self.compact_ratio
+        ):
+            return
+        log.compacting = True
+        task = asyncio.create_task(self._compact(path, log))
+        self._compactions.add(task)
+        task.add_done_callback(self._compactions.discard)
+
+    async def _compact(self, path: Path, log: _Log) -> None:
+        """Rewrite a log with its live lines, then swap it in.
+
+        The copy runs without the lock; the lines appended meanwhile are
+        copied after it under the lock, just before the swap.
+        """
+        tmp = path.with_name(f".{path.name}.compact")
+        try:
+            async with self._locked(path) as current:
+                if current is not log or not log.spans:
+                    return
+                epoch, copied = log.epoch, log.size
+                spans = sorted(log.spans.values())
+            compacted = await asyncio.to_thread(self._copy_live, path, tmp, spans)
+            async with self._locked(path) as current:
+                if log.epoch != epoch:
+                    return
+                fresh = await asyncio.to_thread(
+                    self._swap, path, tmp, compacted, copied, log.size
+                )
+                before = log.size
+                log.spans, log.size, log.records = (
+                    fresh.spans,
+                    fresh.size,
+                    fresh.records,
+                )
+                self._dirty.discard(path)
+                logger.debug(f"Compacted {path}: {before} -> {log.size} bytes")
+        except OSError as e:
+            logger.error(f"Failed to compact {path}: {e}")
+        finally:
+            log.compacting = False
+            with contextlib.suppress(OSError):
+                tmp.unlink(missing_ok=True)
+
+    @staticmethod
+    def _copy_live(
+        path: Path, tmp: Path, spans: list[tuple[int, int, float | None]]
+    ) -> _Log:
+        compacted = _Log()
+        with open(path, "rb") as source, open(tmp, "wb") as target:
+            for offset, length, expires_at in spans:
+                source.seek(offset)
+                line = source.read(length)
+                record = json.loads(line)
+                if record.get("x") != expires_at:
+                    # Fold later expiry changes into the value line
+                    record["x"] = expires_at
+                    line = _encode(record)
+                compacted.apply(record, compacted.size, len(line))
+                compacted.size += len(line)
+                target.write(line)
+        return compacted
+
+    @staticmethod
+    def _swap(path: Path, tmp: Path, compacted: _Log, start: int, end: int) -> _Log:
+        """Append the lines written since the copy, fsync and replace the log."""
+        with open(path, "rb") as source, open(tmp, "ab") as target:
+            source.seek(start)
+            tail = source.read(end - start)
+            target.write(tail)
+            target.flush()
+            os.fsync(target.fileno())
+        for line in tail.splitlines(keepends=True):
+            compacted.apply(json.loads(line), compacted.size, len(line))
+            compacted.size += len(line)
+        os.replace(tmp, path)
+        return compacted
+
+
+def dump_log(path: str | Path, *, records: bool = False) -> Any:
+    """A log's live entries in the ``file`` engine's layout, or all its lines.
+
+    Reads the file directly, so it works without a running application; a
+    torn last line is left out.
+    """
+    with open(path, "rb") as file:
+        lines = list(_lines(file))
+    if records:
+        return [{"offset": offset, **json.loads(line)} for offset, line in lines]
+
+    log = _Log()
+    values: dict[str, Any] = {}
+    for offset, line in lines:
+        record = json.loads(line)
+        log.apply(record, offset, len(line))
+        if "v" in record:
+            values[record["k"]] = record["v"]
+    live = log.take(list(log.spans), time.time())
+    return {
+        "_metadata": {
+            "expires": {
+                key: datetime.fromtimestamp(expires_at).isoformat()
+                for key, _, _, expires_at in live
+                if expires_at is not None
+            },
+            "records": log.records,
+            "live": len(live),
+            "bytes": sum(len(line) for _, line in lines),
+        },
+        "data": {key: values[key] for key, *_ in live},
+    }
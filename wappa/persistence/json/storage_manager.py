@@ -1,17 +1,35 @@
+"""
+Entry point of the JSON cache backend.
+
+``JSONStorageManager`` maps ``(cache_type, inbox, user)`` to a store of the
+current engine (``engines``) and serializes entries on their way in and out.
+
+Expired entries are hidden by every read (lazy expiry). So that stores nobody
+touches again still shrink, the manager also keeps a heap of the next deadline
+of each store it has written with a TTL and, every
+``SYSTEM_JSON_CACHE_SWEEP_INTERVAL`` seconds, purges the stores whose deadline
+has passed; its first pass purges every store on disk, which schedules the
+deadlines written by earlier runs.
+"""
+
+import asyncio
+import heapq
 import logging
-from collections.abc import Callable
-from datetime import datetime
+import time
+from collections.abc import Callable, Collection, Mapping, Sequence
 from pathlib import Path
 from typing import Any
 
 from pydantic import BaseModel
 
+from ...core.config.settings import settings
+from ..value_compression import value_compression
+from .engines import JSONEngine, create_engine
 from .handlers.utils.file_manager import file_manager
 from .handlers.utils.serialization import (
-    create_cache_file_data,
     deserialize_from_json,
-    extract_cache_file_data,
-    serialize_for_json,
+    inflate_entry,
+    serialize_entry,
 )
 
 logger = logging.getLogger("JSONStorageManager")
@@ -20,20 +38,97 @@ logger = logging.getLogger("JSONStorageManager")
 class JSONStorageManager:
     def __init__(self) -> None:
         file_manager.ensure_cache_directories()
+        self.engine: JSONEngine = create_engine(settings.json_cache_engine)
+        self.sweep_interval = settings.json_cache_sweep_interval
+        # (deadline, store) of every store with expiring entries; _next holds
+        # the live deadline of each, so outdated heap items are skipped
+        self._deadlines: list[tuple[float, Path]] = []
+        self._next: dict[Path, float] = {}
+        self._sweeper: asyncio.Task[None] | None = None
+        # Left alone when off, so compression configured in code stays active
+        if settings.cache_compression != "off":
+            value_compression.configure(
+                settings.cache_compression,
+                threshold=settings.cache_compression_threshold,
+                thresholds=settings.cache_compression_thresholds,
+            )
 
-    async def _load_cache_data(
-        self, file_path: Path, *, delete_if_expired: bool = True
-    ) -> dict[str, Any] | None:
-        """Return cache dict, None if file missing or expired (optionally deleting)."""
-        file_data = await file_manager.read_file(file_path)
-        if not file_data:
-            return None
-        cache_data = extract_cache_file_data(file_data)
-        if cache_data is None:
-            if delete_if_expired:
-                await file_manager.delete_file(file_path)
-            return None
-        return cache_data
+    def use_engine(self, engine: str | JSONEngine) -> JSONEngine:
+        """Switch storage engines (``file``, ``log`` or an instance).
+
+        Stores written by the previous engine are not migrated.
+        """
+        self.engine = create_engine(engine) if isinstance(engine, str) else engine
+        self._deadlines, self._next = [], {}
+        self._stop_sweeper()
+        return self.engine
+
+    async def close(self) -> None:
+        """Stop expiring stores and let the engine finish; called at shutdown."""
+        self._stop_sweeper()
+        await self.engine.close()
+
+    def _path(self, cache_type: str, inbox_id: str, user_id: str | None) -> Path:
+        self._start_sweeper()
+        return self.engine.path(cache_type, inbox_id, user_id)
+
+    # ---- Expiry ----
+
+    def _expires(self, path: Path, deadline: float | None) -> None:
+        """Purge ``path`` once ``deadline`` passes (an earlier one stays)."""
+        if deadline is None or self._next.get(path, deadline + 1) <= deadline:
+            return
+        self._next[path] = deadline
+        heapq.heappush(self._deadlines, (deadline, path))
+
+    def _written(self, path: Path, ttl: int | None) -> None:
+        if ttl:
+            self._expires(path, time.time() + ttl)
+
+    async def expire_due(self) -> int:
+        """Purge the stores whose next deadline has passed; returns how many."""
+        now = time.time()
+        due: list[Path] = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, path = heapq.heappop(self._deadlines)
+            if self._next.get(path) == deadline:
+                del self._next[path]
+                due.append(path)
+        for path in due:
+            await self._purge(path)
+        return len(due)
+
+    async def _purge(self, path: Path) -> None:
+        try:
+            self._expires(path, await self.engine.purge(path))
+        except Exception as e:
+            logger.error(f"Failed to purge expired entries of {path}: {e}")
+
+    def _start_sweeper(self) -> None:
+        if self.sweep_interval <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        sweeper = self._sweeper
+        if sweeper is None or sweeper.done() or sweeper.get_loop() is not loop:
+            self._sweeper = loop.create_task(self._sweep_periodically())
+
+    def _stop_sweeper(self) -> None:
+        if self._sweeper is not None and not self._sweeper.done():
+            self._sweeper.cancel()
+        self._sweeper = None
+
+    async def _sweep_periodically(self) -> None:
+        try:
+            for path in await self.engine.all_paths():
+                await self._purge(path)
+        except OSError as e:
+            logger.error(f"Failed to list JSON cache stores: {e}")
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.expire_due()
 
     async def get(
         self,
@@ -44,9 +139,9 @@ class JSONStorageManager:
         model: type[BaseModel] | None = None,
     ) -> Any:
         try:
-            file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-            cache_data = await self._load_cache_data(file_path)
-            if cache_data is None or key not in cache_data:
+            file_path = self._path(cache_type, inbox_id, user_id)
+            cache_data = await self.engine.read(file_path, (key,))
+            if not cache_data:
                 return None
             return deserialize_from_json(cache_data[key], model)
         except Exception as e:
@@ -63,16 +158,13 @@ class JSONStorageManager:
         ttl: int | None = None,
     ) -> bool:
         try:
-            file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-            file_data = await file_manager.read_file(file_path)
-            cache_data = extract_cache_file_data(file_data) if file_data else {}
-            if cache_data is None:
-                cache_data = {}
-
-            cache_data[key] = serialize_for_json(value)
-            return await file_manager.write_file(
-                file_path, create_cache_file_data(cache_data, ttl)
+            file_path = self._path(cache_type, inbox_id, user_id)
+            stored = serialize_entry(cache_type, value)
+            written = await self.engine.mutate(
+                file_path, (), lambda _: {key: stored}, ttl
             )
+            self._written(file_path, ttl)
+            return written
         except Exception as e:
             logger.error(f"Failed to set key '{key}' in {cache_type} cache: {e}")
             return False
@@ -86,23 +178,25 @@ class JSONStorageManager:
         value: Any,
         ttl: int | None = None,
     ) -> tuple[bool, Any]:
-        """Write a key only when the file holds no live entry for it.
+        """Write a key only when the store holds no live entry for it.
 
-        Returns ``(created, existing)``. The read and the write share one file
-        lock, so two coroutines cannot both conclude the key was absent.
+        Returns ``(created, existing)``. The read and the write share one
+        store lock, so two coroutines cannot both conclude the key was absent.
         """
-        file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-        async with file_manager.locked(file_path):
-            cache_data = await self._read_live_data(file_path)
-            existing = cache_data.get(key)
-            if existing is not None:
-                return False, deserialize_from_json(existing)
-
-            cache_data[key] = serialize_for_json(value)
-            await file_manager.write_unlocked(
-                file_path, create_cache_file_data(cache_data, ttl)
-            )
-            return True, None
+        file_path = self._path(cache_type, inbox_id, user_id)
+        existing: list[Any] = []
+
+        def change(current: dict[str, Any]) -> dict[str, Any]:
+            if current.get(key) is not None:
+                existing.append(current[key])
+                return {}
+            return {key: serialize_entry(cache_type, value)}
+
+        await self.engine.mutate(file_path, (key,), change, ttl)
+        self._written(file_path, ttl)
+        if existing:
+            return False, deserialize_from_json(existing[0])
+        return True, None
 
     async def replace_if(
         self,
@@ -117,52 +211,200 @@ class JSONStorageManager:
         """Replace a live entry only when ``matches`` accepts the current one.
 
         Returns ``("replaced" | "condition_not_met" | "missing", current)``. A
-        refused replacement writes nothing, so the file's expiry survives it.
+        refused replacement writes nothing, so the store's expiry survives it.
         """
-        file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-        async with file_manager.locked(file_path):
-            cache_data = await self._read_live_data(file_path)
-            stored = cache_data.get(key)
+        file_path = self._path(cache_type, inbox_id, user_id)
+        outcome: list[tuple[str, Any]] = []
+
+        def change(current: dict[str, Any]) -> dict[str, Any]:
+            stored = current.get(key)
             if stored is None:
-                return "missing", None
+                outcome.append(("missing", None))
+                return {}
+            value_now = deserialize_from_json(stored)
+            if not matches(value_now):
+                outcome.append(("condition_not_met", value_now))
+                return {}
+            outcome.append(("replaced", None))
+            return {key: serialize_entry(cache_type, value)}
+
+        await self.engine.mutate(file_path, (key,), change, ttl)
+        self._written(file_path, ttl)
+        return outcome[0]
+
+    async def update(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        key: str,
+        mutate: Callable[[Any], Any],
+        ttl: int | None = None,
+    ) -> Any:
+        """Read-modify-write one key under the store lock.
 
-            current = deserialize_from_json(stored)
-            if not matches(current):
-                return "condition_not_met", current
+        ``mutate`` receives the live value (or None) and returns the value to
+        store; returning None removes the key. Returns the stored value, as
+        a later ``get`` would read it back.
+        """
+        file_path = self._path(cache_type, inbox_id, user_id)
+        written: list[Any] = []
 
-            cache_data[key] = serialize_for_json(value)
-            await file_manager.write_unlocked(
-                file_path, create_cache_file_data(cache_data, ttl)
+        def change(current: dict[str, Any]) -> dict[str, Any]:
+            stored = current.get(key)
+            value = mutate(
+                deserialize_from_json(stored) if stored is not None else None
+            )
+            written.append(
+                None if value is None else serialize_entry(cache_type, value)
             )
-            return "replaced", None
+            return {key: written[0]}
 
-    async def _read_live_data(self, file_path: Path) -> dict[str, Any]:
-        """Read unexpired cache contents while the file lock is already held."""
-        file_data = await file_manager.read_unlocked(file_path)
-        if not file_data:
-            return {}
-        return extract_cache_file_data(file_data) or {}
+        await self.engine.mutate(file_path, (key,), change, ttl)
+        self._written(file_path, ttl)
+        return None if written[0] is None else deserialize_from_json(written[0])
 
-    async def delete(
-        self, cache_type: str, inbox_id: str, user_id: str | None, key: str
+    async def update_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        keys: Collection[str],
+        mutate: Callable[[dict[str, Any]], Mapping[str, Any]],
+        ttl: int | None = None,
+    ) -> None:
+        """Read-modify-write several keys of one store under its lock.
+
+        ``mutate`` receives the live values among ``keys`` and returns the
+        changes: key -> value to store, or None to remove the key. Only the
+        changed keys are written.
+        """
+        file_path = self._path(cache_type, inbox_id, user_id)
+
+        def change(current: dict[str, Any]) -> dict[str, Any]:
+            changes = mutate(
+                {key: deserialize_from_json(value) for key, value in current.items()}
+            )
+            return {
+                key: None if value is None else serialize_entry(cache_type, value)
+                for key, value in changes.items()
+            }
+
+        await self.engine.mutate(file_path, keys, change, ttl)
+        self._written(file_path, ttl)
+
+    async def view(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        read: Callable[[Callable[[str], Any]], Any],
+    ) -> Any:
+        """Run ``read`` over one store's live entries, loading it once.
+
+        ``read`` receives a lookup returning the stored value of a key (or
+        None), so it can pick its next key from what it already read. The
+        engine returns one whole version of the store, so no lock is held
+        while ``read`` runs.
+        """
+        file_path = self._path(cache_type, inbox_id, user_id)
+        cache_data = await self.engine.read(file_path) or {}
+
+        def lookup(key: str) -> Any:
+            stored = cache_data.get(key)
+            return deserialize_from_json(stored) if stored is not None else None
+
+        return read(lookup)
+
+    async def get_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        refs: Sequence[tuple[str | None, str]],
+        model: type[BaseModel] | None = None,
+    ) -> list[Any]:
+        """Read several ``(user_id, key)`` entries, one read per store."""
+        try:
+            by_file: dict[Path, set[str]] = {}
+            for user_id, key in refs:
+                file_path = self._path(cache_type, inbox_id, user_id)
+                by_file.setdefault(file_path, set()).add(key)
+            loaded = {
+                file_path: await self.engine.read(file_path, keys) or {}
+                for file_path, keys in by_file.items()
+            }
+            values: list[Any] = []
+            for user_id, key in refs:
+                stored = loaded[self._path(cache_type, inbox_id, user_id)].get(key)
+                values.append(
+                    deserialize_from_json(stored, model) if stored is not None else None
+                )
+            return values
+        except Exception as e:
+            logger.error(f"Failed to get {len(refs)} keys from {cache_type} cache: {e}")
+            return [None] * len(refs)
+
+    async def set_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        entries: Sequence[tuple[str | None, str, Any]],
+        ttl: int | None = None,
     ) -> bool:
+        """Write several ``(user_id, key, value)`` entries, one write per store."""
+        try:
+            by_file: dict[Path, dict[str, Any]] = {}
+            for user_id, key, value in entries:
+                file_path = self._path(cache_type, inbox_id, user_id)
+                by_file.setdefault(file_path, {})[key] = serialize_entry(
+                    cache_type, value
+                )
+
+            success = True
+            for file_path, updates in by_file.items():
+                success &= await self.engine.mutate(
+                    file_path, (), lambda _, updates=updates: updates, ttl
+                )
+                self._written(file_path, ttl)
+            return success
+        except Exception as e:
+            logger.error(
+                f"Failed to set {len(entries)} keys in {cache_type} cache: {e}"
+            )
+            return False
+
+    async def delete_many(
+        self, cache_type: str, inbox_id: str, refs: Sequence[tuple[str | None, str]]
+    ) -> int:
+        """Delete several ``(user_id, key)`` entries; returns how many existed."""
         try:
-            file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-            file_data = await file_manager.read_file(file_path)
-            if not file_data:
-                return True
+            by_file: dict[Path, set[str]] = {}
+            for user_id, key in refs:
+                file_path = self._path(cache_type, inbox_id, user_id)
+                by_file.setdefault(file_path, set()).add(key)
 
-            cache_data = extract_cache_file_data(file_data)
-            if cache_data is None or key not in cache_data:
-                return True
+            present: list[str] = []
 
-            del cache_data[key]
+            def change(current: dict[str, Any]) -> dict[str, Any]:
+                present.extend(current)
+                return dict.fromkeys(current)
 
-            if not cache_data:
-                return await file_manager.delete_file(file_path)
+            for file_path, keys in by_file.items():
+                await self.engine.mutate(file_path, keys, change)
+            return len(present)
+        except Exception as e:
+            logger.error(
+                f"Failed to delete {len(refs)} keys from {cache_type} cache: {e}"
+            )
+            return 0
 
-            return await file_manager.write_file(
-                file_path, create_cache_file_data(cache_data)
+    async def delete(
+        self, cache_type: str, inbox_id: str, user_id: str | None, key: str
+    ) -> bool:
+        try:
+            file_path = self._path(cache_type, inbox_id, user_id)
+            return await self.engine.mutate(
+                file_path, (key,), lambda current: dict.fromkeys(current)
             )
         except Exception as e:
             logger.error(f"Failed to delete key '{key}' from {cache_type} cache: {e}")
@@ -172,9 +414,8 @@ class JSONStorageManager:
         self, cache_type: str, inbox_id: str, user_id: str | None, key: str
     ) -> bool:
         try:
-            file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-            cache_data = await self._load_cache_data(file_path)
-            return cache_data is not None and key in cache_data
+            file_path = self._path(cache_type, inbox_id, user_id)
+            return bool(await self.engine.read(file_path, (key,)))
         except Exception as e:
             logger.error(
                 f"Failed to check existence of key '{key}' in {cache_type} cache: {e}"
@@ -188,26 +429,11 @@ class JSONStorageManager:
         user_id: str | None,
         key: str | None = None,
     ) -> int:
+        """Seconds left of ``key``, or of the store as a whole without it."""
         try:
-            file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-            file_data = await file_manager.read_file(file_path)
-
-            if not file_data:
-                return -2
-
-            expires_at_str = file_data.get("_metadata", {}).get("expires_at")
-            if not expires_at_str:
-                return -1
-
-            try:
-                expires_at = datetime.fromisoformat(expires_at_str)
-            except ValueError:
-                return -1
-
-            now = datetime.now()
-            if now >= expires_at:
-                return -2
-            return int((expires_at - now).total_seconds())
+            return await self.engine.get_ttl(
+                self._path(cache_type, inbox_id, user_id), key
+            )
         except Exception as e:
             logger.error(f"Failed to get TTL for {cache_type} cache: {e}")
             return -2
@@ -220,19 +446,20 @@ class JSONStorageManager:
         key_or_ttl: str | int,
         ttl: int | None = None,
     ) -> bool:
+        """Expire ``key`` in ``ttl`` seconds; ``set_ttl(..., ttl)`` expires every key."""
         try:
-            effective_ttl = key_or_ttl if isinstance(key_or_ttl, int) else ttl
+            if isinstance(key_or_ttl, int):
+                key, effective_ttl = None, key_or_ttl
+            else:
+                key, effective_ttl = key_or_ttl, ttl
             if effective_ttl is None:
                 raise ValueError("ttl is required for set_ttl")
 
-            file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-            cache_data = await self._load_cache_data(file_path, delete_if_expired=False)
-            if cache_data is None:
-                return False
-
-            return await file_manager.write_file(
-                file_path, create_cache_file_data(cache_data, effective_ttl)
-            )
+            file_path = self._path(cache_type, inbox_id, user_id)
+            renewed = await self.engine.set_ttl(file_path, key, effective_ttl)
+            if renewed:
+                self._written(file_path, effective_ttl)
+            return renewed
         except Exception as e:
             logger.error(f"Failed to set TTL for {cache_type} cache: {e}")
             return False
@@ -241,12 +468,30 @@ class JSONStorageManager:
         self, cache_type: str, inbox_id: str, user_id: str | None
     ) -> dict[str, Any]:
         try:
-            file_path = file_manager.get_cache_file_path(cache_type, inbox_id, user_id)
-            cache_data = await self._load_cache_data(file_path)
-            return cache_data or {}
+            file_path = self._path(cache_type, inbox_id, user_id)
+            cache_data = await self.engine.read(file_path)
+            return {
+                key: inflate_entry(value) for key, value in (cache_data or {}).items()
+            }
         except Exception as e:
             logger.error(f"Failed to get all keys from {cache_type} cache: {e}")
             return {}
 
+    async def get_keys_by_prefix(
+        self, cache_type: str, inbox_id: str, key_prefix: str
+    ) -> dict[str, Any]:
+        """Entries of every store of the inbox whose key starts with ``key_prefix``."""
+        try:
+            result: dict[str, Any] = {}
+            for file_path in await self.engine.paths(cache_type, inbox_id):
+                cache_data = await self.engine.read(file_path)
+                for key, value in (cache_data or {}).items():
+                    if key.startswith(key_prefix):
+                        result[key] = deserialize_from_json(value)
+            return result
+        except Exception as e:
+            logger.error(f"Failed to list '{key_prefix}' keys from {cache_type}: {e}")
+            return {}
+
 
 storage_manager = JSONStorageManager()
@@ -5,11 +5,14 @@ Provides state cache operations using in-memory storage.
 """
 
 import logging
+from collections.abc import Iterable, Mapping
+from datetime import UTC, datetime
 from typing import Any, cast
 
 from pydantic import BaseModel
 
 from ....domain.interfaces.cache_interfaces import IStateCache
+from ... import field_updates
 from ..storage_manager import storage_manager
 from .utils.key_factory import default_key_factory
 
@@ -101,6 +104,40 @@ class MemoryStateHandler(IStateCache):
         success = await storage_manager.delete("states", self.inbox, self.user_id, key)
         return 1 if success else 0
 
+    async def get_many(
+        self, handler_names: Iterable[str], models: type[BaseModel] | None = None
+    ) -> dict[str, Any]:
+        """Get several handler states with one store lock hold."""
+        names = list(dict.fromkeys(handler_names))
+        values = await storage_manager.get_many(
+            "states",
+            self.inbox,
+            [(self.user_id, self._key(name)) for name in names],
+            models,
+        )
+        return dict(zip(names, values, strict=True))
+
+    async def upsert_many(
+        self,
+        states: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """Create or update several handler states with one store lock hold."""
+        return await storage_manager.set_many(
+            "states",
+            self.inbox,
+            [(self.user_id, self._key(name), data) for name, data in states.items()],
+            ttl,
+        )
+
+    async def delete_many(self, handler_names: Iterable[str]) -> int:
+        """Delete several handler states with one store lock hold."""
+        return await storage_manager.delete_many(
+            "states",
+            self.inbox,
+            [(self.user_id, self._key(name)) for name in dict.fromkeys(handler_names)],
+        )
+
     async def exists(self, handler_name: str) -> bool:
         """
         Check if handler state exists.
@@ -135,6 +172,17 @@ class MemoryStateHandler(IStateCache):
             # BaseModel instance
             return getattr(state_data, field, None)
 
+    async def _update(
+        self, handler_name: str, mutate: field_updates.Mutation, ttl: int | None
+    ) -> dict[str, Any]:
+        """Read-modify-write one handler state under the namespace lock."""
+        return cast(
+            dict[str, Any],
+            await storage_manager.update(
+                "states", self.inbox, self.user_id, self._key(handler_name), mutate, ttl
+            ),
+        )
+
     async def update_field(
         self,
         handler_name: str,
@@ -154,15 +202,14 @@ class MemoryStateHandler(IStateCache):
         Returns:
             True if successful, False otherwise
         """
-        state_data = await self.get(handler_name)
-        if state_data is None:
-            state_data = {}
-
-        if isinstance(state_data, BaseModel):
-            state_data = state_data.model_dump()
-
-        state_data[field] = value
-        return await self.upsert(handler_name, state_data, ttl)
+        try:
+            await self._update(
+                handler_name, field_updates.set_fields({field: value}), ttl
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update field '{field}' of '{handler_name}': {e}")
+            return False
 
     async def increment_field(
         self,
@@ -183,25 +230,19 @@ class MemoryStateHandler(IStateCache):
         Returns:
             New value after increment or None on error
         """
-        state_data = await self.get(handler_name)
-        if state_data is None:
-            state_data = {}
-
-        if isinstance(state_data, BaseModel):
-            state_data = state_data.model_dump()
-
-        current_value = state_data.get(field, 0)
-        if not isinstance(current_value, int | float):
-            logger.warning(
-                f"Cannot increment non-numeric field '{field}': {current_value}"
+        try:
+            state_data = await self._update(
+                handler_name, field_updates.increment(field, increment), ttl
             )
+        except field_updates.NotNumericError as e:
+            logger.warning(str(e))
             return None
-
-        new_value = int(current_value) + increment
-        state_data[field] = new_value
-
-        success = await self.upsert(handler_name, state_data, ttl)
-        return new_value if success else None
+        except Exception as e:
+            logger.error(
+                f"Failed to increment field '{field}' of '{handler_name}': {e}"
+            )
+            return None
+        return cast(int, state_data[field])
 
     async def append_to_list(
         self,
@@ -209,6 +250,7 @@ class MemoryStateHandler(IStateCache):
         field: str,
         value: Any,
         ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
         Append value to a list field in handler state.
@@ -218,25 +260,55 @@ class MemoryStateHandler(IStateCache):
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
         """
-        state_data = await self.get(handler_name)
-        if state_data is None:
-            state_data = {}
-
-        if isinstance(state_data, BaseModel):
-            state_data = state_data.model_dump()
+        field_updates.require_max_length(max_length)
+        try:
+            await self._update(
+                handler_name, field_updates.append(field, value, max_length), ttl
+            )
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed to append to field '{field}' of '{handler_name}': {e}"
+            )
+            return False
 
-        current_list = state_data.get(field, [])
-        if not isinstance(current_list, list):
-            current_list = []
+    async def merge(
+        self,
+        handler_name: str,
+        state_data: dict[str, Any],
+        ttl: int | None = None,
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Merge new data into the existing handler state under the namespace lock.
 
-        current_list.append(value)
-        state_data[field] = current_list
+        Args:
+            handler_name: Handler name
+            state_data: New state data to merge
+            ttl: Optional TTL override
+            models: Optional BaseModel class for deserialization
 
-        return await self.upsert(handler_name, state_data, ttl)
+        Returns:
+            Final merged state or None on failure
+        """
+        fields = {
+            **state_data,
+            "handler_type": handler_name,
+            "timestamp": datetime.now(UTC).isoformat(),
+        }
+        try:
+            merged = await self._update(
+                handler_name, field_updates.set_fields(fields), ttl
+            )
+        except Exception as e:
+            logger.error(f"Failed to merge into '{handler_name}': {e}")
+            return None
+        return cast(dict[str, Any], models.model_validate(merged)) if models else merged
 
     async def get_ttl(self, handler_name: str) -> int:
         """
@@ -315,13 +387,5 @@ class MemoryStateHandler(IStateCache):
         store = get_memory_store()
         key_prefix = f"{inbox_id}:{kf.handler_prefix}:{handler_name}:"
         ctx_prefix = f"{inbox_id}_"
-        user_ids: list[str] = []
-        async with store._locks["states"]:
-            for context_key, context_store in store._store["states"].items():
-                if not context_key.startswith(ctx_prefix):
-                    continue
-                for key in context_store:
-                    if key.startswith(key_prefix):
-                        user_ids.append(key[len(key_prefix) :])
-                        break
-        return user_ids
+        keys = await store.first_key_per_context("states", ctx_prefix, key_prefix)
+        return [key[len(key_prefix) :] for key in keys]
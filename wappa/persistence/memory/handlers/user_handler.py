@@ -5,11 +5,15 @@ Provides user-specific cache operations using in-memory storage.
 """
 
 import logging
+from collections.abc import Iterable, Mapping
 from typing import Any, cast
 
 from pydantic import BaseModel
 
 from ....domain.interfaces.cache_interfaces import IUserCache
+from ... import field_updates
+from ...field_index import USER_SCOPE, StorageFieldIndex, field_indexes, row_value
+from ...identity_index import StorageIdentityIndex, record_identities
 from ..storage_manager import storage_manager
 from .utils.key_factory import default_key_factory
 
@@ -21,7 +25,8 @@ class MemoryUser(IUserCache):
     Memory-based user cache handler.
 
     Mirrors RedisUser functionality using in-memory storage.
-    Maintains the same API for seamless cache backend switching.
+    Maintains the same API for seamless cache backend switching. Writes keep
+    the inbox identity index (phone number / BSUID -> user_id) current.
     """
 
     def __init__(self, inbox: str, user_id: str):
@@ -43,7 +48,27 @@ class MemoryUser(IUserCache):
 
     def _key(self) -> str:
         """Build user key using KeyFactory (same as Redis)."""
-        return self.keys.user(self.inbox, self.user_id)
+        return self._user_key(self.user_id)
+
+    def _user_key(self, user_id: str) -> str:
+        return self.keys.user(self.inbox, user_id)
+
+    async def _reindex(
+        self, users: Mapping[str, dict[str, Any] | BaseModel | None]
+    ) -> None:
+        """Bring the declared user field indexes in line with these users."""
+        if field_indexes.fields(USER_SCOPE):
+            await StorageFieldIndex(storage_manager, self.inbox, USER_SCOPE).reindex(
+                users
+            )
+
+    async def _all_users(self) -> dict[str, Any]:
+        """Every user record of the inbox, by user_id."""
+        key_prefix = self._user_key("")
+        records = await storage_manager.get_keys_by_prefix(
+            "users", self.inbox, key_prefix
+        )
+        return {key.removeprefix(key_prefix): data for key, data in records.items()}
 
     # ---- Public API matching RedisUser ----
     async def get(self, models: type[BaseModel] | None = None) -> dict[str, Any] | None:
@@ -76,9 +101,14 @@ class MemoryUser(IUserCache):
             True if successful, False otherwise
         """
         key = self._key()
-        return await storage_manager.set(
+        previous = record_identities(await self.get())
+        success = await storage_manager.set(
             "users", self.inbox, self.user_id, key, data, ttl
         )
+        if success:
+            await self._relink(record_identities(data), previous)
+            await self._reindex({self.user_id: data})
+        return success
 
     async def delete(self) -> int:
         """
@@ -88,9 +118,56 @@ class MemoryUser(IUserCache):
             1 if deleted, 0 if didn't exist
         """
         key = self._key()
+        previous = record_identities(await self.get())
         success = await storage_manager.delete("users", self.inbox, self.user_id, key)
+        if success:
+            await self._relink(set(), previous)
+            await self._reindex({self.user_id: None})
         return 1 if success else 0
 
+    async def get_many(
+        self, user_ids: Iterable[str], models: type[BaseModel] | None = None
+    ) -> dict[str, Any]:
+        """Get several users of this inbox with one store lock hold."""
+        unique = list(dict.fromkeys(user_ids))
+        values = await storage_manager.get_many(
+            "users", self.inbox, [(uid, self._user_key(uid)) for uid in unique], models
+        )
+        return dict(zip(unique, values, strict=True))
+
+    async def upsert_many(
+        self, users: Mapping[str, dict[str, Any] | BaseModel], ttl: int | None = None
+    ) -> bool:
+        """Create or update several users of this inbox with one store lock hold."""
+        previous = await self.get_many(users)
+        success = await storage_manager.set_many(
+            "users",
+            self.inbox,
+            [(uid, self._user_key(uid), data) for uid, data in users.items()],
+            ttl,
+        )
+        if success:
+            await self._relink_many(
+                [
+                    (uid, record_identities(data), record_identities(previous[uid]))
+                    for uid, data in users.items()
+                ]
+            )
+            await self._reindex(users)
+        return success
+
+    async def delete_many(self, user_ids: Iterable[str]) -> int:
+        """Delete several users of this inbox with one store lock hold."""
+        previous = await self.get_many(user_ids)
+        deleted = await storage_manager.delete_many(
+            "users", self.inbox, [(uid, self._user_key(uid)) for uid in previous]
+        )
+        await self._relink_many(
+            [(uid, set(), record_identities(data)) for uid, data in previous.items()]
+        )
+        await self._reindex(dict.fromkeys(previous))
+        return deleted
+
     async def exists(self) -> bool:
         """
         Check if user data exists.
@@ -121,6 +198,30 @@ class MemoryUser(IUserCache):
             # BaseModel instance
             return getattr(user_data, field, None)
 
+    async def _update(
+        self, mutate: field_updates.Mutation, ttl: int | None
+    ) -> dict[str, Any]:
+        """Read-modify-write this user's record under the namespace lock.
+
+        The identity and field indexes follow the record, using the value the
+        mutation actually replaced.
+        """
+        replaced: list[Any] = []
+
+        def step(current: Any) -> dict[str, Any]:
+            replaced.append(current)
+            return mutate(current)
+
+        record = cast(
+            "dict[str, Any]",
+            await storage_manager.update(
+                "users", self.inbox, self.user_id, self._key(), step, ttl
+            ),
+        )
+        await self._relink(record_identities(record), record_identities(replaced[0]))
+        await self._reindex({self.user_id: record})
+        return record
+
     async def update_field(
         self, field: str, value: Any, ttl: int | None = None
     ) -> bool:
@@ -135,21 +236,20 @@ class MemoryUser(IUserCache):
         Returns:
             True if successful, False otherwise
         """
-        user_data = await self.get()
-        if user_data is None:
-            user_data = {}
-
-        if isinstance(user_data, BaseModel):
-            user_data = user_data.model_dump()
-
-        user_data[field] = value
-        return await self.upsert(user_data, ttl)
+        try:
+            await self._update(field_updates.set_fields({field: value}), ttl)
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed to update field '{field}' of user '{self.user_id}': {e}"
+            )
+            return False
 
     async def increment_field(
         self, field: str, increment: int = 1, ttl: int | None = None
     ) -> int | None:
         """
-        Atomically increment an integer field.
+        Atomically increment an integer field in user data.
 
         Args:
             field: Field name
@@ -159,55 +259,95 @@ class MemoryUser(IUserCache):
         Returns:
             New value after increment or None on error
         """
-        user_data = await self.get()
-        if user_data is None:
-            user_data = {}
-
-        if isinstance(user_data, BaseModel):
-            user_data = user_data.model_dump()
-
-        current_value = user_data.get(field, 0)
-        if not isinstance(current_value, int | float):
-            logger.warning(
-                f"Cannot increment non-numeric field '{field}': {current_value}"
+        try:
+            data = await self._update(field_updates.increment(field, increment), ttl)
+        except field_updates.NotNumericError as e:
+            logger.warning(str(e))
+            return None
+        except Exception as e:
+            logger.error(
+                f"Failed to increment field '{field}' of user '{self.user_id}': {e}"
             )
             return None
-
-        new_value = int(current_value) + increment
-        user_data[field] = new_value
-
-        success = await self.upsert(user_data, ttl)
-        return new_value if success else None
+        return cast(int, data[field])
 
     async def append_to_list(
-        self, field: str, value: Any, ttl: int | None = None
+        self,
+        field: str,
+        value: Any,
+        ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """
-        Append value to a list field.
+        Append value to a list field in user data.
 
         Args:
             field: Field name containing list
             value: Value to append
             ttl: Time to live in seconds
+            max_length: Keep only the newest max_length items (None keeps all)
 
         Returns:
             True if successful, False otherwise
         """
-        user_data = await self.get()
-        if user_data is None:
-            user_data = {}
+        field_updates.require_max_length(max_length)
+        try:
+            await self._update(field_updates.append(field, value, max_length), ttl)
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed to append to field '{field}' of user '{self.user_id}': {e}"
+            )
+            return False
+
+    async def find_by_field(
+        self, field: str, value: Any, models: type[BaseModel] | None = None
+    ) -> dict[str, Any] | None:
+        """
+        Find the first user of the inbox whose field equals value.
+
+        Reads the field index when ``field`` is declared with
+        ``field_indexes.declare_users``; otherwise checks every user record.
 
-        if isinstance(user_data, BaseModel):
-            user_data = user_data.model_dump()
+        Args:
+            field: Field name to search
+            value: Value to match
+            models: Optional BaseModel class for deserialization
+
+        Returns:
+            Matching user data or None if no user matches
+        """
+        if field_indexes.is_indexed(USER_SCOPE, field):
+            user = await StorageFieldIndex(
+                storage_manager, self.inbox, USER_SCOPE
+            ).find(field, value, self.get_many)
+        else:
+            user = next(
+                (
+                    data
+                    for _, data in sorted((await self._all_users()).items())
+                    if row_value(data, field) == value
+                ),
+                None,
+            )
+        if user is not None and models is not None and isinstance(user, dict):
+            return cast(dict[str, Any], models.model_validate(user))
+        return user
 
-        current_list = user_data.get(field, [])
-        if not isinstance(current_list, list):
-            current_list = []
+    async def rebuild_field_indexes(self) -> int:
+        """
+        Re-create the declared user field indexes from the inbox's user records.
 
-        current_list.append(value)
-        user_data[field] = current_list
+        Run once after declaring an index when users already exist.
 
-        return await self.upsert(user_data, ttl)
+        Returns:
+            Number of users indexed
+        """
+        if not field_indexes.fields(USER_SCOPE):
+            return 0
+        users = await self._all_users()
+        await StorageFieldIndex(storage_manager, self.inbox, USER_SCOPE).replace(users)
+        return len(users)
 
     async def get_ttl(self) -> int:
         """
@@ -233,3 +373,13 @@ class MemoryUser(IUserCache):
         return await storage_manager.set_ttl(
             "users", self.inbox, self.user_id, self._key(), ttl
         )
+
+    async def _relink(self, current: set[str], previous: set[str]) -> None:
+        """Point ``current`` at this user and release ``previous``."""
+        await self._relink_many([(self.user_id, current, previous)])
+
+    async def _relink_many(self, changes: list[tuple[str, set[str], set[str]]]) -> None:
+        """``_relink`` for several users in one index write."""
+        if any(current or previous for _, current, previous in changes):
+            index = StorageIdentityIndex(storage_manager, self.inbox, self._user_key)
+            await index.link_many(changes)
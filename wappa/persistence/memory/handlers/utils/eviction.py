@@ -0,0 +1,250 @@
+"""
+Eviction policies and size estimates for a bounded ``MemoryStore``.
+
+A policy tracks the entries of one namespace as ``(context_key, key)`` refs
+and names the next one to evict. Every method is O(1), so the store can call
+them on each read and write, and evicting never scans the namespace.
+
+- ``lru``: least recently read or written first.
+- ``tinylfu``: W-TinyLFU. New entries go through a small LRU window into a
+  probation area; when room is needed the latest arrival and the oldest entry
+  of probation compete on their access frequency (a count-min sketch that
+  halves itself as it ages), and entries read again move to a protected area,
+  so a burst of one-off keys cannot flush the entries read every message.
+- ``ttl``: entries with a TTL before entries without one, least recently used
+  first in each group; the expiring entries would leave soon anyway.
+
+    store.configure_limits(max_bytes=256 << 20, eviction="tinylfu")
+"""
+
+from __future__ import annotations
+
+import sys
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+Ref = tuple[str, str]
+
+# Dict slot, entry tuple and bookkeeping charged to every entry on top of its
+# key and value.
+ENTRY_OVERHEAD = 160
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate bytes held by a cached value (JSON-like data is exact enough)."""
+    if isinstance(value, str):
+        return 49 + len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return 24 if value is None or isinstance(value, bool) else 32
+    if isinstance(value, dict):
+        return 64 + sum(estimate_item_size(k, v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 56 + 8 * len(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, (bytes, bytearray)):
+        return 33 + len(value)
+    return sys.getsizeof(value)
+
+
+def estimate_item_size(key: Any, value: Any) -> int:
+    """Bytes one item adds to the ``estimate_size`` of its dict."""
+    return 40 + estimate_size(key) + estimate_size(value)
+
+
+class EvictionPolicy(ABC):
+    """Eviction order of the entries of one namespace."""
+
+    name: str = ""
+
+    @abstractmethod
+    def on_write(self, ref: Ref, expiring: bool) -> None:
+        """An entry was stored; ``expiring`` tells whether it has a TTL."""
+
+    @abstractmethod
+    def on_read(self, ref: Ref) -> None:
+        """A live entry was read."""
+
+    @abstractmethod
+    def on_remove(self, ref: Ref) -> None:
+        """An entry was deleted or expired."""
+
+    @abstractmethod
+    def victim(self) -> Ref | None:
+        """Stop tracking and return the entry to evict, or None if empty."""
+
+
+class LRUPolicy(EvictionPolicy):
+    name = "lru"
+
+    def __init__(self) -> None:
+        self._order: OrderedDict[Ref, None] = OrderedDict()
+
+    def on_write(self, ref: Ref, expiring: bool) -> None:
+        self._order[ref] = None
+        self._order.move_to_end(ref)
+
+    def on_read(self, ref: Ref) -> None:
+        if ref in self._order:
+            self._order.move_to_end(ref)
+
+    def on_remove(self, ref: Ref) -> None:
+        self._order.pop(ref, None)
+
+    def victim(self) -> Ref | None:
+        if not self._order:
+            return None
+        return self._order.popitem(last=False)[0]
+
+
+class TTLFirstPolicy(EvictionPolicy):
+    name = "ttl"
+
+    def __init__(self) -> None:
+        self._expiring: OrderedDict[Ref, None] = OrderedDict()
+        self._persistent: OrderedDict[Ref, None] = OrderedDict()
+
+    def on_write(self, ref: Ref, expiring: bool) -> None:
+        self.on_remove(ref)
+        (self._expiring if expiring else self._persistent)[ref] = None
+
+    def on_read(self, ref: Ref) -> None:
+        for order in (self._expiring, self._persistent):
+            if ref in order:
+                order.move_to_end(ref)
+                return
+
+    def on_remove(self, ref: Ref) -> None:
+        self._expiring.pop(ref, None)
+        self._persistent.pop(ref, None)
+
+    def victim(self) -> Ref | None:
+        for order in (self._expiring, self._persistent):
+            if order:
+                return order.popitem(last=False)[0]
+        return None
+
+
+# Odd 64-bit multipliers, one per sketch row
+_SEEDS = (
+    0x9E3779B97F4A7C15,
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+)
+_U64 = (1 << 64) - 1
+
+
+class FrequencySketch:
+    """Count-min sketch of counters capped at 15, halved every ``width * 10`` hits."""
+
+    MAX_COUNT = 15
+
+    def __init__(self, width: int = 1 << 16) -> None:
+        self._width = 1 << max(4, (width - 1).bit_length())
+        self._mask = self._width - 1
+        self._rows = [bytearray(self._width) for _ in _SEEDS]
+        self._sample_size = self._width * 10
+        self._additions = 0
+
+    def _slots(self, ref: Ref) -> list[int]:
+        h = hash(ref)
+        return [((h * seed) & _U64) >> 32 & self._mask for seed in _SEEDS]
+
+    def increment(self, ref: Ref) -> None:
+        for row, slot in zip(self._rows, self._slots(ref), strict=True):
+            if row[slot] < self.MAX_COUNT:
+                row[slot] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def frequency(self, ref: Ref) -> int:
+        return min(
+            row[slot] for row, slot in zip(self._rows, self._slots(ref), strict=True)
+        )
+
+    def _age(self) -> None:
+        # O(width), once every width * 10 hits: constant per hit on average
+        for row in self._rows:
+            row[:] = bytes(count >> 1 for count in row)
+        self._additions //= 2
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """
+    W-TinyLFU: an LRU window (``window_share`` of entries) in front of a
+    segmented LRU main area (probation, then protected once read again).
+    """
+
+    name = "tinylfu"
+
+    def __init__(
+        self,
+        sketch_width: int = 1 << 16,
+        window_share: float = 0.01,
+        protected_share: float = 0.8,
+    ) -> None:
+        self._sketch = FrequencySketch(sketch_width)
+        self._window: OrderedDict[Ref, None] = OrderedDict()
+        self._probation: OrderedDict[Ref, None] = OrderedDict()
+        self._protected: OrderedDict[Ref, None] = OrderedDict()
+        self._window_share = window_share
+        self._protected_share = protected_share
+
+    def _size(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def on_write(self, ref: Ref, expiring: bool) -> None:
+        self._sketch.increment(ref)
+        if ref in self._window or ref in self._probation or ref in self._protected:
+            self._touch(ref)
+            return
+        self._window[ref] = None
+        # Entries leaving the window join probation on trial; whether they
+        # stay is decided when room is needed, in ``victim``
+        if len(self._window) > max(1, int(self._size() * self._window_share)):
+            oldest, _ = self._window.popitem(last=False)
+            self._probation[oldest] = None
+
+    def on_read(self, ref: Ref) -> None:
+        self._sketch.increment(ref)
+        self._touch(ref)
+
+    def _touch(self, ref: Ref) -> None:
+        if ref in self._window:
+            self._window.move_to_end(ref)
+        elif ref in self._protected:
+            self._protected.move_to_end(ref)
+        elif ref in self._probation:
+            del self._probation[ref]
+            self._protected[ref] = None
+            limit = max(1, int(self._size() * self._protected_share))
+            if len(self._protected) > limit:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+
+    def on_remove(self, ref: Ref) -> None:
+        self._window.pop(ref, None)
+        self._probation.pop(ref, None)
+        self._protected.pop(ref, None)
+
+    def victim(self) -> Ref | None:
+        # The newest entry of probation (the last to leave the window) is
+        # admitted only if it is read more often than the oldest one
+        if len(self._probation) > 1:
+            candidate = next(reversed(self._probation))
+            incumbent = next(iter(self._probation))
+            if self._sketch.frequency(candidate) > self._sketch.frequency(incumbent):
+                del self._probation[incumbent]
+                return incumbent
+            del self._probation[candidate]
+            return candidate
+        for order in (self._probation, self._protected, self._window):
+            if order:
+                return order.popitem(last=False)[0]
+        return None
+
+
+EVICTION_POLICIES: dict[str, type[EvictionPolicy]] = {
+    policy.name: policy for policy in (LRUPolicy, TinyLFUPolicy, TTLFirstPolicy)
+}
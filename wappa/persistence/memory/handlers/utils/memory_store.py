@@ -1,22 +1,134 @@
 import asyncio
+import contextlib
+import heapq
+import itertools
 import logging
-from collections.abc import Callable
-from datetime import datetime, timedelta
+import os
+import pickle
+import time
+import zlib
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
 from typing import Any
 
+from .....core.config.settings import settings
+from .eviction import (
+    ENTRY_OVERHEAD,
+    EVICTION_POLICIES,
+    EvictionPolicy,
+    estimate_item_size,
+    estimate_size,
+)
+from .snapshot import Record, SnapshotReader, SnapshotWriter, encode_frame
+
 logger = logging.getLogger("MemoryStore")
 
-_NAMESPACES = ("users", "tables", "states", "ai_states")
+_NAMESPACES = ("users", "tables", "states", "ai_states", "identities", "indexes")
+# Never evicted: a lost entry would make lookups miss rows that still exist
+_UNEVICTABLE = frozenset({"identities", "indexes"})
+
+# Lock stripes per namespace; an entry is guarded by the stripe its
+# (context_key, key) hashes to
+DEFAULT_STRIPES = 16
+# Most deadlines the expiry task pops before it yields to other tasks
+DEFAULT_EXPIRY_BATCH = 256
+# Seconds between expiry ticks while nothing is overdue
+DEFAULT_EXPIRY_INTERVAL = 1.0
+# Heap size below which superseded deadlines are left to pop on their own
+_COMPACT_MIN = 10_000
+# Entries per snapshot frame; each frame is pickled on the loop between yields
+DEFAULT_SNAPSHOT_CHUNK = 2000
+
+# (data, time.monotonic() deadline or None, estimated bytes; 0 while unbounded)
+Entry = tuple[Any, float | None, int]
+
+_ABSENT = object()
+
+
+@dataclass
+class MemoryStoreStats:
+    """Footprint (``entries``, estimated ``bytes``) and counters of a namespace.
+
+    ``bytes`` is only estimated while the store is bounded (``configure_limits``).
+    """
+
+    entries: int = 0
+    bytes: int = 0
+    evictions: int = 0
+    expired: int = 0
 
 
 class MemoryStore:
-    def __init__(self) -> None:
-        self._store: dict[str, dict[str, dict[str, tuple[Any, datetime | None]]]] = {
+    """In-process store behind the memory cache backend.
+
+    Entries live in ``_store[namespace][context_key][key]`` as
+    ``(data, deadline, size)`` with ``deadline`` on ``time.monotonic()``, so
+    wall-clock jumps neither expire nor revive them, and ``size`` estimated
+    when written while the store is bounded (0 otherwise). Each namespace has
+    ``stripes`` locks and an entry is guarded by the one its
+    ``(context_key, key)`` hashes to; calls touching several entries take
+    their stripes in index order.
+
+    Expired entries read as absent and are dropped on read. Every TTL write
+    also pushes its deadline on a min-heap, from which a background task pops
+    at most ``expiry_batch`` due entries per tick, so expiry never sweeps the
+    whole store. Deadlines superseded by a later write or delete are skipped
+    when popped.
+
+    The store is unbounded, and sizes nothing, until ``configure_limits`` caps
+    entries or bytes, per namespace or overall; writes past a cap then evict
+    in the order of the configured ``EvictionPolicy``. The ``identities`` and
+    ``indexes`` namespaces count toward the limits but are never evicted.
+    ``save_snapshot`` and ``load_snapshot`` carry the entries, and the time
+    left on their TTLs, across restarts.
+    """
+
+    def __init__(
+        self,
+        stripes: int = DEFAULT_STRIPES,
+        *,
+        expiry_batch: int = DEFAULT_EXPIRY_BATCH,
+        expiry_interval: float = DEFAULT_EXPIRY_INTERVAL,
+    ) -> None:
+        if stripes < 1 or expiry_batch < 1:
+            raise ValueError("stripes and expiry_batch must be positive")
+        self._store: dict[str, dict[str, dict[str, Entry]]] = {
             ns: {} for ns in _NAMESPACES
         }
-        self._locks = {ns: asyncio.Lock() for ns in _NAMESPACES}
+        self._stripes = stripes
+        self._locks = {
+            ns: tuple(asyncio.Lock() for _ in range(stripes)) for ns in _NAMESPACES
+        }
+        # (deadline, push order, namespace, context_key, key); the push order
+        # breaks ties so equal deadlines never fall back to comparing keys
+        self._deadlines: list[tuple[float, int, str, str, str]] = []
+        self._pushes = itertools.count()
+        # Heap items whose entry has since been rewritten, deleted or expired
+        self._stale_deadlines = 0
+        self._expiry_batch = expiry_batch
         self._cleanup_task: asyncio.Task[None] | None = None
-        self._cleanup_interval = 300  # 5 minutes
+        self._cleanup_interval = expiry_interval
+        self._usage = {ns: MemoryStoreStats() for ns in _NAMESPACES}
+        self._total_entries = 0
+        self._total_bytes = 0
+        # Empty while the store is unbounded: no eviction order is kept
+        self._policies: dict[str, EvictionPolicy] = {}
+        self._max_entries: int | None = None
+        self._max_bytes: int | None = None
+        self._namespace_max_entries: dict[str, int] = {}
+        self._namespace_max_bytes: dict[str, int] = {}
+        self._snapshot_lock = asyncio.Lock()
+        self._snapshot_path: Path | None = None
+        self._snapshot_task: asyncio.Task[None] | None = None
 
     def _require_namespace(self, namespace: str) -> None:
         if namespace not in self._locks:
@@ -32,12 +144,311 @@ class MemoryStore:
             self._cleanup_task.cancel()
             logger.info("Stopped memory store TTL cleanup task")
 
+    def configure_limits(
+        self,
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        namespace_max_entries: Mapping[str, int] | None = None,
+        namespace_max_bytes: Mapping[str, int] | None = None,
+        eviction: str | Callable[[], EvictionPolicy] = "lru",
+    ) -> None:
+        """
+        Bound the store; a write past a limit evicts entries until it fits.
+
+        Args:
+            max_entries: Entries kept across all namespaces.
+            max_bytes: Estimated bytes kept across all namespaces.
+            namespace_max_entries: Entries kept per namespace.
+            namespace_max_bytes: Estimated bytes kept per namespace.
+            eviction: ``lru``, ``tinylfu``, ``ttl`` or a factory of
+                ``EvictionPolicy`` instances (one per namespace).
+
+        Limits left as None (or 0) are unbounded; with none set the store
+        keeps no eviction order and estimates no sizes at all. Entries already
+        stored are sized, then evicted down to the new limits, right away.
+        ``identities`` and ``indexes`` entries count toward ``max_entries``
+        and ``max_bytes`` but are never evicted.
+
+        Raises:
+            ValueError: If a namespace or policy is unknown, a limit is
+                negative, or a namespace limit names ``identities`` or
+                ``indexes``.
+        """
+        per_namespace = {
+            **(namespace_max_entries or {}),
+            **(namespace_max_bytes or {}),
+        }
+        for namespace in per_namespace:
+            self._require_namespace(namespace)
+            if namespace in _UNEVICTABLE:
+                raise ValueError(
+                    f"The {namespace} memory cache is never evicted and "
+                    f"takes no limit of its own"
+                )
+        limits = [max_entries or 0, max_bytes or 0, *per_namespace.values()]
+        if any(limit < 0 for limit in limits):
+            raise ValueError("Memory store limits cannot be negative")
+        if isinstance(eviction, str):
+            if eviction not in EVICTION_POLICIES:
+                raise ValueError(
+                    f"Unknown eviction policy '{eviction}' "
+                    f"(available: {', '.join(sorted(EVICTION_POLICIES))})"
+                )
+            eviction = EVICTION_POLICIES[eviction]
+
+        self._max_entries = max_entries or None
+        self._max_bytes = max_bytes or None
+        self._namespace_max_entries = {
+            ns: n for ns, n in (namespace_max_entries or {}).items() if n
+        }
+        self._namespace_max_bytes = {
+            ns: n for ns, n in (namespace_max_bytes or {}).items() if n
+        }
+        self._policies = {}
+        if not any(limits):
+            self._resize_all()
+            return
+
+        for namespace in _NAMESPACES:
+            if namespace in _UNEVICTABLE:
+                continue
+            policy = self._policies[namespace] = eviction()
+            for context_key, context_store in self._store[namespace].items():
+                for key, (_, deadline, _) in context_store.items():
+                    policy.on_write((context_key, key), deadline is not None)
+        self._resize_all()
+        for namespace in self._policies:
+            self._evict(namespace)
+        logger.info(
+            f"Memory store bounded to {self._max_entries or 'unlimited'} entries, "
+            f"{self._max_bytes or 'unlimited'} bytes ({getattr(eviction, 'name', '')})"
+        )
+
+    def stats(self) -> dict[str, MemoryStoreStats]:
+        """Per namespace footprint and eviction/expiry counters."""
+        return {ns: replace(usage) for ns, usage in self._usage.items()}
+
+    def _stripe(self, context_key: str, key: str) -> int:
+        return hash((context_key, key)) % self._stripes
+
+    def _lock(self, namespace: str, context_key: str, key: str) -> asyncio.Lock:
+        return self._locks[namespace][self._stripe(context_key, key)]
+
+    @asynccontextmanager
+    async def _locked(
+        self, namespace: str, refs: Iterable[tuple[str, str]]
+    ) -> AsyncIterator[None]:
+        """Hold the stripes of ``(context_key, key)`` refs, in index order."""
+        indexes = sorted({self._stripe(ctx, key) for ctx, key in refs})
+        async with AsyncExitStack() as stack:
+            for index in indexes:
+                await stack.enter_async_context(self._locks[namespace][index])
+            yield
+
+    @asynccontextmanager
+    async def _locked_all(self, namespace: str) -> AsyncIterator[None]:
+        """Hold every stripe of a namespace, for reads that span contexts."""
+        async with AsyncExitStack() as stack:
+            for lock in self._locks[namespace]:
+                await stack.enter_async_context(lock)
+            yield
+
+    @staticmethod
+    def _deadline(ttl: int | None) -> float | None:
+        return time.monotonic() + ttl if ttl else None
+
+    def _account(self, namespace: str, entries: int, size: int) -> None:
+        usage = self._usage[namespace]
+        usage.entries += entries
+        usage.bytes += size
+        self._total_entries += entries
+        self._total_bytes += size
+
+    def _resize_all(self) -> None:
+        """Size every entry afresh, after the store became bounded or unbounded."""
+        bounded = bool(self._policies)
+        for namespace in _NAMESPACES:
+            usage = self._usage[namespace]
+            self._total_bytes -= usage.bytes
+            usage.bytes = 0
+            for context_store in self._store[namespace].values():
+                for key, (data, deadline, _) in context_store.items():
+                    size = self._estimate(key, data) if bounded else 0
+                    context_store[key] = (data, deadline, size)
+                    usage.bytes += size
+            self._total_bytes += usage.bytes
+
+    @staticmethod
+    def _estimate(key: str, data: Any) -> int:
+        return ENTRY_OVERHEAD + estimate_size(key) + estimate_size(data)
+
+    def _sized(self, namespace: str, key: str, data: Any) -> int:
+        """Estimated bytes of an entry; raises if it could never fit.
+
+        Unbounded stores size nothing: walking every value written would
+        cost O(value) per write for no reader.
+        """
+        if not self._policies:
+            return 0
+        return self._fits(namespace, key, self._estimate(key, data))
+
+    def _resized(self, namespace: str, key: str, previous: Entry, data: Any) -> int:
+        """``_sized`` of a rewritten entry, charging only what changed.
+
+        ``update`` mutations return a new dict that shares the values they
+        left alone, so only top-level fields whose value is not the same
+        object are estimated again.
+        """
+        old = previous[0]
+        if (
+            not self._policies
+            or old is data
+            or not isinstance(old, dict)
+            or not isinstance(data, dict)
+        ):
+            return self._sized(namespace, key, data)
+        size = previous[2]
+        for field in old.keys() | data.keys():
+            before, after = old.get(field, _ABSENT), data.get(field, _ABSENT)
+            if before is after:
+                continue
+            if before is not _ABSENT:
+                size -= estimate_item_size(field, before)
+            if after is not _ABSENT:
+                size += estimate_item_size(field, after)
+        return self._fits(namespace, key, size)
+
+    def _fits(self, namespace: str, key: str, size: int) -> int:
+        limit = min(
+            (
+                n
+                for n in (self._max_bytes, self._namespace_max_bytes.get(namespace))
+                if n
+            ),
+            default=None,
+        )
+        if limit is not None and size > limit:
+            raise ValueError(
+                f"Entry '{key}' of ~{size} bytes exceeds the {limit}-byte "
+                f"limit of the {namespace} memory cache"
+            )
+        return size
+
+    def _put(
+        self,
+        namespace: str,
+        context_key: str,
+        key: str,
+        data: Any,
+        deadline: float | None,
+        size: int | None = None,
+    ) -> None:
+        if size is None:
+            size = self._sized(namespace, key, data)
+        context_store = self._store[namespace].setdefault(context_key, {})
+        previous = context_store.get(key)
+        if previous is not None:
+            self._account(namespace, -1, -previous[2])
+            if previous[1] is not None:
+                self._stale_deadlines += 1
+        context_store[key] = (data, deadline, size)
+        self._account(namespace, 1, size)
+        if deadline is not None:
+            heapq.heappush(
+                self._deadlines,
+                (deadline, next(self._pushes), namespace, context_key, key),
+            )
+            self.start_cleanup_task()
+        policy = self._policies.get(namespace)
+        if policy is not None:
+            policy.on_write((context_key, key), deadline is not None)
+        if self._policies:
+            self._evict(namespace)
+
+    def _discard(
+        self,
+        namespace: str,
+        context_key: str,
+        key: str,
+        *,
+        deadline_popped: bool = False,
+    ) -> Entry | None:
+        store = self._store[namespace]
+        context_store = store.get(context_key)
+        if not context_store:
+            return None
+        entry = context_store.pop(key, None)
+        if not context_store:
+            del store[context_key]
+        if entry is None:
+            return None
+        self._account(namespace, -1, -entry[2])
+        if entry[1] is not None and not deadline_popped:
+            self._stale_deadlines += 1
+        policy = self._policies.get(namespace)
+        if policy is not None:
+            policy.on_remove((context_key, key))
+        return entry
+
+    def _expire(self, namespace: str, context_key: str, key: str) -> None:
+        self._discard(namespace, context_key, key)
+        self._usage[namespace].expired += 1
+
+    def _over_limit(self, namespace: str) -> bool:
+        usage = self._usage[namespace]
+        max_entries = self._namespace_max_entries.get(namespace)
+        max_bytes = self._namespace_max_bytes.get(namespace)
+        return bool(
+            (max_entries and usage.entries > max_entries)
+            or (max_bytes and usage.bytes > max_bytes)
+        )
+
+    def _evict(self, namespace: str) -> None:
+        """Evict until ``namespace`` and the whole store are within their limits.
+
+        Each eviction is one O(1) policy call; nothing is scanned. The store
+        limits evict from the namespace holding most of what is over.
+        """
+        while self._over_limit(namespace) and self._evict_one(namespace):
+            pass
+        while True:
+            if self._max_bytes and self._total_bytes > self._max_bytes:
+                target = max(self._policies, key=lambda ns: self._usage[ns].bytes)
+            elif self._max_entries and self._total_entries > self._max_entries:
+                target = max(self._policies, key=lambda ns: self._usage[ns].entries)
+            else:
+                return
+            if not self._evict_one(target):
+                return
+
+    def _evict_one(self, namespace: str) -> bool:
+        ref = self._policies[namespace].victim()
+        if ref is None:
+            return False
+        if self._discard(namespace, *ref) is not None:
+            self._usage[namespace].evictions += 1
+        return True
+
+    def _live(self, namespace: str, context_key: str, key: str) -> Any:
+        """Read an unexpired entry, dropping it if its deadline has passed."""
+        entry = self._store[namespace].get(context_key, {}).get(key)
+        if entry is None:
+            return None
+        data, deadline, _ = entry
+        if deadline is not None and deadline <= time.monotonic():
+            self._expire(namespace, context_key, key)
+            return None
+        policy = self._policies.get(namespace)
+        if policy is not None:
+            policy.on_read((context_key, key))
+        return data
+
     async def get(self, namespace: str, context_key: str, key: str) -> Any:
         self._require_namespace(namespace)
 
-        async with self._locks[namespace]:
-            context_store = self._store[namespace].get(context_key, {})
-            return self._live_entry(context_store, key)
+        async with self._lock(namespace, context_key, key):
+            return self._live(namespace, context_key, key)
 
     async def set(
         self,
@@ -49,13 +460,9 @@ class MemoryStore:
     ) -> bool:
         self._require_namespace(namespace)
 
-        expires_at = self._expires_at(ttl)
-
         try:
-            async with self._locks[namespace]:
-                store = self._store[namespace]
-                store.setdefault(context_key, {})[key] = (data, expires_at)
-                self.start_cleanup_task()
+            async with self._lock(namespace, context_key, key):
+                self._put(namespace, context_key, key, data, self._deadline(ttl))
                 return True
         except Exception as e:
             logger.error(f"Failed to set key '{key}' in {namespace}: {e}")
@@ -72,17 +479,15 @@ class MemoryStore:
         """Store data only when the key holds no live entry.
 
         Returns ``(created, existing)``. The whole check-and-write runs under
-        the namespace lock, so concurrent callers cannot both see "absent".
+        the entry's lock stripe, so concurrent callers cannot both see "absent".
         """
         self._require_namespace(namespace)
 
-        async with self._locks[namespace]:
-            context_store = self._store[namespace].setdefault(context_key, {})
-            existing = self._live_entry(context_store, key)
+        async with self._lock(namespace, context_key, key):
+            existing = self._live(namespace, context_key, key)
             if existing is not None:
                 return False, existing
-            context_store[key] = (data, self._expires_at(ttl))
-            self.start_cleanup_task()
+            self._put(namespace, context_key, key, data, self._deadline(ttl))
             return True, None
 
     async def replace_if(
@@ -101,45 +506,151 @@ class MemoryStore:
         """
         self._require_namespace(namespace)
 
-        async with self._locks[namespace]:
-            context_store = self._store[namespace].setdefault(context_key, {})
-            current = self._live_entry(context_store, key)
+        async with self._lock(namespace, context_key, key):
+            current = self._live(namespace, context_key, key)
             if current is None:
                 return "missing", None
             if not matches(current):
                 return "condition_not_met", current
-            context_store[key] = (data, self._expires_at(ttl))
-            self.start_cleanup_task()
+            self._put(namespace, context_key, key, data, self._deadline(ttl))
             return "replaced", None
 
-    @staticmethod
-    def _expires_at(ttl: int | None) -> datetime | None:
-        return datetime.now() + timedelta(seconds=ttl) if ttl else None
+    async def update(
+        self,
+        namespace: str,
+        context_key: str,
+        key: str,
+        mutate: Callable[[Any], Any],
+        ttl: int | None = None,
+    ) -> Any:
+        """Read-modify-write one entry under its lock stripe.
 
-    @staticmethod
-    def _live_entry(
-        context_store: dict[str, tuple[Any, datetime | None]], key: str
+        ``mutate`` receives the live value (or None) and returns the value to
+        store; returning None deletes the entry. Returns the stored value.
+        A returned dict is charged only for the fields whose value is not the
+        very object stored before, so ``mutate`` must copy what it changes
+        rather than edit the stored value in place.
+        """
+        self._require_namespace(namespace)
+
+        async with self._lock(namespace, context_key, key):
+            data = mutate(self._live(namespace, context_key, key))
+            if data is None:
+                self._discard(namespace, context_key, key)
+                return None
+            previous = self._store[namespace].get(context_key, {}).get(key)
+            size = (
+                self._sized(namespace, key, data)
+                if previous is None
+                else self._resized(namespace, key, previous, data)
+            )
+            self._put(namespace, context_key, key, data, self._deadline(ttl), size)
+            return data
+
+    async def update_many(
+        self,
+        namespace: str,
+        context_key: str,
+        keys: Iterable[str],
+        mutate: Callable[[dict[str, Any]], Mapping[str, Any]],
+        ttl: int | None = None,
+    ) -> None:
+        """Read-modify-write several entries of one context under their stripes.
+
+        ``mutate`` receives the live values among ``keys`` and returns the
+        changes: key -> value to store, or None to delete the entry. Every
+        entry it writes is sized before any is stored.
+        """
+        self._require_namespace(namespace)
+
+        keys = list(dict.fromkeys(keys))
+        async with self._locked(namespace, [(context_key, key) for key in keys]):
+            current = {
+                key: data
+                for key in keys
+                if (data := self._live(namespace, context_key, key)) is not None
+            }
+            changes = mutate(current)
+            sizes = {
+                key: self._sized(namespace, key, data)
+                for key, data in changes.items()
+                if data is not None
+            }
+            deadline = self._deadline(ttl)
+            for key, data in changes.items():
+                if data is None:
+                    self._discard(namespace, context_key, key)
+                else:
+                    self._put(namespace, context_key, key, data, deadline, sizes[key])
+
+    def view(
+        self,
+        namespace: str,
+        context_key: str,
+        read: Callable[[Callable[[str], Any]], Any],
     ) -> Any:
-        """Read an unexpired entry, dropping it if its TTL has passed."""
-        if key not in context_store:
-            return None
-        data, expires_at = context_store[key]
-        if expires_at and datetime.now() > expires_at:
-            del context_store[key]
-            return None
-        return data
+        """Run ``read`` with a live-entry lookup, without taking any lock.
+
+        ``read`` runs synchronously, and every write applies its change
+        without awaiting in between, so the entries it sees are consistent
+        with each other. Use it for reads that need no write to follow them.
+        """
+        self._require_namespace(namespace)
+
+        return read(lambda key: self._live(namespace, context_key, key))
+
+    async def get_many(
+        self, namespace: str, refs: Sequence[tuple[str, str]]
+    ) -> list[Any]:
+        """Read several ``(context_key, key)`` entries under one lock hold."""
+        self._require_namespace(namespace)
+
+        async with self._locked(namespace, refs):
+            return [
+                self._live(namespace, context_key, key) for context_key, key in refs
+            ]
+
+    async def set_many(
+        self,
+        namespace: str,
+        entries: Sequence[tuple[str, str, Any]],
+        ttl: int | None = None,
+    ) -> bool:
+        """Store several ``(context_key, key, data)`` entries under one lock hold."""
+        self._require_namespace(namespace)
+
+        deadline = self._deadline(ttl)
+
+        try:
+            # Size every entry first, so one that cannot fit stores none
+            sizes = [self._sized(namespace, key, data) for _, key, data in entries]
+            async with self._locked(namespace, [(c, k) for c, k, _ in entries]):
+                for (context_key, key, data), size in zip(entries, sizes, strict=True):
+                    self._put(namespace, context_key, key, data, deadline, size)
+                return True
+        except Exception as e:
+            logger.error(f"Failed to set {len(entries)} keys in {namespace}: {e}")
+            return False
+
+    async def delete_many(self, namespace: str, refs: Sequence[tuple[str, str]]) -> int:
+        """Delete several entries under one lock hold; returns how many existed."""
+        self._require_namespace(namespace)
+
+        deleted = 0
+        async with self._locked(namespace, refs):
+            now = time.monotonic()
+            for context_key, key in refs:
+                entry = self._discard(namespace, context_key, key)
+                if entry is not None and (entry[1] is None or entry[1] > now):
+                    deleted += 1
+        return deleted
 
     async def delete(self, namespace: str, context_key: str, key: str) -> bool:
         self._require_namespace(namespace)
 
         try:
-            async with self._locks[namespace]:
-                store = self._store[namespace]
-                context_store = store.get(context_key, {})
-                if key in context_store:
-                    del context_store[key]
-                    if not context_store:
-                        del store[context_key]
+            async with self._lock(namespace, context_key, key):
+                self._discard(namespace, context_key, key)
                 return True
         except Exception as e:
             logger.error(f"Failed to delete key '{key}' from {namespace}: {e}")
@@ -152,20 +663,20 @@ class MemoryStore:
         if namespace not in self._locks:
             return -2
 
-        async with self._locks[namespace]:
-            context_store = self._store[namespace].get(context_key, {})
-            if key not in context_store:
+        async with self._lock(namespace, context_key, key):
+            entry = self._store[namespace].get(context_key, {}).get(key)
+            if entry is None:
                 return -2
 
-            _, expires_at = context_store[key]
-            if expires_at is None:
+            deadline = entry[1]
+            if deadline is None:
                 return -1
 
-            now = datetime.now()
-            if now >= expires_at:
-                del context_store[key]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._expire(namespace, context_key, key)
                 return -2
-            return int((expires_at - now).total_seconds())
+            return int(remaining)
 
     async def set_ttl(
         self, namespace: str, context_key: str, key: str, ttl: int
@@ -174,12 +685,11 @@ class MemoryStore:
             return False
 
         try:
-            async with self._locks[namespace]:
-                context_store = self._store[namespace].get(context_key, {})
-                if key not in context_store:
+            async with self._lock(namespace, context_key, key):
+                if self._live(namespace, context_key, key) is None:
                     return False
-                data, _ = context_store[key]
-                context_store[key] = (data, datetime.now() + timedelta(seconds=ttl))
+                data, _, size = self._store[namespace][context_key][key]
+                self._put(namespace, context_key, key, data, self._deadline(ttl), size)
                 return True
         except Exception as e:
             logger.error(f"Failed to set TTL for key '{key}' in {namespace}: {e}")
@@ -189,62 +699,232 @@ class MemoryStore:
         if namespace not in self._locks:
             return {}
 
-        async with self._locks[namespace]:
-            context_store = self._store[namespace].get(context_key, {})
-            now = datetime.now()
+        async with self._locked_all(namespace):
+            keys = list(self._store[namespace].get(context_key, {}))
             result: dict[str, Any] = {}
-            expired_keys: list[str] = []
-
-            for key, (data, expires_at) in context_store.items():
-                if expires_at and now > expires_at:
-                    expired_keys.append(key)
-                else:
+            for key in keys:
+                data = self._live(namespace, context_key, key)
+                if data is not None:
                     result[key] = data
+            return result
 
-            for key in expired_keys:
-                del context_store[key]
+    async def get_by_prefix(self, namespace: str, key_prefix: str) -> dict[str, Any]:
+        """Live entries whose key starts with ``key_prefix``, across all contexts."""
+        if namespace not in self._locks:
+            return {}
 
+        async with self._locked_all(namespace):
+            result: dict[str, Any] = {}
+            for context_key, context_store in list(self._store[namespace].items()):
+                for key in [k for k in context_store if k.startswith(key_prefix)]:
+                    data = self._live(namespace, context_key, key)
+                    if data is not None:
+                        result[key] = data
             return result
 
-    async def _cleanup_expired_entries(self) -> None:
-        while True:
-            try:
-                await asyncio.sleep(self._cleanup_interval)
+    async def first_key_per_context(
+        self, namespace: str, context_prefix: str, key_prefix: str
+    ) -> list[str]:
+        """First live key starting with ``key_prefix`` in each matching context."""
+        if namespace not in self._locks:
+            return []
+
+        async with self._locked_all(namespace):
+            found: list[str] = []
+            for context_key, context_store in list(self._store[namespace].items()):
+                if not context_key.startswith(context_prefix):
+                    continue
+                for key in [k for k in context_store if k.startswith(key_prefix)]:
+                    if self._live(namespace, context_key, key) is not None:
+                        found.append(key)
+                        break
+            return found
+
+    def _expire_due(self) -> tuple[int, int]:
+        """Pop up to ``expiry_batch`` due deadlines; returns ``(popped, expired)``.
+
+        Every locked section reads and writes without awaiting, and an expired
+        entry already reads as absent, so entries are dropped here without
+        taking their stripe.
+        """
+        heap = self._deadlines
+        now = time.monotonic()
+        popped = expired = 0
+        while heap and popped < self._expiry_batch and heap[0][0] <= now:
+            deadline, _, namespace, context_key, key = heapq.heappop(heap)
+            popped += 1
+            context_store = self._store[namespace].get(context_key)
+            entry = context_store.get(key) if context_store else None
+            if entry is None or entry[1] != deadline:
+                self._stale_deadlines = max(0, self._stale_deadlines - 1)
+                continue
+            self._discard(namespace, context_key, key, deadline_popped=True)
+            self._usage[namespace].expired += 1
+            expired += 1
+
+        if len(heap) >= _COMPACT_MIN and self._stale_deadlines > len(heap) // 2:
+            self._compact_deadlines()
+        return popped, expired
+
+    def _compact_deadlines(self) -> None:
+        """Drop superseded deadlines once they outnumber the live ones."""
+
+        def current(item: tuple[float, int, str, str, str]) -> bool:
+            deadline, _, namespace, context_key, key = item
+            entry = self._store[namespace].get(context_key, {}).get(key)
+            return entry is not None and entry[1] == deadline
+
+        self._deadlines = [item for item in self._deadlines if current(item)]
+        heapq.heapify(self._deadlines)
+        self._stale_deadlines = 0
+
+    async def save_snapshot(
+        self, path: str | Path, *, chunk_size: int = DEFAULT_SNAPSHOT_CHUNK
+    ) -> int:
+        """
+        Write every live entry to a snapshot file; returns how many were saved.
 
-                now = datetime.now()
-                total_cleaned = 0
+        Entries are gathered and pickled ``chunk_size`` at a time on the event
+        loop, which runs other tasks between chunks; compressing and writing
+        each chunk happens in a worker thread. Handlers may change a cached
+        value between awaits, so values are never pickled off the loop. An
+        entry written while the snapshot runs is saved in either state.
+        """
+        async with self._snapshot_lock:
+            started = time.perf_counter()
+            created_at, now = time.time(), time.monotonic()
+            writer = await asyncio.to_thread(SnapshotWriter, path, created_at)
+            saved = 0
+            try:
+                for records in self._snapshot_chunks(now, chunk_size):
+                    await asyncio.to_thread(writer.write_frame, encode_frame(records))
+                    saved += len(records)
+                await asyncio.to_thread(writer.commit)
+            except BaseException:
+                writer.abort()
+                raise
+            logger.info(
+                f"Saved {saved} memory cache entries to {path} "
+                f"({writer.bytes_written} bytes, "
+                f"{(time.perf_counter() - started) * 1e3:.0f}ms)"
+            )
+            return saved
+
+    def _snapshot_chunks(self, now: float, chunk_size: int) -> Iterator[list[Record]]:
+        # Resumed after every await: walk copies of the key lists and skip
+        # whatever was removed in between
+        records: list[Record] = []
+        for namespace in _NAMESPACES:
+            store = self._store[namespace]
+            for context_key in list(store):
+                context_store = store.get(context_key)
+                if not context_store:
+                    continue
+                for key, (data, deadline, _) in list(context_store.items()):
+                    if deadline is not None and deadline <= now:
+                        continue
+                    left = None if deadline is None else deadline - now
+                    records.append((namespace, context_key, key, data, left))
+                if len(records) >= chunk_size:
+                    yield records
+                    records = []
+        if records:
+            yield records
+
+    async def load_snapshot(self, path: str | Path) -> int:
+        """
+        Restore the entries of a snapshot; returns how many were restored.
 
-                for namespace in _NAMESPACES:
-                    async with self._locks[namespace]:
-                        store = self._store[namespace]
-                        empty_contexts: list[str] = []
+        Entries whose TTL ran out since the snapshot was taken are dropped,
+        and the rest keep the time they had left. Keys written since startup
+        win over their saved copy, and limits set by ``configure_limits``
+        apply as entries come in. Frames are read one at a time in a worker
+        thread; a truncated or damaged file restores the frames before the
+        damage. A missing file restores nothing.
 
-                        for context_key, context_store in store.items():
-                            expired_keys = [
-                                key
-                                for key, (_, expires_at) in context_store.items()
-                                if expires_at and now > expires_at
-                            ]
-                            for key in expired_keys:
-                                del context_store[key]
-                                total_cleaned += 1
+        Raises:
+            ValueError: If the file is not a memory cache snapshot.
+        """
+        if not await asyncio.to_thread(os.path.exists, path):
+            return 0
+        reader = await asyncio.to_thread(SnapshotReader, path)
+        elapsed = max(0.0, time.time() - reader.created_at)
+        restored = 0
+        try:
+            while (records := await asyncio.to_thread(reader.next_frame)) is not None:
+                restored += self._restore(records, elapsed)
+        except (ValueError, EOFError, zlib.error, pickle.UnpicklingError) as e:
+            logger.warning(f"Stopped reading damaged snapshot {path}: {e}")
+        finally:
+            reader.close()
+        logger.info(f"Restored {restored} memory cache entries from {path}")
+        return restored
+
+    def _restore(self, records: list[Record], elapsed: float) -> int:
+        now = time.monotonic()
+        restored = 0
+        for namespace, context_key, key, data, left in records:
+            if namespace not in self._store or (left is not None and left <= elapsed):
+                continue
+            if key in self._store[namespace].get(context_key, {}):
+                continue
+            deadline = None if left is None else now + left - elapsed
+            try:
+                self._put(namespace, context_key, key, data, deadline)
+            except ValueError:
+                continue  # larger than a byte limit set since it was saved
+            restored += 1
+        return restored
 
-                            if not context_store:
-                                empty_contexts.append(context_key)
+    def start_snapshots(self, path: str | Path, interval: float) -> None:
+        """Snapshot to ``path`` every ``interval`` seconds and on ``stop_snapshots``.
 
-                        for context_key in empty_contexts:
-                            del store[context_key]
+        With ``interval`` 0 only ``stop_snapshots`` writes one.
+        """
+        self._snapshot_path = Path(path)
+        if interval > 0 and (self._snapshot_task is None or self._snapshot_task.done()):
+            self._snapshot_task = asyncio.create_task(
+                self._snapshot_periodically(interval)
+            )
+            logger.info(f"Snapshotting memory cache to {path} every {interval}s")
+
+    async def stop_snapshots(self) -> None:
+        """Stop periodic snapshots and write a final one."""
+        task, self._snapshot_task = self._snapshot_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        path, self._snapshot_path = self._snapshot_path, None
+        if path is not None:
+            await self.save_snapshot(path)
+
+    async def _snapshot_periodically(self, interval: float) -> None:
+        while self._snapshot_path is not None:
+            await asyncio.sleep(interval)
+            try:
+                await self.save_snapshot(self._snapshot_path)
+            except Exception as e:
+                logger.error(f"Memory cache snapshot failed: {e}")
 
-                if total_cleaned > 0:
-                    logger.debug(
-                        f"Cleaned up {total_cleaned} expired entries from memory store"
-                    )
+    async def _cleanup_expired_entries(self) -> None:
+        while True:
+            try:
+                popped, expired = self._expire_due()
+                if expired:
+                    logger.debug(f"Expired {expired} entries from memory store")
+                # A full batch means more deadlines are due: let other tasks
+                # run, then carry on without waiting for the next tick
+                await asyncio.sleep(
+                    0 if popped >= self._expiry_batch else self._cleanup_interval
+                )
 
             except asyncio.CancelledError:
                 logger.info("Memory store cleanup task cancelled")
                 break
             except Exception as e:
                 logger.error(f"Error in memory store cleanup task: {e}")
+                await asyncio.sleep(self._cleanup_interval)
 
 
 _global_memory_store: MemoryStore | None = None
@@ -254,4 +934,17 @@ def get_memory_store() -> MemoryStore:
     global _global_memory_store
     if _global_memory_store is None:
         _global_memory_store = MemoryStore()
+        if (
+            settings.memory_cache_max_entries
+            or settings.memory_cache_max_bytes
+            or settings.memory_cache_namespace_max_entries
+            or settings.memory_cache_namespace_max_bytes
+        ):
+            _global_memory_store.configure_limits(
+                max_entries=settings.memory_cache_max_entries,
+                max_bytes=settings.memory_cache_max_bytes,
+                namespace_max_entries=settings.memory_cache_namespace_max_entries,
+                namespace_max_bytes=settings.memory_cache_namespace_max_bytes,
+                eviction=settings.memory_cache_eviction,
+            )
     return _global_memory_store
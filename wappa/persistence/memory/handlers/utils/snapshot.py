@@ -0,0 +1,104 @@
+"""
+Snapshot files of the memory cache, for warm restarts.
+
+A snapshot is an 8-byte magic and the wall-clock time it was taken, followed
+by frames: a 4-byte big-endian length and the zlib-compressed pickle of a list
+of ``(namespace, context_key, key, data, seconds_left)`` records, where
+``seconds_left`` is None for entries without a TTL. Frames are written and
+read one at a time, so neither side holds the whole file in memory.
+
+Snapshots are pickles: only load files this application wrote. They are
+created with mode ``0o600`` and replace the previous snapshot atomically once
+complete, so a crash mid-write leaves the last good one in place.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import pickle
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO
+
+MAGIC = b"WPMEMSS1"
+_HEADER = struct.Struct(">8sd")
+_FRAME = struct.Struct(">I")
+
+# (namespace, context_key, key, data, seconds left or None)
+Record = tuple[str, str, str, Any, float | None]
+
+
+def encode_frame(records: list[Record]) -> bytes:
+    """Pickle one frame's records; compression happens in ``SnapshotWriter``."""
+    return pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class SnapshotWriter:
+    """Writes a snapshot to a temporary file and moves it into place on commit.
+
+    Its methods do blocking file I/O and are meant to run in a worker thread.
+    """
+
+    def __init__(self, path: str | Path, created_at: float) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_name(f".{self.path.name}.tmp")
+        fd = os.open(self._tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        self._file: BinaryIO = os.fdopen(fd, "wb")
+        self._file.write(_HEADER.pack(MAGIC, created_at))
+        self.bytes_written = _HEADER.size
+
+    def write_frame(self, payload: bytes) -> None:
+        frame = zlib.compress(payload, 1)
+        self._file.write(_FRAME.pack(len(frame)))
+        self._file.write(frame)
+        self.bytes_written += _FRAME.size + len(frame)
+
+    def commit(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        with contextlib.suppress(FileNotFoundError):
+            self._tmp.unlink()
+
+
+class SnapshotReader:
+    """Reads a snapshot frame by frame; blocking, like ``SnapshotWriter``.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this format.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._file: BinaryIO = open(path, "rb")  # noqa: SIM115 - closed by close()
+        header = self._file.read(_HEADER.size)
+        if len(header) < _HEADER.size or header[:8] != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a Wappa memory cache snapshot")
+        _, self.created_at = _HEADER.unpack(header)
+
+    def next_frame(self) -> list[Record] | None:
+        """The next frame's records, or None at the end of the file.
+
+        Raises:
+            ValueError: If the file ends in the middle of a frame.
+        """
+        prefix = self._file.read(_FRAME.size)
+        if not prefix:
+            return None
+        if len(prefix) < _FRAME.size:
+            raise ValueError("Snapshot ends inside a frame header")
+        (length,) = _FRAME.unpack(prefix)
+        frame = self._file.read(length)
+        if len(frame) < length:
+            raise ValueError("Snapshot ends inside a frame")
+        return pickle.loads(zlib.decompress(frame))  # noqa: S301 - own file
+
+    def close(self) -> None:
+        self._file.close()
@@ -208,10 +208,11 @@ class TTLManager:
             store = self.memory_store._store[namespace]
             stats["total_contexts"] = len(store)
 
-            for context_key, context_store in store.items():
+            # get_ttl drops expired entries, so walk copies of the key lists
+            for context_key, context_store in list(store.items()):
                 stats["total_keys"] += len(context_store)
 
-                for key in context_store:
+                for key in list(context_store):
                     ttl = await self.memory_store.get_ttl(namespace, context_key, key)
                     if ttl == -1:
                         stats["keys_persistent"] += 1
@@ -5,18 +5,24 @@ Creates memory-backed cache instances using in-memory storage
 with handlers implementing type-specific interfaces directly.
 """
 
+from functools import partial
+
 from ...domain.interfaces.cache_factory import ICacheFactory
 from ...domain.interfaces.cache_interfaces import (
     IAIStateCache,
     IExpiryCache,
+    IIdentityIndex,
     IStateCache,
     ITableCache,
     IUserCache,
 )
+from ..identity_index import StorageIdentityIndex
 from .handlers.ai_state import MemoryAIState
 from .handlers.state_handler import MemoryStateHandler
 from .handlers.table_handler import MemoryTable
 from .handlers.user_handler import MemoryUser
+from .handlers.utils.key_factory import default_key_factory
+from .storage_manager import storage_manager
 
 
 class MemoryCacheFactory(ICacheFactory):
@@ -130,3 +136,20 @@ class MemoryCacheFactory(ICacheFactory):
         """
         effective_inbox, effective_user = self._resolve_context(inbox_id, user_id)
         return MemoryAIState(inbox=effective_inbox, user_id=effective_user)
+
+    def create_identity_index(self, inbox_id: str | None = None) -> IIdentityIndex:
+        """
+        Create Memory identity index (phone number / BSUID -> user_id).
+
+        Args:
+            inbox_id: Optional override (uses default if None)
+
+        Returns:
+            StorageIdentityIndex backed by the memory store
+        """
+        effective_inbox, _ = self._resolve_context(inbox_id, None)
+        return StorageIdentityIndex(
+            storage_manager,
+            effective_inbox,
+            partial(default_key_factory.user, effective_inbox),
+        )
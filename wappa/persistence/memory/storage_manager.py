@@ -1,5 +1,5 @@
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Collection, Mapping, Sequence
 from typing import Any
 
 from pydantic import BaseModel
@@ -27,7 +27,7 @@ class MemoryStorageManager:
 
     @staticmethod
     def _build_context_key(cache_type: str, inbox_id: str, user_id: str | None) -> str:
-        if cache_type == "tables":
+        if cache_type in {"tables", "identities", "indexes"}:
             return inbox_id
         if cache_type in {"users", "states", "ai_states"}:
             if not user_id:
@@ -98,6 +98,109 @@ class MemoryStorageManager:
             cache_type, context_key, key, self._serialize_data(value), matches, ttl
         )
 
+    async def update(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        key: str,
+        mutate: Callable[[Any], Any],
+        ttl: int | None = None,
+    ) -> Any:
+        context_key = self._build_context_key(cache_type, inbox_id, user_id)
+        return await self.memory_store.update(cache_type, context_key, key, mutate, ttl)
+
+    async def update_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        keys: Collection[str],
+        mutate: Callable[[dict[str, Any]], Mapping[str, Any]],
+        ttl: int | None = None,
+    ) -> None:
+        """Read-modify-write several keys of one context together.
+
+        ``mutate`` receives the live values among ``keys`` and returns the
+        changes: key -> value to store, or None to delete the key.
+        """
+        context_key = self._build_context_key(cache_type, inbox_id, user_id)
+        await self.memory_store.update_many(cache_type, context_key, keys, mutate, ttl)
+
+    async def view(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        user_id: str | None,
+        read: Callable[[Callable[[str], Any]], Any],
+    ) -> Any:
+        """Run ``read`` over one context's live entries, without a lock.
+
+        ``read`` receives a lookup returning the stored value of a key (or
+        None), so it can pick its next key from what it already read.
+        """
+        context_key = self._build_context_key(cache_type, inbox_id, user_id)
+        return self.memory_store.view(cache_type, context_key, read)
+
+    async def get_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        refs: Sequence[tuple[str | None, str]],
+        model: type[BaseModel] | None = None,
+    ) -> list[Any]:
+        """Read several ``(user_id, key)`` entries with one store lock hold."""
+        try:
+            store_refs = [
+                (self._build_context_key(cache_type, inbox_id, user_id), key)
+                for user_id, key in refs
+            ]
+            values = await self.memory_store.get_many(cache_type, store_refs)
+            return [self._deserialize_data(data, model) for data in values]
+        except Exception as e:
+            logger.error(f"Failed to get {len(refs)} keys from {cache_type} cache: {e}")
+            return [None] * len(refs)
+
+    async def set_many(
+        self,
+        cache_type: str,
+        inbox_id: str,
+        entries: Sequence[tuple[str | None, str, Any]],
+        ttl: int | None = None,
+    ) -> bool:
+        """Write several ``(user_id, key, value)`` entries with one lock hold."""
+        try:
+            store_entries = [
+                (
+                    self._build_context_key(cache_type, inbox_id, user_id),
+                    key,
+                    self._serialize_data(value),
+                )
+                for user_id, key, value in entries
+            ]
+            return await self.memory_store.set_many(cache_type, store_entries, ttl)
+        except Exception as e:
+            logger.error(
+                f"Failed to set {len(entries)} keys in {cache_type} cache: {e}"
+            )
+            return False
+
+    async def delete_many(
+        self, cache_type: str, inbox_id: str, refs: Sequence[tuple[str | None, str]]
+    ) -> int:
+        """Delete several ``(user_id, key)`` entries; returns how many existed."""
+        try:
+            store_refs = [
+                (self._build_context_key(cache_type, inbox_id, user_id), key)
+                for user_id, key in refs
+            ]
+            return await self.memory_store.delete_many(cache_type, store_refs)
+        except Exception as e:
+            logger.error(
+                f"Failed to delete {len(refs)} keys from {cache_type} cache: {e}"
+            )
+            return 0
+
     async def delete(
         self, cache_type: str, inbox_id: str, user_id: str | None, key: str
     ) -> bool:
@@ -154,5 +257,15 @@ class MemoryStorageManager:
             logger.error(f"Failed to get all keys from {cache_type} cache: {e}")
             return {}
 
+    async def get_keys_by_prefix(
+        self, cache_type: str, inbox_id: str, key_prefix: str
+    ) -> dict[str, Any]:
+        """Entries of every context of the inbox whose key starts with ``key_prefix``."""
+        try:
+            return await self.memory_store.get_by_prefix(cache_type, key_prefix)
+        except Exception as e:
+            logger.error(f"Failed to list '{key_prefix}' keys from {cache_type}: {e}")
+            return {}
+
 
 storage_manager = MemoryStorageManager()
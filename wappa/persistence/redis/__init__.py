@@ -6,6 +6,9 @@ Includes PubSub subscriber utilities for real-time notifications.
 """
 
 from . import ops, redis_handler
+from .generation_sync import RedisGenerationSync
+from .lua_scripts import RedisScript, register_script, script_registry
+from .near_cache import NearCache, NearCacheStats, near_caches
 from .pubsub_subscriber import (
     Notification,
     NotificationBuffer,
@@ -15,6 +18,12 @@ from .pubsub_subscriber import (
     subscribe,
 )
 from .redis_client import RedisClient
+from .redis_handler.utils.serde import (
+    SerdeCodec,
+    get_codec,
+    register_codec,
+    use_codec,
+)
 from .redis_manager import RedisManager
 
 __all__ = [
@@ -23,6 +32,21 @@ __all__ = [
     "RedisManager",
     "ops",
     "redis_handler",
+    # Generation cache invalidation
+    "RedisGenerationSync",
+    # Near-cache of hash reads (client-side tracking)
+    "NearCache",
+    "NearCacheStats",
+    "near_caches",
+    # Value codecs
+    "SerdeCodec",
+    "get_codec",
+    "register_codec",
+    "use_codec",
+    # Lua scripts (EVALSHA)
+    "RedisScript",
+    "register_script",
+    "script_registry",
     # PubSub Subscriber Utilities
     "subscribe",
     "build_channel",
@@ -0,0 +1,193 @@
+"""
+Keeps a process-local ``GenerationCache`` coherent with Redis.
+
+Two feeds, picked by ``mode``:
+
+- ``pubsub``: listens on ``KeyFactory.generation_channel()``, where every
+  ``RedisTable.bump_generation`` announces the counter it bumped. Works in
+  every Redis mode, cluster included (PUBLISH reaches every node).
+- ``tracking``: Redis client-side caching. Generations are read on a
+  connection with ``CLIENT TRACKING ON REDIRECT`` to a subscribed one, so the
+  server reports any change to a counter it served - including expiry and
+  writes that bypass ``bump_generation``. Needs a single server (Redis 6+).
+
+The cache serves nothing until the feed listens, and is dropped whenever the
+feed is lost; the sync reconnects in the background.
+
+    sync = RedisGenerationSync(mode="pubsub")
+    await sync.start()
+    ...
+    await sync.stop()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any, Literal
+
+from redis.asyncio.cluster import RedisCluster
+
+from ...domain.interfaces.cache_interfaces import GENERATION_FIELD, generation_of
+from ..generation_cache import GenerationCache, table_generations
+from .redis_client import PoolAlias, RedisClient
+from .redis_handler.utils.key_factory import KeyFactory
+from .tracking import TrackedConnections
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+    from redis.asyncio.client import PubSub
+
+logger = logging.getLogger("RedisGenerationSync")
+
+GenerationSyncMode = Literal["pubsub", "tracking"]
+
+# Idle seconds between checks that the tracked reader is still connected.
+CHECK_INTERVAL = 5.0
+
+
+class RedisGenerationSync:
+    """
+    Feeds generation invalidations from Redis into a ``GenerationCache``.
+
+    Args:
+        generations: The cache to keep coherent (default: ``table_generations``).
+        mode: ``pubsub`` or ``tracking`` (see the module docstring).
+        alias: Pool alias the table cache uses.
+        reconnect_delay: Seconds between reconnection attempts.
+    """
+
+    def __init__(
+        self,
+        generations: GenerationCache = table_generations,
+        *,
+        mode: GenerationSyncMode = "pubsub",
+        alias: PoolAlias = "table",
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        if mode not in ("pubsub", "tracking"):
+            raise ValueError("mode must be 'pubsub' or 'tracking'")
+        self.generations = generations
+        self.mode = mode
+        self.alias = alias
+        self.reconnect_delay = reconnect_delay
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """
+        Connect and start feeding invalidations in the background.
+
+        Raises:
+            Exception: If the first connection fails, e.g. the server rejects
+                ``CLIENT TRACKING``; the cache then stays detached.
+        """
+        if self.running:
+            return
+        feed = await self._open()
+        self._task = asyncio.create_task(self._run(feed), name="generation_sync")
+        logger.info(f"Generation sync started ({self.mode}, alias={self.alias})")
+
+    async def stop(self) -> None:
+        """Stop feeding and detach the cache, so it serves nothing stale."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self.generations.detach()
+
+    async def _open(self) -> _PubSubFeed | _TrackingFeed:
+        redis = await RedisClient.get(self.alias)
+        feed: _PubSubFeed | _TrackingFeed = (
+            _TrackingFeed(redis) if self.mode == "tracking" else _PubSubFeed(redis)
+        )
+        await feed.open(self.generations)
+        return feed
+
+    async def _run(self, feed: _PubSubFeed | _TrackingFeed) -> None:
+        while True:
+            try:
+                async for keys in feed.invalidations():
+                    self.generations.invalidate(keys)
+                raise ConnectionError("Generation feed ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Generation feed lost, reconnecting: {e}")
+            finally:
+                self.generations.detach()
+                await feed.close()
+
+            while True:
+                await asyncio.sleep(self.reconnect_delay)
+                try:
+                    feed = await self._open()
+                    break
+                except Exception as e:
+                    logger.warning(f"Generation feed reconnect failed: {e}")
+
+
+class _PubSubFeed:
+    """Bump announcements published by ``RedisTable.bump_generation``."""
+
+    def __init__(self, redis: Redis) -> None:
+        self._pubsub: PubSub = redis.pubsub(ignore_subscribe_messages=True)
+
+    async def open(self, generations: GenerationCache) -> None:
+        await self._pubsub.subscribe(KeyFactory.generation_channel())
+        connection = getattr(self._pubsub, "connection", None)
+        if connection is not None:
+            # Bumps are sparse; an idle subscription is not a failure
+            connection.socket_timeout = None
+        generations.attach()
+
+    async def invalidations(self) -> AsyncIterator[list[str] | None]:
+        async for message in self._pubsub.listen():
+            if message.get("type") == "message":
+                yield [_text(message["data"])]
+
+    async def close(self) -> None:
+        try:
+            await self._pubsub.unsubscribe()
+            await self._pubsub.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing generation PubSub: {e}")
+
+
+class _TrackingFeed:
+    """Client-side caching: the server reports changes to the counters it served."""
+
+    def __init__(self, redis: Redis) -> None:
+        if isinstance(redis, RedisCluster):
+            raise ValueError(
+                "Generation tracking needs a single Redis server; "
+                "use the pubsub mode with Redis Cluster"
+            )
+        self._connections = TrackedConnections(redis)
+
+    async def open(self, generations: GenerationCache) -> None:
+        await self._connections.open()
+        generations.attach(self._load)
+
+    async def _load(self, key: str) -> int:
+        """Read a generation on the tracked connection."""
+        bumps = await self._connections.call("HGET", key, GENERATION_FIELD)
+        if isinstance(bumps, Exception):
+            raise bumps
+        return generation_of(bumps)
+
+    def invalidations(self) -> AsyncIterator[list[str] | None]:
+        return self._connections.invalidations(check_interval=CHECK_INTERVAL)
+
+    async def close(self) -> None:
+        await self._connections.close()
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
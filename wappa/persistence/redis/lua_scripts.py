@@ -0,0 +1,132 @@
+"""
+Registry of the Lua scripts the Redis persistence layer runs.
+
+Scripts are registered once at import time, loaded into every pool with
+``SCRIPT LOAD`` when Redis starts up (``RedisManager.initialize``) and invoked
+with ``EVALSHA``, so each call sends a 40-character digest instead of the
+whole source and the server skips recompiling it. ``ops.eval_script`` and
+friends reload a script and retry when the server answers ``NOSCRIPT`` (after
+a restart, a failover or ``SCRIPT FLUSH``), so loading up front is an
+optimization, never a requirement.
+
+Application code registers its own scripts the same way::
+
+    from wappa.persistence.redis import ops, register_script
+
+    CLAIM = register_script("myapp.claim", "return redis.call('SETNX', KEYS[1], ARGV[1])")
+    await ops.eval_script(CLAIM, ["lock:order:1"], ["worker-1"], alias="table")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
+
+from .redis_client import PoolAlias, RedisClient
+
+logger = logging.getLogger("RedisScripts")
+
+
+@dataclass(frozen=True, slots=True)
+class RedisScript:
+    """A Lua script and the SHA1 digest ``EVALSHA`` calls it by."""
+
+    name: str
+    source: str
+    sha: str
+
+    @classmethod
+    def from_source(cls, source: str, name: str | None = None) -> RedisScript:
+        sha = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        return cls(name=name or sha, source=source, sha=sha)
+
+
+class ScriptRegistry:
+    """Named Lua scripts, loaded into Redis together."""
+
+    def __init__(self) -> None:
+        self._scripts: dict[str, RedisScript] = {}
+
+    def register(self, name: str, source: str) -> RedisScript:
+        """
+        Register ``source`` under ``name`` and return its handle.
+
+        Registering the same source under the same name again is a no-op, so
+        modules may be re-imported; reusing a name for different source raises
+        ``ValueError``.
+        """
+        if not name:
+            raise ValueError("Script name must not be empty")
+        script = RedisScript.from_source(source, name)
+        existing = self._scripts.get(name)
+        if existing is not None and existing.sha != script.sha:
+            raise ValueError(f"Script '{name}' is already registered")
+        return self._scripts.setdefault(name, script)
+
+    def get(self, name: str) -> RedisScript:
+        """The script registered under ``name`` (``KeyError`` if none)."""
+        return self._scripts[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._scripts
+
+    def __iter__(self) -> Iterator[RedisScript]:
+        return iter(list(self._scripts.values()))
+
+    def __len__(self) -> int:
+        return len(self._scripts)
+
+    async def load(self, redis: Redis) -> int:
+        """
+        ``SCRIPT LOAD`` every registered script through ``redis`` in one round trip.
+
+        A cluster client loads them one command at a time instead, since only
+        a plain ``SCRIPT LOAD`` is sent to every primary.
+        """
+        scripts = list(self)
+        if not scripts:
+            return 0
+        if isinstance(redis, RedisCluster):
+            for script in scripts:
+                await redis.script_load(script.source)
+            return len(scripts)
+        async with redis.pipeline(transaction=False) as pipe:
+            for script in scripts:
+                pipe.script_load(script.source)
+            await pipe.execute()
+        return len(scripts)
+
+    async def load_all(self, aliases: list[PoolAlias] | None = None) -> int:
+        """
+        Load every registered script into each set-up pool (or ``aliases``).
+
+        Pools may point at different servers (``setup_multiple_urls``), so
+        each one is loaded; the script cache is per server, not per database.
+        Aliases sharing one client (``setup_shared_url``, ``setup_cluster``)
+        load it once.
+
+        Returns:
+            The number of scripts loaded per pool.
+        """
+        loaded: set[int] = set()
+        for alias in aliases or RedisClient.aliases():
+            async with RedisClient.connection(alias=alias) as redis:
+                if id(redis) in loaded:
+                    continue
+                loaded.add(id(redis))
+                await self.load(redis)
+        logger.debug(f"Loaded {len(self)} Lua scripts")
+        return len(self)
+
+
+script_registry = ScriptRegistry()
+
+
+def register_script(name: str, source: str) -> RedisScript:
+    """Register a Lua script in the shared registry (see ``ScriptRegistry.register``)."""
+    return script_registry.register(name, source)
@@ -0,0 +1,361 @@
+"""
+Process-local near-cache for Redis hash reads.
+
+Handlers read the same user profile and state hashes on every message of a
+conversation. With a near-cache enabled for a cache space (pool alias),
+``InboxCache`` serves those ``HGETALL`` reads from memory and only goes to
+Redis on a miss - through a tracked connection (see ``tracking``), so Redis
+reports every later change of a key it served, whichever worker makes it.
+
+Coherence rules:
+
+- An entry is served only while the invalidation feed is connected; losing it
+  drops every entry.
+- Every write through ``ops`` drops the keys it touched once it completes, so
+  a process reads its own writes without waiting for the server's report.
+- A miss stores what it read only if no invalidation of that key arrived
+  while the read was in flight.
+- Entries expire after ``max_ttl`` regardless, bounding how long a missed
+  invalidation could go unnoticed.
+
+    near_caches.enable("users", max_entries=5_000, max_bytes=8 << 20)
+    await near_caches.start()
+    ...
+    near_caches.stats()     # {"users": NearCacheStats(hits=..., ...)}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .redis_client import PoolAlias, RedisClient
+from .tracking import TrackedConnections
+
+logger = logging.getLogger("RedisNearCache")
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 32 << 20
+DEFAULT_MAX_TTL = 60.0
+
+# Bookkeeping charged to every entry on top of its key and field text.
+ENTRY_OVERHEAD = 64
+
+
+@dataclass
+class NearCacheStats:
+    """Counters of one near-cache; ``entries`` and ``bytes`` are current."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class NearCache:
+    """
+    LRU cache of raw Redis hashes for one pool alias, kept coherent by tracking.
+
+    Args:
+        alias: Pool alias whose reads are cached.
+        max_entries: Entries kept before the least recently used is evicted.
+        max_bytes: Approximate bytes of key and field text kept.
+        max_ttl: Seconds an entry is served, invalidated or not.
+        readers: Tracked connections serving misses.
+        check_interval: Idle seconds between checks of the tracked readers.
+        reconnect_delay: Seconds between reconnection attempts.
+    """
+
+    def __init__(
+        self,
+        alias: PoolAlias,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_ttl: float = DEFAULT_MAX_TTL,
+        readers: int = 2,
+        check_interval: float = 5.0,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive")
+        if max_ttl <= 0:
+            raise ValueError("max_ttl must be a positive number of seconds")
+        self.alias = alias
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self.readers = readers
+        self.check_interval = check_interval
+        self.reconnect_delay = reconnect_delay
+        # key -> (hash, expires at, charged bytes), least recently used first
+        self._entries: OrderedDict[str, tuple[dict[str, str], float, int]] = (
+            OrderedDict()
+        )
+        # key -> token of the miss reading it; dropped by any invalidation
+        self._pending: dict[str, object] = {}
+        self._bytes = 0
+        self._stats = NearCacheStats()
+        self._connections: TrackedConnections | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def live(self) -> bool:
+        """Whether the invalidation feed is connected and entries are served."""
+        return self._connections is not None
+
+    def stats(self) -> NearCacheStats:
+        return NearCacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            invalidations=self._stats.invalidations,
+            evictions=self._stats.evictions,
+            entries=len(self._entries),
+            bytes=self._bytes,
+        )
+
+    # ---- lifecycle ----------------------------------------------------------
+    async def start(self) -> None:
+        """
+        Connect the tracked readers and start listening for invalidations.
+
+        Raises:
+            Exception: If the first connection fails, e.g. the server has no
+                ``CLIENT TRACKING`` or the alias is a cluster.
+        """
+        if self._task is not None:
+            return
+        await self._open()
+        self._task = asyncio.create_task(self._run(), name=f"near_cache_{self.alias}")
+        logger.info(
+            f"Near-cache for '{self.alias}' started "
+            f"({self.max_entries} entries, {self.max_bytes} bytes, {self.max_ttl}s)"
+        )
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await self._close()
+
+    async def _open(self) -> None:
+        connections = TrackedConnections(
+            await RedisClient.get(self.alias), readers=self.readers
+        )
+        await connections.open()
+        self.clear()
+        self._connections = connections
+
+    async def _close(self) -> None:
+        connections, self._connections = self._connections, None
+        self.clear()
+        if connections is not None:
+            await connections.close()
+
+    async def _run(self) -> None:
+        while True:
+            connections = self._connections
+            try:
+                if connections is None:
+                    raise ConnectionError("Near-cache feed is closed")
+                async for keys in connections.invalidations(
+                    check_interval=self.check_interval
+                ):
+                    if keys is None:
+                        self.clear()
+                    else:
+                        self.discard(keys)
+                raise ConnectionError("Near-cache feed ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Near-cache feed of '{self.alias}' lost: {e}")
+            await self._close()
+
+            while True:
+                await asyncio.sleep(self.reconnect_delay)
+                try:
+                    await self._open()
+                    break
+                except Exception as e:
+                    logger.warning(
+                        f"Near-cache reconnect of '{self.alias}' failed: {e}"
+                    )
+
+    # ---- reads --------------------------------------------------------------
+    async def get_hash(self, key: str) -> dict[str, str]:
+        """The hash at ``key`` (empty when absent); do not mutate the result."""
+        return (await self.get_hashes([key]))[0]
+
+    async def get_hashes(self, keys: Sequence[str]) -> list[dict[str, str]]:
+        """Cached hashes, with every miss read in one round trip."""
+        results: list[dict[str, str] | None] = [self._lookup(key) for key in keys]
+        missing = [i for i, value in enumerate(results) if value is None]
+        if missing:
+            fetched = await self._read([keys[i] for i in missing])
+            for i, value in zip(missing, fetched, strict=True):
+                results[i] = value
+        return [value if value is not None else {} for value in results]
+
+    def _lookup(self, key: str) -> dict[str, str] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if time.monotonic() >= expires_at:
+            self._drop(key)
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    async def _read(self, keys: list[str]) -> list[dict[str, str]]:
+        connections = self._connections
+        if connections is None:
+            return await self._read_untracked(keys)
+
+        tokens = [self._pending.setdefault(key, object()) for key in keys]
+        try:
+            replies = await connections.call_many([("HGETALL", key) for key in keys])
+        except Exception as e:
+            logger.warning(f"Near-cache read on '{self.alias}' failed: {e}")
+            for key, token in zip(keys, tokens, strict=True):
+                if self._pending.get(key) is token:
+                    del self._pending[key]
+            return await self._read_untracked(keys)
+
+        values: list[dict[str, str]] = []
+        for key, token, reply in zip(keys, tokens, replies, strict=True):
+            if self._pending.get(key) is token:
+                del self._pending[key]
+            else:
+                token = None  # invalidated while in flight
+            if isinstance(reply, Exception):
+                logger.error(f"Redis HGETALL error for key '{key}': {reply}")
+                values.append({})
+                continue
+            value = dict(zip(reply[0::2], reply[1::2], strict=True))
+            if token is not None and self._connections is connections:
+                self._store(key, value)
+            values.append(value)
+        return values
+
+    async def _read_untracked(self, keys: list[str]) -> list[dict[str, str]]:
+        """Plain pool reads while the feed is down; nothing is cached."""
+        try:
+            async with (
+                RedisClient.connection(alias=self.alias) as redis,
+                redis.pipeline(transaction=False) as pipe,
+            ):
+                for key in keys:
+                    pipe.hgetall(key)
+                return [dict(raw or {}) for raw in await pipe.execute()]
+        except Exception as e:
+            logger.error(f"Redis HGETALL error for {len(keys)} keys: {e}")
+            return [{} for _ in keys]
+
+    # ---- bookkeeping --------------------------------------------------------
+    def _store(self, key: str, value: dict[str, str]) -> None:
+        size = (
+            ENTRY_OVERHEAD + len(key) + sum(len(f) + len(v) for f, v in value.items())
+        )
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (value, time.monotonic() + self.max_ttl, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats.evictions += 1
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Drop ``keys``, and refuse what in-flight misses read for them."""
+        for key in keys:
+            self._pending.pop(key, None)
+            if self._drop(key):
+                self._stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry and refuse every in-flight miss."""
+        self._stats.invalidations += len(self._entries)
+        self._entries.clear()
+        self._pending.clear()
+        self._bytes = 0
+
+
+class NearCacheRegistry:
+    """The near-caches enabled in this process, one per pool alias."""
+
+    def __init__(self) -> None:
+        self._caches: dict[PoolAlias, NearCache] = {}
+
+    def enable(self, alias: PoolAlias, **options: Any) -> NearCache:
+        """
+        Enable a near-cache for ``alias``; ``start`` connects it.
+
+        Args:
+            alias: Pool alias (cache space) whose hash reads are cached.
+            **options: ``NearCache`` limits (``max_entries``, ``max_bytes``,
+                ``max_ttl``, ...).
+
+        Raises:
+            ValueError: If ``alias`` already has one.
+        """
+        if alias in self._caches:
+            raise ValueError(f"Near-cache for '{alias}' is already enabled")
+        cache = NearCache(alias, **options)
+        self._caches[alias] = cache
+        return cache
+
+    def get(self, alias: PoolAlias) -> NearCache | None:
+        """The live near-cache of ``alias``, or None (read Redis directly)."""
+        cache = self._caches.get(alias)
+        return cache if cache is not None and cache.live else None
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Drop written keys from every near-cache (pools may share key names)."""
+        if not self._caches:
+            return
+        keys = list(keys)
+        for cache in self._caches.values():
+            cache.discard(keys)
+
+    async def start(self) -> None:
+        for cache in self._caches.values():
+            await cache.start()
+
+    async def stop(self) -> None:
+        """Stop and forget every near-cache."""
+        caches, self._caches = self._caches, {}
+        for cache in caches.values():
+            await cache.stop()
+
+    def stats(self) -> dict[PoolAlias, NearCacheStats]:
+        return {alias: cache.stats() for alias, cache in self._caches.items()}
+
+    def __len__(self) -> int:
+        return len(self._caches)
+
+
+# Shared by InboxCache reads and the ops write paths.
+near_caches = NearCacheRegistry()
@@ -1,10 +1,22 @@
 # mimeiapify/symphony_ai/redis/ops.py
 
 import builtins
+import functools
 import logging
-from collections.abc import Awaitable, Mapping, Sequence
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Mapping,
+    Sequence,
+)
 from typing import cast
 
+from redis.exceptions import NoScriptError
+
+from .lua_scripts import RedisScript
+from .near_cache import near_caches
 from .redis_client import PoolAlias, RedisClient
 
 logger = logging.getLogger(
@@ -17,9 +29,65 @@ async def _await_command[T](result: T | Awaitable[T]) -> T:
     return await cast(Awaitable[T], result)
 
 
+# =========================================================================
+# SECTION: Near-cache invalidation
+# =========================================================================
+def _drops_near_cached[**P, R](
+    keys_of: Callable[..., Iterable[str]],
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """
+    Drop the keys a write touched from the near-caches once it completes.
+
+    Redis also reports the change, but asynchronously: without this, a
+    process could read its own write's old value from its near-cache.
+    ``keys_of`` gets the write's arguments; it only runs when a near-cache
+    is enabled.
+    """
+
+    def decorate(write: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(write)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            try:
+                return await write(*args, **kwargs)
+            finally:
+                if near_caches:
+                    near_caches.discard(keys_of(*args, **kwargs))
+
+        return wrapper
+
+    return decorate
+
+
+def _first_key(*args: object, **kwargs: object) -> Iterable[str]:
+    """The key, keys, or mapping of keys a write takes first."""
+    first = (
+        args[0] if args else kwargs.get("key", kwargs.get("keys", kwargs.get("items")))
+    )
+    if isinstance(first, str):
+        return [first]
+    return cast(Iterable[str], first or ())
+
+
+def _all_keys(*keys: str, **_: object) -> Iterable[str]:
+    return keys
+
+
+def _script_keys(*args: object, **kwargs: object) -> Iterable[str]:
+    return cast(Iterable[str], args[1] if len(args) > 1 else kwargs.get("keys", ()))
+
+
+def _scripts_keys(*args: object, **kwargs: object) -> Iterable[str]:
+    calls = cast(
+        Sequence[tuple[object, Sequence[str], object]],
+        args[0] if args else kwargs.get("calls", ()),
+    )
+    return [key for _, keys, _ in calls for key in keys]
+
+
 # =========================================================================
 # SECTION: Basic Key-Value Operations
 # =========================================================================
+@_drops_near_cached(_first_key)
 async def set(
     key: str, value: str, ex: int | None = None, *, alias: PoolAlias = "users"
 ) -> bool:
@@ -51,6 +119,7 @@ async def set(
             return False
 
 
+@_drops_near_cached(_first_key)
 async def setex(
     key: str, seconds: int, value: str, *, alias: PoolAlias = "users"
 ) -> bool:
@@ -124,6 +193,7 @@ async def get(key: str, *, alias: PoolAlias = "users") -> str | None:
             return None
 
 
+@_drops_near_cached(_all_keys)
 async def delete(*keys: str, alias: PoolAlias = "users") -> int:
     """
     Delete one or more keys.
@@ -147,11 +217,45 @@ async def delete(*keys: str, alias: PoolAlias = "users") -> int:
             )
             return 0
 
-    # =========================================================================
 
+@_drops_near_cached(_first_key)
+async def unlink_many(
+    keys: Sequence[str], *, batch_size: int = 500, alias: PoolAlias = "users"
+) -> int:
+    """
+    Remove keys with UNLINK, ``batch_size`` keys per command, in one round trip.
+
+    UNLINK frees the values in a background thread, so dropping a large batch
+    does not stall the server the way DEL can.
 
+    Args:
+        keys: Full Redis keys to remove.
+        batch_size: Keys per UNLINK command within the pipeline.
+        alias: Redis pool alias to use (default: "default").
+
+    Returns:
+        The number of keys removed. Returns 0 on error.
+    """
+    if not keys:
+        return 0
+    async with RedisClient.connection(alias=alias) as redis:
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for start in range(0, len(keys), batch_size):
+                    pipe.unlink(*keys[start : start + batch_size])
+                return sum(await pipe.execute())
+        except Exception as e:
+            logger.error(
+                f"Redis UNLINK error for {len(keys)} keys starting with '{keys[0]}': {e}",
+                exc_info=True,
+            )
+            return 0
+
+
+# =========================================================================
 # SECTION: Atomic Combined Operations (Using Pipelines internally)
 # =========================================================================
+@_drops_near_cached(_first_key)
 async def hset_with_expire(
     key: str, mapping: Mapping[str, str], ttl: int, *, alias: PoolAlias = "users"
 ) -> tuple[int | None, bool]:
@@ -212,6 +316,52 @@ async def hset_with_expire(
             return None, False  # Indicate pipeline execution failure
 
 
+@_drops_near_cached(_first_key)
+async def hset_many_with_expire(
+    items: Mapping[str, Mapping[str, str]],
+    ttl: int,
+    *,
+    alias: PoolAlias = "users",
+) -> bool:
+    """
+    Sets several hashes and their expirations in one round trip.
+
+    One non-transactional pipeline of HSET + EXPIRE per key: each hash is
+    written independently, so MULTI would only add server work.
+
+    Args:
+        items: Mapping of full Redis key to its field-value pairs (str:str).
+        ttl: Time To Live in seconds, applied to every key.
+        alias: Redis pool alias to use (default: "default").
+
+    Returns:
+        True if every HSET and EXPIRE succeeded, False otherwise (or on error).
+    """
+    if not items:
+        return True
+    async with RedisClient.connection(alias=alias) as redis:
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, mapping in items.items():
+                    pipe.hset(key, mapping=dict(mapping))
+                    pipe.expire(key, ttl)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            logger.error(
+                f"Redis HSET+EXPIRE batch error for {len(items)} keys: {e}",
+                exc_info=True,
+            )
+            return False
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        logger.error(
+            f"Redis HSET+EXPIRE batch: {len(failures)} of {len(results)} commands failed: {failures[0]}"
+        )
+        return False
+    return all(results[1::2])
+
+
+@_drops_near_cached(_first_key)
 async def hincrby_with_expire(
     key: str, field: str, increment: int, ttl: int, *, alias: PoolAlias = "users"
 ) -> tuple[int | None, bool]:
@@ -329,8 +479,15 @@ async def rpush_and_sadd(
             return None, None  # Indicate pipeline execution failure
 
 
+def _as_script(script: RedisScript | str) -> RedisScript:
+    return (
+        script if isinstance(script, RedisScript) else RedisScript.from_source(script)
+    )
+
+
+@_drops_near_cached(_script_keys)
 async def eval_script(
-    script: str,
+    script: RedisScript | str,
     keys: Sequence[str],
     args: Sequence[str | int | float],
     *,
@@ -339,12 +496,16 @@ async def eval_script(
     """
     Run a Lua script server-side, so a condition and its write cannot interleave.
 
+    Calls it by digest (EVALSHA); on NOSCRIPT the script is loaded and the
+    call retried once. Prefer a registered `RedisScript` (see `lua_scripts`)
+    so it is loaded at startup; raw source works but hashes on every call.
+
     Raises instead of swallowing errors: a caller reaching for a script needs a
     conditional write to either happen or visibly fail, and a `None` fallback
     would read as "condition not met".
 
     Args:
-        script: Lua source.
+        script: Registered script, or Lua source.
         keys: Redis keys the script touches (KEYS[1..n]).
         args: Script arguments (ARGV[1..n]).
         alias: Redis pool alias to use.
@@ -352,8 +513,99 @@ async def eval_script(
     Returns:
         The script's reply, converted by redis-py.
     """
+    script = _as_script(script)
+    async with RedisClient.connection(alias=alias) as redis:
+        try:
+            return await _await_command(
+                redis.evalsha(script.sha, len(keys), *keys, *args)
+            )
+        except NoScriptError:
+            logger.info(f"Lua script '{script.name}' not cached on server; reloading")
+            await _await_command(redis.script_load(script.source))
+            return await _await_command(
+                redis.evalsha(script.sha, len(keys), *keys, *args)
+            )
+
+
+async def eval_script_many(
+    script: RedisScript | str,
+    calls: Sequence[tuple[Sequence[str], Sequence[str | int | float]]],
+    *,
+    alias: PoolAlias = "users",
+) -> list[object]:
+    """
+    Run one Lua script several times in a single pipelined round trip.
+
+    Like `eval_script`, calls by digest, reloads on NOSCRIPT and raises on
+    error rather than swallowing it.
+
+    Args:
+        script: Registered script, or Lua source.
+        calls: ``(keys, args)`` per invocation.
+        alias: Redis pool alias to use.
+
+    Returns:
+        One reply per call, in order.
+    """
+    script = _as_script(script)
+    return await eval_scripts(
+        [(script, keys, args) for keys, args in calls], alias=alias
+    )
+
+
+@_drops_near_cached(_scripts_keys)
+async def eval_scripts(
+    calls: Sequence[
+        tuple[RedisScript | str, Sequence[str], Sequence[str | int | float]]
+    ],
+    *,
+    alias: PoolAlias = "users",
+) -> list[object]:
+    """
+    Run several (possibly different) Lua scripts in a single pipelined round trip.
+
+    Like `eval_script`, calls by digest and raises on error rather than
+    swallowing it. Calls answered NOSCRIPT did not run; their scripts are
+    loaded and just those calls are re-sent, in order, in one more pipeline.
+    The loads are plain commands rather than pipelined, so in cluster mode they
+    reach every primary.
+
+    Args:
+        calls: ``(script, keys, args)`` per invocation.
+        alias: Redis pool alias to use.
+
+    Returns:
+        One reply per call, in order.
+    """
+    if not calls:
+        return []
+    resolved = [(_as_script(script), keys, args) for script, keys, args in calls]
     async with RedisClient.connection(alias=alias) as redis:
-        return await _await_command(redis.eval(script, len(keys), *keys, *args))
+        async with redis.pipeline(transaction=False) as pipe:
+            for script, keys, args in resolved:
+                pipe.evalsha(script.sha, len(keys), *keys, *args)
+            replies = cast(list[object], await pipe.execute(raise_on_error=False))
+
+        missing = [
+            i for i, reply in enumerate(replies) if isinstance(reply, NoScriptError)
+        ]
+        if missing:
+            reload = {resolved[i][0].sha: resolved[i][0] for i in missing}
+            for script in reload.values():
+                await _await_command(redis.script_load(script.source))
+            logger.info(f"Reloaded {len(reload)} Lua scripts after NOSCRIPT")
+            async with redis.pipeline(transaction=False) as pipe:
+                for i in missing:
+                    script, keys, args = resolved[i]
+                    pipe.evalsha(script.sha, len(keys), *keys, *args)
+                retried = await pipe.execute(raise_on_error=False)
+            for i, reply in zip(missing, retried, strict=True):
+                replies[i] = reply
+
+    for reply in replies:
+        if isinstance(reply, Exception):
+            raise reply
+    return replies
 
 
 # =========================================================================
@@ -371,6 +623,10 @@ async def scan_keys(
     """
     Iterates the key space using the SCAN command.
 
+    A single cursor only walks one node, so in cluster mode
+    (``RedisClient.setup_cluster``) use ``scan_iter_keys`` or
+    ``scan_all_keys`` instead.
+
     Args:
         match_pattern: Glob-style pattern to match keys.
         cursor: The cursor to start iteration from (0 for the first call).
@@ -415,6 +671,47 @@ async def scan_keys(
             return 0, []
 
 
+async def scan_iter_keys(
+    match_pattern: str, *, count: int = 100, alias: PoolAlias = "users"
+) -> AsyncIterator[str]:
+    """
+    Yield every key matching a pattern, iterating SCAN to the end.
+
+    Walks every primary in cluster mode. Errors propagate to the caller.
+
+    Args:
+        match_pattern: Glob-style pattern to match keys.
+        count: Hint for the number of keys per SCAN iteration.
+        alias: Redis pool alias to use.
+    """
+    async with RedisClient.connection(alias=alias) as redis:
+        async for key in redis.scan_iter(match=match_pattern, count=count):
+            yield key
+
+
+async def scan_all_keys(
+    match_pattern: str, *, count: int = 100, alias: PoolAlias = "users"
+) -> list[str]:
+    """
+    Collect every key matching a pattern, iterating SCAN to the end.
+
+    Raises instead of returning what it found so far: a caller that records the
+    result as the complete key set must not mistake a failed SCAN for a short
+    one.
+
+    Args:
+        match_pattern: Glob-style pattern to match keys.
+        count: Hint for the number of keys per SCAN iteration.
+        alias: Redis pool alias to use.
+
+    Returns:
+        Matching keys, in SCAN order.
+    """
+    return [
+        key async for key in scan_iter_keys(match_pattern, count=count, alias=alias)
+    ]
+
+
 # =========================================================================
 # SECTION: TTL Management
 # =========================================================================
@@ -464,6 +761,7 @@ async def expire(key: str, ttl: int, *, alias: PoolAlias = "users") -> bool:
 # =========================================================================
 # SECTION: Hash Operations
 # =========================================================================
+@_drops_near_cached(_first_key)
 async def hset(
     key: str,
     field: str | None = None,
@@ -555,6 +853,57 @@ async def hget(key: str, field: str, *, alias: PoolAlias = "users") -> str | Non
             return None
 
 
+async def hmget(key: str, *fields: str, alias: PoolAlias = "users") -> list[str | None]:
+    """
+    Gets the string values of several hash fields in one round trip.
+
+    Args:
+        key: The full Redis key of the hash.
+        *fields: The field names.
+        alias: Redis pool alias to use (default: "default").
+
+    Returns:
+        One value per field, in order; None where the field or key doesn't
+        exist. All None on error.
+    """
+    if not fields:
+        return []
+    async with RedisClient.connection(alias=alias) as redis:
+        try:
+            return cast(
+                list[str | None], await _await_command(redis.hmget(key, list(fields)))
+            )
+        except Exception as e:
+            logger.error(f"Redis HMGET error for key '{key}': {e}")
+            return [None] * len(fields)
+
+
+async def hmget_many(
+    requests: Sequence[tuple[str, Sequence[str]]], *, alias: PoolAlias = "users"
+) -> list[list[str | None]]:
+    """
+    Runs several HMGETs in one round trip (non-transactional pipeline).
+
+    Args:
+        requests: ``(key, fields)`` per hash.
+        alias: Redis pool alias to use (default: "default").
+
+    Returns:
+        One value list per request, in order. All None on error.
+    """
+    if not requests:
+        return []
+    async with RedisClient.connection(alias=alias) as redis:
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, fields in requests:
+                    pipe.hmget(key, list(fields))
+                return cast(list[list[str | None]], await pipe.execute())
+        except Exception as e:
+            logger.error(f"Redis HMGET batch error for {len(requests)} keys: {e}")
+            return [[None] * len(fields) for _, fields in requests]
+
+
 async def hgetall(key: str, *, alias: PoolAlias = "users") -> dict[str, str]:
     """
     Gets all fields and values stored in a hash.
@@ -576,6 +925,35 @@ async def hgetall(key: str, *, alias: PoolAlias = "users") -> dict[str, str]:
             return {}
 
 
+async def hgetall_many(
+    keys: Sequence[str], *, alias: PoolAlias = "users"
+) -> list[dict[str, str]]:
+    """
+    Gets several whole hashes in one round trip (non-transactional pipeline).
+
+    Args:
+        keys: Full Redis keys of the hashes.
+        alias: Redis pool alias to use (default: "default").
+
+    Returns:
+        One dict per key, in order; empty where the key doesn't exist. All
+        empty on error.
+    """
+    if not keys:
+        return []
+    async with RedisClient.connection(alias=alias) as redis:
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hgetall(key)
+                return cast(list[dict[str, str]], await pipe.execute())
+        except Exception as e:
+            logger.error(
+                f"Redis HGETALL batch error for {len(keys)} keys: {e}", exc_info=True
+            )
+            return [{} for _ in keys]
+
+
 async def hexists(key: str, field: str, *, alias: PoolAlias = "users") -> bool:
     """
     Checks if a field exists in a hash.
@@ -596,6 +974,7 @@ async def hexists(key: str, field: str, *, alias: PoolAlias = "users") -> bool:
             return False
 
 
+@_drops_near_cached(_first_key)
 async def hdel(key: str, *fields: str, alias: PoolAlias = "users") -> int:
     """
     Deletes one or more hash fields.
@@ -618,6 +997,7 @@ async def hdel(key: str, *fields: str, alias: PoolAlias = "users") -> int:
             return 0
 
 
+@_drops_near_cached(_first_key)
 async def hincrby(
     key: str, field: str, increment: int = 1, *, alias: PoolAlias = "users"
 ) -> int | None:
@@ -869,6 +1249,29 @@ async def srem(key: str, *members: str, alias: PoolAlias = "users") -> int:
             return 0
 
 
+# =========================================================================
+# SECTION: Sorted Set Operations
+# =========================================================================
+async def zrange(key: str, *, alias: PoolAlias = "users") -> list[str]:
+    """
+    Gets every member of a sorted set, lowest score first.
+
+    Args:
+        key: The full key name for the sorted set.
+        alias: Redis pool alias to use (default: "default").
+
+    Returns:
+        The members in score order (assumes decode_responses=True),
+        or an empty list if the key doesn't exist or on error.
+    """
+    async with RedisClient.connection(alias=alias) as redis:
+        try:
+            return cast(list[str], await _await_command(redis.zrange(key, 0, -1)))
+        except Exception as e:
+            logger.error(f"Redis ZRANGE error for key '{key}': {e}", exc_info=True)
+            return []
+
+
 """
 Tiny, opinionated helpers on top of `redis.asyncio`.
 
@@ -9,12 +9,14 @@ from ...domain.interfaces.cache_factory import ICacheFactory
 from ...domain.interfaces.cache_interfaces import (
     IAIStateCache,
     IExpiryCache,
+    IIdentityIndex,
     IStateCache,
     ITableCache,
     IUserCache,
 )
 from .redis_handler.ai_state import RedisAIState
 from .redis_handler.expiry import RedisExpiry
+from .redis_handler.identity import RedisIdentityIndex
 from .redis_handler.state_handler import RedisStateHandler
 from .redis_handler.table import RedisTable
 from .redis_handler.user import RedisUser
@@ -158,3 +160,16 @@ class RedisCacheFactory(ICacheFactory):
         return RedisAIState(
             inbox=effective_inbox, user_id=effective_user, redis_alias="ai_state"
         )
+
+    def create_identity_index(self, inbox_id: str | None = None) -> IIdentityIndex:
+        """
+        Create Redis identity index (phone number / BSUID -> user_id).
+
+        Args:
+            inbox_id: Optional override (uses default if None)
+
+        Returns:
+            RedisIdentityIndex configured for users pool
+        """
+        effective_inbox, _ = self._resolve_context(inbox_id, None)
+        return RedisIdentityIndex(inbox=effective_inbox, redis_alias="users")
@@ -10,17 +10,34 @@ Why so elaborate?
   pub/sub and can leak file descriptors.
 
 • Each worker therefore needs its *own* connection-pool.
+
+Connection health is kept off the hot path: redis-py's
+``health_check_interval`` re-checks a pooled connection only after it has sat
+idle, and an optional watchdog task per pool PINGs in the background, marks the
+pool unhealthy and rebuilds it after consecutive failures. ``get()`` itself is a
+plain lookup and never talks to Redis.
+
+Besides one pool per cache space (the default, one logical database each),
+all five spaces can share a single pool (``setup_shared_url``) or a
+``RedisCluster`` client (``setup_cluster``). Spaces are then told apart by key
+prefix only, and keys wrap the inbox in a ``{...}`` hash tag so every key of an
+inbox lands in one cluster slot (see ``KeyFactory.namespace``).
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import os
+import time
 from collections.abc import AsyncIterator, Awaitable
 from contextlib import asynccontextmanager
-from typing import ClassVar, Literal, cast
+from dataclasses import asdict, dataclass
+from typing import Any, ClassVar, Literal, cast
 
 from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.cluster import RedisCluster
 
 log = logging.getLogger("RedisClient")
 
@@ -35,6 +52,32 @@ POOL_DB_MAPPING: dict[PoolAlias, int] = {
     "ai_state": 4,  # AI agent state cache operations
 }
 
+# Pool name every alias is routed to by setup_shared_url / setup_cluster
+SHARED_POOL = "shared"
+
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+DEFAULT_WATCHDOG_INTERVAL = 5.0
+DEFAULT_WATCHDOG_FAILURE_THRESHOLD = 3
+
+
+@dataclass(slots=True)
+class PoolHealth:
+    """Watchdog view of one pool, as reported by ``RedisClient.get_pool_health``."""
+
+    healthy: bool = True
+    consecutive_failures: int = 0
+    rebuilds: int = 0
+    last_error: str | None = None
+    last_check: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class _PoolSettings:
+    url: str
+    max_connections: int
+    health_check_interval: int
+    cluster: bool = False
+
 
 class RedisClient:
     """
@@ -47,23 +90,39 @@ class RedisClient:
     - "expiry" (db 3): Expiry trigger cache operations
     - "ai_state" (db 4): AI agent state cache operations
 
+    Each alias is routed to a named pool: its own (named after the alias), or
+    ``SHARED_POOL`` when one pool or cluster client serves every space. Health,
+    watchdogs and rebuilds are tracked per pool.
+
     Every worker process keeps its own pools to avoid post-fork descriptor reuse.
     """
 
-    _pools: ClassVar[dict[PoolAlias, ConnectionPool]] = {}
-    _clients: ClassVar[dict[PoolAlias, Redis]] = {}
+    _routes: ClassVar[dict[PoolAlias, str]] = {}
+    _pools: ClassVar[dict[str, ConnectionPool]] = {}
+    _clients: ClassVar[dict[str, Redis]] = {}
+    _settings: ClassVar[dict[str, _PoolSettings]] = {}
+    _health: ClassVar[dict[str, PoolHealth]] = {}
+    _watchdogs: ClassVar[dict[str, asyncio.Task[None]]] = {}
     _pid: ClassVar[int | None] = None
 
     # ---------- life-cycle --------------------------------------------------
 
     @classmethod
-    def setup_single_url(cls, base_url: str, *, max_connections: int = 64) -> None:
+    def setup_single_url(
+        cls,
+        base_url: str,
+        *,
+        max_connections: int = 64,
+        health_check_interval: int = DEFAULT_HEALTH_CHECK_INTERVAL,
+    ) -> None:
         """
         Set up all 4 Redis pools from a single base URL by appending database numbers.
 
         Args:
             base_url: Base Redis URL (e.g., "redis://localhost:6379")
             max_connections: Max connections per pool
+            health_check_interval: Seconds a pooled connection may sit idle
+                before redis-py re-checks it on checkout (0 disables)
 
         Example:
             RedisClient.setup_single_url("redis://localhost:6379")
@@ -82,11 +141,17 @@ class RedisClient:
 
         for alias, db_num in POOL_DB_MAPPING.items():
             url = f"{base_url.rstrip('/')}/{db_num}"
-            cls._setup_pool(alias, url, max_connections)
+            cls._setup_pool(
+                alias, alias, _PoolSettings(url, max_connections, health_check_interval)
+            )
 
     @classmethod
     def setup_multiple_urls(
-        cls, urls: dict[PoolAlias, str], *, max_connections: int = 64
+        cls,
+        urls: dict[PoolAlias, str],
+        *,
+        max_connections: int = 64,
+        health_check_interval: int = DEFAULT_HEALTH_CHECK_INTERVAL,
     ) -> None:
         """
         Set up Redis pools from explicit URLs for each pool.
@@ -94,6 +159,8 @@ class RedisClient:
         Args:
             urls: Mapping of pool alias to Redis URL
             max_connections: Max connections per pool
+            health_check_interval: Seconds a pooled connection may sit idle
+                before redis-py re-checks it on checkout (0 disables)
 
         Example:
             RedisClient.setup_multiple_urls({
@@ -114,34 +181,109 @@ class RedisClient:
             )
 
         for alias, url in urls.items():
-            cls._setup_pool(alias, url, max_connections)
+            cls._setup_pool(
+                alias, alias, _PoolSettings(url, max_connections, health_check_interval)
+            )
+
+    @classmethod
+    def setup_shared_url(
+        cls,
+        url: str,
+        *,
+        max_connections: int = 64,
+        health_check_interval: int = DEFAULT_HEALTH_CHECK_INTERVAL,
+    ) -> None:
+        """
+        Serve all five cache spaces from one pool on one logical database.
+
+        A worker then holds at most ``max_connections`` connections instead of
+        five times that. Keys are hash-tagged, as in cluster mode, so data
+        written in this mode moves to a cluster unchanged.
+
+        Example:
+            RedisClient.setup_shared_url("redis://localhost:6379/0")
+        """
+        settings = _PoolSettings(url, max_connections, health_check_interval)
+        for alias in POOL_DB_MAPPING:
+            cls._setup_pool(alias, SHARED_POOL, settings)
+
+    @classmethod
+    def setup_cluster(
+        cls,
+        url: str,
+        *,
+        max_connections: int = 64,
+        health_check_interval: int = DEFAULT_HEALTH_CHECK_INTERVAL,
+    ) -> None:
+        """
+        Serve all five cache spaces from one ``RedisCluster`` client.
+
+        ``url`` names any node of the cluster; the rest are discovered.
+        ``max_connections`` applies per node. Every key of an inbox shares its
+        hash tag, so the multi-key scripts and pipelines of one inbox stay on
+        one slot.
+
+        Example:
+            RedisClient.setup_cluster("redis://node-1:7000")
+        """
+        settings = _PoolSettings(
+            url, max_connections, health_check_interval, cluster=True
+        )
+        for alias in POOL_DB_MAPPING:
+            cls._setup_pool(alias, SHARED_POOL, settings)
 
     @classmethod
-    def _setup_pool(cls, alias: PoolAlias, url: str, max_connections: int) -> None:
-        """Internal helper to set up a single pool."""
+    def _setup_pool(cls, alias: PoolAlias, name: str, settings: _PoolSettings) -> None:
+        """Internal helper routing ``alias`` to pool ``name``, creating it once."""
         pid = os.getpid()
         if cls._pid is None:
             cls._pid = pid
         elif cls._pid != pid:
-            # process forked – discard inherited pools
+            # process forked – discard inherited pools (and the parent's
+            # watchdog tasks, which belong to an event loop we do not own)
+            cls._routes.clear()
             cls._pools.clear()
             cls._clients.clear()
+            cls._settings.clear()
+            cls._health.clear()
+            cls._watchdogs.clear()
             cls._pid = pid
 
-        if alias in cls._pools:
+        if alias in cls._routes:
             log.debug(f"Redis pool '{alias}' already exists in PID {pid}")
             return
 
-        log.info(f"Initialising Redis pool '{alias}' in PID {pid} ({url})")
+        if name not in cls._clients:
+            log.info(f"Initialising Redis pool '{name}' in PID {pid} ({settings.url})")
+            cls._settings[name] = settings
+            cls._health[name] = PoolHealth()
+            cls._install_pool(name, settings)
+        cls._routes[alias] = name
+
+    @classmethod
+    def _install_pool(cls, name: str, settings: _PoolSettings) -> None:
+        if settings.cluster:
+            cluster = RedisCluster.from_url(
+                settings.url,
+                decode_responses=True,
+                encoding="utf-8",
+                max_connections=settings.max_connections,
+                health_check_interval=settings.health_check_interval,
+            )
+            cls._pools.pop(name, None)
+            # RedisCluster mirrors the Redis command API the ops layer uses
+            cls._clients[name] = cast(Redis, cluster)
+            return
+
         pool = ConnectionPool.from_url(
-            url,
+            settings.url,
             decode_responses=True,
             encoding="utf-8",
-            max_connections=max_connections,
+            max_connections=settings.max_connections,
+            health_check_interval=settings.health_check_interval,
         )
-        client = Redis(connection_pool=pool)
-        cls._pools[alias] = pool
-        cls._clients[alias] = client
+        cls._pools[name] = pool
+        cls._clients[name] = Redis(connection_pool=pool)
 
     @classmethod
     async def close(cls, alias: PoolAlias | None = None) -> None:
@@ -151,32 +293,183 @@ class RedisClient:
             log.debug("No Redis pool to close for PID %s", pid)
             return
 
-        aliases = [alias] if alias else list(cls._pools.keys())
+        aliases = [alias] if alias else list(cls._routes)
         for a in aliases:
-            pool = cls._pools.pop(a, None)
-            if pool:
-                log.info("Closing Redis pool '%s' in PID %s", a, pid)
+            name = cls._routes.pop(a, None)
+            if name is None or name in cls._routes.values():
+                continue
+            await cls._stop_watchdog(name)
+            client = cls._clients.pop(name, None)
+            pool = cls._pools.pop(name, None)
+            log.info("Closing Redis pool '%s' in PID %s", name, pid)
+            if pool is not None:
                 await pool.disconnect()
-                cls._clients.pop(a, None)
-        if not cls._pools:
+            elif client is not None:
+                await client.aclose()
+            cls._settings.pop(name, None)
+            cls._health.pop(name, None)
+        if not cls._routes:
             cls._pid = None
 
+    # ---------- background health ------------------------------------------
+
+    @classmethod
+    def start_watchdog(
+        cls,
+        *,
+        interval: float = DEFAULT_WATCHDOG_INTERVAL,
+        failure_threshold: int = DEFAULT_WATCHDOG_FAILURE_THRESHOLD,
+    ) -> None:
+        """
+        Start one background PING task per pool (idempotent).
+
+        A failed PING marks the pool unhealthy; ``failure_threshold``
+        consecutive failures replace it with a fresh pool. Must be called from
+        the event loop that will use the pools; ``close()`` stops the tasks.
+        """
+        for name in cls._clients:
+            task = cls._watchdogs.get(name)
+            if task is not None and not task.done():
+                continue
+            cls._watchdogs[name] = asyncio.create_task(
+                cls._watch(name, interval, failure_threshold),
+                name=f"redis-watchdog-{name}",
+            )
+
+    @classmethod
+    async def _stop_watchdog(cls, name: str) -> None:
+        task = cls._watchdogs.pop(name, None)
+        if task is None or task.done():
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, RuntimeError):
+            await task
+
+    @classmethod
+    async def _watch(cls, name: str, interval: float, failure_threshold: int) -> None:
+        while name in cls._clients:
+            await asyncio.sleep(interval)
+            await cls.check_pool(
+                name, failure_threshold=failure_threshold, timeout=interval
+            )
+
+    @classmethod
+    def pool_name(cls, alias: str) -> str:
+        """The pool an alias is routed to (a pool name resolves to itself)."""
+        return cls._routes.get(cast(PoolAlias, alias), alias)
+
+    @classmethod
+    async def check_pool(
+        cls,
+        alias: str,
+        *,
+        failure_threshold: int = DEFAULT_WATCHDOG_FAILURE_THRESHOLD,
+        timeout: float = DEFAULT_WATCHDOG_INTERVAL,
+    ) -> bool:
+        """
+        PING one pool (by alias or pool name) now and update its health;
+        rebuild it at the threshold.
+
+        Returns:
+            True if the pool answered.
+        """
+        alias = cls.pool_name(alias)
+        client = cls._clients.get(alias)
+        health = cls._health.get(alias)
+        if client is None or health is None:
+            return False
+
+        health.last_check = time.time()
+        try:
+            await asyncio.wait_for(
+                cast("Awaitable[bool]", client.ping()), timeout=timeout
+            )
+        except Exception as exc:
+            health.healthy = False
+            health.consecutive_failures += 1
+            health.last_error = f"{type(exc).__name__}: {exc}"
+            log.warning(
+                "Redis pool '%s' health check failed (%d/%d): %s",
+                alias,
+                health.consecutive_failures,
+                failure_threshold,
+                health.last_error,
+            )
+            if health.consecutive_failures >= failure_threshold:
+                await cls._rebuild_pool(alias)
+            return False
+
+        if not health.healthy:
+            log.info("Redis pool '%s' is healthy again", alias)
+        health.healthy = True
+        health.consecutive_failures = 0
+        health.last_error = None
+        return True
+
+    @classmethod
+    async def _rebuild_pool(cls, name: str) -> None:
+        """Swap in a fresh pool; in-flight commands finish on the old one."""
+        settings = cls._settings.get(name)
+        old_client = cls._clients.get(name)
+        old_pool = cls._pools.get(name)
+        if settings is None or old_client is None:
+            return
+
+        cls._install_pool(name, settings)
+        health = cls._health[name]
+        health.rebuilds += 1
+        health.consecutive_failures = 0
+        log.warning("Rebuilt Redis pool '%s' (rebuild #%d)", name, health.rebuilds)
+        try:
+            if old_pool is not None:
+                await old_pool.disconnect(inuse_connections=False)
+            else:
+                await old_client.aclose()
+        except Exception as exc:
+            log.debug("Discarding old Redis pool '%s' failed: %s", name, exc)
+
+    @classmethod
+    def is_healthy(cls, alias: str = "users") -> bool:
+        """Last watchdog verdict for the pool (True until a check fails)."""
+        health = cls._health.get(cls.pool_name(alias))
+        return health is not None and health.healthy
+
+    @classmethod
+    def get_pool_health(cls) -> dict[str, dict[str, Any]]:
+        """Per-pool watchdog state for health endpoints, keyed by pool name."""
+        return {
+            name: {
+                **asdict(health),
+                "watchdog": name in cls._watchdogs and not cls._watchdogs[name].done(),
+            }
+            for name, health in cls._health.items()
+        }
+
     # ---------- access helpers ---------------------------------------------
 
+    @classmethod
+    def aliases(cls) -> list[PoolAlias]:
+        """Aliases of the pools set up in this process."""
+        return list(cls._routes) if cls._pid == os.getpid() else []
+
+    @classmethod
+    def uses_hash_tags(cls) -> bool:
+        """Whether the cache spaces share one keyspace (shared pool or cluster)."""
+        return SHARED_POOL in cls._clients and cls._pid == os.getpid()
+
     @classmethod
     async def get(cls, alias: PoolAlias = "users") -> Redis:
-        """Return the Redis client for the given alias."""
-        client = cls._clients.get(alias)
+        """
+        Return the Redis client for the given alias.
+
+        A dictionary lookup, no round trip: connection health is handled by
+        the pool's ``health_check_interval`` and the background watchdog.
+        """
+        name = cls._routes.get(alias)
+        client = cls._clients.get(name) if name else None
         if client is None or cls._pid != os.getpid():
             log.error("RedisClient.get() called before setup() in this process.")
             raise RuntimeError(f"RedisClient must be set up for alias '{alias}' first.")
-        # quick health check – keep it cheap
-        try:
-            await cast("Awaitable[bool]", client.ping())
-            log.debug("Redis PING successful for '%s'.", alias)
-        except Exception as exc:
-            log.error("Redis ping failed for '%s': %s", alias, exc, exc_info=True)
-            raise
         return client
 
     @classmethod
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable, Mapping
 from datetime import UTC, datetime
 from typing import Any
 
@@ -53,7 +54,10 @@ class RedisAIState(InboxCache, IAIStateCache):
             return await self._hset_with_ttl(key, {field: value}, ttl)
 
         result = await hset(
-            key, field=field, value=dumps(value), alias=self.redis_alias
+            key,
+            field=field,
+            value=dumps(value, self.redis_alias),
+            alias=self.redis_alias,
         )
         return result >= 0
 
@@ -77,10 +81,15 @@ class RedisAIState(InboxCache, IAIStateCache):
         return None
 
     async def append_to_list(
-        self, agent_name: str, field: str, value: Any, ttl: int | None = None
+        self,
+        agent_name: str,
+        field: str,
+        value: Any,
+        ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         return await self._append_to_list_field(
-            self._key(agent_name), field, value, ttl
+            self._key(agent_name), field, value, ttl, max_length=max_length
         )
 
     async def exists(self, agent_name: str) -> bool:
@@ -89,6 +98,27 @@ class RedisAIState(InboxCache, IAIStateCache):
     async def delete(self, agent_name: str) -> int:
         return await self.delete_key(self._key(agent_name))
 
+    async def get_many(
+        self, agent_names: Iterable[str], models: type[BaseModel] | None = None
+    ) -> dict[str, Any]:
+        names = list(dict.fromkeys(agent_names))
+        rows = await self._get_hashes([self._key(name) for name in names], models)
+        return dict(zip(names, rows, strict=True))
+
+    async def upsert_many(
+        self,
+        states: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        return await self._hset_many_with_ttl(
+            {self._key(name): data for name, data in states.items()}, ttl
+        )
+
+    async def delete_many(self, agent_names: Iterable[str]) -> int:
+        return await self.delete_keys(
+            [self._key(name) for name in dict.fromkeys(agent_names)]
+        )
+
     async def merge(
         self,
         agent_name: str,
@@ -96,24 +126,23 @@ class RedisAIState(InboxCache, IAIStateCache):
         ttl: int | None = None,
         models: type[BaseModel] | None = None,
     ) -> dict[str, Any] | None:
-        logger.debug(f"Upsert AI agent '{agent_name}' for user '{self.user_id}'")
+        """Write only the given fields server-side; one round trip."""
+        logger.debug(f"Merge AI agent '{agent_name}' for user '{self.user_id}'")
 
-        existing_state = await self.get(agent_name, models=models) or {}
-        new_state = {
-            **existing_state,
+        fields = {
             **state_data,
             "agent_type": agent_name,
             "timestamp": datetime.now(UTC).isoformat(),
         }
-
-        if await self.upsert(agent_name, new_state, ttl):
+        merged = await self._merge_hash(self._key(agent_name), fields, ttl, models)
+        if merged is not None:
             logger.debug(
-                f"Successfully upserted AI agent '{agent_name}' for user '{self.user_id}'"
+                f"Successfully merged AI agent '{agent_name}' for user '{self.user_id}'"
             )
-            return new_state
+            return merged
 
         logger.error(
-            f"Failed to upsert AI agent '{agent_name}' for user '{self.user_id}'"
+            f"Failed to merge AI agent '{agent_name}' for user '{self.user_id}'"
         )
         return None
 
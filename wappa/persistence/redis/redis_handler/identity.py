@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import logging
+from itertools import batched
+from typing import cast
+
+from ...identity_index import IDENTITY_FIELDS, CachedIdentityIndex, hot_identities
+from ..lua_scripts import register_script
+from ..ops import (
+    eval_script,
+    eval_script_many,
+    hexists,
+    hgetall,
+    hmget,
+    hmget_many,
+    hset,
+)
+from ..redis_client import PoolAlias
+from .utils.inbox_cache import _REBUILD_BATCH, InboxCache
+
+logger = logging.getLogger("RedisIdentityIndex")
+
+# KEYS[1] = index hash; ARGV = user_id, ttl, #linked, linked..., dropped...
+# Links overwrite; drops only remove identities still owned by user_id, so a
+# phone number that moved to another user is not torn away from it. The
+# index expiry only ever grows, keeping it alive as long as its newest user.
+_LINK_SCRIPT = register_script(
+    "wappa.identity.link",
+    """
+local user_id = ARGV[1]
+local ttl = tonumber(ARGV[2])
+local linked = tonumber(ARGV[3])
+local remaining = redis.call('TTL', KEYS[1])
+for i = 4, 3 + linked do
+    redis.call('HSET', KEYS[1], ARGV[i], user_id)
+end
+for i = 4 + linked, #ARGV do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == user_id then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+if ttl > 0 and remaining ~= -1 and remaining < ttl then
+    redis.call('EXPIRE', KEYS[1], ttl)
+end
+return 1
+""",
+)
+
+
+# KEYS[1] = index hash, KEYS[2..] = the user hash of each entry;
+# ARGV = #fields, identity fields..., then one identity and user_id per entry.
+# Entries whose user hash is gone (expired) or no longer carries the identity
+# are removed while they still point at that user; returns 1 per entry kept.
+_PRUNE_SCRIPT = register_script(
+    "wappa.identity.prune",
+    """
+local nfields = tonumber(ARGV[1])
+local kept = {}
+for i = 2, #KEYS do
+    local at = 1 + nfields + 2 * (i - 1) - 1
+    local identity, user_id = ARGV[at], ARGV[at + 1]
+    local carried = false
+    for f = 2, 1 + nfields do
+        if redis.call('HGET', KEYS[i], ARGV[f]) == identity then
+            carried = true
+        end
+    end
+    if carried then
+        kept[#kept + 1] = 1
+    else
+        if redis.call('HGET', KEYS[1], identity) == user_id then
+            redis.call('HDEL', KEYS[1], identity)
+        end
+        kept[#kept + 1] = 0
+    end
+end
+return kept
+""",
+)
+
+# Set by ``rebuild``; no phone number or BSUID looks like it
+_COMPLETE_FIELD = ":"
+
+
+class RedisIdentityIndex(InboxCache, CachedIdentityIndex):
+    """
+    Identity index stored as one hash per inbox: ``{inbox}:identity``.
+
+    Lives in the users pool next to the records it indexes. Lookups are one
+    HMGET for any number of identities, plus one script call checking that
+    the users found still carry them: the hash lives as long as its newest
+    user, so it outlives users that expired. Writes run one Lua call per
+    user, pipelined into one round trip for ``link_many``.
+
+    Example usage:
+        index = RedisIdentityIndex(inbox="mimeia")
+        await index.link("user123", {"573001112233"})
+        user_id = await index.get_user_id("573001112233")
+    """
+
+    redis_alias: PoolAlias = "users"
+
+    def _key(self) -> str:
+        return self.keys.identity_index(self.inbox)
+
+    async def _fetch_user_ids(self, identities: list[str]) -> dict[str, str]:
+        values = await hmget(self._key(), *identities, alias=self.redis_alias)
+        found = {
+            identity: user_id
+            for identity, user_id in zip(identities, values, strict=True)
+            if user_id
+        }
+        return await self._prune(found) if found else {}
+
+    async def _prune(self, entries: dict[str, str]) -> dict[str, str]:
+        """Keep the entries whose user hash still carries the identity."""
+        pairs = list(entries.items())
+        kept = await eval_script(
+            _PRUNE_SCRIPT,
+            [self._key(), *(self.keys.user(self.inbox, user) for _, user in pairs)],
+            [
+                len(IDENTITY_FIELDS),
+                *IDENTITY_FIELDS,
+                *(part for pair in pairs for part in pair),
+            ],
+            alias=self.redis_alias,
+        )
+        flags = dict(zip(entries, cast("list[int]", kept), strict=True))
+        hot_identities.discard(
+            self.inbox, [identity for identity, flag in flags.items() if not flag]
+        )
+        return {identity: entries[identity] for identity, flag in flags.items() if flag}
+
+    async def rebuild(self) -> int:
+        prefix = self.keys.user(self.inbox, "")
+        keys = await self._scan_keys_by_pattern(self.keys.user_pattern(self.inbox))
+        for batch in batched(keys, _REBUILD_BATCH):
+            stored = await hmget_many(
+                [(key, list(IDENTITY_FIELDS)) for key in batch],
+                alias=self.redis_alias,
+            )
+            await self.link_many(
+                (key.removeprefix(prefix), {value for value in values if value}, ())
+                for key, values in zip(batch, stored, strict=True)
+            )
+        entries = await hgetall(self._key(), alias=self.redis_alias)
+        entries.pop(_COMPLETE_FIELD, None)
+        for batch in batched(entries.items(), _REBUILD_BATCH):
+            await self._prune(dict(batch))
+        await hset(self._key(), _COMPLETE_FIELD, "1", alias=self.redis_alias)
+        logger.info(f"Rebuilt identity index of '{self.inbox}' over {len(keys)} users")
+        return len(keys)
+
+    async def is_complete(self) -> bool:
+        return await hexists(self._key(), _COMPLETE_FIELD, alias=self.redis_alias)
+
+    async def _write_many(self, batch: list[tuple[str, set[str], set[str]]]) -> None:
+        key = self._key()
+        await eval_script_many(
+            _LINK_SCRIPT,
+            [
+                ([key], [user_id, self.ttl_default, len(linked), *linked, *dropped])
+                for user_id, linked, dropped in batch
+            ],
+            alias=self.redis_alias,
+        )
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable, Mapping
 from datetime import UTC, datetime
 from typing import Any
 
 from pydantic import BaseModel, Field
 
 from ....domain.interfaces.cache_interfaces import IStateCache
-from ..ops import hget, hincrby_with_expire, hset, scan_keys
+from ..ops import hget, hincrby_with_expire, hset, scan_iter_keys
 from ..redis_client import PoolAlias
 from .utils.inbox_cache import InboxCache
-from .utils.key_factory import default_key_factory
+from .utils.key_factory import redis_key_factory
 from .utils.serde import dumps, loads
 
 logger = logging.getLogger("RedisStateHandler")
@@ -54,7 +55,10 @@ class RedisStateHandler(InboxCache, IStateCache):
             return await self._hset_with_ttl(key, {field: value}, ttl)
 
         result = await hset(
-            key, field=field, value=dumps(value), alias=self.redis_alias
+            key,
+            field=field,
+            value=dumps(value, self.redis_alias),
+            alias=self.redis_alias,
         )
         return result >= 0
 
@@ -78,10 +82,15 @@ class RedisStateHandler(InboxCache, IStateCache):
         return None
 
     async def append_to_list(
-        self, handler_name: str, field: str, value: Any, ttl: int | None = None
+        self,
+        handler_name: str,
+        field: str,
+        value: Any,
+        ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         return await self._append_to_list_field(
-            self._key(handler_name), field, value, ttl
+            self._key(handler_name), field, value, ttl, max_length=max_length
         )
 
     async def exists(self, handler_name: str) -> bool:
@@ -90,6 +99,27 @@ class RedisStateHandler(InboxCache, IStateCache):
     async def delete(self, handler_name: str) -> int:
         return await self.delete_key(self._key(handler_name))
 
+    async def get_many(
+        self, handler_names: Iterable[str], models: type[BaseModel] | None = None
+    ) -> dict[str, Any]:
+        names = list(dict.fromkeys(handler_names))
+        rows = await self._get_hashes([self._key(name) for name in names], models)
+        return dict(zip(names, rows, strict=True))
+
+    async def upsert_many(
+        self,
+        states: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        return await self._hset_many_with_ttl(
+            {self._key(name): data for name, data in states.items()}, ttl
+        )
+
+    async def delete_many(self, handler_names: Iterable[str]) -> int:
+        return await self.delete_keys(
+            [self._key(name) for name in dict.fromkeys(handler_names)]
+        )
+
     async def merge(
         self,
         handler_name: str,
@@ -97,24 +127,23 @@ class RedisStateHandler(InboxCache, IStateCache):
         ttl: int | None = None,
         models: type[BaseModel] | None = None,
     ) -> dict[str, Any] | None:
-        logger.debug(f"Upsert handler '{handler_name}' for user '{self.user_id}'")
+        """Write only the given fields server-side; one round trip."""
+        logger.debug(f"Merge handler '{handler_name}' for user '{self.user_id}'")
 
-        existing_state = await self.get(handler_name, models=models) or {}
-        new_state = {
-            **existing_state,
+        fields = {
             **state_data,
             "handler_type": handler_name,
             "timestamp": datetime.now(UTC).isoformat(),
         }
-
-        if await self.upsert(handler_name, new_state, ttl):
+        merged = await self._merge_hash(self._key(handler_name), fields, ttl, models)
+        if merged is not None:
             logger.debug(
-                f"Successfully upserted handler '{handler_name}' for user '{self.user_id}'"
+                f"Successfully merged handler '{handler_name}' for user '{self.user_id}'"
             )
-            return new_state
+            return merged
 
         logger.error(
-            f"Failed to upsert handler '{handler_name}' for user '{self.user_id}'"
+            f"Failed to merge handler '{handler_name}' for user '{self.user_id}'"
         )
         return None
 
@@ -169,7 +198,7 @@ class RedisStateHandler(InboxCache, IStateCache):
             self.inbox, user_id=self.user_id, name_prefix=prefix or ""
         )
 
-        key_prefix = f"{self.inbox}:{self.keys.handler_prefix}:"
+        key_prefix = f"{self.keys.namespace(self.inbox)}:{self.keys.handler_prefix}:"
         key_suffix = f":{self.user_id}"
 
         keys = await self._scan_keys_by_pattern(pattern)
@@ -185,26 +214,16 @@ class RedisStateHandler(InboxCache, IStateCache):
     async def list_users_with_handler(
         cls, inbox_id: str, handler_name: str
     ) -> list[str]:
-        pattern = default_key_factory.handler_pattern(inbox_id, name=handler_name)
-        key_prefix = f"{inbox_id}:{default_key_factory.handler_prefix}:{handler_name}:"
+        keys = redis_key_factory
+        pattern = keys.handler_pattern(inbox_id, name=handler_name)
+        key_prefix = f"{keys.namespace(inbox_id)}:{keys.handler_prefix}:{handler_name}:"
 
         user_ids: list[str] = []
-        cursor = 0
 
         try:
-            while True:
-                next_cursor, keys_batch = await scan_keys(
-                    match_pattern=pattern,
-                    cursor=cursor,
-                    count=100,
-                    alias="state_handler",
-                )
-                for key in keys_batch:
-                    if key.startswith(key_prefix):
-                        user_ids.append(key[len(key_prefix) :])
-                if next_cursor == 0:
-                    break
-                cursor = next_cursor
+            async for key in scan_iter_keys(pattern, count=100, alias="state_handler"):
+                if key.startswith(key_prefix):
+                    user_ids.append(key[len(key_prefix) :])
         except Exception as e:
             logger.error(
                 f"Error listing users for handler '{handler_name}' "
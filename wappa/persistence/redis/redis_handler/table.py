@@ -1,20 +1,34 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Mapping, Sequence
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import batched
 from typing import Any, cast
 
 from pydantic import BaseModel
 
 from ....domain.interfaces.cache_interfaces import (
+    FIRST_GENERATION,
+    GENERATION_FIELD,
     ITableCache,
     TableRowTransition,
     TableTransitionResult,
+    generation_of,
 )
+from ...field_index import field_indexes
 from ...row_conditions import condition_tokens, require_full_row
-from ..ops import eval_script, hget, hincrby_with_expire
+from ..lua_scripts import RedisScript, register_script
+from ..ops import (
+    eval_script,
+    eval_scripts,
+    hget,
+    scan_all_keys,
+    unlink_many,
+    zrange,
+)
 from ..redis_client import PoolAlias
-from .utils.inbox_cache import InboxCache
+from .utils.inbox_cache import InboxCache, register_row_script
 from .utils.serde import dumps_hash, loads, loads_hash
 
 logger = logging.getLogger("RedisTable")
@@ -25,41 +39,131 @@ _WROTE = 1
 _BLOCKED = 0
 _ABSENT = 2
 
-_CREATE_IF_ABSENT = """
-if redis.call('EXISTS', KEYS[1]) == 1 then
-  return {0, redis.call('HGETALL', KEYS[1])}
+_CREATE_IF_ABSENT = register_row_script(
+    "wappa.table.create_if_absent",
+    """
+if redis.call('EXISTS', row) == 1 then
+  return {0, redis.call('HGETALL', row)}
 end
-local row = {}
-for i = 2, #ARGV do row[#row + 1] = ARGV[i] end
-redis.call('HSET', KEYS[1], unpack(row))
-redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('HSET', row, unpack(args))
+redis.call('EXPIRE', row, ttl)
 return {1, {}}
-"""
+""",
+)
 
-# ARGV: ttl, expected-pair count, expected field/value pairs, replacement pairs.
+# args = expected-pair count, expected field/value pairs, replacement pairs.
 # A refused transition returns before EXPIRE, so the stored TTL survives it.
-_REPLACE_IF = """
-if redis.call('EXISTS', KEYS[1]) == 0 then
+_REPLACE_IF = register_row_script(
+    "wappa.table.replace_if",
+    """
+if redis.call('EXISTS', row) == 0 then
   return {2, {}}
 end
-local expected = tonumber(ARGV[2])
+local expected = tonumber(args[1])
 for i = 1, expected do
-  if redis.call('HGET', KEYS[1], ARGV[2 + i * 2 - 1]) ~= ARGV[2 + i * 2] then
-    return {0, redis.call('HGETALL', KEYS[1])}
+  if redis.call('HGET', row, args[i * 2]) ~= args[i * 2 + 1] then
+    return {0, redis.call('HGETALL', row)}
   end
 end
-local row = {}
-for i = 3 + expected * 2, #ARGV do row[#row + 1] = ARGV[i] end
-redis.call('DEL', KEYS[1])
-redis.call('HSET', KEYS[1], unpack(row))
-redis.call('EXPIRE', KEYS[1], ARGV[1])
+local fields = {}
+for i = 2 + expected * 2, #args do fields[#fields + 1] = args[i] end
+redis.call('DEL', row)
+redis.call('HSET', row, unpack(fields))
+redis.call('EXPIRE', row, ttl)
 return {1, {}}
-"""
+""",
+)
+
+# KEYS[1] = counter, KEYS[2] = the row in the generation the caller guessed;
+# ARGV = field, guessed generation. Reads the row only when the guess is the
+# current generation, and otherwise answers with the counter alone so the
+# caller can retry with the right row key declared.
+_GET_IN_GENERATION = register_script(
+    "wappa.table.get_in_generation",
+    """
+local bumps = tonumber(redis.call('HGET', KEYS[1], ARGV[1])) or 0
+if bumps < 0 then bumps = 0 end
+if 1 + bumps ~= tonumber(ARGV[2]) then
+  return {bumps}
+end
+return {bumps, redis.call('HGETALL', KEYS[2])}
+""",
+)
+
+# Last generation each counter was read at: ``get_in_generation`` declares
+# that generation's row, and only retries when a bump moved it.
+_seen_generations: dict[str, int] = {}
+
+# args = field, channel. Bumps and announces the bump to every process
+# caching generations, in one step.
+_BUMP_GENERATION = register_row_script(
+    "wappa.table.bump_generation",
+    """
+local bumps = redis.call('HINCRBY', row, args[1], 1)
+redis.call('EXPIRE', row, ttl)
+redis.call('PUBLISH', args[2], row)
+return bumps
+""",
+)
+
+# Table membership: one sorted set per table listing its pkids (folded, as in
+# the row key) scored by first insertion time, so listing a table costs the
+# size of the table rather than a SCAN of the inbox. The set is *sealed* by
+# the ``:`` member - never a folded pkid - once a SCAN has backfilled it:
+# writes alone create an unsealed set, which may predate older rows, so a
+# reader finding no seal SCANs the table once and seals it.
+_SEAL = ":"
+_MEMBER_BATCH = 500
+
+# KEYS[1] = members, KEYS[2..] = row keys; ARGV = ttl, score, seal, pkids...
+# Adds the rows that exist and drops those that do not, so it converges after
+# any write or delete. Membership expiry only grows, like the rows it lists.
+_SYNC_MEMBERS = register_script(
+    "wappa.table.sync_members",
+    """
+local ttl = tonumber(ARGV[1])
+local score = tonumber(ARGV[2])
+local existed = redis.call('EXISTS', KEYS[1])
+for i = 2, #KEYS do
+  if redis.call('EXISTS', KEYS[i]) == 1 then
+    redis.call('ZADD', KEYS[1], 'NX', score + i, ARGV[i + 2])
+  else
+    redis.call('ZREM', KEYS[1], ARGV[i + 2])
+  end
+end
+if ARGV[3] == '1' then
+  redis.call('ZADD', KEYS[1], 'NX', 0, ':')
+end
+local remaining = redis.call('TTL', KEYS[1])
+if ttl > 0 and remaining ~= -2 and (existed == 0 or remaining ~= -1)
+    and remaining < ttl then
+  redis.call('EXPIRE', KEYS[1], ttl)
+end
+return 1
+""",
+)
+
+# KEYS[1] = members, KEYS[2..] = row keys; ARGV = their pkids. The pkids
+# whose row is live, pruning the members whose row expired.
+_LIVE_MEMBERS = register_script(
+    "wappa.table.live_members",
+    """
+local live = {}
+for i = 2, #KEYS do
+  if redis.call('EXISTS', KEYS[i]) == 1 then
+    live[#live + 1] = ARGV[i - 1]
+  else
+    redis.call('ZREM', KEYS[1], ARGV[i - 1])
+  end
+end
+return live
+""",
+)
 
 
-def _row_payload(data: dict[str, Any] | BaseModel) -> list[str]:
+def _row_payload(data: dict[str, Any] | BaseModel, space: str) -> list[str]:
     """Flatten a full row into the field/value arguments HSET expects."""
-    encoded = dumps_hash(require_full_row(data))
+    encoded = dumps_hash(require_full_row(data), space)
     return [token for pair in encoded.items() for token in pair]
 
 
@@ -88,6 +192,97 @@ class RedisTable(InboxCache, ITableCache):
         """Build table key using KeyFactory"""
         return self.keys.table(self.inbox, table_name, pkid)
 
+    def _pkid_of(self, key: str) -> str:
+        marker = f":{self.keys.pk_marker}:"
+        return key[key.rfind(marker) + len(marker) :]
+
+    def _table_of(self, key: str) -> str:
+        start = len(f"{self.keys.namespace(self.inbox)}:{self.keys.table_prefix}:")
+        return key[start : key.rfind(f":{self.keys.pk_marker}:")]
+
+    def _row_scope(self, key: str) -> tuple[str, str]:
+        """Table rows are indexed under their table name by pkid."""
+        return self._table_of(key), self._pkid_of(key)
+
+    def _row_members(self, key: str) -> str:
+        return self._members_key(self._table_of(key))
+
+    def _members_key(self, table_name: str) -> str:
+        return self.keys.table_members(self.inbox, table_name)
+
+    def _member_calls(
+        self,
+        table_name: str,
+        rows: Mapping[str, str],
+        ttl: int | None = None,
+        *,
+        seal: bool = False,
+    ) -> list[tuple[RedisScript, list[str], list[str | int]]]:
+        """The ``eval_scripts`` calls syncing ``rows`` (pkid -> key) into membership."""
+        members = self._members_key(table_name)
+        score = time.time_ns() // 1000
+        items = list(rows.items())
+        calls: list[tuple[RedisScript, list[str], list[str | int]]] = []
+        for start in range(0, max(len(items), 1), _MEMBER_BATCH):
+            batch = items[start : start + _MEMBER_BATCH]
+            last = start + _MEMBER_BATCH >= len(items)
+            calls.append(
+                (
+                    _SYNC_MEMBERS,
+                    [members, *(key for _, key in batch)],
+                    [
+                        ttl or self.ttl_default,
+                        score + start,
+                        int(seal and last),
+                        *(pkid for pkid, _ in batch),
+                    ],
+                )
+            )
+        return calls if items or seal else []
+
+    async def _live_pkids(self, table_name: str) -> list[str]:
+        """The table's pkids in insertion order, read from its membership set.
+
+        When the set is not sealed (first read since it was created, or since
+        it expired) the table is SCANned once and the set backfilled and sealed.
+        """
+        members = self._members_key(table_name)
+        row_prefix = self.keys.table_row_prefix(self.inbox, table_name)
+        try:
+            listed = await zrange(members, alias=self.redis_alias)
+            if _SEAL not in listed:
+                pattern = self.keys.table_pattern(self.inbox, table_name)
+                keys = await scan_all_keys(pattern, alias=self.redis_alias)
+                rows = {self._pkid_of(key): key for key in keys}
+                await eval_scripts(
+                    self._member_calls(table_name, rows, seal=True),
+                    alias=self.redis_alias,
+                )
+                logger.debug(
+                    f"Backfilled membership of table '{table_name}' "
+                    f"with {len(rows)} rows"
+                )
+                listed = await zrange(members, alias=self.redis_alias)
+
+            pkids = [pkid for pkid in listed if pkid != _SEAL]
+            replies = await eval_scripts(
+                [
+                    (
+                        _LIVE_MEMBERS,
+                        [members, *(row_prefix + pkid for pkid in batch)],
+                        list(batch),
+                    )
+                    for batch in batched(pkids, _MEMBER_BATCH)
+                ],
+                alias=self.redis_alias,
+            )
+            return [pkid for live in replies for pkid in cast("list[str]", live)]
+        except Exception as e:
+            logger.error(
+                f"Error listing rows of table '{table_name}': {e}", exc_info=True
+            )
+            return []
+
     # ---- Public API extracted from RedisHandler Table methods ---------------
     async def get(
         self,
@@ -128,12 +323,10 @@ class RedisTable(InboxCache, ITableCache):
         data: dict[str, Any] | BaseModel,
         ttl: int | None = None,
     ) -> TableTransitionResult:
-        """Create a row only when absent (single EVAL, no read-then-write)."""
-        payload = _row_payload(data)
+        """Create a row only when absent (single EVALSHA, no read-then-write)."""
+        payload = _row_payload(data, self.redis_alias)
         status, row = await self._transition(
-            _CREATE_IF_ABSENT,
-            self._key(table_name, pkid),
-            [ttl or self.ttl_default, *payload],
+            _CREATE_IF_ABSENT, self._key(table_name, pkid), payload, ttl
         )
         if status == _WROTE:
             return TableTransitionResult(TableRowTransition.CREATED)
@@ -147,14 +340,15 @@ class RedisTable(InboxCache, ITableCache):
         expected: Mapping[str, Any],
         ttl: int | None = None,
     ) -> TableTransitionResult:
-        """Replace a row only when its current fields match (single EVAL)."""
+        """Replace a row only when its current fields match (single EVALSHA)."""
         conditions = condition_tokens(expected)
-        payload = _row_payload(data)
+        payload = _row_payload(data, self.redis_alias)
         flattened = [token for pair in conditions.items() for token in pair]
         status, row = await self._transition(
             _REPLACE_IF,
             self._key(table_name, pkid),
-            [ttl or self.ttl_default, len(conditions), *flattened, *payload],
+            [len(conditions), *flattened, *payload],
+            ttl,
         )
         if status == _WROTE:
             return TableTransitionResult(TableRowTransition.REPLACED)
@@ -164,14 +358,17 @@ class RedisTable(InboxCache, ITableCache):
 
     async def _transition(
         self,
-        script: str,
+        script: RedisScript,
         key: str,
-        args: Sequence[str | int | float],
+        args: Sequence[str | int],
+        ttl: int | None,
     ) -> tuple[int, dict[str, Any] | None]:
         """Run a transition script and decode its {status, row} reply."""
         reply = cast(
             "list[Any]",
-            await eval_script(script, [key], args, alias=self.redis_alias),
+            await eval_script(
+                *self._row_call(script, key, args, ttl), alias=self.redis_alias
+            ),
         )
         status = int(reply[0])
         flat = reply[1] if len(reply) > 1 else []
@@ -203,29 +400,27 @@ class RedisTable(InboxCache, ITableCache):
     ) -> int | None:
         """Atomically increment integer field (was increment_table_data_field)"""
         key = self._key(table_name, pkid)
-
-        new_value, expire_res = await hincrby_with_expire(
-            key=key,
-            field=field,
-            increment=increment,
-            ttl=ttl or self.ttl_default,
-            alias=self.redis_alias,
-        )
-
-        if new_value is not None and expire_res:
-            return new_value
-        else:
+        new_value = await self._hincrby_with_ttl(key, field, increment, ttl)
+        if new_value is None:
             logger.warning(
                 f"Failed to increment table field '{field}' for '{table_name}:{pkid}'"
             )
-            return None
+        return new_value
 
     async def append_to_list(
-        self, table_name: str, pkid: str, field: str, value: Any, ttl: int | None = None
+        self,
+        table_name: str,
+        pkid: str,
+        field: str,
+        value: Any,
+        ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """Append value to list field (was append_to_table_data_list_field)"""
         key = self._key(table_name, pkid)
-        return await self._append_to_list_field(key, field, value, ttl)
+        return await self._append_to_list_field(
+            key, field, value, ttl, max_length=max_length
+        )
 
     async def exists(self, table_name: str, pkid: str) -> bool:
         """Check if table row exists (was table_data_exists)"""
@@ -235,7 +430,36 @@ class RedisTable(InboxCache, ITableCache):
     async def delete(self, table_name: str, pkid: str) -> int:
         """Delete table row (was delete_table_data)"""
         key = self._key(table_name, pkid)
-        return await self.delete_key(key)
+        return await self._delete_rows([key])
+
+    async def get_many(
+        self,
+        table_name: str,
+        pkids: Iterable[str],
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        """Get several rows with one pipelined HGETALL batch"""
+        unique = list(dict.fromkeys(pkids))
+        rows = await self._get_hashes(
+            [self._key(table_name, pkid) for pkid in unique], models
+        )
+        return dict(zip(unique, rows, strict=True))
+
+    async def upsert_many(
+        self,
+        table_name: str,
+        rows: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+    ) -> bool:
+        """Set several rows with one pipelined HSET+EXPIRE batch"""
+        return await self._hset_many_with_ttl(
+            {self._key(table_name, pkid): data for pkid, data in rows.items()}, ttl
+        )
+
+    async def delete_many(self, table_name: str, pkids: Iterable[str]) -> int:
+        """Delete several rows with one DEL"""
+        unique = list(dict.fromkeys(pkids))
+        return await self._delete_rows([self._key(table_name, pkid) for pkid in unique])
 
     async def find_by_field(
         self,
@@ -247,15 +471,39 @@ class RedisTable(InboxCache, ITableCache):
         """
         Find first row in table where field matches value (was find_table_by_field)
 
+        Reads the field index when one is declared for ``(table_name, field)``
+        (see ``field_indexes``); otherwise SCANs the table.
+
         Args:
             table_name: Name of the table
             field: Field name to search
             value: Value to match
             models: Optional BaseModel class for full object reconstruction
         """
+        if field_indexes.is_indexed(table_name, field):
+            return await self._find_by_index(
+                table_name,
+                field,
+                value,
+                lambda pkid: self._key(table_name, pkid),
+                models,
+            )
         pattern = self.keys.table_pattern(self.inbox, table_name)
         return await self._find_by_field(pattern, field, value, models=models)
 
+    async def rebuild_field_indexes(self, table_name: str) -> int:
+        """
+        Re-create the declared field indexes of a table from its rows.
+
+        Run once after declaring an index on a table that already holds data.
+
+        Returns:
+            Number of rows indexed
+        """
+        return await self._rebuild_field_indexes(
+            table_name, self.keys.table_pattern(self.inbox, table_name), self._pkid_of
+        )
+
     async def delete_all_by_pkid(self, pkid: str) -> int:
         """
         Delete all table rows across all tables with same pkid (was delete_all_tables_by_pkid)
@@ -268,7 +516,78 @@ class RedisTable(InboxCache, ITableCache):
         logger.info(
             f"Deleting all table data with pkid '{pkid}' (pattern: '{pattern}')"
         )
-        return await self._delete_by_pattern(pattern)
+        keys = await self._scan_keys_by_pattern(pattern)
+        return await self._delete_rows(keys)
+
+    def generation_key(self, counter_table: str, name: str) -> str | None:
+        """The counter's Redis key: what bump announcements and tracking name."""
+        return self._key(counter_table, name)
+
+    async def get_generation(self, counter_table: str, name: str) -> int:
+        key = self._key(counter_table, name)
+        return generation_of(await hget(key, GENERATION_FIELD, alias=self.redis_alias))
+
+    async def bump_generation(
+        self, counter_table: str, name: str, ttl: int | None = None
+    ) -> int | None:
+        """Bump the counter and publish its key on ``generation_channel``.
+
+        The membership of the counter table is synced in the same script call.
+        """
+        key = self._key(counter_table, name)
+        try:
+            bumps = await eval_script(
+                *self._row_call(
+                    _BUMP_GENERATION,
+                    key,
+                    [GENERATION_FIELD, self.keys.generation_channel()],
+                    ttl,
+                ),
+                alias=self.redis_alias,
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to bump generation '{counter_table}:{name}': {e}",
+                exc_info=True,
+            )
+            return None
+        return generation_of(bumps)
+
+    async def get_in_generation(
+        self,
+        counter_table: str,
+        name: str,
+        table_prefix: str,
+        pkid: str,
+        models: type[BaseModel] | None = None,
+    ) -> tuple[int, dict[str, Any] | None]:
+        """Resolve the generation and read the row in one script.
+
+        The script declares the row of the generation last seen for this
+        counter; after a bump moved it, one more call reads the new one.
+        """
+        counter = self._key(counter_table, name)
+        generation = _seen_generations.get(counter, FIRST_GENERATION)
+        while True:
+            reply = cast(
+                "list[Any]",
+                await eval_script(
+                    _GET_IN_GENERATION,
+                    [counter, self._key(f"{table_prefix}{generation}", pkid)],
+                    [GENERATION_FIELD, generation],
+                    alias=self.redis_alias,
+                ),
+            )
+            current = generation_of(reply[0])
+            _seen_generations[counter] = current
+            if len(reply) > 1 and current == generation:
+                break
+            generation = current
+        flat = reply[1]
+        if not flat:
+            return generation, None
+        raw = dict(zip(flat[0::2], flat[1::2], strict=True))
+        return generation, cast("dict[str, Any]", loads_hash(raw, models=models))
 
     async def get_ttl(self, table_name: str, pkid: str) -> int:
         """
@@ -300,17 +619,19 @@ class RedisTable(InboxCache, ITableCache):
         return await self._renew_ttl(key, ttl)
 
     async def delete_table(self, table_name: str) -> int:
+        """Delete every row of a table: pipelined UNLINK over its membership set."""
         if not table_name:
             raise ValueError("table_name must not be empty")
 
-        pattern = self.keys.table_pattern(self.inbox, table_name)
-
-        logger.debug(
-            f"Deleting all rows in table '{table_name}' for inbox '{self.inbox}' "
-            f"(pattern: '{pattern}')"
+        pkids = await self._live_pkids(table_name)
+        count = await unlink_many(
+            [self._key(table_name, pkid) for pkid in pkids], alias=self.redis_alias
         )
-
-        count = await self._delete_by_pattern(pattern)
+        await self.delete_key(self._members_key(table_name))
+        if field_indexes.fields(table_name):
+            await self._delete_by_pattern(
+                self.keys.field_index_pattern(self.inbox, table_name)
+            )
 
         if count > 0:
             logger.info(
@@ -325,17 +646,8 @@ class RedisTable(InboxCache, ITableCache):
         return count
 
     async def list_pkids(self, table_name: str) -> list[str]:
-        pattern = self.keys.table_pattern(self.inbox, table_name)
-        pkid_marker = f":{self.keys.pk_marker}:"
-
-        keys = await self._scan_keys_by_pattern(pattern)
-        pkids = []
-        for key in keys:
-            idx = key.rfind(pkid_marker)
-            if idx >= 0:
-                pkids.append(key[idx + len(pkid_marker) :])
-
-        return pkids
+        """Pkids of a table in insertion order, from its membership set."""
+        return await self._live_pkids(table_name)
 
     async def get_all(
         self,
@@ -343,7 +655,10 @@ class RedisTable(InboxCache, ITableCache):
         models: type[BaseModel] | None = None,
     ) -> list[dict[str, Any]]:
         """
-        Get all rows for a table using Redis SCAN.
+        Get all rows for a table, in insertion order.
+
+        Reads the table's membership set, then every row in one pipelined
+        HGETALL batch.
 
         Args:
             table_name: Table name identifier
@@ -352,35 +667,17 @@ class RedisTable(InboxCache, ITableCache):
         Returns:
             List of table row data dictionaries
         """
-        from ..ops import scan_keys
-
-        pattern = self.keys.table_pattern(self.inbox, table_name)
-        results = []
-        cursor = 0
-
+        pkids = await self._live_pkids(table_name)
         try:
-            while True:
-                next_cursor, keys_batch = await scan_keys(
-                    match_pattern=pattern,
-                    cursor=cursor,
-                    count=100,
-                    alias=self.redis_alias,
-                )
-
-                for key in keys_batch:
-                    data = await self._get_hash(key, models=models)
-                    if data:
-                        results.append(data)
-
-                if next_cursor == 0:
-                    break
-                cursor = next_cursor
-
-            logger.debug(f"Retrieved {len(results)} rows from table '{table_name}'")
-            return results
-
+            rows = await self._get_hashes(
+                [self._key(table_name, pkid) for pkid in pkids], models
+            )
         except Exception as e:
             logger.error(
                 f"Error getting all rows from table '{table_name}': {e}", exc_info=True
             )
             return []
+
+        results = [row for row in rows if row]
+        logger.debug(f"Retrieved {len(results)} rows from table '{table_name}'")
+        return results
@@ -1,19 +1,32 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable, Mapping
 from typing import Any
 
 from pydantic import BaseModel, Field
 
 from ....domain.interfaces.cache_interfaces import IUserCache
-from ..ops import hdel, hget, hincrby_with_expire
+from ...field_index import USER_SCOPE, field_indexes
+from ...identity_index import IDENTITY_FIELDS
+from ..ops import hget, hmget_many
 from ..redis_client import PoolAlias
+from .identity import RedisIdentityIndex
 from .utils.inbox_cache import InboxCache
-from .utils.serde import loads
+from .utils.serde import dumps_hash, loads
 
 logger = logging.getLogger("RedisUser")
 
 
+def _identities(raw: dict[str, str | None]) -> set[str]:
+    """Identity values in a serialized (field -> Redis string) mapping."""
+    return {
+        value
+        for field, value in raw.items()
+        if field in IDENTITY_FIELDS and value and value != "null"
+    }
+
+
 class RedisUser(InboxCache, IUserCache):
     """
     Repository for user-specific operations.
@@ -30,7 +43,8 @@ class RedisUser(InboxCache, IUserCache):
     - delete_user_hash_field() -> delete_field()
     - user_exists() -> exists()
 
-    Single Responsibility: User data management only
+    Single Responsibility: User data management only. Writes that touch
+    ``phone_number`` or ``bsuid`` also keep the inbox identity index current.
 
     Example usage:
         user = RedisUser(inbox="mimeia", user_id="user123")
@@ -44,7 +58,17 @@ class RedisUser(InboxCache, IUserCache):
 
     def _key(self) -> str:
         """Build user key using KeyFactory"""
-        return self.keys.user(self.inbox, self.user_id)
+        return self._user_key(self.user_id)
+
+    def _user_key(self, user_id: str) -> str:
+        return self.keys.user(self.inbox, user_id)
+
+    def _user_id_of(self, key: str) -> str:
+        return key[len(self._user_key("")) :]
+
+    def _row_scope(self, key: str) -> tuple[str, str]:
+        """User records are indexed under ``USER_SCOPE`` by user_id."""
+        return USER_SCOPE, self._user_id_of(key)
 
     # ---- Public API extracted from RedisHandler User methods ----------------
     async def get(self, models: type[BaseModel] | None = None) -> dict[str, Any] | None:
@@ -68,43 +92,48 @@ class RedisUser(InboxCache, IUserCache):
     ) -> bool:
         """Create or update user record with multiple fields (Redis HSET upsert behavior)"""
         key = self._key()
-        return await self._hset_with_ttl(key, data, ttl)
+        payload = dumps_hash(data)
+        previous = await self._stored_identities(payload)
+        success = await self._hset_with_ttl(key, data, ttl)
+        if success:
+            await self._relink(_identities(dict(payload)), previous, ttl)
+        return success
 
     async def update_field(
         self, field: str, value: Any, ttl: int | None = None
     ) -> bool:
         """Update single field in user hash"""
         key = self._key()
-        return await self._hset_with_ttl(key, {field: value}, ttl)
+        payload = dumps_hash({field: value})
+        previous = await self._stored_identities(payload)
+        success = await self._hset_with_ttl(key, {field: value}, ttl)
+        if success:
+            await self._relink(_identities(dict(payload)), previous, ttl)
+        return success
 
     async def increment_field(
         self, field: str, increment: int = 1, ttl: int | None = None
     ) -> int | None:
         """Atomically increment integer field (was increment_user_field)"""
-        key = self._key()
-
-        new_value, expire_res = await hincrby_with_expire(
-            key=key,
-            field=field,
-            increment=increment,
-            ttl=ttl or self.ttl_default,
-            alias=self.redis_alias,
-        )
-
-        if new_value is not None and expire_res:
-            return new_value
-        else:
+        new_value = await self._hincrby_with_ttl(self._key(), field, increment, ttl)
+        if new_value is None:
             logger.warning(
                 f"Failed to increment user field '{field}' for user_id '{self.user_id}'"
             )
-            return None
+        return new_value
 
     async def append_to_list(
-        self, field: str, value: Any, ttl: int | None = None
+        self,
+        field: str,
+        value: Any,
+        ttl: int | None = None,
+        max_length: int | None = None,
     ) -> bool:
         """Append value to list field (was append_to_user_list_field)"""
         key = self._key()
-        return await self._append_to_list_field(key, field, value, ttl)
+        return await self._append_to_list_field(
+            key, field, value, ttl, max_length=max_length
+        )
 
     async def find_by_field(
         self, field: str, value: Any, models: type[BaseModel] | None = None
@@ -112,23 +141,49 @@ class RedisUser(InboxCache, IUserCache):
         """
         Find first user where field matches value (was find_user_by_field)
 
+        Reads the field index when ``field`` is declared with
+        ``field_indexes.declare_users``; otherwise SCANs the inbox's users.
+
         Args:
             field: Field name to search
             value: Value to match
             models: Optional BaseModel class for full object reconstruction
         """
+        if field_indexes.is_indexed(USER_SCOPE, field):
+            return await self._find_by_index(
+                USER_SCOPE, field, value, self._user_key, models
+            )
         pattern = self.keys.user_pattern(self.inbox)
         return await self._find_by_field(pattern, field, value, models=models)
 
+    async def rebuild_field_indexes(self) -> int:
+        """
+        Re-create the declared user field indexes from the inbox's user records.
+
+        Run once after declaring an index when users already exist.
+
+        Returns:
+            Number of users indexed
+        """
+        return await self._rebuild_field_indexes(
+            USER_SCOPE, self.keys.user_pattern(self.inbox), self._user_id_of
+        )
+
     async def delete(self) -> int:
         """Delete entire user record (was delete_user_record)"""
         key = self._key()
-        return await self.delete_key(key)
+        previous = await self._stored_identities(IDENTITY_FIELDS)
+        deleted = await self._delete_rows([key])
+        await self._relink(set(), previous)
+        return deleted
 
     async def delete_field(self, field: str) -> int:
         """Delete specific field from user hash (was delete_user_hash_field)"""
         key = self._key()
-        return await hdel(key, field, alias=self.redis_alias)
+        previous = await self._stored_identities((field,))
+        deleted = await self._hdel_fields(key, field)
+        await self._relink(set(), previous)
+        return deleted
 
     async def exists(self) -> bool:
         """Check if user exists (was user_exists)"""
@@ -163,3 +218,95 @@ class RedisUser(InboxCache, IUserCache):
         """
         key = self._key()
         return await self._renew_ttl(key, ttl)
+
+    # ---- Bulk operations ---------------------------------------------------
+    async def get_many(
+        self, user_ids: Iterable[str], models: type[BaseModel] | None = None
+    ) -> dict[str, Any]:
+        """Get several users of this inbox with one pipelined HGETALL batch"""
+        unique = list(dict.fromkeys(user_ids))
+        rows = await self._get_hashes([self._user_key(uid) for uid in unique], models)
+        return dict(zip(unique, rows, strict=True))
+
+    async def upsert_many(
+        self, users: Mapping[str, dict[str, Any] | BaseModel], ttl: int | None = None
+    ) -> bool:
+        """Write several users with one pipelined HSET+EXPIRE batch"""
+        payloads = {uid: dumps_hash(data) for uid, data in users.items()}
+        previous = await self._stored_identities_many(payloads)
+        success = await self._hset_many_with_ttl(
+            {self._user_key(uid): data for uid, data in users.items()}, ttl
+        )
+        if success:
+            await self._relink_many(
+                [
+                    (uid, _identities(dict(payload)), previous[uid])
+                    for uid, payload in payloads.items()
+                ],
+                ttl,
+            )
+        return success
+
+    async def delete_many(self, user_ids: Iterable[str]) -> int:
+        """Delete several users with one DEL"""
+        unique = list(dict.fromkeys(user_ids))
+        previous = await self._stored_identities_many(
+            dict.fromkeys(unique, IDENTITY_FIELDS)
+        )
+        deleted = await self._delete_rows([self._user_key(uid) for uid in unique])
+        await self._relink_many([(uid, set(), previous[uid]) for uid in unique])
+        return deleted
+
+    # ---- Identity index maintenance ------------------------------------------
+    async def _stored_identities(self, fields: Iterable[str]) -> set[str]:
+        """Current identity values for the identity fields among ``fields``."""
+        stored = await self._stored_identities_many({self.user_id: fields})
+        return stored[self.user_id]
+
+    async def _stored_identities_many(
+        self, fields_by_user: Mapping[str, Iterable[str]]
+    ) -> dict[str, set[str]]:
+        """``_stored_identities`` for several users in one round trip."""
+        wanted = {
+            uid: [field for field in fields if field in IDENTITY_FIELDS]
+            for uid, fields in fields_by_user.items()
+        }
+        stored: dict[str, set[str]] = {uid: set() for uid in wanted}
+        requests = [(uid, fields) for uid, fields in wanted.items() if fields]
+        values = await hmget_many(
+            [(self._user_key(uid), fields) for uid, fields in requests],
+            alias=self.redis_alias,
+        )
+        for (uid, fields), row in zip(requests, values, strict=True):
+            stored[uid] = _identities(dict(zip(fields, row, strict=True)))
+        return stored
+
+    async def _relink(
+        self, current: set[str], previous: set[str], ttl: int | None = None
+    ) -> None:
+        await self._relink_many([(self.user_id, current, previous)], ttl)
+
+    async def _relink_many(
+        self, changes: list[tuple[str, set[str], set[str]]], ttl: int | None = None
+    ) -> None:
+        """Point each user's current identities at it and release previous ones.
+
+        The user records are already written; an index failure is logged and
+        lookups fall back to misses rather than failing the user write.
+        """
+        changes = [change for change in changes if change[1] or change[2]]
+        if not changes:
+            return
+        index = RedisIdentityIndex(
+            inbox=self.inbox,
+            keys=self.keys,
+            redis_alias=self.redis_alias,
+            ttl_default=ttl or self.ttl_default,
+        )
+        try:
+            await index.link_many(changes)
+        except Exception as e:
+            logger.error(
+                f"Failed to update identity index for {len(changes)} users: {e}",
+                exc_info=True,
+            )
@@ -7,6 +7,15 @@ Contains key building, serialization, and base functionality.
 
 from .inbox_cache import InboxCache
 from .key_factory import KeyFactory
-from .serde import dumps, loads
+from .serde import SerdeCodec, dumps, get_codec, loads, register_codec, use_codec
 
-__all__ = ["KeyFactory", "dumps", "loads", "InboxCache"]
+__all__ = [
+    "KeyFactory",
+    "dumps",
+    "loads",
+    "InboxCache",
+    "SerdeCodec",
+    "get_codec",
+    "register_codec",
+    "use_codec",
+]
@@ -1,26 +1,230 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections.abc import Callable, Mapping, Sequence
+from itertools import batched
 from typing import Any, cast
 
 from pydantic import BaseModel, Field
 
+from ....field_index import field_indexes
+from ....field_updates import require_max_length
+from ...lua_scripts import RedisScript, register_script
+from ...near_cache import near_caches
 from ...ops import (
     delete,
+    eval_script,
+    eval_scripts,
     exists,
-    expire,
     get_ttl,
     hget,
     hgetall,
-    hset_with_expire,
-    scan_keys,
+    hgetall_many,
+    hmget_many,
+    scan_iter_keys,
 )
 from ...redis_client import PoolAlias
 from .key_factory import KeyFactory
-from .serde import dumps, dumps_hash, loads, loads_hash
+from .serde import dumps, dumps_hash, dumps_list_item, loads_hash
 
 logger = logging.getLogger("InboxCache")
 
+# Row writes run inside a frame that keeps the row's declared field indexes
+# (and, for tables, the membership set) in the same script call, so a row and
+# what lists it never disagree.
+# KEYS[1] = row, KEYS[2..n+1] = one index per indexed field, KEYS[n+2] = the
+# membership set when the score is not empty.
+# ARGV = ttl, pkid, n, the n field names, membership score, then the write's
+# own arguments.
+# An index is a sorted set with every member scored 0, so it is ordered by
+# ``#value:value..pkid``: a lexicographic range over that prefix lists exactly
+# the pkids indexed under one (hash-encoded) value. The body sees ``row``,
+# ``ttl`` and ``args``, and runs between reading the indexed fields and
+# re-indexing them. Index and membership expiry only grow.
+_ROW_FRAME = """
+local row, ttl, pkid = KEYS[1], tonumber(ARGV[1]), ARGV[2]
+local indexed = tonumber(ARGV[3])
+local score = ARGV[4 + indexed]
+local args = {}
+for i = 5 + indexed, #ARGV do args[#args + 1] = ARGV[i] end
+local function entry(value) return #value .. ':' .. value .. pkid end
+local function extend(key, existed)
+  local remaining = redis.call('TTL', key)
+  if ttl > 0 and (existed == 0 or remaining ~= -1) and remaining < ttl then
+    redis.call('EXPIRE', key, ttl)
+  end
+end
+local before = {}
+for i = 1, indexed do before[i] = redis.call('HGET', row, ARGV[3 + i]) end
+local function write()
+%s
+end
+local reply = write()
+for i = 1, indexed do
+  local index, old = KEYS[1 + i], before[i]
+  local new = redis.call('HGET', row, ARGV[3 + i])
+  if old and old ~= new then
+    redis.call('ZREM', index, entry(old))
+  end
+  if new then
+    local existed = redis.call('EXISTS', index)
+    redis.call('ZADD', index, 0, entry(new))
+    extend(index, existed)
+  end
+end
+if score ~= '' then
+  local members = KEYS[2 + indexed]
+  if redis.call('EXISTS', row) == 1 then
+    local existed = redis.call('EXISTS', members)
+    redis.call('ZADD', members, 'NX', score, pkid)
+    extend(members, existed)
+  else
+    redis.call('ZREM', members, pkid)
+  end
+end
+return reply
+"""
+
+
+def register_row_script(name: str, body: str) -> RedisScript:
+    """Register a row write ``body`` wrapped in the index-keeping frame."""
+    return register_script(name, _ROW_FRAME % body)
+
+
+_ROW_HSET = register_row_script(
+    "wappa.row.hset",
+    """
+redis.call('HSET', row, unpack(args))
+redis.call('EXPIRE', row, ttl)
+return 1
+""",
+)
+
+# args = field, increment
+_ROW_HINCRBY = register_row_script(
+    "wappa.row.hincrby",
+    """
+local value = redis.call('HINCRBY', row, args[1], args[2])
+redis.call('EXPIRE', row, ttl)
+return value
+""",
+)
+
+_ROW_HDEL = register_row_script(
+    "wappa.row.hdel", "return redis.call('HDEL', row, unpack(args))"
+)
+
+_ROW_DELETE = register_row_script("wappa.row.delete", "return redis.call('DEL', row)")
+
+_ROW_EXPIRE = register_row_script(
+    "wappa.row.expire", "return redis.call('EXPIRE', row, ttl)"
+)
+
+# Writes nothing: re-indexes the row as it is (index rebuilds).
+_ROW_SYNC = register_row_script("wappa.row.sync", "return 1")
+
+# KEYS[1] = index; ARGV[1] = value. The pkids indexed under the value.
+_INDEX_LOOKUP = register_script(
+    "wappa.index.lookup",
+    """
+local prefix = #ARGV[1] .. ':' .. ARGV[1]
+local pkids = {}
+local entries = redis.call(
+  'ZRANGEBYLEX', KEYS[1], '[' .. prefix, '(' .. prefix .. '\\255')
+for _, entry in ipairs(entries) do
+  pkids[#pkids + 1] = string.sub(entry, #prefix + 1)
+end
+return pkids
+""",
+)
+
+# KEYS[1] = row, KEYS[2] = index; ARGV = field, value, pkid. Drops the
+# pkid's entry under the value unless the row holds that value again.
+_INDEX_PRUNE = register_script(
+    "wappa.index.prune",
+    """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+  redis.call('ZREM', KEYS[2], #ARGV[2] .. ':' .. ARGV[2] .. ARGV[3])
+end
+return 1
+""",
+)
+
+_REBUILD_BATCH = 500
+
+# KEYS[1] = hash; ARGV = ttl, field/value pairs... Writes only the given
+# fields and answers with the whole merged hash.
+_MERGE_SCRIPT = register_script(
+    "wappa.inbox.merge",
+    """
+local fields = {}
+for i = 2, #ARGV do fields[#fields + 1] = ARGV[i] end
+redis.call('HSET', KEYS[1], unpack(fields))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+""",
+)
+
+# args = field, encoded item, max length (0 keeps all).
+# Splices the item into the stored JSON text instead of decoding and
+# re-encoding it (cjson would round numbers and turn [] into {}); cjson only
+# checks that the field holds a list. Anything else is replaced by a new list.
+_ROW_APPEND = register_row_script(
+    "wappa.row.append",
+    """
+local function top_level_commas(list)
+  local commas, depth, in_string, escaped = {}, 0, false, false
+  for i = 2, #list - 1 do
+    local c = string.sub(list, i, i)
+    if in_string then
+      if escaped then
+        escaped = false
+      elseif c == '\\\\' then
+        escaped = true
+      elseif c == '"' then
+        in_string = false
+      end
+    elseif c == '"' then
+      in_string = true
+    elseif c == '[' or c == '{' then
+      depth = depth + 1
+    elseif c == ']' or c == '}' then
+      depth = depth - 1
+    elseif c == ',' and depth == 0 then
+      commas[#commas + 1] = i
+    end
+  end
+  return commas
+end
+
+local item, max_length = args[2], tonumber(args[3])
+local current = redis.call('HGET', row, args[1])
+local is_list = false
+if current and string.sub(current, 1, 1) == '[' then
+  local ok, decoded = pcall(cjson.decode, current)
+  is_list = ok and type(decoded) == 'table'
+end
+local list
+if not is_list or string.match(current, '^%[%s*%]$') then
+  list = '[' .. item .. ']'
+else
+  list = string.sub(current, 1, -2) .. ', ' .. item .. ']'
+end
+if max_length > 0 then
+  local commas = top_level_commas(list)
+  local extra = #commas + 1 - max_length
+  if extra > 0 then
+    local rest = string.gsub(string.sub(list, commas[extra] + 1), '^%s+', '')
+    list = '[' .. rest
+  end
+end
+redis.call('HSET', row, args[1], list)
+redis.call('EXPIRE', row, ttl)
+return 1
+""",
+)
+
 
 class InboxCache(BaseModel):
     """
@@ -36,11 +240,52 @@ class InboxCache(BaseModel):
     inbox: str = Field(..., min_length=1)
     ttl_default: int = 86400  # 24 hours
     redis_alias: PoolAlias = "state_handler"  # Default pool
-    keys: KeyFactory = Field(default_factory=KeyFactory)
+    keys: KeyFactory = Field(default_factory=lambda: KeyFactory(hash_tags=None))
 
     model_config = {"arbitrary_types_allowed": True}
 
     # --------- Low-level helpers extracted from RedisHandler ------------------
+    def _row_scope(self, key: str) -> tuple[str, str] | None:
+        """``(index scope, pkid)`` of a row key, for repositories with field indexes.
+
+        None (the default) leaves the row unindexed.
+        """
+        return None
+
+    def _row_members(self, key: str) -> str | None:
+        """The membership set listing a row key; None (the default) for none."""
+        return None
+
+    def _row_call(
+        self,
+        script: RedisScript,
+        key: str,
+        args: Sequence[str | int] = (),
+        ttl: int | None = None,
+        *,
+        position: int = 0,
+    ) -> tuple[RedisScript, list[str], list[str | int]]:
+        """The ``eval_scripts`` call running a row script on ``key``.
+
+        Declares the row's field index keys and membership set, so the write,
+        its indexes and its membership change in one script call. Rows
+        written by one batch get consecutive membership scores, ``position``
+        being the row's place in it.
+        """
+        scope, pkid = self._row_scope(key) or ("", "")
+        fields = field_indexes.fields(scope) if scope else ()
+        keys = [key, *(self.keys.field_index(self.inbox, scope, f) for f in fields)]
+        members = self._row_members(key)
+        score: str | int = ""
+        if members is not None:
+            keys.append(members)
+            score = time.time_ns() // 1000 + position
+        return (
+            script,
+            keys,
+            [ttl or self.ttl_default, pkid, len(fields), *fields, score, *args],
+        )
+
     async def _hset_with_ttl(
         self,
         key: str,
@@ -52,20 +297,18 @@ class InboxCache(BaseModel):
         """Helper for atomic hash set with expiration"""
         _alias = alias or self.redis_alias
         normalized = data.model_dump() if isinstance(data, BaseModel) else data
-        payload = dumps_hash(normalized)
+        payload = dumps_hash(normalized, _alias)
         if not payload:
             logger.warning(f"Setting key '{key}' with empty data. Deleting instead.")
-            return await delete(key, alias=_alias) >= 0
+            return await self._delete_rows([key], alias=_alias) >= 0
 
-        hset_res, expire_res = await hset_with_expire(
-            key, payload, ttl or self.ttl_default, alias=_alias
-        )
-        success = hset_res is not None and expire_res
-        if not success:
-            logger.warning(
-                f"Failed hset_with_expire for key '{key}'. HSET: {hset_res}, EXPIRE: {expire_res}"
-            )
-        return success
+        flat = [token for pair in payload.items() for token in pair]
+        try:
+            await eval_script(*self._row_call(_ROW_HSET, key, flat, ttl), alias=_alias)
+            return True
+        except Exception as e:
+            logger.error(f"Failed HSET+EXPIRE for key '{key}': {e}", exc_info=True)
+            return False
 
     async def _get_hash(
         self,
@@ -84,13 +327,116 @@ class InboxCache(BaseModel):
             alias: Redis pool alias to use (defaults to self.redis_alias)
         """
         _alias = alias or self.redis_alias
-        raw_data = await hgetall(key, alias=_alias)
+        near = near_caches.get(_alias)
+        raw_data = (
+            await near.get_hash(key) if near else await hgetall(key, alias=_alias)
+        )
         return (
             cast(dict[str, Any], loads_hash(raw_data, models=models))
             if raw_data
             else None
         )
 
+    async def _get_hashes(
+        self,
+        keys: Sequence[str],
+        models: type[BaseModel] | None = None,
+        *,
+        alias: PoolAlias | None = None,
+    ) -> list[dict[str, Any] | None]:
+        """Batch ``_get_hash``: one pipelined round trip for all keys."""
+        _alias = alias or self.redis_alias
+        near = near_caches.get(_alias)
+        raw_hashes = (
+            await near.get_hashes(keys)
+            if near
+            else await hgetall_many(keys, alias=_alias)
+        )
+        return [
+            cast(dict[str, Any], loads_hash(raw, models=models)) if raw else None
+            for raw in raw_hashes
+        ]
+
+    async def _hset_many_with_ttl(
+        self,
+        items: Mapping[str, dict[str, Any] | BaseModel],
+        ttl: int | None = None,
+        *,
+        alias: PoolAlias | None = None,
+    ) -> bool:
+        """Batch ``_hset_with_ttl``: one pipelined round trip for all keys."""
+        _alias = alias or self.redis_alias
+        payloads = {key: dumps_hash(data, _alias) for key, data in items.items()}
+        empty = [key for key, payload in payloads.items() if not payload]
+        if empty:
+            logger.warning(
+                f"Setting {len(empty)} keys with empty data. Deleting instead."
+            )
+        calls = [
+            self._row_call(
+                _ROW_HSET,
+                key,
+                [token for pair in payload.items() for token in pair],
+                ttl,
+                position=position,
+            )
+            if payload
+            else self._row_call(_ROW_DELETE, key)
+            for position, (key, payload) in enumerate(payloads.items())
+        ]
+        try:
+            await eval_scripts(calls, alias=_alias)
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed HSET+EXPIRE batch for {len(calls)} keys: {e}", exc_info=True
+            )
+            return False
+
+    async def _hincrby_with_ttl(
+        self, key: str, field: str, increment: int, ttl: int | None = None
+    ) -> int | None:
+        """Increment a hash field and renew the key's expiry; None on failure."""
+        try:
+            value = await eval_script(
+                *self._row_call(_ROW_HINCRBY, key, [field, increment], ttl),
+                alias=self.redis_alias,
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed HINCRBY+EXPIRE for key '{key}', field '{field}': {e}",
+                exc_info=True,
+            )
+            return None
+        return int(cast(int, value))
+
+    async def _hdel_fields(self, key: str, *fields: str) -> int:
+        """Delete hash fields; 0 when none existed or on error."""
+        if not fields:
+            return 0
+        try:
+            removed = await eval_script(
+                *self._row_call(_ROW_HDEL, key, fields), alias=self.redis_alias
+            )
+        except Exception as e:
+            logger.error(f"Failed HDEL for key '{key}', fields {fields}: {e}")
+            return 0
+        return int(cast(int, removed))
+
+    async def _delete_rows(
+        self, keys: Sequence[str], *, alias: PoolAlias | None = None
+    ) -> int:
+        """Delete row keys, one pipelined round trip; 0 on error."""
+        if not keys:
+            return 0
+        calls = [self._row_call(_ROW_DELETE, key) for key in keys]
+        try:
+            replies = await eval_scripts(calls, alias=alias or self.redis_alias)
+        except Exception as e:
+            logger.error(f"Failed to delete {len(keys)} rows: {e}", exc_info=True)
+            return 0
+        return sum(int(cast(int, reply)) for reply in replies)
+
     async def _find_by_field(
         self,
         pattern: str,
@@ -117,29 +463,15 @@ class InboxCache(BaseModel):
             f"Searching pattern '{pattern}' where field '{field}' == '{compare_value_str}'"
         )
 
-        cursor = 0
         try:
-            while True:
-                next_cursor, keys_batch = await scan_keys(
-                    match_pattern=pattern, cursor=cursor, count=100, alias=_alias
-                )
+            async for full_key in scan_iter_keys(pattern, count=100, alias=_alias):
+                current_value_str = await hget(full_key, field, alias=_alias)
+                if current_value_str == compare_value_str:
+                    logger.info(f"Match found for field '{field}' in key '{full_key}'")
+                    return await self._get_hash(full_key, models=models, alias=alias)
 
-                for full_key in keys_batch:
-                    current_value_str = await hget(full_key, field, alias=_alias)
-                    if current_value_str == compare_value_str:
-                        logger.info(
-                            f"Match found for field '{field}' in key '{full_key}'"
-                        )
-                        return await self._get_hash(
-                            full_key, models=models, alias=alias
-                        )
-
-                if next_cursor == 0:
-                    logger.debug(
-                        f"SCAN finished for pattern '{pattern}'. No match found."
-                    )
-                    return None
-                cursor = next_cursor
+            logger.debug(f"SCAN finished for pattern '{pattern}'. No match found.")
+            return None
         except Exception as e:
             logger.error(
                 f"Error during find_by_field (pattern='{pattern}', field='{field}'): {e}",
@@ -147,6 +479,70 @@ class InboxCache(BaseModel):
             )
             return None
 
+    # --------- Declared field indexes (see persistence.field_index) ----------
+    # Every row write keeps the indexes itself (``_row_call``); these read them.
+    async def _find_by_index(
+        self,
+        scope: str,
+        field: str,
+        value: Any,
+        row_key: Callable[[str], str],
+        models: type[BaseModel] | None = None,
+    ) -> dict[str, Any] | None:
+        """First row whose ``field`` equals ``value``, read through its index.
+
+        Candidates are checked against the row itself (one pipelined HMGET);
+        entries of those that no longer match (expired rows) are pruned.
+        """
+        token = dumps(value)
+        index_key = self.keys.field_index(self.inbox, scope, field)
+        members = await eval_script(
+            _INDEX_LOOKUP, [index_key], [token], alias=self.redis_alias
+        )
+        keys = {pkid: row_key(pkid) for pkid in cast("list[str]", members)}
+        stored = await hmget_many(
+            [(key, [field]) for key in keys.values()], alias=self.redis_alias
+        )
+
+        stale: list[tuple[RedisScript, list[str], list[str | int]]] = []
+        match: str | None = None
+        for (pkid, key), (current,) in zip(keys.items(), stored, strict=True):
+            if current == token:
+                match = key
+                break
+            stale.append((_INDEX_PRUNE, [key, index_key], [field, token, pkid]))
+
+        try:
+            await eval_scripts(stale, alias=self.redis_alias)
+        except Exception as e:
+            logger.warning(f"Failed to prune index '{index_key}': {e}")
+        return await self._get_hash(match, models=models) if match else None
+
+    async def _rebuild_field_indexes(
+        self, scope: str, pattern: str, pkid_of: Callable[[str], str]
+    ) -> int:
+        """Drop and re-create the field indexes of ``scope`` from its rows.
+
+        Args:
+            scope: Table name, or ``USER_SCOPE``
+            pattern: SCAN pattern over the scope's row keys
+            pkid_of: Extracts the pkid from a row key
+
+        Returns:
+            Number of rows indexed
+        """
+        if not field_indexes.fields(scope):
+            return 0
+        await self._delete_by_pattern(self.keys.field_index_pattern(self.inbox, scope))
+        keys = await self._scan_keys_by_pattern(pattern)
+        for batch in batched(keys, _REBUILD_BATCH):
+            await eval_scripts(
+                [self._row_call(_ROW_SYNC, key) for key in batch],
+                alias=self.redis_alias,
+            )
+        logger.info(f"Rebuilt '{scope}' field indexes over {len(keys)} rows")
+        return len(keys)
+
     async def _scan_keys_by_pattern(
         self, pattern: str, *, alias: PoolAlias | None = None
     ) -> list[str]:
@@ -159,17 +555,10 @@ class InboxCache(BaseModel):
         """
         _alias = alias or self.redis_alias
         all_keys: list[str] = []
-        cursor = 0
 
         try:
-            while True:
-                next_cursor, keys_batch = await scan_keys(
-                    match_pattern=pattern, cursor=cursor, count=100, alias=_alias
-                )
-                all_keys.extend(keys_batch)
-                if next_cursor == 0:
-                    break
-                cursor = next_cursor
+            async for key in scan_iter_keys(pattern, count=100, alias=_alias):
+                all_keys.append(key)
         except Exception as e:
             logger.error(
                 f"Error scanning keys for pattern '{pattern}': {e}", exc_info=True
@@ -177,6 +566,10 @@ class InboxCache(BaseModel):
 
         return all_keys
 
+    async def _delete_batch(self, keys: list[str], alias: PoolAlias) -> int:
+        logger.debug(f"Deleting batch of {len(keys)} keys")
+        return max(await delete(*keys, alias=alias), 0)
+
     async def _delete_by_pattern(
         self, pattern: str, *, alias: PoolAlias | None = None
     ) -> int:
@@ -190,24 +583,18 @@ class InboxCache(BaseModel):
         """
         _alias = alias or self.redis_alias
         total_deleted = 0
-        cursor = 0
 
         logger.debug(f"Deleting keys matching pattern '{pattern}'")
         try:
-            while True:
-                next_cursor, keys_batch = await scan_keys(
-                    match_pattern=pattern, cursor=cursor, count=100, alias=_alias
-                )
-
-                if keys_batch:
-                    logger.debug(f"Deleting batch of {len(keys_batch)} keys")
-                    deleted_in_batch = await delete(*keys_batch, alias=_alias)
-                    if deleted_in_batch >= 0:
-                        total_deleted += deleted_in_batch
-
-                if next_cursor == 0:
-                    break
-                cursor = next_cursor
+            keys_batch: list[str] = []
+            async for key in scan_iter_keys(pattern, count=100, alias=_alias):
+                keys_batch.append(key)
+                if len(keys_batch) < 100:
+                    continue
+                total_deleted += await self._delete_batch(keys_batch, _alias)
+                keys_batch = []
+            if keys_batch:
+                total_deleted += await self._delete_batch(keys_batch, _alias)
 
             logger.info(f"Deleted {total_deleted} keys for pattern '{pattern}'")
         except Exception as e:
@@ -224,54 +611,36 @@ class InboxCache(BaseModel):
         value: Any,
         ttl: int | None = None,
         *,
+        max_length: int | None = None,
         alias: PoolAlias | None = None,
     ) -> bool:
         """
-        Append to a list stored in a hash field.
-        Extracted from _append_to_list_in_hash_field in RedisHandler.
+        Append to a list stored in a hash field, server-side in one round trip.
+
+        Only the one field is rewritten, and concurrent appends cannot drop
+        each other's items.
 
         Args:
             key: Redis key
             field: Hash field name
             value: Value to append to the list
             ttl: Optional TTL override
+            max_length: Keep only the newest ``max_length`` items (None keeps all)
             alias: Redis pool alias to use (defaults to self.redis_alias)
         """
+        require_max_length(max_length)
         _alias = alias or self.redis_alias
         try:
-            # Get current value
-            current_raw = await hget(key, field, alias=_alias)
-            current_list = []
-
-            if current_raw:
-                try:
-                    deserialized = loads(current_raw)
-                    if isinstance(deserialized, list):
-                        current_list = deserialized
-                    else:
-                        logger.warning(
-                            f"Field '{field}' in '{key}' is not a list. Overwriting."
-                        )
-                except Exception as e:
-                    logger.warning(f"Could not deserialize list field '{field}': {e}")
-
-            # Append and serialize
-            current_list.append(value)
-            serialized_list = dumps(current_list)
-
-            # Write back atomically
-            hset_res, expire_res = await hset_with_expire(
-                key=key,
-                mapping={field: serialized_list},
-                ttl=ttl or self.ttl_default,
+            await eval_script(
+                *self._row_call(
+                    _ROW_APPEND,
+                    key,
+                    [field, dumps_list_item(value), max_length or 0],
+                    ttl,
+                ),
                 alias=_alias,
             )
-
-            success = hset_res is not None and expire_res
-            if not success:
-                logger.warning(f"Failed list append for field '{field}' in '{key}'")
-            return success
-
+            return True
         except Exception as e:
             logger.error(
                 f"Error in append_to_list_field '{field}' in '{key}': {e}",
@@ -279,6 +648,52 @@ class InboxCache(BaseModel):
             )
             return False
 
+    async def _merge_hash(
+        self,
+        key: str,
+        data: dict[str, Any],
+        ttl: int | None = None,
+        models: type[BaseModel] | None = None,
+        *,
+        alias: PoolAlias | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Write ``data`` into a hash and return the merged result, in one round trip.
+
+        Fields not named in ``data`` are left as stored; nothing is re-serialized
+        but the fields being written. An empty ``data`` only reads the hash.
+
+        Args:
+            key: Redis key
+            data: Fields to write
+            ttl: Optional TTL override
+            models: Optional BaseModel class for the returned hash
+            alias: Redis pool alias to use (defaults to self.redis_alias)
+        """
+        _alias = alias or self.redis_alias
+        payload = [token for pair in dumps_hash(data, _alias).items() for token in pair]
+        try:
+            if not payload:
+                # HSET refuses an empty field list
+                return cast(
+                    dict[str, Any],
+                    loads_hash(await hgetall(key, alias=_alias), models=models),
+                )
+            flat = cast(
+                "list[str]",
+                await eval_script(
+                    _MERGE_SCRIPT,
+                    [key],
+                    [ttl or self.ttl_default, *payload],
+                    alias=_alias,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Error merging into '{key}': {e}", exc_info=True)
+            return None
+        raw = dict(zip(flat[0::2], flat[1::2], strict=True))
+        return cast(dict[str, Any], loads_hash(raw, models=models))
+
     # --------- Utility methods -----------------------------------------------
     async def key_exists(self, key: str, *, alias: PoolAlias | None = None) -> bool:
         """Check if key exists"""
@@ -290,7 +705,14 @@ class InboxCache(BaseModel):
     ) -> bool:
         """Renew TTL for a key"""
         _alias = alias or self.redis_alias
-        return await expire(key, ttl or self.ttl_default, alias=_alias)
+        try:
+            renewed = await eval_script(
+                *self._row_call(_ROW_EXPIRE, key, ttl=ttl), alias=_alias
+            )
+        except Exception as e:
+            logger.error(f"Error setting EXPIRE for key '{key}': {e}")
+            return False
+        return bool(renewed)
 
     async def _get_ttl(self, key: str, *, alias: PoolAlias | None = None) -> int:
         """Get remaining TTL for a key"""
@@ -301,3 +723,10 @@ class InboxCache(BaseModel):
         """Delete a key"""
         _alias = alias or self.redis_alias
         return await delete(key, alias=_alias)
+
+    async def delete_keys(
+        self, keys: Sequence[str], *, alias: PoolAlias | None = None
+    ) -> int:
+        """Delete several keys with one DEL"""
+        _alias = alias or self.redis_alias
+        return await delete(*keys, alias=_alias)
@@ -4,11 +4,22 @@ import logging
 
 from pydantic import BaseModel, Field
 
+from ...redis_client import RedisClient
+
 logger = logging.getLogger("RedisKeyFactory")
 
 
 class KeyFactory(BaseModel):
-    """Pure stateless helpers for Wappa cache key generation."""
+    """
+    Pure stateless helpers for Wappa cache key generation.
+
+    With ``hash_tags`` on, the inbox segment of every key is wrapped in braces
+    (``{inbox}:user:123``) so Redis Cluster hashes only the inbox: all keys of
+    one inbox share a slot, which keeps the multi-key scripts and pipelines
+    (identity links, field indexes, table membership) legal in cluster mode.
+    ``None`` follows ``RedisClient.uses_hash_tags()``, i.e. the shared-pool and
+    cluster setups.
+    """
 
     user_prefix: str = Field(default="user")
     handler_prefix: str = Field(default="state")
@@ -16,7 +27,11 @@ class KeyFactory(BaseModel):
     trigger_prefix: str = Field(default="EXPTRIGGER")
     aistate_prefix: str = Field(default="aistate")
     pubsub_prefix: str = Field(default="notify")
+    identity_prefix: str = Field(default="identity")
+    index_prefix: str = Field(default="idx")
     pk_marker: str = Field(default="pkid")
+    members_marker: str = Field(default="members")
+    hash_tags: bool | None = Field(default=False)
 
     # ---- pattern segments -------------------------------------------------
     @staticmethod
@@ -37,17 +52,51 @@ class KeyFactory(BaseModel):
         """Render one pattern segment: ``None`` means "any", anything else is literal."""
         return "*" if value is None else self.glob_escape(value.replace(":", "_"))
 
+    def _tagged(self) -> bool:
+        return (
+            RedisClient.uses_hash_tags() if self.hash_tags is None else self.hash_tags
+        )
+
+    def namespace(self, inbox: str) -> str:
+        """The leading segment of every key of ``inbox``: ``inbox`` or ``{inbox}``."""
+        return f"{{{inbox}}}" if self._tagged() else inbox
+
+    def _inbox_segment(self, inbox: str) -> str:
+        segment = self._segment(inbox)
+        return f"{{{segment}}}" if self._tagged() else segment
+
+    @staticmethod
+    def strip_hash_tag(inbox: str) -> str:
+        """``{inbox}`` -> ``inbox``; an untagged segment is returned unchanged."""
+        if len(inbox) > 1 and inbox[0] == "{" and inbox[-1] == "}":
+            return inbox[1:-1]
+        return inbox
+
     # ---- builders ---------------------------------------------------------
     def user(self, inbox: str, user_id: str) -> str:
-        return f"{inbox}:{self.user_prefix}:{user_id}"
+        return f"{self.namespace(inbox)}:{self.user_prefix}:{user_id}"
 
     def handler(self, inbox: str, name: str, user_id: str) -> str:
-        return f"{inbox}:{self.handler_prefix}:{name}:{user_id}"
+        return f"{self.namespace(inbox)}:{self.handler_prefix}:{name}:{user_id}"
 
     def table(self, inbox: str, table: str, pkid: str) -> str:
         safe_tbl = table.replace(":", "_")
         safe_pk = pkid.replace(":", "_")
-        return f"{inbox}:{self.table_prefix}:{safe_tbl}:{self.pk_marker}:{safe_pk}"
+        return f"{self.namespace(inbox)}:{self.table_prefix}:{safe_tbl}:{self.pk_marker}:{safe_pk}"
+
+    def table_members(self, inbox: str, table: str) -> str:
+        """
+        Build a table's membership key: a sorted set of its pkids by insertion time.
+
+        Pattern: {inbox}:df:{safe_table}:members — outside ``table_pattern``,
+        which always has a ``:pkid:`` segment.
+        """
+        safe_tbl = table.replace(":", "_")
+        return f"{self.namespace(inbox)}:{self.table_prefix}:{safe_tbl}:{self.members_marker}"
+
+    def table_row_prefix(self, inbox: str, table: str) -> str:
+        """Everything of a row key but the (folded) pkid: ``{inbox}:df:{table}:pkid:``."""
+        return self.table(inbox, table, "")
 
     def trigger(self, inbox: str, action: str, ident: str) -> str:
         """
@@ -72,7 +121,9 @@ class KeyFactory(BaseModel):
         """
         safe_action = action.replace(":", "_")
         safe_ident = ident.replace(":", "_")
-        return f"{inbox}:{self.trigger_prefix}:{safe_action}:{safe_ident}"
+        return (
+            f"{self.namespace(inbox)}:{self.trigger_prefix}:{safe_action}:{safe_ident}"
+        )
 
     def aistate(self, inbox: str, agent_name: str, user_id: str) -> str:
         """
@@ -96,7 +147,33 @@ class KeyFactory(BaseModel):
             Colons in agent_name are replaced with underscores for safety.
         """
         safe_agent = agent_name.replace(":", "_")
-        return f"{inbox}:{self.aistate_prefix}:{safe_agent}:{user_id}"
+        return f"{self.namespace(inbox)}:{self.aistate_prefix}:{safe_agent}:{user_id}"
+
+    def identity_index(self, inbox: str) -> str:
+        """
+        Build the inbox's identity index key (phone number / BSUID -> user_id).
+
+        Pattern: {inbox}:identity
+        """
+        return f"{self.namespace(inbox)}:{self.identity_prefix}"
+
+    def field_index_prefix(self, inbox: str, scope: str) -> str:
+        """
+        Common prefix of every field index key of one table (or of users).
+
+        Pattern: {inbox}:idx:{safe_scope}:
+        """
+        return f"{self.namespace(inbox)}:{self.index_prefix}:{scope.replace(':', '_')}:"
+
+    def field_index(self, inbox: str, scope: str, field: str) -> str:
+        """
+        Build a field index key.
+
+        Pattern: {inbox}:idx:{safe_scope}:{field} — a sorted set holding one
+        ``{length}:{value}{pkid}`` member per indexed row (value hash-encoded),
+        all scored 0 so the pkids of one value form a lexicographic range.
+        """
+        return f"{self.field_index_prefix(inbox, scope)}{field}"
 
     # ---- SCAN patterns ----------------------------------------------------
     # Every enumeration (delete-by-pattern, find-by-field, list-*) builds its
@@ -104,7 +181,9 @@ class KeyFactory(BaseModel):
     # a literal segment. Pass ``None`` for the dimension you want to range over.
 
     def user_pattern(self, inbox: str, user_id: str | None = None) -> str:
-        return f"{self._segment(inbox)}:{self.user_prefix}:{self._segment(user_id)}"
+        return (
+            f"{self._inbox_segment(inbox)}:{self.user_prefix}:{self._segment(user_id)}"
+        )
 
     def handler_pattern(
         self,
@@ -120,7 +199,7 @@ class KeyFactory(BaseModel):
         else:
             handler = self._segment(name)
         return (
-            f"{self._segment(inbox)}:{self.handler_prefix}:{handler}"
+            f"{self._inbox_segment(inbox)}:{self.handler_prefix}:{handler}"
             f":{self._segment(user_id)}"
         )
 
@@ -128,15 +207,20 @@ class KeyFactory(BaseModel):
         self, inbox: str, table: str | None = None, pkid: str | None = None
     ) -> str:
         return (
-            f"{self._segment(inbox)}:{self.table_prefix}:{self._segment(table)}"
+            f"{self._inbox_segment(inbox)}:{self.table_prefix}:{self._segment(table)}"
             f":{self.pk_marker}:{self._segment(pkid)}"
         )
 
+    def field_index_pattern(self, inbox: str, scope: str) -> str:
+        return (
+            f"{self._inbox_segment(inbox)}:{self.index_prefix}:{self._segment(scope)}:*"
+        )
+
     def trigger_pattern(
         self, inbox: str, action: str | None = None, ident: str | None = None
     ) -> str:
         return (
-            f"{self._segment(inbox)}:{self.trigger_prefix}:{self._segment(action)}"
+            f"{self._inbox_segment(inbox)}:{self.trigger_prefix}:{self._segment(action)}"
             f":{self._segment(ident)}"
         )
 
@@ -154,7 +238,7 @@ class KeyFactory(BaseModel):
         else:
             agent = self._segment(agent_name)
         return (
-            f"{self._segment(inbox)}:{self.aistate_prefix}:{agent}"
+            f"{self._inbox_segment(inbox)}:{self.aistate_prefix}:{agent}"
             f":{self._segment(user_id)}"
         )
 
@@ -183,6 +267,16 @@ class KeyFactory(BaseModel):
         safe_event = event_type.replace(":", "_").lower()
         return f"wappa:{self.pubsub_prefix}:{inbox}:{safe_user}:{safe_event}"
 
+    @staticmethod
+    def generation_channel() -> str:
+        """
+        PubSub channel announcing table generation bumps.
+
+        One channel for every inbox: each message is the bumped counter's key,
+        which is what process-local generation caches are keyed by.
+        """
+        return "wappa:generations"
+
     def channel_pattern(
         self, inbox: str, user_id: str = "*", event_type: str = "*"
     ) -> str:
@@ -243,7 +337,7 @@ class KeyFactory(BaseModel):
                 return None
 
             inbox, _, action, identifier = parts
-            return inbox, action, identifier
+            return self.strip_hash_tag(inbox), action, identifier
         except (ValueError, IndexError):
             return None
 
@@ -269,3 +363,7 @@ class KeyFactory(BaseModel):
 
 # Default instance for global use
 default_key_factory = KeyFactory()
+
+# Instance for the Redis handlers: tags keys whenever the client runs in
+# shared-pool or cluster mode.
+redis_key_factory = KeyFactory(hash_tags=None)
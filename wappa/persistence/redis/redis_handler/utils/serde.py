@@ -1,19 +1,64 @@
+"""
+Value encoding for Redis hashes.
+
+Top-level scalars keep their plain spelling (booleans as ``"1"``/``"0"``,
+numbers and strings as text; see ADR-0008), so field indexes, row conditions
+and external readers see the same fields whatever the codec. Container values
+go through the active ``SerdeCodec``:
+
+- ``json`` (default): stdlib JSON text, exactly as Wappa always wrote it.
+- ``orjson``: the same JSON values, encoded and decoded by ``orjson``
+  (``pip install wappa[speedups]``).
+- ``msgpack``: dicts and models as MessagePack (``pip install wappa[msgpack]``).
+  Lists stay JSON so the append script can splice them. Faster to decode,
+  but not smaller in Redis (see ``MsgpackCodec``).
+
+A codec that does not write JSON text starts its values with a marker
+character (a control character JSON never starts with), so values written
+before a switch, or by another codec, still read back. Reads into a model
+validate through a cached pydantic ``TypeAdapter`` instead of guessing types
+from the decoded strings.
+
+Given the cache space (pool alias) it is written to, a dict or model value
+past that space's threshold is also compressed (see ``value_compression``).
+Lists and scalars never are: the append script splices lists as stored, and
+field indexes and row conditions compare scalars with a single HGET.
+"""
+
 from __future__ import annotations
 
 import json
 import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 from enum import Enum
+from functools import lru_cache
 from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
 from pathlib import PurePath
 from typing import Any, cast
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+
+from ....value_compression import COMPRESSION_MARKERS, value_compression
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    msgpack = None
 
 logger = logging.getLogger("RedisSerde")
 
+# First characters json.loads accepts; any other unmarked value is plain text.
+_JSON_STARTS = frozenset('{["-0123456789tfnNI \t\n\r')
+
 
 def _convert_bools_to_redis(obj: Any) -> Any:
     """Recursively convert boolean values to Redis-optimized "1"/"0" strings"""
@@ -87,8 +132,318 @@ def _convert_iso_strings_to_datetime(obj: Any) -> Any:
         return obj
 
 
-def dumps(obj: Any) -> str:
-    """Serialize Python object to Redis-compatible string"""
+def _parse_json(text: str) -> Any:
+    """Decode JSON text; ValueError if it is not JSON."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # NaN, integers beyond 64 bits: the stdlib has the last word
+    return json.loads(text)
+
+
+# ---------------------------------------------------------------------------
+# Codecs
+# ---------------------------------------------------------------------------
+
+
+class SerdeCodec(ABC):
+    """
+    Encoding of the container values (dicts, lists, models) of hash fields.
+
+    ``encode`` returns the stored text, marker included; ``decode`` receives
+    it without the marker. A codec that writes JSON text has no marker: its
+    values are read by the JSON path, whichever codec is active. Markers
+    ``\\x01``-``\\x0f`` are reserved for Wappa's codecs.
+    """
+
+    name: str = ""
+    marker: str = ""
+
+    @abstractmethod
+    def encode(self, value: Any) -> str:
+        """Encode a value; TypeError if it holds an unsupported type."""
+
+    @abstractmethod
+    def decode(self, text: str) -> Any:
+        """Decode what ``encode`` wrote; ValueError if it is not valid."""
+
+
+class JsonCodec(SerdeCodec):
+    """Stdlib JSON text, Wappa's historical encoding."""
+
+    name = "json"
+
+    def encode(self, value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, default=_json_default_handler)
+
+    def decode(self, text: str) -> Any:
+        return _parse_json(text)
+
+
+class OrjsonCodec(SerdeCodec):
+    """JSON text written by ``orjson``: compact, several times faster."""
+
+    name = "orjson"
+
+    def encode(self, value: Any) -> str:
+        try:
+            return orjson.dumps(
+                value, default=_json_default_handler, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, unsupported types: the stdlib decides
+            return _JSON.encode(value)
+
+    def decode(self, text: str) -> Any:
+        return _parse_json(text)
+
+
+class MsgpackCodec(SerdeCodec):
+    """
+    MessagePack behind marker ``\\x01``, stored as latin-1 text.
+
+    The pools decode replies as text, so each packed byte travels as one
+    character, and Redis holds that text UTF-8 encoded: every byte at 0x80
+    or above takes two. That includes the header of every map, array and
+    string, so stored values are about as large as JSON, and larger for
+    float-heavy data; ``scripts/bench_serde.py`` prints the sizes.
+    """
+
+    name = "msgpack"
+    marker = "\x01"
+
+    def encode(self, value: Any) -> str:
+        try:
+            packed = msgpack.packb(
+                value, default=_json_default_handler, use_bin_type=True
+            )
+        except (OverflowError, TypeError):
+            # Integers beyond 64 bits reach ``default``: JSON text holds them
+            return _JSON.encode(value)
+        # The pools decode replies as text; latin-1 maps each byte to one char
+        return self.marker + packed.decode("latin-1")
+
+    def decode(self, text: str) -> Any:
+        try:
+            return msgpack.unpackb(
+                text.encode("latin-1"), raw=False, strict_map_key=False
+            )
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack value: {e}") from e
+
+
+_JSON = JsonCodec()
+_codecs: dict[str, SerdeCodec] = {_JSON.name: _JSON}
+_marked: dict[str, SerdeCodec] = {}
+# Dicts and models are written with _codec; lists (spliced by the append
+# script) with _list_codec, which is JSON text whatever the codec.
+_codec: SerdeCodec = _JSON
+_list_codec: SerdeCodec = _JSON
+
+
+def register_codec(codec: SerdeCodec) -> None:
+    """
+    Make ``codec`` available to ``use_codec`` and its values readable.
+
+    Raises:
+        ValueError: If the name or marker is taken, or the marker is not a
+            single non-whitespace control character.
+    """
+    marker = codec.marker
+    if marker and (len(marker) != 1 or marker >= " " or marker in _JSON_STARTS):
+        raise ValueError(
+            f"Codec marker {marker!r} must be one non-whitespace control character"
+        )
+    if marker in COMPRESSION_MARKERS:
+        raise ValueError(f"Codec marker {marker!r} is reserved for compression")
+    if codec.name in _codecs:
+        raise ValueError(f"Serde codec '{codec.name}' is already registered")
+    if marker in _marked:
+        raise ValueError(
+            f"Codec marker {marker!r} is taken by '{_marked[marker].name}'"
+        )
+    _codecs[codec.name] = codec
+    if marker:
+        _marked[marker] = codec
+
+
+def use_codec(name: str) -> SerdeCodec:
+    """
+    Write container values with the codec registered as ``name``.
+
+    Values already stored keep reading back: JSON text always, marked
+    values while their codec is registered.
+
+    Raises:
+        ValueError: If no such codec is registered (``orjson`` and
+            ``msgpack`` are only when their package is installed).
+    """
+    global _codec, _list_codec
+    codec = _codecs.get(name)
+    if codec is None:
+        raise ValueError(
+            f"Serde codec '{name}' is not available "
+            f"(registered: {', '.join(sorted(_codecs))})"
+        )
+    _codec = codec
+    _list_codec = _JSON if codec.marker else codec
+    logger.debug(f"Redis serde codec: {name}")
+    return codec
+
+
+def get_codec() -> SerdeCodec:
+    """The codec container values are currently written with."""
+    return _codec
+
+
+if orjson is not None:
+    register_codec(OrjsonCodec())
+if msgpack is not None:
+    register_codec(MsgpackCodec())
+
+# Returned by _decode for values that are plain text
+_PLAIN = object()
+
+
+def _inflate(raw: str) -> str:
+    """The stored text with any compression undone."""
+    if raw[:1] in COMPRESSION_MARKERS:
+        return value_compression.unpack(raw) or raw
+    return raw
+
+
+def _decode(raw: str) -> Any:
+    """Decode a stored container value, or ``_PLAIN`` if it is plain text."""
+    raw = _inflate(raw)
+    first = raw[:1]
+    try:
+        if first in _JSON_STARTS:
+            return _parse_json(raw)
+        codec = _marked.get(first)
+        if codec is not None:
+            return codec.decode(raw[1:])
+    except ValueError:
+        pass
+    return _PLAIN
+
+
+# ---------------------------------------------------------------------------
+# Schema-directed reads
+# ---------------------------------------------------------------------------
+
+# Schemas that see the input before it is typed: the stored values were
+# converted for them (bools, ISO datetimes) before schema-directed reads.
+_GUESSED_SCHEMAS = frozenset(
+    {"any", "function-before", "function-wrap", "function-plain"}
+)
+# Keys of a core schema that describe output, not validation.
+_SKIPPED_KEYS = frozenset({"metadata", "serialization"})
+
+
+@dataclass(frozen=True, slots=True)
+class _ModelPlan:
+    adapter: TypeAdapter[Any]
+    # Stored data validates as is: nothing in the model is untyped or
+    # pre-validated, so guessing types from strings would change nothing.
+    direct: bool
+    # Top-level str fields of a model: read as stored, not decoded.
+    text_fields: frozenset[str]
+
+
+@lru_cache(maxsize=512)
+def _model_plan(model: Any) -> _ModelPlan:
+    adapter: TypeAdapter[Any] = TypeAdapter(model)
+    schema = cast("dict[str, Any]", adapter.core_schema)
+    return _ModelPlan(adapter, not _guessed(schema), _text_fields(schema))
+
+
+def _guessed(node: Any) -> bool:
+    if isinstance(node, dict):
+        if node.get("type") in _GUESSED_SCHEMAS:
+            return True
+        return any(
+            _guessed(value) for key, value in node.items() if key not in _SKIPPED_KEYS
+        )
+    if isinstance(node, list):
+        return any(_guessed(item) for item in node)
+    return False
+
+
+def _text_fields(schema: dict[str, Any]) -> frozenset[str]:
+    definitions = {
+        definition["ref"]: definition for definition in schema.get("definitions", ())
+    }
+
+    def resolve(node: dict[str, Any]) -> dict[str, Any]:
+        while True:
+            match node.get("type"):
+                case "definitions" | "function-after" | "default" | "nullable":
+                    node = node["schema"]
+                case "definition-ref":
+                    node = definitions[node["schema_ref"]]
+                case _:
+                    return node
+
+    model = resolve(schema)
+    if model.get("type") != "model":
+        return frozenset()
+    fields = resolve(model["schema"])
+    if fields.get("type") != "model-fields":
+        return frozenset()
+    return frozenset(
+        name
+        for name, field in fields["fields"].items()
+        if resolve(field["schema"]).get("type") == "str"
+    )
+
+
+def _load_text(raw: str) -> Any:
+    """A str field as stored; ``"1"``/``"0"`` still read as bools (ADR-0008)."""
+    if raw == "null":
+        return None
+    if raw == "1":
+        return True
+    if raw == "0":
+        return False
+    return raw
+
+
+def _load_model(raw: str, model: Any) -> Any:
+    plan = _model_plan(model)
+    raw = _inflate(raw)
+    if plan.direct:
+        try:
+            first = raw[:1]
+            if first in _JSON_STARTS:
+                return plan.adapter.validate_json(raw)
+            codec = _marked.get(first)
+            if codec is not None:
+                return plan.adapter.validate_python(codec.decode(raw[1:]))
+        except ValueError:
+            pass  # not JSON, or only valid once converted: the old path decides
+
+    data = _decode(raw)
+    if data is _PLAIN:
+        return raw
+    # Convert Redis "1"/"0" back to bools and handle datetime strings
+    bool_converted_data = _convert_redis_to_bools(data)
+    datetime_converted_data = _convert_iso_strings_to_datetime(bool_converted_data)
+    return model.model_validate(datetime_converted_data)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def dumps(obj: Any, space: str | None = None) -> str:
+    """
+    Serialize Python object to Redis-compatible string
+
+    With a ``space`` (the pool alias written to), dict and model values past
+    its compression threshold are stored compressed.
+    """
     if obj is None:
         return "null"
     if isinstance(obj, bool):
@@ -102,12 +457,14 @@ def dumps(obj: Any) -> str:
     if isinstance(obj, Enum):
         return str(obj.value)
     if isinstance(obj, BaseModel):
-        # Convert to dict first, then convert bools to "1"/"0", then to JSON
+        # Convert to dict first, then convert bools to "1"/"0", then encode
         model_dict = obj.model_dump()
         redis_dict = _convert_bools_to_redis(model_dict)
-        return json.dumps(redis_dict, ensure_ascii=False, default=_json_default_handler)
+        return _compressed(_codec.encode(redis_dict), space)
     try:
-        return json.dumps(obj, ensure_ascii=False, default=_json_default_handler)
+        if isinstance(obj, dict):
+            return _compressed(_codec.encode(obj), space)
+        return _list_codec.encode(obj)
     except TypeError as e:
         logger.warning(
             f"Could not JSON serialize value of type {type(obj)}. Falling back to str(). Error: {e}. Value: {obj!r}"
@@ -115,8 +472,33 @@ def dumps(obj: Any) -> str:
         return str(obj)
 
 
+def _compressed(text: str, space: str | None) -> str:
+    if space is None:
+        return text
+    return value_compression.pack(text, space) or text
+
+
+def dumps_list_item(value: Any) -> str:
+    """Serialize one list element, as ``dumps`` writes it inside a JSON list."""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    try:
+        return _list_codec.encode(value)
+    except TypeError as e:
+        logger.warning(
+            f"Could not JSON serialize list item of type {type(value)}. Falling back to str(). Error: {e}."
+        )
+        return json.dumps(str(value), ensure_ascii=False)
+
+
 def loads(raw: str | None, model: type[BaseModel] | None = None) -> Any:
-    """Deserialize Redis string back to Python object"""
+    """
+    Deserialize Redis string back to Python object
+
+    With a ``model``, the value is validated against its cached
+    ``TypeAdapter``; models with untyped (``Any``) parts or custom
+    before-validators still get the stored strings converted first.
+    """
     if raw in (None, "null"):
         return None
     assert raw is not None
@@ -124,26 +506,20 @@ def loads(raw: str | None, model: type[BaseModel] | None = None) -> Any:
         return True
     if raw == "0":
         return False
-    try:
-        data = json.loads(raw)
-        if model is not None:
-            # Convert Redis "1"/"0" back to bools and handle datetime strings
-            bool_converted_data = _convert_redis_to_bools(data)
-            datetime_converted_data = _convert_iso_strings_to_datetime(
-                bool_converted_data
-            )
-            return model.model_validate(datetime_converted_data)
-        return data
-    except (json.JSONDecodeError, TypeError):
-        return raw
+    if model is not None:
+        return _load_model(raw, model)
+    data = _decode(raw)
+    return raw if data is _PLAIN else data
 
 
-def dumps_hash(data: dict[str, Any] | BaseModel) -> dict[str, str]:
+def dumps_hash(
+    data: dict[str, Any] | BaseModel, space: str | None = None
+) -> dict[str, str]:
     """Serialize dictionary or BaseModel values for Redis hash storage"""
     if isinstance(data, BaseModel):
         # Convert BaseModel to dict first
         data = data.model_dump()
-    return {field: dumps(value) for field, value in data.items()}
+    return {field: dumps(value, space) for field, value in data.items()}
 
 
 def loads_hash(
@@ -160,12 +536,15 @@ def loads_hash(
     if not raw_data:
         return {}
 
-    # Deserialize all fields normally (no model-specific deserialization)
-    data = {field: loads(value_str) for field, value_str in raw_data.items()}
+    if not models:
+        return {field: loads(value_str) for field, value_str in raw_data.items()}
 
-    if models:
-        # Let Pydantic handle nested model reconstruction with preprocessing
-        # The model_validate will automatically call @model_validator(mode="before") methods
-        return models.model_validate(data)
-    else:
-        return data
+    # str fields are taken as stored; the rest are decoded for the model
+    text_fields = _model_plan(models).text_fields
+    data = {
+        field: _load_text(value_str) if field in text_fields else loads(value_str)
+        for field, value_str in raw_data.items()
+    }
+    # Let Pydantic handle nested model reconstruction with preprocessing
+    # The model_validate will automatically call @model_validator(mode="before") methods
+    return models.model_validate(data)
@@ -7,12 +7,18 @@ Provides a clean interface for applications to manage Redis connections.
 
 import logging
 from collections.abc import Awaitable
+from dataclasses import asdict
 from typing import Any, cast
 
 from redis.asyncio import Redis
 
 from ...core.config.settings import settings
+from ..value_compression import value_compression
+from .generation_sync import GenerationSyncMode, RedisGenerationSync
+from .lua_scripts import script_registry
+from .near_cache import near_caches
 from .redis_client import POOL_DB_MAPPING, PoolAlias, RedisClient
+from .redis_handler.utils.serde import use_codec
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +35,7 @@ class RedisManager:
     """
 
     _initialized: bool = False
+    _generation_sync: RedisGenerationSync | None = None
 
     @classmethod
     async def initialize(
@@ -37,8 +44,10 @@ class RedisManager:
         """
         Initialize Redis pools with enhanced logging.
 
-        Uses the existing multi-pool setup with proper configuration
-        from application settings or provided parameters.
+        Sets up the pools for ``settings.redis_mode``: one pool per cache
+        space (``pools``), one shared pool (``shared``) or a cluster client
+        (``cluster``), configured from application settings or provided
+        parameters.
 
         Args:
             redis_url: Redis connection URL (defaults to settings.redis_url)
@@ -55,33 +64,120 @@ class RedisManager:
                 raise ValueError("Redis URL is required")
             connections = max_connections or settings.redis_max_connections
 
+            # Left alone at their defaults, so a codec or compression chosen in
+            # code stays active
+            if settings.redis_serde_codec != "json":
+                use_codec(settings.redis_serde_codec)
+                logger.info(f"Redis values encoded with {settings.redis_serde_codec}")
+            if settings.cache_compression != "off":
+                value_compression.configure(
+                    settings.cache_compression,
+                    threshold=settings.cache_compression_threshold,
+                    thresholds=settings.cache_compression_thresholds,
+                )
+
+            mode = settings.redis_mode
             logger.info(
-                f"Setting up Redis pools from {url} (max_connections: {connections})"
+                f"Setting up Redis pools from {url} "
+                f"(mode: {mode}, max_connections: {connections})"
             )
 
-            # Use Wappa's RedisClient.setup_single_url
-            RedisClient.setup_single_url(
-                base_url=url,
-                max_connections=connections,
-            )
+            if mode == "cluster":
+                RedisClient.setup_cluster(
+                    url,
+                    max_connections=connections,
+                    health_check_interval=settings.redis_health_check_interval,
+                )
+            elif mode == "shared":
+                RedisClient.setup_shared_url(
+                    url,
+                    max_connections=connections,
+                    health_check_interval=settings.redis_health_check_interval,
+                )
+            else:
+                RedisClient.setup_single_url(
+                    base_url=url,
+                    max_connections=connections,
+                    health_check_interval=settings.redis_health_check_interval,
+                )
 
             # Verify all pools with detailed logging
             logger.info("Verifying Redis pool health...")
             await cls._verify_pools()
 
+            # Framework and app scripts, so the hot path can call EVALSHA
+            loaded = await script_registry.load_all()
+            logger.info(f"Loaded {loaded} Lua scripts into every Redis pool")
+
+            # From here on, health is checked in the background, not per call
+            RedisClient.start_watchdog(
+                interval=settings.redis_watchdog_interval,
+                failure_threshold=settings.redis_watchdog_failure_threshold,
+            )
+
+            await cls._start_generation_sync()
+            await cls._start_near_caches()
+
             cls._initialized = True
 
             # Success confirmation with pool details
-            pool_count = len(POOL_DB_MAPPING)
-            pool_details = ", ".join(
-                f"{alias}:db{db}" for alias, db in POOL_DB_MAPPING.items()
-            )
-            logger.info(f"✅ Redis pools ready: {pool_count} pools ({pool_details})")
+            if RedisClient.uses_hash_tags():
+                logger.info(f"✅ Redis ready: one {mode} client for every cache space")
+            else:
+                pool_count = len(POOL_DB_MAPPING)
+                pool_details = ", ".join(
+                    f"{alias}:db{db}" for alias, db in POOL_DB_MAPPING.items()
+                )
+                logger.info(
+                    f"✅ Redis pools ready: {pool_count} pools ({pool_details})"
+                )
 
         except Exception as e:
             logger.error(f"❌ Redis pool initialization failed: {e}", exc_info=True)
             raise
 
+    @classmethod
+    async def _start_generation_sync(cls) -> None:
+        """Cache table generations in process when REDIS_GENERATION_SYNC asks to.
+
+        A sync that cannot start is logged, not raised: generations are then
+        read from Redis on every operation, as with the sync off.
+        """
+        mode = settings.redis_generation_sync
+        if mode == "off":
+            return
+        sync = RedisGenerationSync(mode=cast(GenerationSyncMode, mode))
+        try:
+            await sync.start()
+        except Exception as e:
+            logger.warning(f"Generation sync ({mode}) unavailable, not caching: {e}")
+            return
+        cls._generation_sync = sync
+
+    @classmethod
+    async def _start_near_caches(cls) -> None:
+        """Near-cache the cache spaces listed in REDIS_NEAR_CACHE.
+
+        Like the generation sync, a near-cache that cannot start is logged and
+        left off: reads then go to Redis as before.
+        """
+        for alias in settings.redis_near_cache:
+            if alias not in POOL_DB_MAPPING:
+                logger.warning(f"REDIS_NEAR_CACHE: unknown cache space '{alias}'")
+                continue
+            cache = near_caches.enable(
+                cast(PoolAlias, alias),
+                max_entries=settings.redis_near_cache_max_entries,
+                max_bytes=settings.redis_near_cache_max_bytes,
+                max_ttl=settings.redis_near_cache_ttl,
+            )
+            try:
+                await cache.start()
+            except Exception as e:
+                logger.warning(
+                    f"Near-cache for '{alias}' unavailable, not caching: {e}"
+                )
+
     @classmethod
     async def _verify_pools(cls) -> None:
         """
@@ -117,7 +213,9 @@ class RedisManager:
         """
         Get health status of all Redis pools.
 
-        Returns detailed health information for monitoring.
+        Returns detailed health information for monitoring: a live PING per
+        pool plus the background watchdog's view (consecutive failures,
+        rebuild count, last error).
 
         Returns:
             Dictionary containing initialization status and per-pool health info
@@ -131,22 +229,39 @@ class RedisManager:
             health_status["message"] = "Redis not initialized"
             return health_status
 
+        watchdog = RedisClient.get_pool_health()
+        near_cache_stats = near_caches.stats()
+        compression_stats = value_compression.stats()
+        # Shared and cluster modes keep every space in one keyspace
+        shared = RedisClient.uses_hash_tags()
         for alias in POOL_DB_MAPPING:
             pool_alias: PoolAlias = alias
+            database = None if shared else POOL_DB_MAPPING[alias]
             try:
                 redis = await RedisClient.get(pool_alias)
                 await cast(Awaitable[bool], redis.ping())
                 health_status["pools"][alias] = {
                     "status": "healthy",
-                    "database": POOL_DB_MAPPING[alias],
+                    "database": database,
                     "error": None,
                 }
             except Exception as e:
                 health_status["pools"][alias] = {
                     "status": "unhealthy",
-                    "database": POOL_DB_MAPPING[alias],
+                    "database": database,
                     "error": str(e),
                 }
+            health_status["pools"][alias]["watchdog"] = watchdog.get(
+                RedisClient.pool_name(alias)
+            )
+            if alias in near_cache_stats:
+                health_status["pools"][alias]["near_cache"] = asdict(
+                    near_cache_stats[alias]
+                )
+            if alias in compression_stats:
+                health_status["pools"][alias]["compression"] = asdict(
+                    compression_stats[alias]
+                )
 
         return health_status
 
@@ -182,6 +297,10 @@ class RedisManager:
 
         try:
             logger.info("Shutting down Redis pools...")
+            await near_caches.stop()
+            if cls._generation_sync is not None:
+                await cls._generation_sync.stop()
+                cls._generation_sync = None
             await RedisClient.close()
             cls._initialized = False
             logger.info("Redis pools shut down successfully")
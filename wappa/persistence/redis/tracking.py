@@ -0,0 +1,170 @@
+"""
+Redis client-side caching connections (``CLIENT TRACKING``).
+
+The pools speak RESP2, which has no push messages, so tracking runs in the
+redirect form: reader connections turn tracking on with ``REDIRECT`` to a
+listener connection subscribed to ``__redis__:invalidate``. Redis remembers
+the keys each reader served and, when one changes or expires, publishes it to
+the listener. A reader that disconnects takes its tracking with it, so the
+listener also checks the readers while idle and ends the feed when one fails:
+the caller must then drop everything it cached and reopen.
+
+Used by ``RedisGenerationSync`` (tracking mode) and ``NearCache``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Sequence
+from typing import TYPE_CHECKING, Any, cast
+
+from redis.asyncio.cluster import RedisCluster
+from redis.exceptions import ResponseError
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+    from redis.asyncio.connection import Connection, ConnectionPool
+
+logger = logging.getLogger("RedisTracking")
+
+# Where a RESP2 connection receives redirected tracking invalidations.
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+
+class TrackedConnections:
+    """
+    Reader connections whose reads Redis tracks, and the listener it reports to.
+
+    Args:
+        redis: Client of the pool to take the connections from (single server).
+        readers: Tracked connections; concurrent reads beyond this many wait.
+    """
+
+    def __init__(self, redis: Redis, *, readers: int = 1) -> None:
+        if isinstance(redis, RedisCluster):
+            raise ValueError(
+                "Client-side tracking needs a single Redis server, not a cluster"
+            )
+        if readers < 1:
+            raise ValueError("readers must be at least 1")
+        self._pool: ConnectionPool = redis.connection_pool
+        self._size = readers
+        self._listener: Connection | None = None
+        self._readers: list[Connection] = []
+        self._idle: asyncio.Queue[Connection] = asyncio.Queue()
+
+    async def open(self) -> None:
+        """
+        Take the connections and turn tracking on.
+
+        Raises:
+            ResponseError: If the server has no ``CLIENT TRACKING`` (Redis < 6).
+        """
+        try:
+            self._listener = await self._pool.get_connection()
+            client_id = await _call(self._listener, "CLIENT", "ID")
+            for _ in range(self._size):
+                reader = await self._pool.get_connection()
+                self._readers.append(reader)
+                await _call(reader, "CLIENT", "TRACKING", "ON", "REDIRECT", client_id)
+                self._idle.put_nowait(reader)
+            await _call(self._listener, "SUBSCRIBE", INVALIDATE_CHANNEL)
+        except Exception:
+            await self.close()
+            raise
+        # Invalidations are sparse; an idle listener is not a failure
+        self._listener.socket_timeout = None
+
+    async def call(self, *args: Any) -> Any:
+        """Run one command on a tracked reader."""
+        return (await self.call_many([args]))[0]
+
+    async def call_many(self, commands: Sequence[Sequence[Any]]) -> list[Any]:
+        """
+        Run commands pipelined on one tracked reader.
+
+        Error replies are returned in place (as ``ResponseError``) for the
+        caller to raise; a connection failure ends the feed and is raised.
+        """
+        reader = await self._idle.get()
+        try:
+            await reader.send_packed_command(reader.pack_commands(commands))
+            replies: list[Any] = []
+            for _ in commands:
+                try:
+                    replies.append(await reader.read_response())
+                except ResponseError as e:
+                    replies.append(e)
+            return replies
+        except Exception:
+            # The reader lost its tracking with its connection: end the feed
+            await self._end()
+            raise
+        finally:
+            self._idle.put_nowait(reader)
+
+    async def invalidations(
+        self, *, check_interval: float | None = None
+    ) -> AsyncIterator[list[str] | None]:
+        """
+        Yield the keys Redis invalidates; None means forget every key.
+
+        Args:
+            check_interval: Idle seconds between PINGs of the idle readers.
+
+        Raises:
+            ConnectionError: When the listener or a checked reader fails.
+        """
+        listener = self._listener
+        if listener is None:
+            raise ConnectionError("Tracking connections are closed")
+        while True:
+            message = cast(
+                "list[Any] | None", await listener.read_response(timeout=check_interval)
+            )
+            if message is None:
+                await self._check_readers()
+                continue
+            if len(message) < 3 or _text(message[0]) != "message":
+                continue
+            keys = message[2]
+            # None: the server flushed its tracking table
+            yield None if keys is None else [_text(key) for key in keys]
+
+    async def _check_readers(self) -> None:
+        idle: list[Connection] = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        try:
+            for reader in idle:
+                await _call(reader, "PING")
+        except Exception as e:
+            raise ConnectionError(f"Tracked reader failed: {e}") from e
+        finally:
+            for reader in idle:
+                self._idle.put_nowait(reader)
+
+    async def _end(self) -> None:
+        if self._listener is not None:
+            await self._listener.disconnect()
+
+    async def close(self) -> None:
+        """Disconnect every connection; tracking state must not reach the pool."""
+        for connection in (self._listener, *self._readers):
+            if connection is None:
+                continue
+            await connection.disconnect()
+            await self._pool.release(connection)
+        self._listener = None
+        self._readers.clear()
+        self._idle = asyncio.Queue()
+
+
+async def _call(connection: Connection, *args: Any) -> Any:
+    await connection.send_command(*args)
+    return await connection.read_response()
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
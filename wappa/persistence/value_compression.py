@@ -0,0 +1,237 @@
+"""Threshold-based compression of large cached values.
+
+AI conversation states and wide table rows grow to tens of kilobytes, which
+costs Redis memory, network transfer and JSON file rewrites. With compression
+configured, a value whose encoded text reaches its cache space's threshold is
+stored as a marker character followed by the base64 of the compressed text:
+
+- ``\\x02`` zlib (always available)
+- ``\\x03`` zstd (``pip install wappa[zstd]``)
+- ``\\x04`` lz4 (``pip install wappa[lz4]``)
+
+Values below the threshold, and values that would not shrink, are stored as
+before, so compressed and plain values coexist and reads tell them apart by
+their first character. Cache spaces are named like the Redis pool aliases
+(``users``, ``state_handler``, ``table``, ``ai_state``).
+
+    value_compression.configure("zlib", threshold=4096, thresholds={"ai_state": 1024})
+    value_compression.stats()   # {"ai_state": CompressionStats(ratio=..., ...)}
+"""
+
+from __future__ import annotations
+
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from base64 import b64decode, b64encode
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - exercised when the extra is absent
+    lz4_frame = None
+
+logger = logging.getLogger("ValueCompression")
+
+DEFAULT_THRESHOLD = 4096
+
+
+class Compressor(ABC):
+    """One compression algorithm and the marker its values start with."""
+
+    name: str = ""
+    marker: str = ""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes: ...
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes: ...
+
+
+class ZlibCompressor(Compressor):
+    name = "zlib"
+    marker = "\x02"
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    name = "zstd"
+    marker = "\x03"
+
+    def __init__(self, level: int = 3) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    name = "lz4"
+    marker = "\x04"
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+# Every marker Wappa reserves for compression, installed or not, so a value
+# written by a worker with an extra is never mistaken for plain text.
+COMPRESSION_MARKERS = frozenset({"\x02", "\x03", "\x04"})
+
+
+def _available() -> dict[str, Compressor]:
+    compressors: list[Compressor] = [ZlibCompressor()]
+    if zstandard is not None:
+        compressors.append(ZstdCompressor())
+    if lz4_frame is not None:
+        compressors.append(Lz4Compressor())
+    return {compressor.name: compressor for compressor in compressors}
+
+
+@dataclass
+class CompressionStats:
+    """Write counters of one cache space; ``ratio`` is bytes in / bytes out."""
+
+    compressed: int = 0
+    # Values over the threshold that did not shrink and were stored as is
+    incompressible: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    ratio: float = 1.0
+
+
+class ValueCompression:
+    """Compression settings and counters shared by the cache backends."""
+
+    def __init__(self) -> None:
+        self._compressors = _available()
+        self._by_marker = {c.marker: c for c in self._compressors.values()}
+        self._compressor: Compressor | None = None
+        self.threshold = DEFAULT_THRESHOLD
+        self.thresholds: dict[str, int] = {}
+        self._stats: dict[str, CompressionStats] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._compressor is not None
+
+    @property
+    def algorithm(self) -> str:
+        """Name of the algorithm values are written with, or ``"off"``."""
+        return self._compressor.name if self._compressor else "off"
+
+    def available(self) -> list[str]:
+        """Algorithms installed in this process."""
+        return sorted(self._compressors)
+
+    def configure(
+        self,
+        algorithm: str = "zlib",
+        *,
+        threshold: int = DEFAULT_THRESHOLD,
+        thresholds: Mapping[str, int] | None = None,
+    ) -> None:
+        """
+        Compress values written from now on.
+
+        Args:
+            algorithm: ``zlib``, ``zstd`` or ``lz4``; ``off`` stops compressing
+                (values already compressed keep reading back).
+            threshold: Length of encoded text from which a value is compressed.
+            thresholds: Per cache space overrides of ``threshold``.
+
+        Raises:
+            ValueError: If the algorithm is not installed or a threshold is
+                not positive.
+        """
+        limits = {"default": threshold, **(thresholds or {})}
+        if any(limit < 1 for limit in limits.values()):
+            raise ValueError("Compression thresholds must be positive")
+        if algorithm == "off":
+            self._compressor = None
+        elif algorithm in self._compressors:
+            self._compressor = self._compressors[algorithm]
+        else:
+            raise ValueError(
+                f"Compression '{algorithm}' is not available "
+                f"(installed: {', '.join(self.available())})"
+            )
+        self.threshold = threshold
+        self.thresholds = dict(thresholds or {})
+        logger.debug(f"Value compression: {self.algorithm} from {threshold} bytes")
+
+    def disable(self) -> None:
+        self._compressor = None
+
+    def threshold_for(self, space: str) -> int:
+        return self.thresholds.get(space, self.threshold)
+
+    def pack(self, text: str, space: str) -> str | None:
+        """
+        The stored form of ``text`` when it should be compressed, else None.
+
+        None means: store ``text`` as is (compression off, below the cache
+        space's threshold, or it would not shrink).
+        """
+        compressor = self._compressor
+        if compressor is None or len(text) < self.threshold_for(space):
+            return None
+        data = text.encode()
+        packed = compressor.marker + b64encode(compressor.compress(data)).decode()
+        stats = self._stats.setdefault(space, CompressionStats())
+        if len(packed) >= len(data):
+            stats.incompressible += 1
+            return None
+        stats.compressed += 1
+        stats.bytes_in += len(data)
+        stats.bytes_out += len(packed)
+        stats.ratio = round(stats.bytes_in / stats.bytes_out, 2)
+        return packed
+
+    def unpack(self, stored: str) -> str | None:
+        """The text ``pack`` compressed, or None if ``stored`` is not compressed."""
+        marker = stored[:1]
+        if marker not in COMPRESSION_MARKERS:
+            return None
+        compressor = self._by_marker.get(marker)
+        if compressor is None:
+            logger.error(
+                f"Cached value compressed with marker {marker!r} but its "
+                "algorithm is not installed; reading it as plain text"
+            )
+            return None
+        try:
+            return compressor.decompress(b64decode(stored[1:], validate=True)).decode()
+        except Exception as e:  # bad base64, zlib.error, zstd and lz4 errors
+            logger.warning(f"Could not decompress {compressor.name} value: {e}")
+            return None
+
+    def stats(self) -> dict[str, CompressionStats]:
+        return {space: replace(stats) for space, stats in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+
+value_compression = ValueCompression()
@@ -10,6 +10,12 @@ previous generation is orphaned.
 Orphaned rows are reclaimed by TTL, so a ``default_ttl`` is required: without
 one, bumped generations would linger forever.
 
+Resolving the generation is a backend read. On Redis it is skipped while a
+``RedisGenerationSync`` keeps the process-wide ``GenerationCache`` coherent,
+and a ``get`` that misses the cache resolves and reads in one script. The
+memory and JSON backends resolve it from their own store without taking a
+lock.
+
     versions = VersionedTableCache(
         cache=factory.create_table_cache(),
         table_name="agent_directory",
@@ -31,14 +37,18 @@ from typing import Any
 from pydantic import BaseModel
 
 from wappa.domain.interfaces.cache_interfaces import (
+    FIRST_GENERATION,
+    GENERATION_FIELD,
     ITableCache,
     TableTransitionResult,
+    generation_of,
 )
 from wappa.persistence.cache_space import (
     build_table_name,
     require_non_empty,
     validate_segment,
 )
+from wappa.persistence.generation_cache import GenerationCache, table_generations
 from wappa.persistence.typed_table_cache import TypedRowTransition
 
 # Table holding the generation counter for every versioned table in this
@@ -47,8 +57,8 @@ from wappa.persistence.typed_table_cache import TypedRowTransition
 VERSION_TABLE = "_wappa_table_versions"
 # The stored value counts *bumps*, not generations, so a table that has never
 # been invalidated needs no counter row at all: absent counter == generation 1.
-VERSION_FIELD = "bumps"
-FIRST_VERSION = 1
+VERSION_FIELD = GENERATION_FIELD
+FIRST_VERSION = FIRST_GENERATION
 
 # The counter must outlive every row written under an older generation. After a
 # bump, the newest possible stale row expires within one `default_ttl`, so the
@@ -69,12 +79,13 @@ class VersionedTableCache[T: BaseModel]:
         default_ttl: Required TTL in seconds. Also bounds how long an orphaned
             generation occupies the backend after a bump.
         cache_space: Optional host-owned namespace prefixed to the table name.
+        generations: Process-local generation cache; defaults to the shared
+            ``table_generations``.
 
     Note:
-        Every operation reads the current generation first, costing one extra
-        cache read. That is what makes a bump visible across processes; a
-        process-local cached version would keep serving stale rows after
-        another worker invalidated them.
+        A cached generation is only used while an invalidation feed is
+        attached to ``generations``; otherwise every operation reads the
+        counter first, which is what makes a bump visible across processes.
     """
 
     def __init__(
@@ -84,6 +95,7 @@ class VersionedTableCache[T: BaseModel]:
         model: type[T],
         default_ttl: int,
         cache_space: str | None = None,
+        generations: GenerationCache | None = None,
     ) -> None:
         if not isinstance(default_ttl, int) or default_ttl <= 0:
             raise ValueError(
@@ -98,15 +110,22 @@ class VersionedTableCache[T: BaseModel]:
         self.default_ttl = default_ttl
         self._version_table = build_table_name(VERSION_TABLE, cache_space)
         self._version_ttl = max(default_ttl * VERSION_TTL_FACTOR, MIN_VERSION_TTL)
+        self.generations = generations or table_generations
+        # None when this backend's generations must not be cached in process
+        self._generation_key = cache.generation_key(
+            self._version_table, self.logical_table_name
+        )
 
     async def current_version(self) -> int:
         """Return the active generation, defaulting to 1 when never bumped."""
-        raw = await self.cache.get_field(
-            self._version_table,
-            self.logical_table_name,
-            VERSION_FIELD,
+        if self._generation_key is None:
+            return await self._read_version()
+        return await self.generations.resolve(self._generation_key, self._read_version)
+
+    async def _read_version(self) -> int:
+        return await self.cache.get_generation(
+            self._version_table, self.logical_table_name
         )
-        return self._to_version(raw)
 
     async def bump_version(self) -> int:
         """Invalidate every cached row and return the new generation.
@@ -117,35 +136,45 @@ class VersionedTableCache[T: BaseModel]:
         them; the margin makes that impossible, and an expiry after a long
         idle period costs only a cold cache.
         """
-        bumps = await self.cache.increment_field(
-            self._version_table,
-            self.logical_table_name,
-            VERSION_FIELD,
-            increment=1,
-            ttl=self._version_ttl,
+        version = await self.cache.bump_generation(
+            self._version_table, self.logical_table_name, self._version_ttl
         )
-        if bumps is None:
+        if self._generation_key is not None:
+            self.generations.invalidate([self._generation_key])
+        if version is None:
             raise RuntimeError(
                 f"Failed to bump cache version for table {self.logical_table_name!r}"
             )
-        return self._to_version(bumps)
+        return version
 
     @staticmethod
     def _to_version(bumps: object) -> int:
-        if not isinstance(bumps, (str, bytes, bytearray, int, float)):
-            return FIRST_VERSION
-        try:
-            counter = int(bumps)
-        except (TypeError, ValueError):
-            counter = 0
-        return FIRST_VERSION + max(counter, 0)
+        return generation_of(bumps)
 
     async def get(self, pkid: str) -> T | None:
-        row = await self.cache.get(
-            await self._table(),
-            require_non_empty(pkid, "pkid"),
-            models=self.model,
-        )
+        pkid = require_non_empty(pkid, "pkid")
+        version: int | None = None
+        if self._generation_key is not None:
+            version = (
+                # Only reads through the feed's loader may be cached
+                await self.current_version()
+                if self.generations.loads_reads
+                else self.generations.get(self._generation_key)
+            )
+        if version is not None:
+            row = await self.cache.get(self._table_of(version), pkid, models=self.model)
+        else:
+            # Resolve and read in one go, and keep what was resolved
+            since = self.generations.snapshot()
+            version, row = await self.cache.get_in_generation(
+                self._version_table,
+                self.logical_table_name,
+                f"{self.base_table_name}@v",
+                pkid,
+                models=self.model,
+            )
+            if self._generation_key is not None:
+                self.generations.offer(self._generation_key, version, since)
         if row is None:
             return None
         return self._validate(row)
@@ -240,7 +269,10 @@ class VersionedTableCache[T: BaseModel]:
         return await self._table()
 
     async def _table(self) -> str:
-        return f"{self.base_table_name}@v{await self.current_version()}"
+        return self._table_of(await self.current_version())
+
+    def _table_of(self, version: int) -> str:
+        return f"{self.base_table_name}@v{version}"
 
     def _typed(self, result: TableTransitionResult) -> TypedRowTransition[T]:
         row = None if result.row is None else self._validate(result.row)
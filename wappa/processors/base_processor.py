@@ -101,6 +101,17 @@ class BaseWebhookProcessor(ABC):
         """Convert a provider payload to Wappa's universal webhook contract."""
         pass
 
+    async def create_universal_webhooks(
+        self, payload: dict[str, Any], **kwargs: Any
+    ) -> list[UniversalWebhook]:
+        """
+        Convert a provider payload to one universal webhook per carried event.
+
+        Platforms that batch several events into one delivery override this;
+        the default treats every payload as a single event.
+        """
+        return [await self.create_universal_webhook(payload, **kwargs)]
+
     @abstractmethod
     def validate_webhook_signature(
         self, payload: bytes, signature: str, **kwargs: Any
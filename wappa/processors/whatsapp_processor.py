@@ -1,37 +1,49 @@
-import hashlib
-import hmac
 from datetime import UTC, datetime
-from typing import TYPE_CHECKING, Any, cast
+from types import NoneType
+from typing import TYPE_CHECKING, Any, Literal, cast, get_args, get_origin
 
 from pydantic import ValidationError
 
 from wappa.core.config.settings import settings
+from wappa.core.external_webhooks.signature import HMACSignatureVerifier
 from wappa.processors.base_processor import (
     BaseWebhookProcessor,
     ProcessorCapabilities,
     ProcessorError,
 )
 from wappa.schemas.core.recipient import looks_like_bsuid, looks_like_phone_number
-from wappa.schemas.core.types import ErrorCode, MessageType, PlatformType
+from wappa.schemas.core.types import (
+    ErrorCode,
+    MessageStatus,
+    MessageType,
+    PlatformType,
+    WebhookType,
+)
 from wappa.webhooks.core.base_message import BaseMessage
+from wappa.webhooks.core.base_webhook import compute_webhook_id
+from wappa.webhooks.core.webhook_interfaces import (
+    ConversationBase,
+    InboxBase,
+    StatusWebhook,
+    UserBase,
+)
+from wappa.webhooks.whatsapp.base_models import ConversationOrigin, Pricing
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from wappa.core.events.field_registry import FieldHandlerRegistry
     from wappa.webhooks.core.webhook_interfaces import (
         AdReferralBase,
         BusinessContextBase,
         CallWebhook,
-        ConversationBase,
         CustomWebhook,
         ErrorDetailBase,
         ErrorWebhook,
         ForwardContextBase,
         InboundMessageWebhook,
-        InboxBase,
-        StatusWebhook,
         SystemWebhook,
         UniversalWebhook,
-        UserBase,
         WhatsAppIncomingWebhookData,
     )
     from wappa.webhooks.whatsapp.message_types.system import WhatsAppSystemMessage
@@ -39,13 +51,108 @@ if TYPE_CHECKING:
     from wappa.webhooks.whatsapp.webhook_container import WhatsAppWebhook
 
 
+def _literal_values(annotation: Any) -> frozenset[Any]:
+    """Values accepted by a ``Literal`` annotation, ``None`` included if optional."""
+    if annotation is NoneType:
+        return frozenset({None})
+    if get_origin(annotation) is Literal:
+        return frozenset(get_args(annotation))
+    values: set[Any] = set()
+    for arg in get_args(annotation):
+        values |= _literal_values(arg)
+    return frozenset(values)
+
+
+# Shapes the fast status decoder accepts. Anything else — unknown keys, failed
+# statuses, other fields in the same delivery — goes through full validation,
+# so contract drift is still reported by the strict models.
+_CONTAINER_KEYS = frozenset({"object", "entry"})
+_ENTRY_KEYS = frozenset({"id", "time", "changes"})
+_CHANGE_KEYS = frozenset({"field", "value"})
+_STATUS_VALUE_KEYS = frozenset(
+    {"messaging_product", "metadata", "contacts", "statuses"}
+)
+_METADATA_KEYS = frozenset({"display_phone_number", "phone_number_id"})
+_STATUS_KEYS = frozenset(
+    {
+        "id",
+        "status",
+        "timestamp",
+        "recipient_id",
+        "recipient_user_id",
+        "recipient_parent_user_id",
+        "recipient_type",
+        "recipient_participant_id",
+        "recipient_participant_user_id",
+        "recipient_participant_parent_user_id",
+        "recipient_identity_key_hash",
+        "biz_opaque_callback_data",
+        "conversation",
+        "pricing",
+    }
+)
+_CONTACT_KEYS = frozenset(
+    {"wa_id", "user_id", "parent_user_id", "profile", "identity_key_hash"}
+)
+_PROFILE_KEYS = frozenset({"name", "username", "country_code"})
+_CONVERSATION_KEYS = frozenset({"id", "expiration_timestamp", "origin"})
+_PRICING_KEYS = frozenset(Pricing.model_fields)
+_FAST_STATUSES = frozenset({"sent", "delivered", "read"})
+_RECIPIENT_TYPES = frozenset({None, "individual", "group"})
+_ORIGIN_TYPES = _literal_values(ConversationOrigin.model_fields["type"].annotation)
+_PRICING_MODELS = _literal_values(Pricing.model_fields["pricing_model"].annotation)
+_PRICING_TYPES = _literal_values(Pricing.model_fields["type"].annotation)
+_PRICING_CATEGORIES = _literal_values(Pricing.model_fields["category"].annotation)
+# Same bounds as WhatsAppMessageStatus.validate_timestamp.
+_MIN_STATUS_TIMESTAMP = 1577836800
+_MAX_STATUS_TIMESTAMP = 4102444800
+
+
+class _StrictFallbackError(Exception):
+    """The delivery is outside the fast decoder's shape; validate it fully."""
+
+
+def _text(value: Any) -> str:
+    if not isinstance(value, str):
+        raise _StrictFallbackError
+    return value.strip()
+
+
+def _optional_text(value: Any) -> str | None:
+    return None if value is None else _text(value)
+
+
+def _object(value: Any, allowed_keys: frozenset[str]) -> dict[str, Any]:
+    if not isinstance(value, dict) or not value.keys() <= allowed_keys:
+        raise _StrictFallbackError
+    return value
+
+
+def _non_empty_list(value: Any) -> list[Any]:
+    if not isinstance(value, list) or not value:
+        raise _StrictFallbackError
+    return value
+
+
 class WhatsAppWebhookProcessor(BaseWebhookProcessor):
-    """WhatsApp Business Platform webhook processor."""
+    """WhatsApp Business Platform webhook processor.
 
-    def __init__(self) -> None:
+    Status-only deliveries — the bulk of webhook traffic — are decoded
+    straight from the payload dict into ``StatusWebhook`` objects, checking
+    the same constraints the pydantic models enforce. Pass
+    ``strict_validation=True`` (or set ``SYSTEM_INBOUND_STRICT_VALIDATION``)
+    to run every delivery through the full models instead.
+    """
+
+    def __init__(self, *, strict_validation: bool | None = None) -> None:
         super().__init__()
 
         self._field_registry: FieldHandlerRegistry | None = None
+        self.strict_validation = (
+            settings.inbound_strict_validation
+            if strict_validation is None
+            else strict_validation
+        )
 
         # Define WhatsApp-specific capabilities
         self._capabilities = ProcessorCapabilities(
@@ -125,36 +232,24 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
     def validate_webhook_signature(
         self, payload: bytes, signature: str, **kwargs: Any
     ) -> bool:
-        if not settings.wp_webhook_verify_token:
-            self.logger.warning(
-                "WhatsApp webhook verification token not configured - skipping signature validation"
+        """
+        Verify Meta's ``X-Hub-Signature-256`` over the raw request body.
+
+        Meta signs every webhook with the app secret, passed as
+        ``app_secret=`` (from the inbox credentials) or read from
+        ``WP_APP_SECRET``. Without a configured secret there is nothing to
+        verify against and the payload is accepted.
+        """
+        app_secret = kwargs.get("app_secret") or settings.wp_app_secret
+        if not app_secret:
+            self.logger.debug(
+                "WhatsApp app secret not configured - skipping signature validation"
             )
             return True
 
-        try:
-            if not signature.startswith("sha256="):
-                self.logger.error(
-                    "Invalid signature format - must start with 'sha256='"
-                )
-                return False
-
-            provided_hash = signature.removeprefix("sha256=")
-            expected_hash = hmac.new(
-                settings.wp_webhook_verify_token.encode("utf-8"),
-                payload,
-                hashlib.sha256,
-            ).hexdigest()
-
-            is_valid = hmac.compare_digest(expected_hash, provided_hash)
-            if not is_valid:
-                self.logger.error("Webhook signature validation failed")
-            return is_valid
-
-        except Exception as e:
-            self.logger.error(
-                "Error validating webhook signature: %s", e, exc_info=True
-            )
-            return False
+        return HMACSignatureVerifier(
+            app_secret, header="X-Hub-Signature-256", prefix="sha256="
+        ).verify_signature(payload, signature or "")
 
     def parse_webhook_container(
         self, payload: dict[str, Any], **kwargs: Any
@@ -333,69 +428,54 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
         inbox_id: str | None = None,
         **kwargs: Any,
     ) -> "UniversalWebhook":
-        try:
-            webhook = self.parse_webhook_container(payload)
-            self.logger.debug("Raw WhatsApp webhook received: %s", payload)
-
-            inbox_base = self._create_inbox_base(webhook, inbox_id)
-            universal_webhook: UniversalWebhook | None
+        """Return the first universal webhook carried by the payload.
 
-            # System events are checked BEFORE incoming messages because system
-            # messages (type=="system") arrive in the messages field.
-            if webhook.is_system_event:
-                universal_webhook = await self._create_system_webhook(
-                    webhook, inbox_base, **kwargs
-                )
-            elif webhook.is_call_event:
-                universal_webhook = await self._create_call_webhook(
-                    webhook, inbox_base, **kwargs
-                )
-            elif webhook.is_incoming_message:
-                universal_webhook = await self._create_incoming_message_webhook(
-                    webhook, inbox_base, **kwargs
-                )
-            elif webhook.is_status_update:
-                universal_webhook = await self._create_status_webhook(
-                    webhook, inbox_base, **kwargs
-                )
-            elif webhook.has_errors:
-                universal_webhook = await self._create_error_webhook(
-                    webhook, inbox_base, **kwargs
-                )
-            elif webhook.is_custom_field and self._field_registry is not None:
-                universal_webhook = await self._create_custom_webhook(
-                    webhook, inbox_base, payload, **kwargs
-                )
-            else:
-                universal_webhook = None
+        Batched deliveries carry more than one event; use
+        :meth:`create_universal_webhooks` to receive all of them.
+        """
+        universal_webhooks = await self.create_universal_webhooks(
+            payload, inbox_id=inbox_id, **kwargs
+        )
+        return universal_webhooks[0]
 
-            if universal_webhook is None:
-                # Unknown webhook type -- wrap as an ErrorWebhook
-                from wappa.webhooks.core.webhook_interfaces import (
-                    ErrorDetailBase,
-                    ErrorWebhook,
-                )
+    async def create_universal_webhooks(
+        self,
+        payload: dict[str, Any],
+        inbox_id: str | None = None,
+        **kwargs: Any,
+    ) -> "list[UniversalWebhook]":
+        """Fan a WhatsApp delivery out into one universal webhook per event.
+
+        Meta batches several messages and statuses into one delivery under
+        load, across entries and changes. Every message and every status
+        becomes its own universal webhook, in payload order; other fields
+        (system events, calls, errors, custom fields) yield one webhook per
+        change. The container is validated once for the whole delivery.
+        Status-only deliveries take the fast decoder unless strict
+        validation is enabled.
+        """
+        if not self.strict_validation:
+            status_webhooks = self._decode_status_delivery(payload)
+            if status_webhooks is not None:
+                return status_webhooks
 
-                error_detail = ErrorDetailBase(
-                    error_code=400,
-                    error_title="Unknown webhook type",
-                    error_message="Webhook contains no recognizable content (messages, statuses, errors, or system events)",
-                    error_type="webhook_format",
-                    occurred_at=datetime.now(UTC),
-                )
+        try:
+            webhook = self.parse_webhook_container(payload)
+            self.logger.debug("Raw WhatsApp webhook received: %s", payload)
 
-                return ErrorWebhook(
-                    inbox=inbox_base,
-                    errors=[error_detail],
-                    timestamp=datetime.now(UTC),
-                    error_level="webhook",
-                    platform=PlatformType.WHATSAPP,
-                    webhook_id=webhook.get_webhook_id(),
+            universal_webhooks: list[UniversalWebhook] = []
+            for change_webhook in self._iter_change_webhooks(webhook):
+                inbox_base = self._create_inbox_base(change_webhook, inbox_id)
+                universal_webhooks.extend(
+                    await self._create_change_webhooks(
+                        change_webhook, inbox_base, payload, **kwargs
+                    )
                 )
 
-            universal_webhook.set_raw_webhook_data(payload)
+            for universal_webhook in universal_webhooks:
+                universal_webhook.set_raw_webhook_data(payload)
 
-            return universal_webhook
+            return universal_webhooks
 
         except Exception as e:
             if isinstance(e, ValidationError):
@@ -409,10 +489,350 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
                 PlatformType.WHATSAPP,
             ) from e
 
+    def _iter_change_webhooks(
+        self, webhook: "WhatsAppWebhook"
+    ) -> "Iterator[WhatsAppWebhook]":
+        """Yield one single-change view of the container per entry change.
+
+        Views are built with ``model_construct`` over already-validated
+        entries and changes, so splitting a batch costs no re-validation and
+        every ``WhatsAppWebhook`` helper stays scoped to its own change.
+        """
+        if len(webhook.entry) == 1 and len(webhook.entry[0].changes) == 1:
+            yield webhook
+            return
+
+        from wappa.webhooks.whatsapp.webhook_container import (
+            WebhookEntry,
+            WhatsAppWebhook,
+        )
+
+        for entry in webhook.entry:
+            for change in entry.changes:
+                yield WhatsAppWebhook.model_construct(
+                    object=webhook.object,
+                    entry=[
+                        WebhookEntry.model_construct(
+                            id=entry.id, time=entry.time, changes=[change]
+                        )
+                    ],
+                    received_at=webhook.received_at,
+                )
+
+    # ===== Fast status decoding =====
+
+    def _decode_status_delivery(
+        self, payload: dict[str, Any]
+    ) -> "list[StatusWebhook] | None":
+        """Decode a status-only delivery without the pydantic webhook models.
+
+        Returns None when the payload is anything but plain ``sent`` /
+        ``delivered`` / ``read`` statuses with known keys, and the caller
+        falls back to full validation.
+        """
+        try:
+            return self._decode_status_entries(payload)
+        except (_StrictFallbackError, TypeError, ValueError):
+            return None
+
+    def _decode_status_entries(self, payload: dict[str, Any]) -> "list[StatusWebhook]":
+
+        if (
+            not payload.keys() <= _CONTAINER_KEYS
+            or payload.get("object") != "whatsapp_business_account"
+        ):
+            raise _StrictFallbackError
+
+        received_at = datetime.now(UTC)
+        webhook_ids: dict[tuple[str, str], str] = {}
+        status_webhooks: list[StatusWebhook] = []
+        for entry in _non_empty_list(payload.get("entry")):
+            entry = _object(entry, _ENTRY_KEYS)
+            waba_id = _text(entry.get("id"))
+            if not waba_id.isdigit() or len(waba_id) < 10:
+                raise _StrictFallbackError
+            for change in _non_empty_list(entry.get("changes")):
+                change = _object(change, _CHANGE_KEYS)
+                if change.get("field") != "messages":
+                    raise _StrictFallbackError
+                value = _object(change.get("value"), _STATUS_VALUE_KEYS)
+                if value.get("messaging_product") != "whatsapp":
+                    raise _StrictFallbackError
+                metadata = _object(value.get("metadata"), _METADATA_KEYS)
+                display_phone_number = _text(metadata.get("display_phone_number"))
+                phone_number_id = _text(metadata.get("phone_number_id"))
+                if len(display_phone_number) < 10:
+                    raise _StrictFallbackError
+
+                inbox_base = InboxBase(
+                    inbox_id=phone_number_id,
+                    display_address=display_phone_number,
+                    platform_account_id=waba_id,
+                )
+                contacts: dict[str, UserBase] = {}
+                for contact in value.get("contacts") or ():
+                    identity, user = self._decode_status_contact(contact)
+                    contacts.setdefault(identity, user)
+                webhook_id = webhook_ids.get((waba_id, phone_number_id))
+                if webhook_id is None:
+                    webhook_id = webhook_ids[waba_id, phone_number_id] = (
+                        compute_webhook_id(
+                            PlatformType.WHATSAPP,
+                            waba_id,
+                            phone_number_id,
+                            received_at,
+                            WebhookType.STATUS_UPDATES,
+                        )
+                    )
+                for raw_status in _non_empty_list(value.get("statuses")):
+                    status_webhooks.append(
+                        self._decode_status(
+                            raw_status, inbox_base, contacts, webhook_id, payload
+                        )
+                    )
+        return status_webhooks
+
+    def _decode_status(
+        self,
+        raw_status: Any,
+        inbox_base: "InboxBase",
+        contacts: dict[str, UserBase],
+        webhook_id: str,
+        payload: dict[str, Any],
+    ) -> "StatusWebhook":
+
+        raw_status = _object(raw_status, _STATUS_KEYS)
+        message_id = _text(raw_status.get("id"))
+        if len(message_id) < 10 or not message_id.startswith("wamid."):
+            raise _StrictFallbackError
+        status = raw_status.get("status")
+        if status not in _FAST_STATUSES:
+            raise _StrictFallbackError
+        timestamp = _text(raw_status.get("timestamp"))
+        if (
+            not timestamp.isdigit()
+            or not _MIN_STATUS_TIMESTAMP <= int(timestamp) <= _MAX_STATUS_TIMESTAMP
+        ):
+            raise _StrictFallbackError
+        recipient_type = raw_status.get("recipient_type")
+        if recipient_type not in _RECIPIENT_TYPES:
+            raise _StrictFallbackError
+
+        recipient_phone_id = _text(raw_status.get("recipient_id", ""))
+        recipient_bsuid = _optional_text(raw_status.get("recipient_user_id"))
+        participant_phone_id = _optional_text(
+            raw_status.get("recipient_participant_id")
+        )
+        participant_bsuid = _optional_text(
+            raw_status.get("recipient_participant_user_id")
+        )
+        # Same canonical user_id and contact matching as _create_status_webhook.
+        if recipient_type == "group":
+            canonical_user_id = participant_bsuid or participant_phone_id or None
+            contact_identity = canonical_user_id or recipient_phone_id or ""
+        else:
+            canonical_user_id = recipient_bsuid or recipient_phone_id or None
+            contact_identity = recipient_bsuid or recipient_phone_id
+
+        user = None
+        if contacts:
+            user = contacts.get(contact_identity) or UserBase(
+                phone_number=contact_identity
+                if looks_like_phone_number(contact_identity)
+                else "",
+                bsuid=contact_identity if looks_like_bsuid(contact_identity) else None,
+            )
+
+        return StatusWebhook(
+            inbox=inbox_base,
+            message_id=message_id,
+            status=MessageStatus(status),
+            recipient_phone_id=recipient_phone_id,
+            recipient_bsuid=recipient_bsuid,
+            recipient_parent_bsuid=_optional_text(
+                raw_status.get("recipient_parent_user_id")
+            ),
+            user=user,
+            recipient_type=recipient_type,
+            recipient_participant_phone_id=participant_phone_id,
+            recipient_participant_bsuid=participant_bsuid,
+            recipient_participant_parent_bsuid=_optional_text(
+                raw_status.get("recipient_participant_parent_user_id")
+            ),
+            user_id=canonical_user_id,
+            timestamp=datetime.fromtimestamp(int(timestamp)),
+            conversation=self._decode_status_conversation(raw_status),
+            errors=None,
+            business_opaque_data=_optional_text(
+                raw_status.get("biz_opaque_callback_data")
+            ),
+            recipient_identity_hash=_optional_text(
+                raw_status.get("recipient_identity_key_hash")
+            ),
+            platform=PlatformType.WHATSAPP,
+            webhook_id=webhook_id,
+            raw_webhook_data=payload,
+        )
+
+    @staticmethod
+    def _decode_status_contact(contact: Any) -> tuple[str, UserBase]:
+        """Return a contact's matching identity and its ``UserBase``."""
+        contact = _object(contact, _CONTACT_KEYS)
+        wa_id = _text(contact.get("wa_id", ""))
+        bsuid = _optional_text(contact.get("user_id"))
+        profile = contact.get("profile")
+        name = username = country_code = None
+        if profile is not None:
+            profile = _object(profile, _PROFILE_KEYS)
+            name = _optional_text(profile.get("name"))
+            if name == "":
+                raise _StrictFallbackError
+            # ContactProfile normalises usernames to "@handle".
+            username = _optional_text(profile.get("username")) or None
+            if username and not username.startswith("@"):
+                username = f"@{username}"
+            country_code = _optional_text(profile.get("country_code"))
+        return bsuid or wa_id, UserBase(
+            phone_number=wa_id,
+            bsuid=bsuid,
+            parent_bsuid=_optional_text(contact.get("parent_user_id")),
+            username=username,
+            country_code=country_code,
+            profile_name=name,
+            identity_key_hash=_optional_text(contact.get("identity_key_hash")),
+        )
+
+    @staticmethod
+    def _decode_status_conversation(
+        raw_status: dict[str, Any],
+    ) -> "ConversationBase | None":
+
+        pricing = raw_status.get("pricing")
+        if pricing is not None:
+            pricing = _object(pricing, _PRICING_KEYS)
+            if (
+                not isinstance(pricing.get("billable"), bool)
+                or pricing.get("pricing_model") not in _PRICING_MODELS
+                or pricing.get("type") not in _PRICING_TYPES
+                or pricing.get("category") not in _PRICING_CATEGORIES
+            ):
+                raise _StrictFallbackError
+
+        conversation = raw_status.get("conversation")
+        if conversation is None:
+            return None
+        conversation = _object(conversation, _CONVERSATION_KEYS)
+        origin_type = _object(conversation.get("origin"), frozenset({"type"})).get(
+            "type"
+        )
+        if origin_type not in _ORIGIN_TYPES:
+            raise _StrictFallbackError
+        expiration = _optional_text(conversation.get("expiration_timestamp"))
+        if expiration is not None and not expiration.isdigit():
+            raise _StrictFallbackError
+
+        return ConversationBase(
+            conversation_id=_text(conversation.get("id")),
+            expiration_timestamp=datetime.fromtimestamp(int(expiration), tz=UTC)
+            if expiration is not None
+            else None,
+            category=origin_type,
+            origin_type=origin_type,
+            is_billable=pricing["billable"] if pricing else None,
+            pricing_model=pricing["pricing_model"] if pricing else None,
+            pricing_category=pricing["category"] if pricing else None,
+            pricing_type=pricing.get("type") if pricing else None,
+        )
+
+    async def _create_change_webhooks(
+        self,
+        webhook: "WhatsAppWebhook",
+        inbox_base: "InboxBase",
+        payload: dict[str, Any],
+        **kwargs: Any,
+    ) -> "list[UniversalWebhook]":
+        """Build the universal webhooks carried by a single-change view."""
+        raw_messages = webhook.get_raw_messages()
+
+        # System events are checked BEFORE incoming messages because system
+        # messages (type=="system") arrive in the messages field.
+        if webhook.is_system_event and not raw_messages:
+            return [await self._create_system_webhook(webhook, inbox_base, **kwargs)]
+        if webhook.is_call_event:
+            return [await self._create_call_webhook(webhook, inbox_base, **kwargs)]
+        if raw_messages:
+            universal_webhooks: list[UniversalWebhook] = []
+            for raw_message in raw_messages:
+                if raw_message.get("type") == "system":
+                    universal_webhooks.append(
+                        await self._create_system_webhook(
+                            webhook, inbox_base, raw_message=raw_message, **kwargs
+                        )
+                    )
+                else:
+                    universal_webhooks.append(
+                        await self._create_incoming_message_webhook(
+                            webhook, inbox_base, raw_message=raw_message, **kwargs
+                        )
+                    )
+            return universal_webhooks
+        if webhook.is_incoming_message:
+            raise ProcessorError(
+                "No messages found in incoming message webhook",
+                ErrorCode.PROCESSING_ERROR,
+                PlatformType.WHATSAPP,
+            )
+        if webhook.is_status_update:
+            raw_statuses = webhook.get_raw_statuses()
+            if not raw_statuses:
+                raise ProcessorError(
+                    "No statuses found in status webhook",
+                    ErrorCode.PROCESSING_ERROR,
+                    PlatformType.WHATSAPP,
+                )
+            return [
+                await self._create_status_webhook(
+                    webhook, inbox_base, raw_status=raw_status, **kwargs
+                )
+                for raw_status in raw_statuses
+            ]
+        if webhook.has_errors:
+            return [await self._create_error_webhook(webhook, inbox_base, **kwargs)]
+        if webhook.is_custom_field and self._field_registry is not None:
+            return [
+                await self._create_custom_webhook(
+                    webhook, inbox_base, payload, **kwargs
+                )
+            ]
+
+        # Unknown webhook type -- wrap as an ErrorWebhook
+        from wappa.webhooks.core.webhook_interfaces import (
+            ErrorDetailBase,
+            ErrorWebhook,
+        )
+
+        error_detail = ErrorDetailBase(
+            error_code=400,
+            error_title="Unknown webhook type",
+            error_message="Webhook contains no recognizable content (messages, statuses, errors, or system events)",
+            error_type="webhook_format",
+            occurred_at=datetime.now(UTC),
+        )
+
+        return [
+            ErrorWebhook(
+                inbox=inbox_base,
+                errors=[error_detail],
+                timestamp=datetime.now(UTC),
+                error_level="webhook",
+                platform=PlatformType.WHATSAPP,
+                webhook_id=webhook.get_webhook_id(),
+            )
+        ]
+
     def _create_inbox_base(
         self, webhook: "WhatsAppWebhook", inbox_id: str | None = None
     ) -> "InboxBase":
-        from wappa.webhooks.core.webhook_interfaces import InboxBase
 
         # Built-in field payloads carry value.metadata with phone number info.
         # Custom registered fields (e.g. message_template_status_update) do
@@ -434,19 +854,24 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
         )
 
     async def _create_incoming_message_webhook(
-        self, webhook: "WhatsAppWebhook", inbox_base: "InboxBase", **kwargs: Any
+        self,
+        webhook: "WhatsAppWebhook",
+        inbox_base: "InboxBase",
+        raw_message: dict[str, Any] | None = None,
+        **kwargs: Any,
     ) -> "InboundMessageWebhook":
         from wappa.webhooks.core.webhook_interfaces import InboundMessageWebhook
 
-        raw_messages = webhook.get_raw_messages()
-        if not raw_messages:
-            raise ProcessorError(
-                "No messages found in incoming message webhook",
-                ErrorCode.PROCESSING_ERROR,
-                PlatformType.WHATSAPP,
-            )
+        if raw_message is None:
+            raw_messages = webhook.get_raw_messages()
+            if not raw_messages:
+                raise ProcessorError(
+                    "No messages found in incoming message webhook",
+                    ErrorCode.PROCESSING_ERROR,
+                    PlatformType.WHATSAPP,
+                )
+            raw_message = raw_messages[0]
 
-        raw_message = raw_messages[0]
         raw_message_type = raw_message.get("type", "text")
 
         # WhatsApp uses 'contacts' but the enum uses 'contact'.
@@ -558,20 +983,23 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
         )
 
     async def _create_status_webhook(
-        self, webhook: "WhatsAppWebhook", inbox_base: "InboxBase", **kwargs: Any
+        self,
+        webhook: "WhatsAppWebhook",
+        inbox_base: "InboxBase",
+        raw_status: dict[str, Any] | None = None,
+        **kwargs: Any,
     ) -> "StatusWebhook":
-        from wappa.webhooks.core.webhook_interfaces import StatusWebhook
 
-        raw_statuses = webhook.get_raw_statuses()
-        if not raw_statuses:
-            raise ProcessorError(
-                "No statuses found in status webhook",
-                ErrorCode.PROCESSING_ERROR,
-                PlatformType.WHATSAPP,
-            )
+        if raw_status is None:
+            raw_statuses = webhook.get_raw_statuses()
+            if not raw_statuses:
+                raise ProcessorError(
+                    "No statuses found in status webhook",
+                    ErrorCode.PROCESSING_ERROR,
+                    PlatformType.WHATSAPP,
+                )
+            raw_status = raw_statuses[0]
 
-        # Parse the first status
-        raw_status = raw_statuses[0]
         status = self.create_status_from_data(raw_status)
 
         # Extract conversation and error context
@@ -616,8 +1044,8 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
             timestamp=datetime.fromtimestamp(getattr(status, "timestamp", 0)),
             conversation=conversation,
             errors=errors,
-            business_opaque_data=getattr(status, "business_opaque_data", None),
-            recipient_identity_hash=getattr(status, "recipient_identity_hash", None),
+            business_opaque_data=status.biz_opaque_callback_data,
+            recipient_identity_hash=status.recipient_identity_key_hash,
             platform=PlatformType.WHATSAPP,
             webhook_id=webhook.get_webhook_id(),
         )
@@ -724,7 +1152,11 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
         )
 
     async def _create_system_webhook(
-        self, webhook: "WhatsAppWebhook", inbox_base: "InboxBase", **kwargs: Any
+        self,
+        webhook: "WhatsAppWebhook",
+        inbox_base: "InboxBase",
+        raw_message: dict[str, Any] | None = None,
+        **kwargs: Any,
     ) -> "SystemWebhook":
         # Handles direct fields and system messages carried by messages[].
         # - field: "user_preferences"           → MARKETING_PREFERENCE
@@ -843,7 +1275,6 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
                     event_timestamp = datetime.fromtimestamp(entry_time, tz=UTC)
 
             case "group_participants_update":
-                from wappa.webhooks.core.webhook_interfaces import UserBase
                 from wappa.webhooks.whatsapp.system_events import (
                     GroupParticipantsUpdateEntry,
                 )
@@ -897,7 +1328,6 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
                     )
 
             case "history" | "smb_message_echoes" | "smb_app_state_sync":
-                from wappa.webhooks.core.webhook_interfaces import UserBase
                 from wappa.webhooks.whatsapp.coexistence_events import (
                     HistoryWebhookValue,
                     SmbAppStateSyncWebhookValue,
@@ -969,15 +1399,17 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
 
             case "messages":
                 # System messages from the messages field (type=="system")
-                raw_messages = webhook.get_raw_messages()
-                if not raw_messages:
-                    raise ProcessorError(
-                        "No system messages found in webhook",
-                        ErrorCode.PROCESSING_ERROR,
-                        PlatformType.WHATSAPP,
-                    )
+                if raw_message is None:
+                    raw_messages = webhook.get_raw_messages()
+                    if not raw_messages:
+                        raise ProcessorError(
+                            "No system messages found in webhook",
+                            ErrorCode.PROCESSING_ERROR,
+                            PlatformType.WHATSAPP,
+                        )
+                    raw_message = raw_messages[0]
 
-                message = self._create_system_message(raw_messages[0])
+                message = self._create_system_message(raw_message)
 
                 if message.is_number_change:
                     system_event_type = SystemEventType.NUMBER_CHANGE
@@ -1023,7 +1455,6 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
     def _create_user_base_from_contacts(
         self, webhook: "WhatsAppWebhook", sender_id: str
     ) -> "UserBase":
-        from wappa.webhooks.core.webhook_interfaces import UserBase
 
         for contact in webhook.get_contacts():
             if contact.user_id == sender_id:
@@ -1145,7 +1576,6 @@ class WhatsAppWebhookProcessor(BaseWebhookProcessor):
     def _extract_conversation_context(
         self, status_data: Any
     ) -> "ConversationBase | None":
-        from wappa.webhooks.core.webhook_interfaces import ConversationBase
 
         conversation = getattr(status_data, "conversation", None)
         if not conversation:
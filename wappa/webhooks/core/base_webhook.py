@@ -5,6 +5,8 @@ This module defines the abstract base classes that all platform-specific
 webhook implementations must inherit from to ensure consistent interfaces.
 """
 
+import hashlib
+import json
 from abc import ABC, abstractmethod
 from datetime import UTC, datetime
 from typing import Any
@@ -13,6 +15,32 @@ from pydantic import BaseModel, ConfigDict, Field
 
 from wappa.schemas.core.types import PlatformType, WebhookType
 
+_WEBHOOK_ID_ENCODER = json.JSONEncoder(sort_keys=True)
+
+
+def compute_webhook_id(
+    platform: PlatformType,
+    business_id: str,
+    source_id: str,
+    received_at: datetime,
+    webhook_type: WebhookType,
+) -> str:
+    """Deterministic webhook ID from platform, account, source and receipt time.
+
+    Shared by :meth:`BaseWebhook.get_webhook_id` and processors that build
+    universal webhooks without a parsed container.
+    """
+    content = _WEBHOOK_ID_ENCODER.encode(
+        {
+            "platform": platform.value,
+            "business_id": business_id,
+            "source_id": source_id,
+            "received_at": received_at.isoformat(),
+            "webhook_type": webhook_type.value,
+        }
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
 
 class BaseContact(BaseModel, ABC):
     """
@@ -217,20 +245,13 @@ class BaseWebhook(BaseModel, ABC):
 
         This can be used for deduplication, logging, and tracking.
         """
-        import hashlib
-        import json
-
-        # Create deterministic ID based on platform, business_id, and timestamp
-        data = {
-            "platform": self.platform.value,
-            "business_id": self.business_id,
-            "source_id": self.source_id,
-            "received_at": self.received_at.isoformat(),
-            "webhook_type": self.webhook_type.value,
-        }
-
-        content = json.dumps(data, sort_keys=True)
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+        return compute_webhook_id(
+            self.platform,
+            self.business_id,
+            self.source_id,
+            self.received_at,
+            self.webhook_type,
+        )
 
     def get_summary(self) -> dict[str, Any]:
         """